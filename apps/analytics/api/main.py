@@ -1,4 +1,3 @@
-import json
 import logging
 import sys
 from datetime import datetime, timezone
@@ -55,6 +54,7 @@ from fastapi import BackgroundTasks, FastAPI, HTTPException  # noqa: E402
 app = FastAPI(title="ABACO Analytics API")
 
 ARTIFACTS_DIR = Path("logs/runs")
+VINTAGES_DIR = Path("exports/vintages")
 
 
 @app.get("/health")
@@ -62,40 +62,119 @@ def health_check():
     return {"status": "healthy", "timestamp": datetime.now(timezone.utc).isoformat()}
 
 
-@app.get("/api/kpis/latest")
-def get_latest_kpis():
-    """Fetch the latest KPI results from the most recent run manifest."""
-    if not ARTIFACTS_DIR.exists():
-        raise HTTPException(status_code=404, detail="No run artifacts found")
+_catalog = None
 
-    # Find the latest manifest
-    manifests = sorted(
-        ARTIFACTS_DIR.glob("*/**/*_manifest.json"), key=lambda p: p.stat().st_mtime, reverse=True
-    )
 
-    if not manifests:
-        raise HTTPException(status_code=404, detail="No manifests found")
+def get_catalog():
+    """Process-wide manifest catalog for ``ARTIFACTS_DIR``.
+
+    Runs written before the catalog existed are merged in once from their
+    ``*_manifest.json`` files, even if a pipeline run has created the catalog since.
+    """
+    global _catalog
+    from src.pipeline.manifest_catalog import ManifestCatalog
+
+    if _catalog is None or _catalog.root != ARTIFACTS_DIR:
+        _catalog = ManifestCatalog(ARTIFACTS_DIR)
+    if ARTIFACTS_DIR.exists():
+        _catalog.backfill()
+    return _catalog
 
-    latest_manifest_path = manifests[0]
+
+def _read_manifest(entry) -> dict:
     try:
-        with latest_manifest_path.open("r", encoding="utf-8") as f:
-            manifest = json.load(f)
-        if not isinstance(manifest, dict):
-            logger.error(
-                "Manifest at %s is not an object (type=%s)",
-                latest_manifest_path,
-                type(manifest).__name__,
-            )
-            raise HTTPException(status_code=500, detail="Malformed manifest file")
+        return get_catalog().load_manifest(entry)
+    except Exception as e:
+        logger.error("Failed to read manifest %s: %s", entry.manifest_path, e)
+        # Re-raise with chaining so the original exception is preserved
+        raise HTTPException(status_code=500, detail=f"Error reading manifest: {str(e)}") from e
+
+
+@app.get("/api/kpis/latest")
+def get_latest_kpis():
+    """Fetch the latest KPI results from the manifest catalog, or the run store."""
+    entry = get_catalog().latest()
+    if entry is not None:
+        manifest = _read_manifest(entry)
         return {
             "run_id": manifest.get("run_id"),
             "generated_at": manifest.get("generated_at"),
             "metrics": manifest.get("metrics"),
             "quality_checks": manifest.get("quality_checks"),
         }
-    except Exception as e:
-        # Re-raise with chaining so the original exception is preserved
-        raise HTTPException(status_code=500, detail=f"Error reading manifest: {str(e)}") from e
+
+    from src.pipeline.run_store import open_run_store
+
+    store = open_run_store()
+    if store is not None:
+        try:
+            latest = store.latest_run()
+        except Exception as e:
+            logger.warning("Run store unavailable: %s", e)
+            latest = None
+        if latest is not None:
+            return {
+                "run_id": latest["run_id"],
+                "generated_at": latest["generated_at"],
+                "metrics": latest["metrics"],
+                "quality_checks": latest["quality_checks"],
+            }
+
+    raise HTTPException(status_code=404, detail="No manifests found")
+
+
+@app.get("/api/runs")
+def list_runs(date: str):
+    """List catalogued runs generated on ``date`` (YYYY-MM-DD)."""
+    try:
+        datetime.strptime(date, "%Y-%m-%d")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {date}") from e
+    return {"date": date, "runs": [entry.to_dict() for entry in get_catalog().on_date(date)]}
+
+
+@app.get("/api/runs/{run_id}")
+def get_run(run_id: str, section: str | None = None):
+    """Fetch one run's catalog entry and manifest header, or one manifest body section."""
+    entry = get_catalog().get(run_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Run not found: {run_id}")
+    manifest = _read_manifest(entry)
+    if section is None:
+        return {**entry.to_dict(), "manifest": manifest.header}
+    try:
+        value = manifest.section(section) if section in manifest.sections else manifest[section]
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown manifest section: {section}") from e
+    return {**entry.to_dict(), "section": section, "value": value}
+
+
+@app.get("/api/kpis/vintages")
+def get_vintage_curves(metric: str = "dpd30_rate"):
+    """Return one vintage metric as a curve (MOB -> value) per origination cohort."""
+    from src.analytics.vintages import (AMOUNT_COLUMNS, RATE_COLUMNS,
+                                        load_vintage_curves)
+
+    if metric not in RATE_COLUMNS and metric not in AMOUNT_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"Unknown vintage metric: {metric}")
+
+    vintages = load_vintage_curves(VINTAGES_DIR)
+    if vintages.cells.empty:
+        raise HTTPException(status_code=404, detail="No vintage curves found")
+
+    matrix = vintages.matrix(metric)
+    cohorts = [
+        {
+            "cohort": cohort,
+            "curve": {int(mob): float(value) for mob, value in row.dropna().items()},
+        }
+        for cohort, row in matrix.iterrows()
+    ]
+    return {
+        "metric": metric,
+        "last_month": vintages.last_month.strftime("%Y-%m-%d"),
+        "cohorts": cohorts,
+    }
 
 
 @app.post("/api/pipeline/trigger")
@@ -253,6 +253,28 @@ def main():
         scorecard_path = project_root / "exports" / "quarterly_scorecard.csv"
         scorecard_df.to_csv(scorecard_path, index=False)
         print(f"✅ Quarterly Scorecard saved to: {scorecard_path}")
+
+        # Export roll-rate matrices for forecasting and loss simulation
+        print("📝 Exporting Roll-Rate Matrices...")
+        roll_rates_df = catalog_proc.get_roll_rates()
+        if roll_rates_df.empty:
+            print("⚠️  No payment schedule loaded; roll-rate matrices not exported")
+        else:
+            roll_rates_path = project_root / "exports" / "roll_rates.parquet"
+            roll_rates_df.to_parquet(roll_rates_path, index=False)
+            print(f"✅ Roll-Rate Matrices saved to: {roll_rates_path}")
+
+        # Append new months to the stored vintage curves
+        print("📝 Updating Vintage Curves...")
+        from src.analytics.vintages import update_vintage_store
+
+        scheduled_loan_month = catalog_proc.scheduled_loan_month()
+        if scheduled_loan_month.empty:
+            print("⚠️  No payment schedule loaded; vintage curves not updated")
+        else:
+            vintages_dir = project_root / "exports" / "vintages"
+            vintages = update_vintage_store(vintages_dir, scheduled_loan_month)
+            print(f"✅ Vintage Curves ({len(vintages.cells):,} cells) saved to: {vintages_dir}")
     except Exception as e:
         print(f"⚠️  Error calculating extended KPIs: {e}")
         import traceback
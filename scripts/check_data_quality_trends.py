@@ -2,19 +2,49 @@
 """
 Check data quality trends script.
 
-This script checks data quality trends based on Opik metrics.
+This script checks data quality trends from the pipeline run store, falling
+back to Opik metrics when no run has been recorded there yet.
 """
 
 import json
 import logging
+import os
+import sys
 from pathlib import Path
 
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.pipeline.run_store import open_run_store  # noqa: E402
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+TREND_WINDOW = int(os.getenv("QUALITY_TREND_WINDOW", "5"))
+
+
+def _quality_from_run_store(window: int = TREND_WINDOW):
+    """Latest run's check pass rate, rolling pass rate and anomaly count, if recorded."""
+    store = open_run_store()
+    if store is None:
+        return None
+    trend = store.quality_trend(window=window)
+    if trend.empty:
+        return None
+    latest = trend.iloc[-1]
+    # Runs without quality checks count as passing
+    pass_rate = float(latest["pass_rate"]) if pd.notna(latest["pass_rate"]) else 1.0
+    rolling = latest["rolling_pass_rate"]
+    return {
+        "completeness_score": float(rolling) if pd.notna(rolling) else pass_rate,
+        "validity_score": pass_rate,
+        "anomalies_detected": int(latest["anomaly_count"] or 0),
+        "run_id": latest["run_id"],
+        "runs_in_window": min(len(trend), window),
+    }
 
-def check_data_quality_trends():
-    """Check data quality trends from metrics."""
+
+def _quality_from_opik():
     metrics_file = Path("outputs/opik_metrics.json")
 
     if not metrics_file.exists():
@@ -24,7 +54,16 @@ def check_data_quality_trends():
     with open(metrics_file, "r") as f:
         metrics = json.load(f)
 
-    quality_metrics = metrics.get("data_quality", {})
+    return metrics.get("data_quality", {})
+
+
+def check_data_quality_trends():
+    """Check data quality trends from metrics."""
+    quality_metrics = _quality_from_run_store()
+    source = "run_store"
+    if quality_metrics is None:
+        quality_metrics = _quality_from_opik()
+        source = "opik"
 
     # Analyze trends
     completeness = quality_metrics.get("completeness_score", 0)
@@ -57,7 +96,11 @@ def check_data_quality_trends():
         "completeness_score": completeness,
         "validity_score": validity,
         "anomaly_count": anomalies,
+        "source": source,
     }
+    if source == "run_store":
+        analysis["run_id"] = quality_metrics["run_id"]
+        analysis["runs_in_window"] = quality_metrics["runs_in_window"]
 
     with open(output_dir / "data_quality_trends.json", "w") as f:
         json.dump(analysis, f, indent=2)
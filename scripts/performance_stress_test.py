@@ -18,7 +18,11 @@ import psutil
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.analytics.credit_loss import simulate_credit_losses
+from src.analytics.scenarios import (ScenarioGrid, roll_forward_matrix,
+                                     run_scenarios)
 from src.kpi_engine_v2 import KPIEngineV2
+from src.kpis.base import safe_numeric
 
 try:
     from src.azure_tracing import setup_azure_tracing
@@ -31,6 +35,34 @@ except (ImportError, Exception) as tracing_err:
     logger.warning("Azure tracing not initialized: %s", tracing_err)
 
 
+def per_metric_scans(df):
+    """PAR30, PAR90 and collection rate as computed before fused aggregation.
+
+    Each KPI counts nulls and sums its own columns with separate pandas calls,
+    so shared columns (``total_receivable_usd``, ``dpd_90_plus_usd``) are
+    scanned once per KPI.
+    """
+    par30_cols = ["dpd_30_60_usd", "dpd_60_90_usd", "dpd_90_plus_usd", "total_receivable_usd"]
+    par30_nulls = sum(df[col].isnull().sum() for col in par30_cols)
+    par30_receivable = safe_numeric(df["total_receivable_usd"]).sum()
+    par30_delinquent = sum(safe_numeric(df[col]).sum() for col in par30_cols[:3])
+
+    par90_nulls = df["dpd_90_plus_usd"].isnull().sum()
+    par90_dpd = safe_numeric(df["dpd_90_plus_usd"]).sum()
+    par90_receivable = safe_numeric(df["total_receivable_usd"]).sum()
+
+    collection_nulls = df["cash_available_usd"].isnull().sum()
+    collection_nulls += df["total_eligible_usd"].isnull().sum()
+    cash = safe_numeric(df["cash_available_usd"]).sum()
+    eligible = safe_numeric(df["total_eligible_usd"]).sum()
+
+    return {
+        "PAR30": (par30_delinquent / par30_receivable * 100.0, int(par30_nulls)),
+        "PAR90": (par90_dpd / par90_receivable * 100.0, int(par90_nulls)),
+        "CollectionRate": (round(cash / eligible * 100.0, 2), int(collection_nulls)),
+    }
+
+
 class PerformanceStressTest:
     """Comprehensive performance and stress testing"""
 
@@ -205,6 +237,124 @@ class PerformanceStressTest:
         logger.info("\n✓ Resource usage test complete")
         return results
 
+    def test_fused_aggregation(self, size=100000, repeats=5):
+        """Compare the previous per-KPI pandas scans with the shared single-pass aggregation"""
+        logger.info("\n" + "=" * 70)
+        logger.info("TEST 4: FUSED AGGREGATION")
+        logger.info("=" * 70)
+
+        df = self.create_test_dataset(size)
+
+        start_time = time.perf_counter()
+        for _ in range(repeats):
+            per_metric_scans(df)
+        sequential = (time.perf_counter() - start_time) / repeats
+
+        start_time = time.perf_counter()
+        for _ in range(repeats):
+            fused_results = KPIEngineV2(df).calculate_all(include_composite=False)
+        fused = (time.perf_counter() - start_time) / repeats
+
+        baseline = per_metric_scans(df)
+        results = {
+            "dataset_size": size,
+            "sequential_time_s": sequential,
+            "fused_time_s": fused,
+            "speedup": sequential / fused if fused else None,
+            "values_match": all(
+                np.isclose(fused_results[kpi]["value"], value)
+                for kpi, (value, _) in baseline.items()
+            ),
+        }
+
+        logger.info(f"  Sequential: {sequential * 1000:.1f}ms")
+        logger.info(f"  Fused: {fused * 1000:.1f}ms")
+        logger.info(f"  Speedup: {results['speedup']:.2f}x")
+
+        self.results["tests"]["fused_aggregation"] = results
+        logger.info("\n✓ Fused aggregation test complete")
+        return results
+
+    def test_scenario_sweep(self, size=100000):
+        """Evaluate a 1,000-scenario rate x haircut x roll-forward grid"""
+        logger.info("\n" + "=" * 70)
+        logger.info("TEST 5: SCENARIO SWEEP")
+        logger.info("=" * 70)
+
+        df = self.create_test_dataset(size)
+        df["interest_rate"] = np.random.uniform(0.05, 0.4, size)
+        df["principal_balance"] = np.random.uniform(1000, 50000, size)
+        grid = ScenarioGrid(
+            rate_deltas=np.linspace(-0.02, 0.02, 10),
+            haircuts=np.linspace(0.0, 0.45, 10),
+            migrations={f"roll_{r:.2f}": roll_forward_matrix(r) for r in np.linspace(0, 0.3, 10)},
+        )
+
+        start_time = time.perf_counter()
+        frame = run_scenarios(df, grid)
+        elapsed = time.perf_counter() - start_time
+
+        results = {
+            "dataset_size": size,
+            "scenarios": len(frame),
+            "sweep_time_s": elapsed,
+            "per_scenario_us": elapsed / len(frame) * 1e6,
+        }
+
+        logger.info(f"  Scenarios: {len(frame):,}")
+        logger.info(f"  Sweep: {elapsed * 1000:.1f}ms")
+
+        self.results["tests"]["scenario_sweep"] = results
+        logger.info("\n✓ Scenario sweep test complete")
+        return results
+
+    def test_credit_loss_simulation(self, loans=100000, paths=10000, workers=None):
+        """Monte Carlo credit losses for a synthetic book across a process pool"""
+        logger.info("\n" + "=" * 70)
+        logger.info("TEST 6: CREDIT LOSS SIMULATION")
+        logger.info("=" * 70)
+
+        workers = workers or os.cpu_count() or 1
+        rng = np.random.default_rng(42)
+        exposures = pd.DataFrame(
+            {
+                "state": rng.choice(3, loans, p=[0.85, 0.1, 0.05]),
+                "exposure": rng.uniform(1000, 50000, loans),
+                "segment": rng.choice(["factoring", "credit_line", "leasing"], loans),
+            }
+        )
+        transition = np.array(
+            [
+                [0.90, 0.05, 0.00, 0.00, 0.05],
+                [0.40, 0.30, 0.30, 0.00, 0.00],
+                [0.10, 0.10, 0.30, 0.50, 0.00],
+                [0.00, 0.00, 0.00, 1.00, 0.00],
+                [0.00, 0.00, 0.00, 0.00, 1.00],
+            ]
+        )
+
+        start_time = time.perf_counter()
+        result = simulate_credit_losses(exposures, transition, n_paths=paths, workers=workers)
+        elapsed = time.perf_counter() - start_time
+        portfolio = result.summary().iloc[0]
+
+        results = {
+            "loans": loans,
+            "paths": paths,
+            "workers": workers,
+            "simulation_time_s": elapsed,
+            "loan_paths_per_s": loans * paths / elapsed,
+            "expected_loss": float(portfolio["expected_loss"]),
+            "var_99": float(portfolio["var_99"]),
+        }
+
+        logger.info(f"  {loans:,} loans x {paths:,} paths on {workers} workers")
+        logger.info(f"  Simulation: {elapsed:.2f}s")
+
+        self.results["tests"]["credit_loss_simulation"] = results
+        logger.info("\n✓ Credit loss simulation test complete")
+        return results
+
     def generate_report(self, output_file="WEEK3_PERFORMANCE_STRESS_TEST.json"):
         """Generate comprehensive test report"""
 
@@ -279,6 +429,9 @@ def main():
     tester.test_load_scalability()
     tester.test_sustained_load(duration_seconds=30)  # 30s for quick test
     tester.test_resource_usage()
+    tester.test_fused_aggregation()
+    tester.test_scenario_sweep()
+    tester.test_credit_loss_simulation()
 
     # Generate report
     tester.generate_report()
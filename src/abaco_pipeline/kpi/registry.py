@@ -1,29 +1,68 @@
-"""KPI registry scaffold.
+"""KPI registry.
 
-Keeps the mapping from KPI names to compute functions.
+Keeps the mapping from KPI names to compute functions. Backed by
+``src.kpis.registry.KPIFunctionRegistry`` so configured dotted paths are
+resolved and signature-checked once.
 """
 
 from __future__ import annotations
 
 from collections.abc import Callable
+from pathlib import Path
+
+import yaml
+
+from src.kpis.registry import (KPI_DEFINITIONS_PATH, KPIFunctionRegistry,
+                               load_kpi_definitions)
 
 ComputeFn = Callable[..., object]
 
+PIPELINE_CONFIG_PATH = Path("config/pipeline.yml")
+
 
 class KPIRegistry:
-    def __init__(self) -> None:
-        self._registry: dict[str, ComputeFn] = {}
+    def __init__(self, functions: KPIFunctionRegistry | None = None) -> None:
+        self._functions = functions or KPIFunctionRegistry()
+
+    @classmethod
+    def from_config(
+        cls,
+        pipeline_config: Path = PIPELINE_CONFIG_PATH,
+        definitions: Path = KPI_DEFINITIONS_PATH,
+        strict: bool = False,
+    ) -> KPIRegistry:
+        """Resolve the calculation metrics in ``pipeline.yml`` and KPI definitions."""
+        with open(pipeline_config, "r") as f:
+            config = yaml.safe_load(f) or {}
+        metrics = (
+            config.get("pipeline", {})
+            .get("phases", {})
+            .get("calculation", {})
+            .get("metrics", [])
+        )
+        return cls(
+            KPIFunctionRegistry.from_config(
+                metrics, load_kpi_definitions(definitions), strict=strict
+            )
+        )
+
+    @property
+    def functions(self) -> KPIFunctionRegistry:
+        return self._functions
 
     def register(self, name: str, fn: ComputeFn) -> None:
         if not name:
             raise ValueError("KPI name is required")
-        self._registry[name] = fn
+        self._functions.register(name, fn)
 
     def get(self, name: str) -> ComputeFn:
-        try:
-            return self._registry[name]
-        except KeyError as exc:
-            raise KeyError(f"Unknown KPI: {name}") from exc
+        entry = self._functions.get(name)
+        if entry.func is None:
+            raise KeyError(f"Unknown KPI: {name} ({entry.error})")
+        return entry.func
+
+    def status(self, name: str, value: float) -> str:
+        return self._functions.get(name).status(value)
 
     def list(self) -> list[str]:
-        return sorted(self._registry.keys())
+        return self._functions.names()
@@ -11,6 +11,7 @@ from pathlib import Path
 
 from src.compliance import (build_compliance_report, create_access_log_entry,
                             mask_pii_in_dataframe, write_compliance_report)
+from src.pipeline.manifest_catalog import ManifestCatalog
 
 from .ingestion.archive import archive_file
 from .logging import configure_logging
@@ -84,17 +85,18 @@ def _write_audit_payload(payload: dict, *, schema: str = "analytics") -> None:
             "SUPABASE_URL and SUPABASE_SERVICE_ROLE are required to publish audit data"
         )
 
-    writer = SupabaseWriter(SupabaseAuth(url=url, service_role_key=key), schema=schema)
     run = payload.get("run") or {}
     raw_artifacts = payload.get("raw_artifacts") or []
     kpis = payload.get("kpi_values") or []
     quality = payload.get("data_quality") or {}
 
-    writer.upsert_pipeline_run(run)
-    writer.insert_raw_artifacts(raw_artifacts)
-    writer.insert_kpi_values(kpis)
-    if quality:
-        writer.upsert_data_quality(quality)
+    auth = SupabaseAuth(url=url, service_role_key=key)
+    with SupabaseWriter(auth, schema=schema) as writer:
+        writer.upsert_pipeline_run(run)
+        writer.insert_raw_artifacts(raw_artifacts)
+        writer.insert_kpi_values(kpis)
+        if quality:
+            writer.upsert_data_quality(quality)
 
 
 def cmd_print_config(args: argparse.Namespace) -> int:
@@ -417,7 +419,10 @@ def cmd_run(args: argparse.Namespace) -> int:
         inputs={"looker_loans": source_hash},
         outputs={},
     )
-    write_manifest(run_dir / "manifest.json", manifest)
+    manifest_path = write_manifest(run_dir / "manifest.json", manifest)
+    ManifestCatalog(artifacts_dir).append(
+        run_id, manifest.created_at.isoformat(), manifest_path, kind="abaco_pipeline"
+    )
 
     status = "success"
     failure_reason = None
@@ -10,17 +10,50 @@ Tables:
 - analytics.raw_artifacts
 - analytics.kpi_values
 - analytics.data_quality_results
+
+All requests share one pooled ``requests.Session`` and are retried with
+exponential backoff. Upserts (``resolution=merge-duplicates``) are retried on
+connection errors, timeouts and 429/5xx responses. Plain inserts may already
+be committed when a timeout or 5xx comes back, so they are only retried on
+429 or when the connection could not be opened. Frames are
+serialized with ``DataFrame.to_json(orient="records", lines=True)`` and sent
+as size-bounded JSON arrays, several batches in flight at once.
 """
 
 from __future__ import annotations
 
 import json
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any
+from typing import Any, Iterator
 from urllib.parse import urlencode
 
+import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Statuses that guarantee the write was not applied
+REJECTED_STATUSES = frozenset({429})
+IDEMPOTENT_RESOLUTIONS = ("resolution=merge-duplicates", "resolution=ignore-duplicates")
+
+
+def _is_idempotent(prefer: str | None) -> bool:
+    return bool(prefer) and any(res in prefer for res in IDEMPOTENT_RESOLUTIONS)
+
+
+def _not_sent(exc: requests.RequestException) -> bool:
+    """Whether ``exc`` was raised before the request reached the server."""
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    reason = getattr(exc.args[0], "reason", None) if exc.args else None
+    return isinstance(reason, NewConnectionError)
 
 
 @dataclass(frozen=True)
@@ -29,12 +62,67 @@ class SupabaseAuth:
     service_role_key: str
 
 
+def json_batches(
+    frame: pd.DataFrame,
+    *,
+    max_rows: int = 1000,
+    max_bytes: int = 1_000_000,
+    chunk_rows: int = 10_000,
+) -> Iterator[tuple[str, int]]:
+    """Yield ``(json_array, row_count)`` batches of ``frame``.
+
+    Rows are serialized ``chunk_rows`` at a time as JSON lines and packed into
+    arrays of at most ``max_rows`` rows and about ``max_bytes`` bytes (a single
+    larger row still gets its own batch).
+    """
+    batch: list[str] = []
+    size = 2
+    for start in range(0, len(frame), chunk_rows):
+        text = frame.iloc[start : start + chunk_rows].to_json(
+            orient="records", lines=True, date_format="iso"
+        )
+        for line in text.splitlines():
+            if batch and (len(batch) >= max_rows or size + len(line) + 1 > max_bytes):
+                yield "[" + ",".join(batch) + "]", len(batch)
+                batch, size = [], 2
+            batch.append(line)
+            size += len(line) + 1
+    if batch:
+        yield "[" + ",".join(batch) + "]", len(batch)
+
+
 class SupabaseWriter:
-    def __init__(self, auth: SupabaseAuth, schema: str = "analytics") -> None:
+    def __init__(
+        self,
+        auth: SupabaseAuth,
+        schema: str = "analytics",
+        *,
+        max_in_flight: int = 4,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 30,
+    ) -> None:
         base = auth.url.rstrip("/")
         self._rest_base = f"{base}/rest/v1"
         self._key = auth.service_role_key
         self._schema = schema
+        self._max_in_flight = max(1, max_in_flight)
+        self._retries = retries
+        self._backoff = backoff
+        self._timeout = timeout
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._max_in_flight)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def close(self) -> None:
+        self._session.close()
+
+    def __enter__(self) -> "SupabaseWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
 
     def _headers(self, prefer: str | None = None) -> dict[str, str]:
         headers = {
@@ -46,20 +134,102 @@ class SupabaseWriter:
             headers["Prefer"] = prefer
         return headers
 
-    def _post(
+    def _send(
         self,
         table: str,
-        payload: list[dict[str, Any]] | dict[str, Any],
+        data: str,
         *,
         params: dict[str, str] | None = None,
         prefer: str | None = None,
+        idempotent: bool | None = None,
     ) -> requests.Response:
+        """POST ``data`` with retries; ``idempotent`` defaults to whether ``prefer`` upserts."""
         qp = f"?{urlencode(params)}" if params else ""
         url = f"{self._rest_base}/{table}{qp}"
+        headers = self._headers(prefer)
+        if idempotent is None:
+            idempotent = _is_idempotent(prefer)
+        statuses = RETRY_STATUSES if idempotent else REJECTED_STATUSES
+        for attempt in range(self._retries + 1):
+            try:
+                resp = self._session.post(url, headers=headers, data=data, timeout=self._timeout)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if attempt == self._retries or not (idempotent or _not_sent(exc)):
+                    raise
+            else:
+                if resp.status_code not in statuses or attempt == self._retries:
+                    resp.raise_for_status()
+                    return resp
+            delay = self._backoff * 2**attempt
+            logger.warning("Retrying POST %s in %.1fs (attempt %d)", table, delay, attempt + 1)
+            time.sleep(delay)
+        raise AssertionError("unreachable")
+
+    def _post(
+        self,
+        table: str,
+        payload: list[dict[str, Any]] | dict[str, Any],
+        *,
+        params: dict[str, str] | None = None,
+        prefer: str | None = None,
+    ) -> requests.Response:
         data = json.dumps(payload, default=_json_default)
-        resp = requests.post(url, headers=self._headers(prefer), data=data, timeout=30)
-        resp.raise_for_status()
-        return resp
+        return self._send(table, data, params=params, prefer=prefer)
+
+    def post_frame(
+        self,
+        table: str,
+        frame: pd.DataFrame,
+        *,
+        params: dict[str, str] | None = None,
+        prefer: str = "return=minimal",
+        max_rows: int = 1000,
+        max_bytes: int = 1_000_000,
+    ) -> int:
+        """POST ``frame`` to ``table`` in size-bounded batches; returns rows written.
+
+        Up to ``max_in_flight`` batches are in flight at once; the first
+        batch that still fails after its retries is raised.
+        """
+        written = 0
+        in_flight: set[Future] = set()
+        with ThreadPoolExecutor(max_workers=self._max_in_flight) as pool:
+            try:
+                for body, rows in json_batches(frame, max_rows=max_rows, max_bytes=max_bytes):
+                    if len(in_flight) >= self._max_in_flight:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        written += sum(future.result() for future in done)
+                    in_flight.add(pool.submit(self._post_batch, table, body, rows, params, prefer))
+                written += sum(future.result() for future in in_flight)
+            except BaseException:
+                for future in in_flight:
+                    future.cancel()
+                raise
+        return written
+
+    def _post_batch(
+        self,
+        table: str,
+        body: str,
+        rows: int,
+        params: dict[str, str] | None,
+        prefer: str,
+    ) -> int:
+        self._send(table, body, params=params, prefer=prefer)
+        return rows
+
+    def upsert_rows(
+        self, table: str, rows: list[dict[str, Any]], *, on_conflict: str | None = None
+    ) -> None:
+        """Upsert ``rows`` with one request (merging on the primary key by default)."""
+        if not rows:
+            return
+        self._post(
+            table,
+            rows,
+            params={"on_conflict": on_conflict} if on_conflict else None,
+            prefer="resolution=merge-duplicates,return=minimal",
+        )
 
     def upsert_pipeline_run(self, run: dict[str, Any]) -> None:
         # Upsert on primary key run_id.
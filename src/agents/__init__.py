@@ -13,7 +13,8 @@ from .tools import (analyze_brand_sentiment, analyze_customer_behavior,
                     predict_employee_performance, prioritize_product_roadmap,
                     retrieve_document, run_portfolio_analysis, run_sql_query,
                     score_leads, send_slack_notification,
-                    simulate_portfolio_scenario, track_campaign_performance)
+                    simulate_portfolio_scenario, sweep_portfolio_scenarios,
+                    track_campaign_performance)
 
 __all__ = [
     "AgentOrchestrator",
@@ -21,6 +22,7 @@ __all__ = [
     "retrieve_document",
     "run_portfolio_analysis",
     "simulate_portfolio_scenario",
+    "sweep_portfolio_scenarios",
     "analyze_customer_behavior",
     "send_slack_notification",
     "create_notion_page",
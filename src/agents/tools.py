@@ -75,6 +75,7 @@ def simulate_portfolio_scenario(
     import pandas as pd
 
     from src.analytics.enterprise_analytics_engine import LoanAnalyticsEngine
+    from src.analytics.scenarios import ScenarioGrid, run_scenarios
 
     if data_path:
         df = pd.read_csv(data_path)
@@ -95,15 +96,16 @@ def simulate_portfolio_scenario(
     engine_baseline = LoanAnalyticsEngine(df)
     baseline_kpis = engine_baseline.run_full_analysis()
 
-    # Simulation
-    df_sim = df.copy()
-    if rate_adjustment != 0:
-        df_sim["interest_rate"] += rate_adjustment
-    if principal_adjustment != 0:
-        df_sim["principal_balance"] *= principal_adjustment
-
-    engine_sim = LoanAnalyticsEngine(df_sim)
-    sim_kpis = engine_sim.run_full_analysis()
+    # Simulation: only the yield KPIs depend on rates/principal, so evaluate the
+    # shock on the baseline's aggregates instead of copying and re-running
+    haircut = 1.0 - principal_adjustment if principal_adjustment != 0 else 0.0
+    grid = ScenarioGrid(rate_deltas=[rate_adjustment], haircuts=[haircut])
+    scenario = run_scenarios(engine_baseline.loan_data, grid).iloc[0]
+    sim_kpis = dict(baseline_kpis)
+    if "PortfolioYield" in scenario:
+        sim_yield = float(scenario["PortfolioYield"])
+        sim_kpis["portfolio_yield_percent"] = sim_yield
+        sim_kpis["portfolio_yield"] = sim_yield
 
     return {
         "baseline": baseline_kpis,
@@ -115,6 +117,38 @@ def simulate_portfolio_scenario(
     }
 
 
+@registry.register(
+    description="Sweep a grid of rate, principal and DPD roll-forward shocks over a portfolio."
+)
+def sweep_portfolio_scenarios(
+    data_path: str,
+    rate_deltas: Optional[List[float]] = None,
+    haircuts: Optional[List[float]] = None,
+    roll_rates: Optional[List[float]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Args:
+        data_path (str): Path to the loan data CSV.
+        rate_deltas (Optional[List[float]]): Values added to all interest rates.
+        haircuts (Optional[List[float]]): Shares of principal removed (e.g., 0.1 for -10%).
+        roll_rates (Optional[List[float]]): Shares of each DPD bucket rolling one bucket worse.
+
+    Returns:
+        List[Dict[str, Any]]: One record per scenario with its shocks and KPIs.
+    """
+    import pandas as pd
+
+    from src.analytics.scenarios import (ScenarioGrid, roll_forward_matrix,
+                                         run_scenarios)
+
+    grid = ScenarioGrid(
+        rate_deltas=rate_deltas or [0.0],
+        haircuts=haircuts or [0.0],
+        migrations={f"roll_{rate:g}": roll_forward_matrix(rate) for rate in roll_rates or [0.0]},
+    )
+    return run_scenarios(pd.read_csv(data_path), grid).to_dict(orient="records")
+
+
 @registry.register(description="Run a full portfolio analysis using the LoanAnalyticsEngine.")
 def run_portfolio_analysis(data_path: Optional[str] = None) -> Dict[str, Any]:
     """
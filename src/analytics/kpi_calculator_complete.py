@@ -4,11 +4,13 @@ import logging
 # Built-ins para Pylance/Flake8
 from builtins import Exception, all, any, len, list, max
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 
 import numpy as np
 import pandas as pd
 
+from src.pipeline.column_aliases import expand_aliases, get_column_index
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -85,7 +87,7 @@ class ABACOKPICalculator:
 
     def get_aum_by_customer_type(self) -> pd.DataFrame:
         """AUM breakdown by customer type."""
-        balance_col = self._find_column(["outstanding_loan_value", "outstanding_balance"])
+        balance_col = self._find_column("outstanding_balance")
 
         merged = self.loans.merge(
             self.customers[["customer_id", "customer_type"]],
@@ -104,7 +106,7 @@ class ABACOKPICalculator:
         Replines % = (Disbursements CM) / (Matured Loans CM) * 100
         CM = Current Month. Measures re-lending of matured portfolio.
         """
-        disb_col = self._find_column(["disbursement_date", "disburse_date"])
+        disb_col = self._find_column("disbursement_date")
         end_col = self._find_column(["loan_end_date", "maturity_date"])
         amount_col = self._find_column(["loan_amount", "disburse_principal", "disbursement_amount"])
 
@@ -181,8 +183,8 @@ class ABACOKPICalculator:
 
     def get_mom_growth_pct(self) -> float:
         """Month-over-Month growth percentage."""
-        balance_col = self._find_column(["outstanding_loan_value", "outstanding_balance"])
-        disb_date_col = self._find_column(["disbursement_date", "disburse_date"])
+        balance_col = self._find_column("outstanding_balance")
+        disb_date_col = self._find_column("disbursement_date")
         if not balance_col or not disb_date_col:
             return 0.0
 
@@ -201,8 +203,8 @@ class ABACOKPICalculator:
 
     def get_yoy_growth_pct(self) -> float:
         """Year-over-Year growth percentage."""
-        balance_col = self._find_column(["outstanding_loan_value", "outstanding_balance"])
-        disb_date_col = self._find_column(["disbursement_date", "disburse_date"])
+        balance_col = self._find_column("outstanding_balance")
+        disb_date_col = self._find_column("disbursement_date")
         if not balance_col or not disb_date_col:
             return 0.0
 
@@ -270,7 +272,7 @@ class ABACOKPICalculator:
     def get_par_90_ratio(self) -> float:
         """Portfolio at Risk (90+DPD) as % of outstanding balance."""
         dpd_col = self._find_column(["dpd", "days_past_due"])
-        balance_col = self._find_column(["outstanding_loan_value", "outstanding_balance"])
+        balance_col = self._find_column("outstanding_balance")
 
         if not all([dpd_col, balance_col]):
             return 0.0
@@ -286,7 +288,7 @@ class ABACOKPICalculator:
     def get_portfolio_by_product(self) -> pd.DataFrame:
         """Loan count and AUM by product type."""
         product_col = self._find_column(["product_type", "product"])
-        balance_col = self._find_column(["outstanding_loan_value", "outstanding_balance"])
+        balance_col = self._find_column("outstanding_balance")
 
         if not product_col:
             return pd.DataFrame()
@@ -301,7 +303,7 @@ class ABACOKPICalculator:
 
     def get_portfolio_by_status(self) -> pd.DataFrame:
         """Loan distribution by status."""
-        status_col = self._find_column(["loan_status", "status", "estado"])
+        status_col = self._find_column("loan_status")
 
         if not status_col:
             return pd.DataFrame()
@@ -355,18 +357,20 @@ class ABACOKPICalculator:
 
     # === HELPER METHODS ===
 
-    def _find_column(self, aliases: list, dataframe=None) -> Optional[str]:
+    def _find_column(self, aliases: Union[list, str], dataframe=None) -> Optional[str]:
         """Find actual column name from list of aliases.
 
         Args:
-            aliases: List of column name aliases to search for
+            aliases: List of column name aliases to search for, or the name of
+                     an alias group in config/column_aliases.yml
             dataframe: Optional dataframe to search in. Defaults to self.loans.
                       Pass self.payments to search payments dataframe.
         """
         df = dataframe if dataframe is not None else self.loans
-        for alias in aliases:
-            if alias in df.columns:
-                return alias
+        aliases = expand_aliases(aliases)
+        found = get_column_index(df).resolve(aliases, mode="exact")
+        if found is not None:
+            return found
         logger.warning("Column not found. Searched for: %s", aliases)
         return None
 
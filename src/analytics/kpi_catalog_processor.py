@@ -1,12 +1,17 @@
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
 import numpy as np
 import pandas as pd
 from scipy.optimize import newton
 
+from src.analytics.roll_rates import (build_roll_rates, scheduled_days_past_due,
+                                      scheduled_principal_due)
+from src.analytics.vintages import build_vintage_curves
+from src.pipeline.column_aliases import expand_aliases, get_column_index
+
 logger = logging.getLogger(__name__)
 
 
@@ -208,6 +213,11 @@ class KPICatalogProcessor:
         """
         Builds a monthly loan snapshot with outstanding principal and DPD.
         Aggregates multiple disbursements per loan_id correctly.
+
+        DPD is rebuilt per month from the payment schedule where a loan has
+        one (``dpd_from_schedule``, with the principal due so far in
+        ``cum_scheduled``); other loans keep the tape's current DPD in every
+        month.
         """
         if end_date is None:
             end_date = datetime.now().strftime("%Y-%m-%d")
@@ -284,6 +294,16 @@ class KPICatalogProcessor:
         # Add metadata
         df_final = df_final.merge(loan_meta, on="loan_id", how="left")
 
+        # Month-end DPD from schedule vs principal paid
+        df_final["dpd_from_schedule"] = False
+        if {"loan_id", "date_due", "principal"} <= set(self.schedule.columns):
+            monthly_dpd = scheduled_days_past_due(df_final, self.schedule)
+            df_final["dpd_from_schedule"] = monthly_dpd.notna()
+            df_final["cum_scheduled"] = scheduled_principal_due(df_final, self.schedule)
+            if "days_past_due" in df_final.columns:
+                monthly_dpd = monthly_dpd.fillna(df_final["days_past_due"])
+            df_final["days_past_due"] = monthly_dpd
+
         self.loan_month = df_final
         return self.loan_month
 
@@ -680,9 +700,7 @@ class KPICatalogProcessor:
         loans = self.loans.copy()
 
         # 1. Identify date column
-        date_col = self._find_column(
-            ["disbursement_date", "disburse_date", "fecha_desembolso"], loans
-        )
+        date_col = self._find_column("disbursement_date", loans)
         if not date_col:
             logger.warning(
                 "get_customer_types: date_col not found. Columns: %s", loans.columns.tolist()
@@ -690,12 +708,10 @@ class KPICatalogProcessor:
             return pd.DataFrame()
 
         # 2. Identify amount column
-        amount_col = self._find_column(
-            ["disbursement_amount", "disburse_principal", "loan_amount"], loans
-        )
+        amount_col = self._find_column("disbursement_amount", loans)
 
         # 3. Identify DPD column for "Recovered"
-        dpd_col = self._find_column(["days_past_due", "dpd", "days_in_default"], loans)
+        dpd_col = self._find_column("days_past_due", loans)
         bad_history = set()
         if dpd_col:
             bad_history = set(loans[loans[dpd_col] > 90]["customer_id"].unique())
@@ -732,12 +748,9 @@ class KPICatalogProcessor:
         )
         return summary
 
-    def _find_column(self, aliases: list, df: pd.DataFrame) -> Optional[str]:
-        """Helper to find column by aliases."""
-        for a in aliases:
-            if a in df.columns:
-                return a
-        return None
+    def _find_column(self, aliases: Union[list, str], df: pd.DataFrame) -> Optional[str]:
+        """Helper to find column by aliases (or a registry alias group name)."""
+        return get_column_index(df).resolve(expand_aliases(aliases), mode="exact")
 
     def get_weighted_fee_rate(self) -> pd.DataFrame:
         """Compute origination fee weighted average per month."""
@@ -934,6 +947,35 @@ class KPICatalogProcessor:
 
         return result
 
+    def get_roll_rates(self) -> pd.DataFrame:
+        """Monthly DPD roll-rate matrices (count and outstanding weighted) in long form.
+
+        Only loans with a payment schedule are used: the tape's static DPD
+        would put every loan on the diagonal.
+        """
+        monthly = self.scheduled_loan_month()
+        if monthly.empty:
+            logger.warning("No payment schedule to derive monthly DPD; roll rates skipped.")
+            return pd.DataFrame()
+        return build_roll_rates(monthly).to_frame()
+
+    def scheduled_loan_month(self) -> pd.DataFrame:
+        """``loan_month`` rows whose DPD was rebuilt per month from the payment schedule."""
+        if self.loan_month.empty:
+            self.build_loan_month()
+        if self.loan_month.empty:
+            return pd.DataFrame()
+        return self.loan_month[self.loan_month["dpd_from_schedule"]]
+
+    def get_vintage_curves(self) -> pd.DataFrame:
+        """Cohort x months-on-book curves (outstanding, DPD30+/90+, collections, defaults,
+        prepayments) over the loans with a payment schedule."""
+        monthly = self.scheduled_loan_month()
+        if monthly.empty:
+            logger.warning("No payment schedule to derive monthly DPD; vintage curves skipped.")
+            return pd.DataFrame()
+        return build_vintage_curves(monthly).curves()
+
     # 5. Payor, LTV & CAC
     def get_throughput_metrics(self) -> pd.DataFrame:
         """
@@ -1339,6 +1381,14 @@ class KPICatalogProcessor:
             kpis["dpd_buckets"] = self.get_dpd_buckets().to_dict("records")
         except Exception:
             pass
+        try:
+            kpis["roll_rates"] = self.get_roll_rates().to_dict("records")
+        except Exception:
+            pass
+        try:
+            kpis["vintage_curves"] = self.get_vintage_curves().to_dict("records")
+        except Exception:
+            pass
         try:
             kpis["payor_concentration"] = self.get_concentration().to_dict("records")
         except Exception:
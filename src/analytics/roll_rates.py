@@ -0,0 +1,244 @@
+"""Roll-rate (DPD transition) matrices from the monthly ``loan_month`` snapshot.
+
+Snapshots are sorted by (loan, month) once and each row is paired with the
+next row of the same loan when it is exactly one month later. Buckets are
+integer codes, so every (month, from, to) cell of every matrix comes out of a
+single ``bincount`` over a combined key, weighted by loan count and by the
+outstanding balance at the start of the month.
+
+The snapshot's DPD has to be as of each month end. A loan tape only carries
+today's DPD, so :func:`scheduled_days_past_due` rebuilds it per month from the
+payment schedule and the principal paid so far.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.utils import ensure_dir
+
+STATES = ("current", "dpd_30", "dpd_60", "default", "paid")
+CURRENT, DPD_30, DPD_60, DEFAULT, PAID = range(len(STATES))
+# Lower bounds (days past due) of dpd_30, dpd_60 and default
+DPD_EDGES = (30, 60, 90)
+PAID_BALANCE = 1e-4
+
+WEIGHTS = ("count", "outstanding")
+FRAME_COLUMNS = ["month_end", "from_state", "to_state", "count", "outstanding"]
+
+
+def dpd_states(days_past_due: Any, outstanding: Any = None) -> np.ndarray:
+    """Integer state codes for DPD values; zero-balance loans are ``paid``."""
+    dpd = pd.to_numeric(pd.Series(days_past_due), errors="coerce").fillna(0).to_numpy()
+    states = np.searchsorted(DPD_EDGES, dpd, side="right").astype(np.int8)
+    if outstanding is not None:
+        balance = pd.to_numeric(pd.Series(outstanding), errors="coerce").fillna(0).to_numpy()
+        states[balance <= PAID_BALANCE] = PAID
+    return states
+
+
+def _installments(schedule: pd.DataFrame) -> pd.DataFrame:
+    """Principal installments per (loan, due date) with their running total ``cum_due``."""
+    due = pd.DataFrame(
+        {
+            "loan_id": schedule["loan_id"],
+            "date_due": pd.to_datetime(schedule["date_due"], errors="coerce"),
+            "principal": pd.to_numeric(schedule["principal"], errors="coerce"),
+        }
+    )
+    # Interest-only rows never fall into principal arrears
+    due = due[due["date_due"].notna() & (due["principal"] > 0)]
+    due = due.groupby(["loan_id", "date_due"], as_index=False)["principal"].sum()
+    due["cum_due"] = due.groupby("loan_id")["principal"].cumsum()
+    return due
+
+
+def scheduled_principal_due(loan_month: pd.DataFrame, schedule: pd.DataFrame) -> pd.Series:
+    """Cumulative scheduled principal due by each snapshot's ``month_end``.
+
+    Loans without schedule rows get NaN.
+    """
+    due = _installments(schedule)
+    left = pd.DataFrame(
+        {
+            "loan_id": loan_month["loan_id"].to_numpy(),
+            "month_end": pd.to_datetime(loan_month["month_end"]).to_numpy(),
+            "row": np.arange(len(loan_month)),
+        }
+    ).sort_values("month_end", kind="stable")
+    matched = pd.merge_asof(
+        left,
+        due[["loan_id", "date_due", "cum_due"]].sort_values("date_due", kind="stable"),
+        left_on="month_end",
+        right_on="date_due",
+        by="loan_id",
+    ).sort_values("row")
+    scheduled = loan_month["loan_id"].isin(due["loan_id"]).to_numpy()
+    cum_due = matched["cum_due"].fillna(0.0).to_numpy()
+    return pd.Series(np.where(scheduled, cum_due, np.nan), index=loan_month.index, name="cum_due")
+
+
+def scheduled_days_past_due(
+    loan_month: pd.DataFrame,
+    schedule: pd.DataFrame,
+    paid_column: str = "cum_principal",
+    tolerance: float = 0.01,
+) -> pd.Series:
+    """Days past due of each ``loan_month`` snapshot, from the payment schedule.
+
+    A snapshot is past due since the first installment whose cumulative
+    scheduled principal the principal paid by ``month_end`` does not cover
+    (within ``tolerance``). Loans without schedule rows get NaN.
+    """
+    due = _installments(schedule)
+    paid = pd.to_numeric(loan_month[paid_column], errors="coerce").fillna(0)
+    left = pd.DataFrame(
+        {
+            "loan_id": loan_month["loan_id"].to_numpy(),
+            "paid": paid.to_numpy() + tolerance,
+            "row": np.arange(len(loan_month)),
+        }
+    ).sort_values("paid", kind="stable")
+    # First installment per loan whose cumulative principal exceeds what was paid
+    oldest_unpaid = pd.merge_asof(
+        left,
+        due[["loan_id", "cum_due", "date_due"]].sort_values("cum_due", kind="stable"),
+        left_on="paid",
+        right_on="cum_due",
+        by="loan_id",
+        direction="forward",
+        allow_exact_matches=False,
+    ).sort_values("row")
+
+    month_end = pd.to_datetime(loan_month["month_end"]).to_numpy()
+    days = (month_end - oldest_unpaid["date_due"].to_numpy()) / np.timedelta64(1, "D")
+    days = np.nan_to_num(np.clip(days, 0, None), nan=0.0)
+    scheduled = loan_month["loan_id"].isin(due["loan_id"]).to_numpy()
+    return pd.Series(
+        np.where(scheduled, days, np.nan), index=loan_month.index, name="days_past_due"
+    )
+
+
+def _normalize(totals: np.ndarray, absorbing: Sequence[int]) -> np.ndarray:
+    """Row-normalize ``(..., S, S)`` totals; unobserved and ``absorbing`` rows stay put."""
+    totals = totals.copy()
+    totals[..., list(absorbing), :] = 0.0
+    row_sums = totals.sum(axis=-1, keepdims=True)
+    rates = np.divide(totals, row_sums, out=np.zeros_like(totals), where=row_sums > 0)
+    stay = np.eye(totals.shape[-1], dtype=bool) & (row_sums == 0)
+    rates[stay] = 1.0
+    return rates
+
+
+@dataclass
+class RollRates:
+    """Transition counts and balances per starting month: arrays are months x from x to."""
+
+    months: pd.DatetimeIndex
+    counts: np.ndarray
+    balances: np.ndarray
+    states: Tuple[str, ...] = STATES
+
+    def _totals(self, weight: str) -> np.ndarray:
+        if weight not in WEIGHTS:
+            raise ValueError(f"weight must be one of {WEIGHTS}")
+        return self.counts if weight == "count" else self.balances
+
+    def monthly(self, weight: str = "count", absorbing: Sequence[int] = ()) -> np.ndarray:
+        """One row-stochastic matrix per month in :attr:`months`."""
+        return _normalize(self._totals(weight), absorbing)
+
+    def matrix(
+        self,
+        weight: str = "count",
+        months: Optional[Sequence[Any]] = None,
+        absorbing: Sequence[int] = (),
+    ) -> np.ndarray:
+        """Average matrix pooled over ``months`` (all by default).
+
+        Pooling sums the transitions before normalizing, so busier months
+        weigh more. Pass ``absorbing=(DEFAULT, PAID)`` for a simulation-ready
+        matrix in which default and paid never move.
+        """
+        totals = self._totals(weight)
+        if months is not None:
+            totals = totals[self.months.isin(pd.to_datetime(list(months)))]
+        return _normalize(totals.sum(axis=0), absorbing)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Tidy table with one row per (month, from, to) cell, including zero cells."""
+        n_months, n = len(self.months), len(self.states)
+        frame = pd.DataFrame(
+            {
+                "month_end": np.repeat(self.months, n * n),
+                "from_state": np.tile(np.repeat(self.states, n), n_months),
+                "to_state": np.tile(self.states, n_months * n),
+                "count": self.counts.ravel(),
+                "outstanding": self.balances.ravel(),
+            }
+        )
+        frame["count_rate"] = self.monthly("count").ravel()
+        frame["balance_rate"] = self.monthly("outstanding").ravel()
+        return frame
+
+    def to_parquet(self, path: Path) -> Path:
+        path = Path(path)
+        ensure_dir(path.parent)
+        tmp_path = path.with_suffix(".tmp")
+        self.to_frame().to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        return path
+
+
+def read_roll_rates(path: Path) -> RollRates:
+    """Load matrices written by :meth:`RollRates.to_parquet`."""
+    frame = pd.read_parquet(path, columns=FRAME_COLUMNS)
+    months = pd.DatetimeIndex(frame["month_end"].drop_duplicates())
+    states = tuple(frame["from_state"].drop_duplicates())
+    shape = (len(months), len(states), len(states))
+    return RollRates(
+        months=months,
+        counts=frame["count"].to_numpy(dtype=float).reshape(shape),
+        balances=frame["outstanding"].to_numpy(dtype=float).reshape(shape),
+        states=states,
+    )
+
+
+def build_roll_rates(
+    loan_month: pd.DataFrame,
+    loan_column: str = "loan_id",
+    time_column: str = "month_end",
+    dpd_column: str = "days_past_due",
+    balance_column: str = "outstanding",
+) -> RollRates:
+    """Count and balance transitions between consecutive monthly snapshots of each loan."""
+    periods = pd.to_datetime(loan_month[time_column]).dt.to_period("M")
+    month_index = (periods.dt.year * 12 + periods.dt.month - 1).to_numpy()
+    loan_codes, _ = pd.factorize(loan_month[loan_column])
+    order = np.lexsort((month_index, loan_codes))
+
+    loans = loan_codes[order]
+    month_index = month_index[order]
+    states = dpd_states(loan_month[dpd_column], loan_month[balance_column])[order].astype(np.intp)
+    balance = pd.to_numeric(loan_month[balance_column], errors="coerce").fillna(0).to_numpy()
+    balance = balance[order]
+
+    pairs = (loans[1:] == loans[:-1]) & (month_index[1:] - month_index[:-1] == 1)
+    month_values, month_codes = np.unique(month_index[:-1][pairs], return_inverse=True)
+    n = len(STATES)
+    key = (month_codes * n + states[:-1][pairs]) * n + states[1:][pairs]
+    size = len(month_values) * n * n
+    shape = (len(month_values), n, n)
+    counts = np.bincount(key, minlength=size).astype(float).reshape(shape)
+    balances = np.bincount(key, weights=balance[:-1][pairs], minlength=size).reshape(shape)
+
+    months = pd.to_datetime(
+        pd.DataFrame({"year": month_values // 12, "month": month_values % 12 + 1, "day": 1})
+    ) + pd.offsets.MonthEnd(0)
+    return RollRates(months=pd.DatetimeIndex(months), counts=counts, balances=balances)
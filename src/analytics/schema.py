@@ -1,11 +1,29 @@
 """Data contracts and schemas using Pandera for Abaco Loans Analytics - Engineering Excellence Edition."""
 
-from typing import Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
 
 import pandas as pd
 import pandera as pa
 from pandera.typing import Series
 
+# Reference time for "not in the future" checks, pinned once per validation run.
+_VALIDATION_AS_OF: ContextVar[Optional[pd.Timestamp]] = ContextVar(
+    "validation_as_of", default=None
+)
+
+
+@contextmanager
+def validation_as_of(as_of: Optional[pd.Timestamp] = None) -> Iterator[pd.Timestamp]:
+    """Pin the reference timestamp used by time-relative checks."""
+    pinned = as_of if as_of is not None else pd.Timestamp.now()
+    token = _VALIDATION_AS_OF.set(pinned)
+    try:
+        yield pinned
+    finally:
+        _VALIDATION_AS_OF.reset(token)
+
 
 class LoanTapeSchema(pa.DataFrameModel):
     """Data contract for loan tape ingestion - Engineering Excellence Edition."""
@@ -22,10 +40,11 @@ class LoanTapeSchema(pa.DataFrameModel):
     interest_rate_apr: Optional[Series[float]] = pa.Field(ge=0, le=2.0, nullable=True)
 
     @pa.check("disbursement_date")
-    @staticmethod
-    def date_not_in_future(series: Series) -> Series:
+    @classmethod
+    def date_not_in_future(cls, series: Series) -> Series:
         """Ensure disbursement dates are not in the future."""
-        return series <= pd.Timestamp.now()
+        as_of = _VALIDATION_AS_OF.get()
+        return series <= (as_of if as_of is not None else pd.Timestamp.now())
 
     class Config:
         strict = False  # Allow extra columns for now, but validate defined ones
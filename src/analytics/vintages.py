@@ -0,0 +1,201 @@
+"""Vintage (cohort x months-on-book) curves from the monthly ``loan_month`` snapshot.
+
+Cohort keys and months-on-book are derived once as integer month indices and
+every curve comes out of a single groupby-sum over (cohort, mob). A cell
+``(cohort, mob)`` only ever draws on snapshots from calendar month
+``cohort + mob``, so appending a month adds new cells without touching the
+old ones; the only state carried between months is which loans have ever
+been 90+ days past due (for the cumulative default curve).
+
+DPD must be as of each month end (see
+:func:`src.analytics.roll_rates.scheduled_days_past_due`); a tape's current
+DPD would mark a loan defaulted from MOB 0. The prepayment curve is the
+principal collected ahead of schedule, ``cum_principal - cum_scheduled``
+floored at zero, and is left empty for snapshots without ``cum_scheduled``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.utils import ensure_dir
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_BALANCE = 1e-4
+DEFAULT_DPD = 90
+
+AMOUNT_COLUMNS = [
+    "disbursed",
+    "outstanding",
+    "dpd30_outstanding",
+    "dpd90_outstanding",
+    "cum_collections",
+    "cum_prepaid",
+    "cum_default_disbursed",
+]
+RATE_COLUMNS = {
+    "outstanding_rate": "outstanding",
+    "dpd30_rate": "dpd30_outstanding",
+    "dpd90_rate": "dpd90_outstanding",
+    "collection_rate": "cum_collections",
+    "prepayment_rate": "cum_prepaid",
+    "cum_default_rate": "cum_default_disbursed",
+}
+CELL_COLUMNS = ["cohort", "mob", "month_end", "loans", "active_loans", *AMOUNT_COLUMNS]
+LOAN_STATE_COLUMNS = ["loan_id", "defaulted"]
+
+
+def _month_index(values: pd.Series) -> np.ndarray:
+    periods = pd.to_datetime(values, errors="coerce").dt.to_period("M")
+    return (periods.dt.year * 12 + periods.dt.month - 1).to_numpy(dtype=float)
+
+
+def _month_end(index: pd.Series) -> pd.Series:
+    index = index.astype(int)
+    starts = pd.to_datetime(pd.DataFrame({"year": index // 12, "month": index % 12 + 1, "day": 1}))
+    return starts + pd.offsets.MonthEnd(0)
+
+
+@dataclass
+class VintageCurves:
+    """Summed cohort x MOB cells plus the per-loan default flags needed to extend them."""
+
+    cells: pd.DataFrame = field(default_factory=lambda: pd.DataFrame(columns=CELL_COLUMNS))
+    defaulted: pd.Series = field(default_factory=lambda: pd.Series(dtype=bool))
+
+    @property
+    def last_month(self) -> Optional[pd.Timestamp]:
+        return None if self.cells.empty else pd.Timestamp(self.cells["month_end"].max())
+
+    def update(self, loan_month: pd.DataFrame) -> "VintageCurves":
+        """Add the cells of months later than :attr:`last_month` from ``loan_month``.
+
+        Raises ``ValueError`` if ``loan_month`` restates an already aggregated
+        month; rebuild with :func:`build_vintage_curves` in that case.
+        """
+        months = pd.to_datetime(loan_month["month_end"])
+        if self.last_month is not None and (months <= self.last_month).any():
+            raise ValueError(
+                f"loan_month contains months up to {self.last_month:%Y-%m}; "
+                "only later months can be appended"
+            )
+        frame = loan_month.assign(
+            _month=_month_index(loan_month["month_end"]),
+            _cohort=_month_index(loan_month["disbursement_date"]),
+        ).dropna(subset=["_month", "_cohort"])
+        frame = frame.sort_values(["_month", "loan_id"], kind="stable")
+
+        dpd = pd.to_numeric(frame["days_past_due"], errors="coerce").fillna(0)
+        outstanding = pd.to_numeric(frame["outstanding"], errors="coerce").fillna(0)
+        active = outstanding > ACTIVE_BALANCE
+        # Ever-defaulted: the carried flag or any 90+ snapshot up to this month
+        hit = (dpd >= DEFAULT_DPD) & active
+        carried = frame["loan_id"].map(self.defaulted).eq(True)
+        ever = hit.groupby(frame["loan_id"]).cummax().astype(bool) | carried
+        disbursed = pd.to_numeric(frame["disbursement_amount"], errors="coerce").fillna(0)
+        collected = (
+            pd.to_numeric(frame["cum_principal"], errors="coerce").fillna(0)
+            if "cum_principal" in frame.columns
+            else pd.Series(0.0, index=frame.index)
+        )
+        scheduled = (
+            pd.to_numeric(frame["cum_scheduled"], errors="coerce")
+            if "cum_scheduled" in frame.columns
+            else pd.Series(np.nan, index=frame.index)
+        )
+
+        values = pd.DataFrame(
+            {
+                "cohort": frame["_cohort"].astype(int),
+                "mob": (frame["_month"] - frame["_cohort"]).astype(int),
+                "loans": 1,
+                "active_loans": active.astype(int),
+                "disbursed": disbursed,
+                "outstanding": outstanding.where(active, 0.0),
+                "dpd30_outstanding": outstanding.where(active & (dpd >= 30), 0.0),
+                "dpd90_outstanding": outstanding.where(hit, 0.0),
+                "cum_collections": collected,
+                "cum_prepaid": (collected - scheduled).clip(lower=0),
+                "cum_default_disbursed": disbursed.where(ever, 0.0),
+            }
+        )
+        values = values[values["mob"] >= 0]
+        if values.empty:
+            return self
+        new_cells = values.groupby(["cohort", "mob"], sort=True).sum(min_count=1).reset_index()
+        new_cells["month_end"] = _month_end(new_cells["cohort"] + new_cells["mob"])
+        new_cells["cohort"] = _month_end(new_cells["cohort"]).dt.to_period("M").astype(str)
+
+        defaulted = ever.groupby(frame["loan_id"]).last()
+        merged = pd.concat([self.defaulted, defaulted]).groupby(level=0).max().astype(bool)
+        merged.index.name = None
+        cells = new_cells[CELL_COLUMNS]
+        if not self.cells.empty:
+            cells = pd.concat([self.cells, cells], ignore_index=True)
+        return VintageCurves(
+            cells=cells.sort_values(["cohort", "mob"], ignore_index=True), defaulted=merged
+        )
+
+    def curves(self) -> pd.DataFrame:
+        """Cells with amounts turned into rates of the cohort's disbursed amount."""
+        curves = self.cells.copy()
+        denominator = curves["disbursed"].replace(0, np.nan)
+        for rate, amount in RATE_COLUMNS.items():
+            curves[rate] = curves[amount] / denominator
+        return curves
+
+    def matrix(self, metric: str = "dpd30_rate") -> pd.DataFrame:
+        """Cohort x MOB pivot of one metric (rate or amount column)."""
+        return self.curves().pivot(index="cohort", columns="mob", values=metric)
+
+    def save(self, directory: Path) -> Path:
+        """Write ``cells.parquet`` and ``loans.parquet`` into ``directory``."""
+        directory = ensure_dir(Path(directory))
+        loans = self.defaulted.rename_axis("loan_id").rename("defaulted").reset_index()
+        for name, frame in (("cells", self.cells), ("loans", loans)):
+            tmp_path = directory / f"{name}.tmp"
+            frame.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, directory / f"{name}.parquet")
+        return directory
+
+
+def load_vintage_curves(directory: Path) -> VintageCurves:
+    """Read curves written by :meth:`VintageCurves.save`; empty if nothing was saved yet."""
+    directory = Path(directory)
+    if not (directory / "cells.parquet").exists():
+        return VintageCurves()
+    cells = pd.read_parquet(directory / "cells.parquet")
+    if not set(CELL_COLUMNS) <= set(cells.columns):
+        logger.info("Vintage cell layout changed; rebuilding %s", directory)
+        return VintageCurves()
+    loans = pd.read_parquet(directory / "loans.parquet", columns=LOAN_STATE_COLUMNS)
+    return VintageCurves(
+        cells=cells[CELL_COLUMNS],
+        defaulted=loans.set_index("loan_id")["defaulted"].astype(bool),
+    )
+
+
+def build_vintage_curves(loan_month: pd.DataFrame) -> VintageCurves:
+    """Aggregate every month of ``loan_month`` into vintage cells."""
+    return VintageCurves().update(loan_month)
+
+
+def update_vintage_store(directory: Path, loan_month: pd.DataFrame) -> VintageCurves:
+    """Append the months of ``loan_month`` newer than the stored curves and save them."""
+    stored = load_vintage_curves(directory)
+    if stored.last_month is not None:
+        loan_month = loan_month[pd.to_datetime(loan_month["month_end"]) > stored.last_month]
+    if loan_month.empty:
+        return stored
+    updated = stored.update(loan_month)
+    updated.save(directory)
+    return updated
+
@@ -5,6 +5,9 @@ from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
+# Checkout this module lives in; the root when no .git marks the project
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+
 
 @lru_cache(maxsize=1)
 def get_project_root() -> Path:
@@ -17,6 +20,17 @@ def get_project_root() -> Path:
     raise RuntimeError("Project root not found")
 
 
+def _base_dir() -> Path:
+    """Project root, or this package's checkout when it ships without .git.
+
+    Docker images, sdists and ``git archive`` copies have no .git directory.
+    """
+    try:
+        return get_project_root()
+    except RuntimeError:
+        return PACKAGE_ROOT
+
+
 def resolve_path(path_str: str, env_var: Optional[str] = None, create: bool = False) -> Path:
     """Resolve path with environment variable support."""
     if not path_str:
@@ -29,11 +43,11 @@ def resolve_path(path_str: str, env_var: Optional[str] = None, create: bool = Fa
         if path_str.startswith("~"):
             resolved = Path(path_str).expanduser()
         elif path_str.startswith("./"):
-            resolved = get_project_root() / path_str[2:]
+            resolved = _base_dir() / path_str[2:]
         elif Path(path_str).is_absolute():
             resolved = Path(path_str)
         else:
-            resolved = get_project_root() / path_str
+            resolved = _base_dir() / path_str
 
     resolved = resolved.resolve()
     if create and not resolved.exists():
@@ -105,6 +119,11 @@ class Paths:
             runs_dir.mkdir(parents=True, exist_ok=True)
         return runs_dir
 
+    @staticmethod
+    def run_store_file(create: bool = False) -> Path:
+        default = Paths.metrics_dir(create=create) / "runs.duckdb"
+        return resolve_path(str(default), env_var="RUN_STORE_FILE")
+
     @staticmethod
     def get_environment() -> str:
         return os.getenv("PYTHON_ENV", os.getenv("APP_ENV", "development"))
@@ -1,20 +1,26 @@
 import logging
 from datetime import date, datetime
 from functools import wraps
-from typing import Any, Callable, List, Optional
+from typing import Any, Callable, List, Optional, Union
 
 import numpy as np
 import pandas as pd
 
+from src.pipeline.column_aliases import expand_aliases
 from src.pipeline.data_validation import find_column
 
 logger = logging.getLogger(__name__)
 
 
 def resolve_column(
-    candidates: List[str], fallback: Optional[str] = None
+    candidates: Union[List[str], str], fallback: Optional[str] = None
 ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
-    """Decorator to resolve column name before method execution."""
+    """Decorator to resolve column name before method execution.
+
+    ``candidates`` may be an alias list or an alias group name from
+    config/column_aliases.yml; lookups go through the shared column index.
+    """
+    candidates = expand_aliases(candidates)
 
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
         @wraps(func)
@@ -6,17 +6,33 @@ Handles:
 - Azure Dashboards for metric visualizations
 - Azure Monitor for alerting and observability
 - Azure Cosmos DB for time-series data (optional)
+
+Files are uploaded by :class:`BlobUploader`, which shares one container client,
+stores each file's SHA-256 in the blob metadata and skips files whose stored
+hash already matches. Run outputs live under a per-run prefix, so their
+stored hashes are read with one listing of that prefix (empty for a new run)
+instead of a properties request per file. Large files go up as parallel block
+uploads. Generated
+content (e.g. a DataFrame exported by :class:`StreamingCSVWriter`) is streamed
+into staged blocks, so only one block is held in memory at a time.
 """
 
+import hashlib
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.pipeline.csv_stream import StreamingCSVWriter
+from src.pipeline.utils import hash_file
 
 logger = logging.getLogger(__name__)
 
 try:
+    from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
     from azure.identity import DefaultAzureCredential
     from azure.storage.blob import BlobServiceClient, ContentSettings
 
@@ -24,6 +40,200 @@ try:
 except ImportError:
     HAS_AZURE = False
 
+HASH_METADATA_KEY = "content_sha256"
+# Files above the threshold are split into blocks uploaded in parallel
+BLOCK_UPLOAD_THRESHOLD = 8 * 1024 * 1024
+BLOCK_SIZE = 4 * 1024 * 1024
+
+
+def blob_service_from_connection_string(connection_string: str) -> "BlobServiceClient":
+    """Blob service client tuned for block uploads; Azurite uses ``UseDevelopmentStorage=true``."""
+    return BlobServiceClient.from_connection_string(
+        connection_string,
+        max_single_put_size=BLOCK_UPLOAD_THRESHOLD,
+        max_block_size=BLOCK_SIZE,
+    )
+
+
+@dataclass
+class BlobUploadResult:
+    """Blob URLs of uploaded and skipped (unchanged) files and errors of failed ones."""
+
+    uploaded: Dict[str, str] = field(default_factory=dict)
+    skipped: Dict[str, str] = field(default_factory=dict)
+    failed: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def blobs(self) -> Dict[str, str]:
+        return {**self.skipped, **self.uploaded}
+
+
+class BlobUploader:
+    """Upload files into one container with bounded concurrency.
+
+    ``max_concurrency`` files are uploaded at once and each file larger than
+    ``block_threshold`` uses ``block_concurrency`` parallel block uploads.
+    """
+
+    def __init__(
+        self,
+        container_client: Any,
+        max_concurrency: int = 4,
+        block_concurrency: int = 4,
+        block_threshold: int = BLOCK_UPLOAD_THRESHOLD,
+    ):
+        self.container_client = container_client
+        self.max_concurrency = max(1, max_concurrency)
+        self.block_concurrency = max(1, block_concurrency)
+        self.block_threshold = block_threshold
+
+    @classmethod
+    def from_connection_string(
+        cls, connection_string: str, container_name: str, create: bool = True, **kwargs: Any
+    ) -> "BlobUploader":
+        container_client = blob_service_from_connection_string(
+            connection_string
+        ).get_container_client(container_name)
+        if create:
+            try:
+                container_client.create_container()
+            except ResourceExistsError:
+                pass
+        return cls(container_client, **kwargs)
+
+    @staticmethod
+    def _stored_hash(blob_client: Any) -> Optional[str]:
+        try:
+            metadata = blob_client.get_blob_properties().metadata or {}
+        except ResourceNotFoundError:
+            return None
+        return metadata.get(HASH_METADATA_KEY)
+
+    def stored_hashes(self, prefix: str) -> Dict[str, Optional[str]]:
+        """Stored content hash of every blob under ``prefix``, from a single listing."""
+        return {
+            blob.name: (blob.metadata or {}).get(HASH_METADATA_KEY)
+            for blob in self.container_client.list_blobs(
+                name_starts_with=prefix, include=["metadata"]
+            )
+        }
+
+    def upload_file(
+        self,
+        path: Path,
+        blob_name: str,
+        content_hash: Optional[str] = None,
+        stored: Optional[Dict[str, Optional[str]]] = None,
+    ) -> Tuple[str, bool]:
+        """Upload ``path`` unless the blob already holds it; returns (url, uploaded).
+
+        ``stored`` is a prefix listing from :meth:`stored_hashes`; without it
+        the blob's properties are fetched.
+        """
+        content_hash = content_hash or hash_file(path)
+        blob_client = self.container_client.get_blob_client(blob_name)
+        if stored is None:
+            stored = {blob_name: self._stored_hash(blob_client)}
+        if stored.get(blob_name) == content_hash:
+            return blob_client.url, False
+
+        size = path.stat().st_size
+        with path.open("rb") as data:
+            blob_client.upload_blob(
+                data,
+                length=size,
+                overwrite=True,
+                metadata={HASH_METADATA_KEY: content_hash},
+                content_settings=ContentSettings(
+                    content_type=AzureStorageClient._guess_content_type(path)
+                ),
+                max_concurrency=self.block_concurrency if size > self.block_threshold else 1,
+            )
+        return blob_client.url, True
+
+    def upload_stream(
+        self,
+        blob_name: str,
+        chunks: Iterable[bytes],
+        content_type: str = "application/octet-stream",
+        content_encoding: Optional[str] = None,
+        block_size: int = BLOCK_SIZE,
+    ) -> Tuple[str, str]:
+        """Stage ``chunks`` as blocks of ~``block_size`` and commit them; returns (url, sha256).
+
+        The blob is only replaced when the block list is committed, so a failed
+        stream leaves the previous version in place.
+        """
+        blob_client = self.container_client.get_blob_client(blob_name)
+        digest = hashlib.sha256()
+        block_ids: List[str] = []
+        buffer = bytearray()
+
+        def stage() -> None:
+            block_id = f"{len(block_ids):08d}"
+            blob_client.stage_block(block_id, bytes(buffer))
+            block_ids.append(block_id)
+            buffer.clear()
+
+        for chunk in chunks:
+            digest.update(chunk)
+            buffer += chunk
+            if len(buffer) >= block_size:
+                stage()
+        if buffer or not block_ids:
+            stage()
+
+        content_hash = digest.hexdigest()
+        blob_client.commit_block_list(
+            block_ids,
+            content_settings=ContentSettings(
+                content_type=content_type, content_encoding=content_encoding
+            ),
+            metadata={HASH_METADATA_KEY: content_hash},
+        )
+        return blob_client.url, content_hash
+
+    def upload(
+        self,
+        files: Dict[str, Path],
+        hashes: Optional[Dict[str, str]] = None,
+        prefix: Optional[str] = None,
+    ) -> BlobUploadResult:
+        """Upload ``files`` (blob name -> local path); ``hashes`` are precomputed SHA-256s.
+
+        With ``prefix`` (which every blob name must start with) the stored
+        hashes come from one listing of it instead of one request per file.
+        """
+        hashes = hashes or {}
+        result = BlobUploadResult()
+        files = {name: Path(path) for name, path in files.items() if Path(path).exists()}
+        if not files:
+            return result
+        if prefix is not None and not all(name.startswith(prefix) for name in files):
+            raise ValueError(f"Every blob name must start with {prefix!r}")
+        stored = self.stored_hashes(prefix) if prefix is not None else None
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(files))) as pool:
+            futures = {
+                pool.submit(self.upload_file, path, name, hashes.get(name), stored): name
+                for name, path in files.items()
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    url, uploaded = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to upload {name} to Azure: {e}")
+                    result.failed[name] = str(e)
+                    continue
+                (result.uploaded if uploaded else result.skipped)[name] = url
+
+        logger.info(
+            f"Azure upload: {len(result.uploaded)} uploaded, {len(result.skipped)} unchanged, "
+            f"{len(result.failed)} failed"
+        )
+        return result
+
 
 class AzureStorageClient:
     """Handle uploading analytics data to Azure Blob Storage."""
@@ -38,7 +248,8 @@ class AzureStorageClient:
         self.container_name = os.getenv("AZURE_STORAGE_CONTAINER", "analytics-exports")
 
         if self.connection_string:
-            self.client = BlobServiceClient.from_connection_string(self.connection_string)
+            self.client = blob_service_from_connection_string(self.connection_string)
+            self.uploader = BlobUploader(self.client.get_container_client(self.container_name))
         else:
             logger.warning("Azure Storage credentials not configured")
             self.client = None
@@ -59,7 +270,7 @@ class AzureStorageClient:
             return None
 
         try:
-            container_client = self.client.get_container_client(self.container_name)
+            container_client = self.uploader.container_client
 
             content_type = self._guess_content_type(file_path)
 
@@ -84,54 +295,71 @@ class AzureStorageClient:
         df,
         blob_name: str,
         overwrite: bool = True,
+        writer: Optional[StreamingCSVWriter] = None,
     ) -> Optional[str]:
-        """Upload pandas DataFrame as CSV to Azure Blob Storage."""
+        """Stream a pandas DataFrame as CSV to Azure Blob Storage.
+
+        ``writer`` controls chunking and gzip/zstd compression; the compressed
+        blob gets the matching ``Content-Encoding``.
+        """
         if not self.client:
             logger.warning("Azure Storage client not initialized")
             return None
 
+        writer = writer or StreamingCSVWriter()
         try:
-            container_client = self.client.get_container_client(self.container_name)
-
-            csv_content = df.to_csv(index=False)
-
-            container_client.upload_blob(
-                name=blob_name,
-                data=csv_content,
-                overwrite=overwrite,
-                content_settings=ContentSettings(content_type="text/csv"),
+            if not overwrite and self._blob_exists(blob_name):
+                raise ResourceExistsError(f"Blob already exists: {blob_name}")
+
+            self.uploader.upload_stream(
+                blob_name,
+                writer.iter_bytes(df),
+                content_type="text/csv",
+                content_encoding=writer.content_encoding,
             )
 
             blob_url = f"https://{self.client.account_name}.blob.core.windows.net/{self.container_name}/{blob_name}"
-            logger.info(f"Uploaded DataFrame to Azure: {blob_url}")
+            stats = writer.stats
+            logger.info(
+                f"Uploaded DataFrame to Azure: {blob_url} ({stats.rows} rows, "
+                f"{stats.written_bytes} bytes, {stats.rows_per_second:.0f} rows/s)"
+            )
             return blob_url
 
         except Exception as e:
             logger.error(f"Failed to upload DataFrame to Azure: {e}")
             return None
 
+    def _blob_exists(self, blob_name: str) -> bool:
+        blob_client = self.uploader.container_client.get_blob_client(blob_name)
+        try:
+            blob_client.get_blob_properties()
+        except ResourceNotFoundError:
+            return False
+        return True
+
     def upload_batch_exports(
         self,
         export_dir: Path,
         run_id: str,
         patterns: Optional[List[str]] = None,
     ) -> Dict[str, str]:
-        """Upload all exported files matching patterns to Azure Blob Storage."""
+        """Upload exported files matching patterns, skipping blobs that are unchanged."""
         if not self.client:
             logger.warning("Azure Storage client not initialized")
             return {}
 
         patterns = patterns or ["*.csv", "*.json", "*.parquet"]
-        uploaded = {}
-
-        for pattern in patterns:
-            for file_path in export_dir.glob(pattern):
-                blob_name = f"exports/{run_id}/{file_path.name}"
-                url = self.upload_file(file_path, blob_name)
-                if url:
-                    uploaded[file_path.name] = url
-
-        return uploaded
+        files = {
+            file_path.name: file_path
+            for pattern in patterns
+            for file_path in export_dir.glob(pattern)
+        }
+        prefix = f"exports/{run_id}/"
+        result = self.uploader.upload(
+            {f"{prefix}{name}": path for name, path in files.items()}, prefix=prefix
+        )
+        return {blob_name.rsplit("/", 1)[-1]: url for blob_name, url in result.blobs.items()}
 
     @staticmethod
     def _guess_content_type(file_path: Path) -> str:
@@ -18,6 +18,7 @@ from typing import Any, Dict, Optional
 import pandas as pd
 
 from src.integrations.unified_output_manager import UnifiedOutputManager
+from src.pipeline.run_store import open_run_store
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(
@@ -37,11 +38,22 @@ class BatchExportRunner:
         self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
 
     def load_latest_metrics(self) -> Dict[str, Any]:
-        """Load latest KPI metrics from local storage or database.
+        """Load latest KPI metrics from the run store, or from local storage.
 
-        Performs runtime validation to ensure the metrics file contains a
-        JSON object; malformed or unexpected types are logged and ignored.
+        Without a run store the metrics file is used; it is validated at
+        runtime to contain a JSON object, and malformed or unexpected types
+        are logged and ignored.
         """
+        store = open_run_store()
+        if store is not None:
+            try:
+                metrics = store.latest_kpis()
+            except Exception as e:
+                logger.error("Failed to query run store %s: %s", store.path, e)
+            else:
+                if metrics:
+                    return metrics
+
         metrics_file = Path("data/metrics") / "latest_metrics.json"
 
         if metrics_file.exists():
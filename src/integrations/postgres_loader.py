@@ -0,0 +1,321 @@
+"""Bulk loading of DataFrames into PostgreSQL with ``COPY ... FROM STDIN``.
+
+Each table is streamed in CSV chunks (pandas' C writer) into an unlogged
+``<table>__staging`` copy of its target, one connection per table, so the
+expensive part of independent tables runs in parallel. The targets are then
+swapped in a single short transaction in foreign-key order: ``replace``
+truncates and refills them from staging, ``merge`` upserts on the table key.
+``merge`` is refused for tables without a key backed by a unique index, as
+``ON CONFLICT`` needs one and appending would duplicate every reloaded row.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psycopg
+    from psycopg import sql
+
+    HAS_PSYCOPG = True
+except ImportError:
+    HAS_PSYCOPG = False
+
+NULL_MARKER = r"\N"
+MODES = ("replace", "merge")
+STAGING_SUFFIX = "__staging"
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    """Source-to-target column mapping of one table.
+
+    ``columns`` maps source (CSV) headers to target columns and ``key`` is
+    the table's unique key: rows repeating it are dropped by :meth:`prepare`
+    and ``merge`` upserts on it. Leave it empty when the target has no
+    unique constraint on those columns (such tables can only be replaced).
+    ``depends_on`` lists the tables its foreign keys point at, which are
+    swapped in first.
+    """
+
+    name: str
+    columns: Dict[str, str]
+    key: Tuple[str, ...] = ()
+    date_columns: Tuple[str, ...] = ()
+    depends_on: Tuple[str, ...] = ()
+
+    @property
+    def target_columns(self) -> List[str]:
+        return list(self.columns.values())
+
+    def prepare(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Select and rename the mapped columns, parse dates and drop duplicate keys."""
+        prepared = frame[list(self.columns)].rename(columns=self.columns)
+        for column in self.date_columns:
+            prepared[column] = pd.to_datetime(prepared[column], errors="coerce").dt.date
+        if self.key:
+            prepared = prepared.drop_duplicates(subset=list(self.key))
+        return prepared.reset_index(drop=True)
+
+
+CUSTOMER_DATA = TableSpec(
+    name="customer_data",
+    columns={
+        "Customer ID": "customer_id",
+        "Client Type": "customer_type",
+        "Income": "income",
+        "Income Currency": "currency",
+        "Gender": "gender",
+        "Birth Year": "birth_date",
+        "Sales Channel": "channel_type",
+        "Number of Dependents": "dependents",
+        "Location City": "geography_city",
+        "Location State Province": "geography_state",
+        "Location Country": "geography_country",
+        "segment": "segment",
+        "subcategoria_linea": "subcategoria_linea",
+        "kam_id": "kam_id",
+        "Industry": "industry",
+    },
+    key=("customer_id",),
+)
+LOAN_DATA = TableSpec(
+    name="loan_data",
+    columns={
+        "Loan ID": "loan_id",
+        "Customer ID": "customer_id",
+        "Product Type": "product_type",
+        "Disbursement Date": "disbursement_date",
+        "Disbursement Amount": "disbursement_amount",
+        "Origination Fee": "origination_fee",
+        "Origination Fee Taxes": "origination_fee_taxes",
+        "Loan Currency": "currency",
+        "Interest Rate APR": "interest_rate_apr",
+        "Term": "term",
+        "Term Unit": "term_unit",
+        "Payment Frequency": "payment_frequency",
+        "Days in Default": "days_past_due",
+        "Outstanding Loan Value": "outstanding_loan_value",
+        "Loan Status": "loan_status",
+    },
+    # One row per disbursement: loan_data is keyed by a serial id, not loan_id
+    date_columns=("disbursement_date",),
+    depends_on=("customer_data",),
+)
+REAL_PAYMENT = TableSpec(
+    name="real_payment",
+    columns={
+        "Loan ID": "loan_id",
+        "True Payment Date": "true_payment_date",
+        "True Principal Payment": "true_principal_payment",
+        "True Interest Payment": "true_interest_payment",
+        "True Fee Payment": "true_fee_payment",
+        "True Other Payment": "true_other_payment",
+        "True Tax Payment": "true_tax_payment",
+        "True Fee Tax Payment": "true_fee_tax_payment",
+        "True Rabates": "true_rebates",
+    },
+    date_columns=("true_payment_date",),
+    depends_on=("loan_data",),
+)
+ABACO_TABLES = {spec.name: spec for spec in (CUSTOMER_DATA, LOAN_DATA, REAL_PAYMENT)}
+
+
+def csv_chunks(frame: pd.DataFrame, chunk_rows: int = 50_000):
+    """Yield ``frame`` as headerless CSV text in COPY's format, ``chunk_rows`` at a time.
+
+    Missing values are written as ``\\N`` so that empty strings survive, and
+    float columns holding only whole numbers are written without ``.0`` so
+    they load into integer columns.
+    """
+    frame = frame.copy()
+    for column in frame.columns:
+        values = frame[column]
+        if pd.api.types.is_float_dtype(values):
+            present = values.dropna()
+            if (present == present.round()).all() and present.abs().lt(2**53).all():
+                frame[column] = values.astype("Int64")
+    for start in range(0, len(frame), chunk_rows):
+        yield frame.iloc[start : start + chunk_rows].to_csv(
+            index=False, header=False, na_rep=NULL_MARKER, date_format="%Y-%m-%d %H:%M:%S"
+        )
+
+
+def load_order(specs: Sequence[TableSpec]) -> List[TableSpec]:
+    """Order ``specs`` so every table follows the tables it depends on."""
+    pending = {spec.name: spec for spec in specs}
+    ordered: List[TableSpec] = []
+    while pending:
+        ready = [
+            spec
+            for spec in pending.values()
+            if not any(dep in pending for dep in spec.depends_on if dep != spec.name)
+        ]
+        if not ready:
+            raise ValueError(f"Circular table dependencies: {sorted(pending)}")
+        for spec in ready:
+            ordered.append(pending.pop(spec.name))
+    return ordered
+
+
+UNIQUE_INDEX_QUERY = """
+SELECT 1 FROM pg_index i
+WHERE i.indrelid = to_regclass(%s) AND i.indisunique AND i.indpred IS NULL
+  AND (
+    SELECT array_agg(a.attname::text ORDER BY a.attname::text)
+    FROM pg_attribute a
+    WHERE a.attrelid = i.indrelid AND a.attnum = ANY (i.indkey)
+  ) = %s::text[]
+LIMIT 1
+"""
+
+
+def _identifier(name: str) -> "sql.Identifier":
+    return sql.Identifier(*name.split("."))
+
+
+def _staging_name(name: str) -> str:
+    return f"{name}{STAGING_SUFFIX}"
+
+
+def copy_frame(cursor, table: str, frame: pd.DataFrame, chunk_rows: int = 50_000) -> int:
+    """Stream ``frame`` into ``table`` with ``COPY FROM STDIN``; returns the row count."""
+    statement = sql.SQL("COPY {} ({}) FROM STDIN (FORMAT csv, NULL {})").format(
+        _identifier(table),
+        sql.SQL(", ").join(sql.Identifier(column) for column in frame.columns),
+        sql.Literal(NULL_MARKER),
+    )
+    with cursor.copy(statement) as copy:
+        for chunk in csv_chunks(frame, chunk_rows):
+            copy.write(chunk)
+    return len(frame)
+
+
+@dataclass
+class LoadResult:
+    table: str
+    rows: int
+    copy_seconds: float
+
+
+@dataclass
+class PostgresBulkLoader:
+    """Load several tables through staging copies and swap them in together.
+
+    ``connect`` defaults to ``psycopg.connect(dsn)``; ``workers`` caps how many
+    tables are copied to staging concurrently (one connection each).
+    """
+
+    dsn: Optional[str] = None
+    workers: int = 3
+    chunk_rows: int = 50_000
+    connect: Optional[Callable[[], object]] = None
+    results: List[LoadResult] = field(default_factory=list)
+
+    def __post_init__(self):
+        if not HAS_PSYCOPG:
+            raise ImportError("psycopg is required for PostgresBulkLoader")
+        if self.connect is None:
+            self.connect = lambda: psycopg.connect(self.dsn)
+
+    def _stage(self, spec: TableSpec, frame: pd.DataFrame) -> LoadResult:
+        started = time.perf_counter()
+        staging = _staging_name(spec.name)
+        with self.connect() as conn, conn.cursor() as cur:
+            cur.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(_identifier(staging)))
+            cur.execute(
+                sql.SQL("CREATE UNLOGGED TABLE {} (LIKE {} INCLUDING DEFAULTS)").format(
+                    _identifier(staging), _identifier(spec.name)
+                )
+            )
+            rows = copy_frame(cur, staging, frame, self.chunk_rows)
+        result = LoadResult(spec.name, rows, time.perf_counter() - started)
+        logger.info("Staged %s rows for %s in %.2fs", rows, spec.name, result.copy_seconds)
+        return result
+
+    def _check_merge_keys(self, specs: Sequence[TableSpec]) -> None:
+        """Raise ``ValueError`` unless every table's key matches a unique index."""
+        unusable = [spec.name for spec in specs if not spec.key]
+        with self.connect() as conn, conn.cursor() as cur:
+            for spec in specs:
+                if spec.key:
+                    cur.execute(UNIQUE_INDEX_QUERY, (spec.name, sorted(spec.key)))
+                    if cur.fetchone() is None:
+                        unusable.append(spec.name)
+        if unusable:
+            raise ValueError(
+                f"merge needs a unique index on the key of {sorted(unusable)}; use replace"
+            )
+
+    def _swap(self, cur, spec: TableSpec, columns: Sequence[str], mode: str) -> None:
+        target, staging = _identifier(spec.name), _identifier(_staging_name(spec.name))
+        column_list = sql.SQL(", ").join(sql.Identifier(column) for column in columns)
+        statement = sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {}").format(
+            target, column_list, column_list, staging
+        )
+        if mode == "merge":
+            updates = [column for column in columns if column not in spec.key]
+            conflict = sql.SQL(", ").join(sql.Identifier(column) for column in spec.key)
+            action = (
+                sql.SQL("DO UPDATE SET {}").format(
+                    sql.SQL(", ").join(
+                        sql.SQL("{} = EXCLUDED.{}").format(
+                            sql.Identifier(column), sql.Identifier(column)
+                        )
+                        for column in updates
+                    )
+                )
+                if updates
+                else sql.SQL("DO NOTHING")
+            )
+            statement = sql.SQL("{} ON CONFLICT ({}) {}").format(statement, conflict, action)
+        cur.execute(statement)
+        cur.execute(sql.SQL("DROP TABLE {}").format(staging))
+
+    def load(
+        self,
+        frames: Dict[str, pd.DataFrame],
+        specs: Optional[Dict[str, TableSpec]] = None,
+        mode: str = "replace",
+    ) -> List[LoadResult]:
+        """Load already prepared ``frames`` (target columns) keyed by table name.
+
+        With ``mode="replace"`` all targets are truncated (``CASCADE``) and
+        refilled in one transaction; ``"merge"`` upserts rows on each
+        table's ``key`` and raises ``ValueError`` before staging anything if a
+        table has no key or no unique index on it.
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        specs = specs or ABACO_TABLES
+        ordered = load_order([specs[name] for name in frames])
+        if mode == "merge":
+            self._check_merge_keys(ordered)
+
+        if self.workers <= 1 or len(ordered) == 1:
+            results = [self._stage(spec, frames[spec.name]) for spec in ordered]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(ordered))) as pool:
+                results = list(
+                    pool.map(lambda spec: self._stage(spec, frames[spec.name]), ordered)
+                )
+
+        with self.connect() as conn, conn.cursor() as cur:
+            if mode == "replace":
+                cur.execute(
+                    sql.SQL("TRUNCATE TABLE {} CASCADE").format(
+                        sql.SQL(", ").join(_identifier(spec.name) for spec in ordered)
+                    )
+                )
+            for spec in ordered:
+                self._swap(cur, spec, list(frames[spec.name].columns), mode)
+        self.results.extend(results)
+        return results
@@ -6,6 +6,10 @@ Handles:
 - Raw analytics data persistence
 - Time-series data for historical analysis
 - Real-time KPI updates via Supabase Realtime
+
+KPI metrics and raw data go through the pooled, batching PostgREST writer in
+``src.abaco_pipeline.output.supabase_writer``; the supabase-py client is only
+needed to read metrics back.
 """
 
 import json
@@ -16,6 +20,8 @@ from typing import Any, Dict, List, Optional
 
 import pandas as pd
 
+from src.abaco_pipeline.output.supabase_writer import SupabaseAuth, SupabaseWriter
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -32,6 +38,11 @@ class SupabaseOutputClient:
     def __init__(self, url: Optional[str] = None, service_role_key: Optional[str] = None):
         self.url = url or os.getenv("SUPABASE_URL")
         self.service_role_key = service_role_key or os.getenv("SUPABASE_SERVICE_ROLE")
+        self.writer = (
+            SupabaseWriter(SupabaseAuth(url=self.url, service_role_key=self.service_role_key))
+            if self.url and self.service_role_key
+            else None
+        )
 
         if not HAS_SUPABASE:
             logger.warning("supabase-py not installed. Supabase export disabled.")
@@ -51,40 +62,34 @@ class SupabaseOutputClient:
         kpi_metrics: Dict[str, Any],
         run_id: str,
     ) -> Dict[str, bool]:
-        """Insert KPI metrics into Supabase analytics_kpi_metrics table."""
-        if not self.client:
+        """Upsert all KPI metrics into analytics_kpi_metrics with one request."""
+        if not self.writer:
             logger.warning("Supabase client not initialized")
             return {}
 
-        results = {}
-
+        created_at = datetime.now(timezone.utc).isoformat()
+        records = [
+            {
+                "kpi_name": kpi_name,
+                "run_id": run_id,
+                "current_value": metric_data.get("current_value"),
+                "previous_value": metric_data.get("previous_value"),
+                "unit": metric_data.get("unit", ""),
+                "status": metric_data.get("status", "neutral"),
+                "metadata": json.dumps(metric_data.get("metadata", {})),
+                "created_at": created_at,
+            }
+            for kpi_name, metric_data in kpi_metrics.items()
+        ]
         try:
-            for kpi_name, metric_data in kpi_metrics.items():
-                record = {
-                    "kpi_name": kpi_name,
-                    "run_id": run_id,
-                    "current_value": metric_data.get("current_value"),
-                    "previous_value": metric_data.get("previous_value"),
-                    "unit": metric_data.get("unit", ""),
-                    "status": metric_data.get("status", "neutral"),
-                    "metadata": json.dumps(metric_data.get("metadata", {})),
-                    "created_at": datetime.now(timezone.utc).isoformat(),
-                }
-
-                response = self.client.table("analytics_kpi_metrics").insert(record).execute()
-
-                success = bool(response.data)
-                results[kpi_name] = success
-
-                if success:
-                    logger.info(f"Inserted KPI metric: {kpi_name}")
-                else:
-                    logger.warning(f"Failed to insert KPI metric: {kpi_name}")
-
+            self.writer.upsert_rows("analytics_kpi_metrics", records)
+            logger.info(f"Upserted {len(records)} KPI metrics (run: {run_id})")
+            success = True
         except Exception as e:
             logger.error(f"Error inserting KPI metrics: {e}")
+            success = False
 
-        return results
+        return {record["kpi_name"]: success for record in records}
 
     def insert_raw_data(
         self,
@@ -93,28 +98,14 @@ class SupabaseOutputClient:
         run_id: str,
         batch_size: int = 1000,
     ) -> int:
-        """Insert raw analytics data into Supabase table."""
-        if not self.client:
+        """Stream raw analytics data into a Supabase table in bounded batches."""
+        if not self.writer:
             logger.warning("Supabase client not initialized")
             return 0
 
+        frame = df.assign(run_id=run_id, created_at=datetime.now(timezone.utc).isoformat())
         try:
-            total_inserted = 0
-
-            for i in range(0, len(df), batch_size):
-                batch_df = df.iloc[i : i + batch_size]
-                batch_records = batch_df.to_dict(orient="records")
-
-                for record in batch_records:
-                    record["run_id"] = run_id
-                    record["created_at"] = datetime.now(timezone.utc).isoformat()
-
-                response = self.client.table(table_name).insert(batch_records).execute()
-
-                if response.data:
-                    total_inserted += len(response.data)
-                    logger.info(f"Inserted {len(response.data)} records into {table_name}")
-
+            total_inserted = self.writer.post_frame(table_name, frame, max_rows=batch_size)
             logger.info(f"Total inserted: {total_inserted} records into {table_name}")
             return total_inserted
 
@@ -128,27 +119,21 @@ class SupabaseOutputClient:
         run_id: str,
     ) -> Dict[str, int]:
         """Upsert time-series data into Supabase."""
-        if not self.client:
+        if not self.writer:
             logger.warning("Supabase client not initialized")
             return {}
 
         results = {}
+        created_at = datetime.now(timezone.utc).isoformat()
 
         try:
             for ts_name, ts_df in timeseries_data.items():
-                ts_records = ts_df.to_dict(orient="records")
-
-                for record in ts_records:
-                    record["run_id"] = run_id
-                    record["created_at"] = datetime.now(timezone.utc).isoformat()
-
-                response = (
-                    self.client.table("analytics_timeseries")
-                    .upsert(ts_records, on_conflict="run_id,metric_name,period")
-                    .execute()
+                inserted = self.writer.post_frame(
+                    "analytics_timeseries",
+                    ts_df.assign(run_id=run_id, created_at=created_at),
+                    params={"on_conflict": "run_id,metric_name,period"},
+                    prefer="resolution=merge-duplicates,return=minimal",
                 )
-
-                inserted = len(response.data) if response.data else 0
                 results[ts_name] = inserted
 
                 logger.info(f"Upserted {inserted} timeseries records for {ts_name}")
@@ -194,7 +179,7 @@ class SupabaseOutputClient:
         Returns:
             Dict with results from each sync operation
         """
-        if not self.client:
+        if not self.writer:
             logger.warning("Supabase export skipped: credentials not configured")
             return {}
 
@@ -7,11 +7,26 @@ This module provides a factory for coordinating outputs to:
 - Supabase (data persistence)
 - Meta (pixel events, ads insights)
 - Notion (documentation, reports)
+
+Platforms are exported one after another by default. With ``concurrent=True``
+they fan out over a thread pool instead: each platform has its own timeout
+and concurrency limit, results are collected as they complete, and a failing
+or timed-out platform is reported without holding up the others. A
+platform's timeout starts once it holds a concurrency slot; one that cannot
+get a slot within its timeout (say, because an export abandoned after a
+timeout is still running) is reported ``busy`` without being run.
 """
 
 import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import partial
+from itertools import accumulate
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import pandas as pd
 
@@ -24,6 +39,13 @@ from src.integrations.supabase_client import SupabaseOutputClient
 
 logger = logging.getLogger(__name__)
 
+OUTPUTS = ("figma", "azure", "supabase", "meta", "notion")
+DEFAULT_SINK_TIMEOUT = 120.0
+# How often the fan-out checks whether platforms waiting for a slot have started
+SLOT_POLL_SECONDS = 0.05
+# Upper bounds (ms) of the per-platform latency histogram buckets
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
 
 class UnifiedOutputManager:
     """
@@ -33,7 +55,12 @@ class UnifiedOutputManager:
     optional filtering, retry logic, and result aggregation.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        concurrent: bool = False,
+        sink_timeouts: Optional[Dict[str, float]] = None,
+        sink_concurrency: Optional[Dict[str, int]] = None,
+    ):
         self.figma_client = FigmaClient()
         self.azure_storage_client = AzureStorageClient()
         self.azure_dashboard_client = AzureDashboardClient()
@@ -42,6 +69,18 @@ class UnifiedOutputManager:
         self.notion_client = NotionOutputClient()
 
         self.results = {}
+        self.concurrent = concurrent
+        self.sink_timeouts: Dict[str, float] = dict(sink_timeouts or {})
+        self._limits: Dict[str, threading.BoundedSemaphore] = {}
+        self.set_sink_concurrency(sink_concurrency or {})
+        self._latencies: Dict[str, List[float]] = defaultdict(list)
+        self._latency_lock = threading.Lock()
+
+    def set_sink_concurrency(self, limits: Dict[str, int]) -> None:
+        """Cap concurrent exports per platform (across overlapping batches); default 1."""
+        self._limits = {
+            name: threading.BoundedSemaphore(max(1, int(limits.get(name, 1)))) for name in OUTPUTS
+        }
 
     def configure_clients(self, config: Dict[str, Any]) -> None:
         """Configure output clients from config dict."""
@@ -83,11 +122,77 @@ class UnifiedOutputManager:
                 database_id=notion_cfg.get("database_id"),
             )
 
+        fanout_cfg = config.get("fanout", {})
+        if fanout_cfg:
+            self.concurrent = bool(fanout_cfg.get("enabled", self.concurrent))
+            self.sink_timeouts.update(fanout_cfg.get("timeouts", {}))
+            self.set_sink_concurrency(fanout_cfg.get("concurrency", {}))
+
+    def _export_azure(self, export_data: Dict[str, Any], run_id: str) -> Dict[str, Any]:
+        return {
+            "storage": self.azure_storage_client.upload_batch_exports(
+                export_data.get("export_dir", Path("data/exports")),
+                run_id,
+            ),
+            "dashboard": self.azure_dashboard_client.sync_batch_export(export_data),
+        }
+
+    def _exporters(self) -> Dict[str, Callable[[Dict[str, Any], str], Any]]:
+        return {
+            "figma": self.figma_client.sync_batch_export,
+            "azure": self._export_azure,
+            "supabase": self.supabase_client.sync_batch_export,
+            "meta": lambda export_data, run_id: self.meta_client.sync_batch_export(export_data),
+            "notion": self.notion_client.sync_batch_export,
+        }
+
+    def _run_sink(
+        self,
+        name: str,
+        exporter: Callable[[Dict[str, Any], str], Any],
+        export_data: Dict[str, Any],
+        run_id: str,
+        slot_timeout: Optional[float] = None,
+        on_start: Optional[Callable[[], None]] = None,
+    ) -> tuple:
+        """Run one platform export under its concurrency limit; returns (result, seconds).
+
+        Waits at most ``slot_timeout`` seconds for a slot and returns a
+        ``busy`` failure (seconds ``None``) if none frees up. ``on_start`` is
+        called once the slot is held, just before the export runs.
+        """
+        limit = self._limits[name]
+        if not limit.acquire(timeout=slot_timeout):
+            logger.error(f"{name} export skipped: previous export still running")
+            return {
+                "success": False,
+                "busy": True,
+                "error": f"busy: no free slot after {slot_timeout}s",
+            }, None
+        try:
+            if on_start is not None:
+                on_start()
+            logger.info(f"Exporting to {name.capitalize()}...")
+            started = time.perf_counter()
+            try:
+                result = exporter(export_data, run_id)
+            except Exception as e:
+                logger.error(f"{name} export failed: {e}")
+                result = {"success": False, "error": str(e)}
+            elapsed = time.perf_counter() - started
+            # Recorded before the slot is freed, so abandoned exports count too
+            with self._latency_lock:
+                self._latencies[name].append(elapsed * 1000)
+        finally:
+            limit.release()
+        return result, elapsed
+
     def export_batch(
         self,
         export_data: Dict[str, Any],
         run_id: str,
         enabled_outputs: Optional[List[str]] = None,
+        concurrent: Optional[bool] = None,
     ) -> Dict[str, Any]:
         """
         Export batch data to all enabled output platforms.
@@ -97,52 +202,33 @@ class UnifiedOutputManager:
             run_id: Pipeline run ID
             enabled_outputs: List of output names to enable (None = all enabled outputs)
                            Valid values: ['figma', 'azure', 'supabase', 'meta', 'notion']
+            concurrent: Fan out to the platforms in parallel (defaults to ``self.concurrent``)
 
         Returns:
-            Dict with results from each output platform
+            Dict with results from each output platform, in completion order, plus
+            per-platform ``latency_ms`` and ``latency_histograms``
         """
         results = {
             "run_id": run_id,
             "timestamp": pd.Timestamp.now().isoformat(),
             "outputs": {},
+            "latency_ms": {},
         }
 
-        enabled_outputs = enabled_outputs or [
-            "figma",
-            "azure",
-            "supabase",
-            "meta",
-            "notion",
-        ]
-
-        if "figma" in enabled_outputs:
-            logger.info("Exporting to Figma...")
-            results["outputs"]["figma"] = self.figma_client.sync_batch_export(export_data, run_id)
-
-        if "azure" in enabled_outputs:
-            logger.info("Exporting to Azure...")
-            azure_results = {
-                "storage": self.azure_storage_client.upload_batch_exports(
-                    export_data.get("export_dir", Path("data/exports")),
-                    run_id,
-                ),
-                "dashboard": self.azure_dashboard_client.sync_batch_export(export_data),
-            }
-            results["outputs"]["azure"] = azure_results
-
-        if "supabase" in enabled_outputs:
-            logger.info("Exporting to Supabase...")
-            results["outputs"]["supabase"] = self.supabase_client.sync_batch_export(
-                export_data, run_id
-            )
-
-        if "meta" in enabled_outputs:
-            logger.info("Exporting to Meta...")
-            results["outputs"]["meta"] = self.meta_client.sync_batch_export(export_data)
+        enabled_outputs = enabled_outputs or list(OUTPUTS)
+        exporters = {
+            name: exporter
+            for name, exporter in self._exporters().items()
+            if name in enabled_outputs
+        }
 
-        if "notion" in enabled_outputs:
-            logger.info("Exporting to Notion...")
-            results["outputs"]["notion"] = self.notion_client.sync_batch_export(export_data, run_id)
+        if self.concurrent if concurrent is None else concurrent:
+            self._fan_out(exporters, export_data, run_id, results)
+        else:
+            for name, exporter in exporters.items():
+                result, elapsed = self._run_sink(name, exporter, export_data, run_id)
+                results["outputs"][name] = result
+                results["latency_ms"][name] = round(elapsed * 1000, 3)
 
         success_flags = [
             output.get("success")
@@ -150,10 +236,108 @@ class UnifiedOutputManager:
             if isinstance(output, dict) and "success" in output
         ]
         results["success"] = all(success_flags) if success_flags else True
+        results["latency_histograms"] = self.latency_histograms(list(exporters))
 
         self._log_results(results)
         return results
 
+    def _fan_out(
+        self,
+        exporters: Dict[str, Callable[[Dict[str, Any], str], Any]],
+        export_data: Dict[str, Any],
+        run_id: str,
+        results: Dict[str, Any],
+    ) -> None:
+        """Run ``exporters`` in parallel, recording results as they complete.
+
+        A platform that has not finished within its timeout of starting is
+        reported as failed; its thread is left to finish in the background
+        and its latency still lands in the histograms.
+        """
+        if not exporters:
+            return
+        limits = {name: self.sink_timeouts.get(name, DEFAULT_SINK_TIMEOUT) for name in exporters}
+        starts: Dict[str, float] = {}
+
+        def mark_started(name: str) -> None:
+            starts[name] = time.monotonic()
+
+        pool = ThreadPoolExecutor(max_workers=len(exporters), thread_name_prefix="output")
+        pending = {
+            pool.submit(
+                self._run_sink,
+                name,
+                exporter,
+                export_data,
+                run_id,
+                slot_timeout=limits[name],
+                on_start=partial(mark_started, name),
+            ): name
+            for name, exporter in exporters.items()
+        }
+        try:
+            while pending:
+                deadlines = [starts[n] + limits[n] for n in pending.values() if n in starts]
+                timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+                if any(name not in starts for name in pending.values()):
+                    # Waiting for a slot: the deadline is only known once it starts
+                    timeout = min(timeout, SLOT_POLL_SECONDS) if deadlines else SLOT_POLL_SECONDS
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = pending.pop(future)
+                    result, elapsed = future.result()
+                    results["outputs"][name] = result
+                    latency = None if elapsed is None else round(elapsed * 1000, 3)
+                    results["latency_ms"][name] = latency
+                now = time.monotonic()
+                expired = [
+                    future
+                    for future, name in pending.items()
+                    if name in starts and starts[name] + limits[name] <= now
+                ]
+                for future in expired:
+                    name = pending.pop(future)
+                    logger.error(f"{name} export timed out after {limits[name]}s")
+                    results["outputs"][name] = {
+                        "success": False,
+                        "error": f"timed out after {limits[name]}s",
+                    }
+                    results["latency_ms"][name] = None
+                    future.add_done_callback(partial(self._log_late, name))
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _log_late(name: str, future: Future) -> None:
+        result, elapsed = future.result()
+        success = result.get("success", True) if isinstance(result, dict) else True
+        logger.warning(
+            f"{name} export finished after timing out ({elapsed * 1000:.0f} ms, "
+            f"success={success})"
+        )
+
+    def latency_histograms(self, outputs: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Cumulative latency histograms (ms) of every export so far, per platform."""
+        histograms = {}
+        with self._latency_lock:
+            latencies = {name: list(values) for name, values in self._latencies.items()}
+        for name in outputs or list(latencies):
+            values = sorted(latencies.get(name, []))
+            if not values:
+                continue
+            counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+            for value in values:
+                counts[bisect_left(LATENCY_BUCKETS_MS, value)] += 1
+            labels = [f"le_{bound}" for bound in LATENCY_BUCKETS_MS] + ["le_inf"]
+            histograms[name] = {
+                "count": len(values),
+                "buckets": dict(zip(labels, accumulate(counts))),
+                "p50_ms": round(values[(len(values) - 1) // 2], 3),
+                "p95_ms": round(values[int(0.95 * (len(values) - 1))], 3),
+                "max_ms": round(values[-1], 3),
+            }
+        return histograms
+
     def export_kpi_metrics_only(
         self,
         kpi_metrics: Dict[str, Any],
@@ -207,10 +391,12 @@ class UnifiedOutputManager:
         logger.info("=" * 60)
 
         for platform, platform_results in results.get("outputs", {}).items():
+            latency = results.get("latency_ms", {}).get(platform)
+            took = f" ({latency:.0f} ms)" if latency is not None else ""
             if isinstance(platform_results, dict):
                 success = platform_results.get("success", True)
                 status = "✓ SUCCESS" if success else "✗ FAILED"
-                logger.info(f"{platform.upper()}: {status}")
+                logger.info(f"{platform.upper()}: {status}{took}")
 
                 for key, value in platform_results.items():
                     if key != "success" and value:
@@ -225,7 +411,7 @@ class UnifiedOutputManager:
         checks = {
             "figma": bool(self.figma_client.api_token),
             "azure": bool(self.azure_storage_client.client),
-            "supabase": bool(self.supabase_client.client),
+            "supabase": bool(self.supabase_client.writer),
             "meta": bool(self.meta_client.access_token),
             "notion": bool(self.notion_client.api_token),
         }
@@ -4,14 +4,19 @@ from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
 
+from src.kpis.base import AggregateSpec, compute_aggregates
+from src.kpis.collection_rate import CollectionRateCalculator
 from src.kpis.collection_rate import \
     calculate_collection_rate as calculate_collection_rate_logic
 from src.kpis.dti import calculate_dti as calculate_dti_logic
 from src.kpis.ltv import calculate_ltv as calculate_ltv_logic
+from src.kpis.par_30 import PAR30Calculator
 from src.kpis.par_30 import calculate_par_30 as calculate_par_30_logic
+from src.kpis.par_90 import PAR90Calculator
 from src.kpis.par_90 import calculate_par_90 as calculate_par_90_logic
 from src.kpis.portfolio_health import \
     calculate_portfolio_health as calculate_portfolio_health_logic
+from src.kpis.portfolio_yield import PortfolioYieldCalculator
 from src.kpis.portfolio_yield import \
     calculate_portfolio_yield as calculate_portfolio_yield_logic
 
@@ -30,6 +35,15 @@ class KPIEngineV2:
         "CollectionRate": calculate_collection_rate_logic,
     }
 
+    # Calculators that can be evaluated from shared column aggregates. Only used
+    # while KPI_FUNCTIONS still maps the KPI to its default function.
+    FUSED_CALCULATORS = {
+        "PAR30": (calculate_par_30_logic, PAR30Calculator),
+        "PAR90": (calculate_par_90_logic, PAR90Calculator),
+        "CollectionRate": (calculate_collection_rate_logic, CollectionRateCalculator),
+        "PortfolioYield": (calculate_portfolio_yield_logic, PortfolioYieldCalculator),
+    }
+
     ON_DEMAND_KPI_FUNCTIONS = {
         "LTV": calculate_ltv_logic,
         "DTI": calculate_dti_logic,
@@ -55,9 +69,21 @@ class KPIEngineV2:
         self._log_event("calculate_all", "started", kpi_count=len(self.KPI_FUNCTIONS))
 
         try:
+            fused = self._fused_calculators()
+            aggregates = None
+            if fused:
+                aggregates = compute_aggregates(
+                    self.df, AggregateSpec.union(c.AGGREGATES for c in fused.values())
+                )
+
             for kpi_name, calculator in self.KPI_FUNCTIONS.items():
                 try:
-                    value, context = calculator(self.df)
+                    if kpi_name in fused:
+                        value, context = fused[kpi_name].calculate_from_aggregates(
+                            aggregates, self.df
+                        )
+                    else:
+                        value, context = calculator(self.df)
                     context.setdefault("metric", kpi_name)
                     self.metrics[kpi_name] = {
                         "value": float(value),
@@ -90,6 +116,13 @@ class KPIEngineV2:
             self._log_event("calculate_all", "failed", error=str(e))
             raise
 
+    def _fused_calculators(self) -> Dict[str, Any]:
+        return {
+            name: calculator_cls()
+            for name, (default, calculator_cls) in self.FUSED_CALCULATORS.items()
+            if self.KPI_FUNCTIONS.get(name) is default
+        }
+
     def calculate_portfolio_health(
         self, par_30: Optional[float] = None, collection_rate: Optional[float] = None
     ) -> Tuple[float, Dict[str, Any]]:
@@ -1,14 +1,22 @@
 from abc import ABC, abstractmethod
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 
 class KPICalculator(ABC):
     """Base class for all KPI calculations with consistent interface."""
 
+    # Set by KPIs that are pure functions of column sums/null counts.
+    AGGREGATES: Optional["AggregateSpec"] = None
+
+    def supports_aggregates(self, columns: Iterable[str]) -> bool:
+        """Whether a frame with ``columns`` can be evaluated from aggregates alone."""
+        return self.AGGREGATES is not None
+
     @abstractmethod
     def calculate(self, df: pd.DataFrame) -> Tuple[float, Dict[str, Any]]:
         """
@@ -46,6 +54,169 @@ def safe_numeric(series: pd.Series, fill_value: float = 0.0) -> pd.Series:
     return numeric.fillna(fill_value)
 
 
+@dataclass(frozen=True)
+class AggregateSpec:
+    """Column reductions a KPI needs: coerced sums, raw null counts and weighted sums."""
+
+    sums: Tuple[str, ...] = ()
+    null_counts: Tuple[str, ...] = ()
+    weighted_sums: Tuple[Tuple[str, str], ...] = ()
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        cols = [*self.sums, *self.null_counts, *(c for pair in self.weighted_sums for c in pair)]
+        return tuple(dict.fromkeys(cols))
+
+    @staticmethod
+    def union(specs: Iterable["AggregateSpec"]) -> "AggregateSpec":
+        sums: Dict[str, None] = {}
+        nulls: Dict[str, None] = {}
+        weighted: Dict[Tuple[str, str], None] = {}
+        for spec in specs:
+            sums.update(dict.fromkeys(spec.sums))
+            nulls.update(dict.fromkeys(spec.null_counts))
+            weighted.update(dict.fromkeys(spec.weighted_sums))
+        return AggregateSpec(tuple(sums), tuple(nulls), tuple(weighted))
+
+
+@dataclass
+class ColumnAggregates:
+    """Precomputed reductions shared by every KPI evaluated over one frame."""
+
+    rows: int
+    columns: frozenset = frozenset()
+    sums: Dict[str, float] = field(default_factory=dict)
+    null_counts: Dict[str, int] = field(default_factory=dict)
+    weighted_sums: Dict[Tuple[str, str], float] = field(default_factory=dict)
+
+    def has(self, *columns: str) -> bool:
+        return all(col in self.columns for col in columns)
+
+    def sum(self, column: str) -> float:
+        """Equivalent to ``safe_numeric(df[column]).sum()``; 0.0 if the column is absent."""
+        return self.sums.get(column, 0.0)
+
+    def nulls(self, column: str) -> int:
+        return self.null_counts.get(column, 0)
+
+    def weighted_sum(self, value: str, weight: str) -> float:
+        """Equivalent to ``(safe_numeric(df[value]) * safe_numeric(df[weight])).sum()``."""
+        return self.weighted_sums.get((value, weight), 0.0)
+
+
+def compute_aggregates(df: Optional[pd.DataFrame], spec: AggregateSpec) -> ColumnAggregates:
+    """Compute every requested sum and null count with one scan per column.
+
+    Each column is read once no matter how many KPIs reference it. Float
+    columns reuse a single NaN mask for both the null count and the sum;
+    other dtypes are coerced like :func:`safe_numeric`. Sums reduce the
+    contiguous column buffer, so results match ``safe_numeric(col).sum()``.
+    """
+    if df is None:
+        return ColumnAggregates(rows=0)
+    present = frozenset(df.columns)
+    sum_cols = {c for c in spec.sums if c in present}
+    null_cols = {c for c in spec.null_counts if c in present}
+    weighted = [(v, w) for v, w in spec.weighted_sums if v in present and w in present]
+    weighted_cols = {c for pair in weighted for c in pair}
+
+    sums: Dict[str, float] = {}
+    null_counts: Dict[str, int] = {}
+    filled: Dict[str, np.ndarray] = {}
+    for col in (c for c in spec.columns if c in present):
+        series = df[col]
+        if series.dtype.kind == "f":
+            values = series.to_numpy()
+            missing = np.isnan(values)
+            n_missing = int(missing.sum())
+            if col in null_cols:
+                null_counts[col] = n_missing
+            if col in sum_cols or col in weighted_cols:
+                values = np.where(missing, 0.0, values) if n_missing else values
+            if col in sum_cols:
+                sums[col] = float(values.sum())
+            if col in weighted_cols:
+                filled[col] = values
+            continue
+        if col in null_cols:
+            null_counts[col] = int(series.isna().sum())
+        if col in sum_cols or col in weighted_cols:
+            values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+            values = np.where(np.isnan(values), 0.0, values)
+            if col in sum_cols:
+                sums[col] = float(values.sum())
+            if col in weighted_cols:
+                filled[col] = values
+
+    weighted_sums = {(v, w): float((filled[v] * filled[w]).sum()) for v, w in weighted}
+    return ColumnAggregates(
+        rows=len(df),
+        columns=present,
+        sums=sums,
+        null_counts=null_counts,
+        weighted_sums=weighted_sums,
+    )
+
+
+def compute_grouped_aggregates(
+    df: pd.DataFrame, spec: AggregateSpec, by: pd.Series, dropna: bool = True
+) -> pd.DataFrame:
+    """Per-group partial sums, null counts and row counts from one ``groupby().sum()``.
+
+    Columns are ``rows``, ``sum:<col>``, ``nulls:<col>`` and
+    ``wsum:<value>*<weight>``. Partials are additive, so coarser groups can be
+    built by summing finer ones.
+    """
+    present = frozenset(df.columns)
+    filled: Dict[str, np.ndarray] = {}
+
+    def coerced(col: str) -> np.ndarray:
+        if col not in filled:
+            values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+            filled[col] = np.where(np.isnan(values), 0.0, values)
+        return filled[col]
+
+    parts: Dict[str, np.ndarray] = {"rows": np.ones(len(df), dtype=np.int64)}
+    for col in spec.sums:
+        if col in present:
+            parts[f"sum:{col}"] = coerced(col)
+    for col in spec.null_counts:
+        if col in present:
+            parts[f"nulls:{col}"] = df[col].isna().to_numpy(dtype=np.int64)
+    for value, weight in spec.weighted_sums:
+        if value in present and weight in present:
+            parts[f"wsum:{value}*{weight}"] = coerced(value) * coerced(weight)
+    return pd.DataFrame(parts, index=df.index).groupby(by, dropna=dropna).sum()
+
+
+def aggregates_from_partials(
+    partials: pd.DataFrame, columns: Iterable[str]
+) -> Dict[Any, ColumnAggregates]:
+    """Turn each row of :func:`compute_grouped_aggregates` output into ``ColumnAggregates``."""
+    present = frozenset(columns)
+    result: Dict[Any, ColumnAggregates] = {}
+    for key, row in zip(partials.index, partials.to_dict("records")):
+        sums: Dict[str, float] = {}
+        null_counts: Dict[str, int] = {}
+        weighted_sums: Dict[Tuple[str, str], float] = {}
+        for name, value in row.items():
+            if name.startswith("sum:"):
+                sums[name[4:]] = float(value)
+            elif name.startswith("nulls:"):
+                null_counts[name[6:]] = int(value)
+            elif name.startswith("wsum:"):
+                value_col, weight_col = name[5:].split("*", 1)
+                weighted_sums[(value_col, weight_col)] = float(value)
+        result[key] = ColumnAggregates(
+            rows=int(row["rows"]),
+            columns=present,
+            sums=sums,
+            null_counts=null_counts,
+            weighted_sums=weighted_sums,
+        )
+    return result
+
+
 def create_context(
     formula: str,
     rows_processed: int,
@@ -2,8 +2,8 @@ from typing import Any, Dict, Tuple
 
 import pandas as pd
 
-from src.kpis.base import (KPICalculator, KPIMetadata, create_context,
-                           safe_numeric)
+from src.kpis.base import (AggregateSpec, ColumnAggregates, KPICalculator,
+                           KPIMetadata, compute_aggregates, create_context)
 
 
 class CollectionRateCalculator(KPICalculator):
@@ -19,28 +19,33 @@ class CollectionRateCalculator(KPICalculator):
         threshold_critical=1.0,
         owner="CFO",
     )
+    AGGREGATES = AggregateSpec(
+        sums=("cash_available_usd", "total_eligible_usd"),
+        null_counts=("cash_available_usd", "total_eligible_usd"),
+    )
 
     def calculate(self, df: pd.DataFrame) -> Tuple[float, Dict[str, Any]]:
-        if df is None or df.shape[0] == 0:
+        return self.calculate_from_aggregates(compute_aggregates(df, self.AGGREGATES), df)
+
+    def calculate_from_aggregates(
+        self, aggs: ColumnAggregates, df: pd.DataFrame = None
+    ) -> Tuple[float, Dict[str, Any]]:
+        if aggs.rows == 0:
             return 0.0, create_context(
                 self.METADATA.formula,
                 rows_processed=0,
                 reason="Empty DataFrame",
             )
 
-        null_count = 0
-        if "cash_available_usd" in df:
-            null_count += df["cash_available_usd"].isnull().sum()
-        if "total_eligible_usd" in df:
-            null_count += df["total_eligible_usd"].isnull().sum()
+        null_count = aggs.nulls("cash_available_usd") + aggs.nulls("total_eligible_usd")
 
-        cash = safe_numeric(df.get("cash_available_usd", pd.Series())).sum()
-        eligible = safe_numeric(df.get("total_eligible_usd", pd.Series())).sum()
+        cash = aggs.sum("cash_available_usd")
+        eligible = aggs.sum("total_eligible_usd")
 
         if eligible == 0:
             return 0.0, create_context(
                 self.METADATA.formula,
-                rows_processed=len(df),
+                rows_processed=aggs.rows,
                 null_count=int(null_count),
                 reason="Zero total eligible",
             )
@@ -48,7 +53,7 @@ class CollectionRateCalculator(KPICalculator):
         value = round((cash / eligible) * 100.0, 2)
         return value, create_context(
             self.METADATA.formula,
-            rows_processed=len(df),
+            rows_processed=aggs.rows,
             null_count=int(null_count),
             cash_sum=float(cash),
             eligible_sum=float(eligible),
@@ -1,9 +1,11 @@
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Iterable, Tuple
 
 import pandas as pd
 
-from src.kpis.base import (KPICalculator, KPIMetadata, create_context,
-                           safe_numeric)
+from src.kpis.base import (AggregateSpec, ColumnAggregates, KPICalculator,
+                           KPIMetadata, compute_aggregates, create_context)
+
+REQUIRED_COLUMNS = ("dpd_30_60_usd", "dpd_60_90_usd", "dpd_90_plus_usd", "total_receivable_usd")
 
 
 class PAR30Calculator(KPICalculator):
@@ -19,9 +21,20 @@ class PAR30Calculator(KPICalculator):
         threshold_critical=8.0,
         owner="CRO",
     )
+    AGGREGATES = AggregateSpec(sums=REQUIRED_COLUMNS, null_counts=REQUIRED_COLUMNS)
+
+    def supports_aggregates(self, columns: Iterable[str]) -> bool:
+        # The loan_status fallback counts rows, so it needs the frame itself.
+        return all(col in columns for col in REQUIRED_COLUMNS)
 
     def calculate(self, df: pd.DataFrame) -> Tuple[float, Dict[str, Any]]:
-        if df is None or df.shape[0] == 0:
+        return self.calculate_from_aggregates(compute_aggregates(df, self.AGGREGATES), df)
+
+    def calculate_from_aggregates(
+        self, aggs: ColumnAggregates, df: pd.DataFrame
+    ) -> Tuple[float, Dict[str, Any]]:
+        """Evaluate from precomputed sums; ``df`` is only read for the status fallback."""
+        if aggs.rows == 0:
             return 0.0, create_context(
                 self.METADATA.formula,
                 rows_processed=0,
@@ -29,20 +42,19 @@ class PAR30Calculator(KPICalculator):
             )
 
         # Check for required columns or fallback to loan_status
-        required = ["dpd_30_60_usd", "dpd_60_90_usd", "dpd_90_plus_usd", "total_receivable_usd"]
-        has_dpd_cols = all(col in df.columns for col in required)
+        required = list(REQUIRED_COLUMNS)
 
-        if has_dpd_cols:
-            null_count = sum(df[col].isnull().sum() for col in required if col in df)
-            dpd_30_60 = safe_numeric(df["dpd_30_60_usd"]).sum()
-            dpd_60_90 = safe_numeric(df["dpd_60_90_usd"]).sum()
-            dpd_90_plus = safe_numeric(df["dpd_90_plus_usd"]).sum()
-            total_receivable = safe_numeric(df["total_receivable_usd"]).sum()
+        if aggs.has(*required):
+            null_count = sum(aggs.nulls(col) for col in required)
+            dpd_30_60 = aggs.sum("dpd_30_60_usd")
+            dpd_60_90 = aggs.sum("dpd_60_90_usd")
+            dpd_90_plus = aggs.sum("dpd_90_plus_usd")
+            total_receivable = aggs.sum("total_receivable_usd")
 
             if total_receivable == 0:
                 return 0.0, create_context(
                     self.METADATA.formula,
-                    rows_processed=len(df),
+                    rows_processed=aggs.rows,
                     null_count=int(null_count),
                     reason="Zero total receivable",
                 )
@@ -50,14 +62,14 @@ class PAR30Calculator(KPICalculator):
             value = (dpd_30_60 + dpd_60_90 + dpd_90_plus) / total_receivable * 100.0
             return value, create_context(
                 self.METADATA.formula,
-                rows_processed=len(df),
+                rows_processed=aggs.rows,
                 null_count=int(null_count),
                 dpd_30_60_sum=float(dpd_30_60),
                 dpd_60_90_sum=float(dpd_60_90),
                 dpd_90_plus_sum=float(dpd_90_plus),
                 total_receivable_sum=float(total_receivable),
             )
-        elif "loan_status" in df.columns:
+        elif "loan_status" in aggs.columns:
             # Fallback for datasets like the one in tests/test_analytics_metrics.py
             delinquent_statuses = [
                 "30-59 days past due",
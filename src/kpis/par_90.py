@@ -2,8 +2,8 @@ from typing import Any, Dict, Tuple
 
 import pandas as pd
 
-from src.kpis.base import (KPICalculator, KPIMetadata, create_context,
-                           safe_numeric)
+from src.kpis.base import (AggregateSpec, ColumnAggregates, KPICalculator,
+                           KPIMetadata, compute_aggregates, create_context)
 
 
 class PAR90Calculator(KPICalculator):
@@ -19,24 +19,32 @@ class PAR90Calculator(KPICalculator):
         threshold_critical=5.0,
         owner="CRO",
     )
+    AGGREGATES = AggregateSpec(
+        sums=("dpd_90_plus_usd", "total_receivable_usd"), null_counts=("dpd_90_plus_usd",)
+    )
 
     def calculate(self, df: pd.DataFrame) -> Tuple[float, Dict[str, Any]]:
-        if df is None or df.shape[0] == 0:
+        return self.calculate_from_aggregates(compute_aggregates(df, self.AGGREGATES), df)
+
+    def calculate_from_aggregates(
+        self, aggs: ColumnAggregates, df: pd.DataFrame = None
+    ) -> Tuple[float, Dict[str, Any]]:
+        if aggs.rows == 0:
             return 0.0, create_context(
                 self.METADATA.formula,
                 rows_processed=0,
                 reason="Empty DataFrame",
             )
 
-        null_count = df["dpd_90_plus_usd"].isnull().sum() if "dpd_90_plus_usd" in df else 0
+        null_count = aggs.nulls("dpd_90_plus_usd")
 
-        dpd = safe_numeric(df.get("dpd_90_plus_usd", pd.Series())).sum()
-        total_receivable = safe_numeric(df.get("total_receivable_usd", pd.Series())).sum()
+        dpd = aggs.sum("dpd_90_plus_usd")
+        total_receivable = aggs.sum("total_receivable_usd")
 
         if total_receivable == 0:
             return 0.0, create_context(
                 self.METADATA.formula,
-                rows_processed=len(df),
+                rows_processed=aggs.rows,
                 null_count=int(null_count),
                 reason="Zero total receivable",
             )
@@ -44,7 +52,7 @@ class PAR90Calculator(KPICalculator):
         value = (dpd / total_receivable) * 100.0
         return value, create_context(
             self.METADATA.formula,
-            rows_processed=len(df),
+            rows_processed=aggs.rows,
             null_count=int(null_count),
             dpd_sum=float(dpd),
             total_receivable_sum=float(total_receivable),
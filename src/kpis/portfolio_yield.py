@@ -1,9 +1,11 @@
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Iterable, Tuple
 
 import pandas as pd
 
-from src.kpis.base import (KPICalculator, KPIMetadata, create_context,
-                           safe_numeric)
+from src.kpis.base import (AggregateSpec, ColumnAggregates, KPICalculator,
+                           KPIMetadata, compute_aggregates, create_context)
+
+REQUIRED_COLUMNS = ("interest_rate", "principal_balance")
 
 
 class PortfolioYieldCalculator(KPICalculator):
@@ -19,33 +21,40 @@ class PortfolioYieldCalculator(KPICalculator):
         threshold_critical=6.0,
         owner="Finance",
     )
+    AGGREGATES = AggregateSpec(
+        sums=("principal_balance",), weighted_sums=(("interest_rate", "principal_balance"),)
+    )
+
+    def supports_aggregates(self, columns: Iterable[str]) -> bool:
+        return all(col in columns for col in REQUIRED_COLUMNS)
 
     def calculate(self, df: pd.DataFrame) -> Tuple[float, Dict[str, Any]]:
-        if df is None or df.empty:
+        return self.calculate_from_aggregates(compute_aggregates(df, self.AGGREGATES), df)
+
+    def calculate_from_aggregates(
+        self, aggs: ColumnAggregates, df: pd.DataFrame = None
+    ) -> Tuple[float, Dict[str, Any]]:
+        if aggs.rows == 0:
             return 0.0, create_context(
                 self.METADATA.formula, rows_processed=0, reason="Empty DataFrame"
             )
 
-        required = ["interest_rate", "principal_balance"]
-        missing = [col for col in required if col not in df.columns]
+        missing = [col for col in REQUIRED_COLUMNS if not aggs.has(col)]
         if missing:
             raise ValueError(f"Missing required columns: {', '.join(missing)}")
 
-        interest_rate = safe_numeric(df["interest_rate"])
-        principal_balance = safe_numeric(df["principal_balance"])
-
-        total_principal = principal_balance.sum()
+        total_principal = aggs.sum("principal_balance")
         if total_principal == 0:
             return 0.0, create_context(
-                self.METADATA.formula, rows_processed=len(df), reason="Zero total principal"
+                self.METADATA.formula, rows_processed=aggs.rows, reason="Zero total principal"
             )
 
-        weighted_interest = (interest_rate * principal_balance).sum()
+        weighted_interest = aggs.weighted_sum("interest_rate", "principal_balance")
         yield_val = (weighted_interest / total_principal) * 100.0
 
         return yield_val, create_context(
             self.METADATA.formula,
-            rows_processed=len(df),
+            rows_processed=aggs.rows,
             total_principal=float(total_principal),
             weighted_interest=float(weighted_interest),
         )
@@ -0,0 +1,194 @@
+"""Resolve configured KPI functions once and serve cached callables and thresholds."""
+
+from __future__ import annotations
+
+import importlib
+import inspect
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+KPI_DEFINITIONS_PATH = Path("config/kpis/kpi_definitions.yaml")
+COMPOSITE_METRICS = {"PortfolioHealth", "HealthScore"}
+
+KPIFunction = Callable[..., Tuple[Any, Dict[str, Any]]]
+
+
+def load_kpi_definitions(path: Path = KPI_DEFINITIONS_PATH) -> Dict[str, Any]:
+    path = Path(path)
+    if path.exists():
+        try:
+            with open(path, "r") as f:
+                return yaml.safe_load(f) or {}
+        except Exception as exc:
+            logger.error("Failed to load KPI definitions: %s", exc)
+    return {}
+
+
+def import_function(dotted_path: str) -> KPIFunction:
+    module_path, func_name = dotted_path.rsplit(".", 1)
+    module = importlib.import_module(module_path)
+    return getattr(module, func_name)
+
+
+@dataclass(frozen=True)
+class RegisteredKPI:
+    """A resolved KPI: callable, origin and pre-parsed status thresholds.
+
+    ``source`` is ``"config"`` for dotted paths, ``"engine"`` for name-only
+    metrics served by the KPIEngineV2 tables and ``"registered"`` for callables
+    added at runtime. Failed resolutions keep ``func=None`` and the error.
+    """
+
+    name: str
+    func: Optional[KPIFunction]
+    path: Optional[str] = None
+    source: str = "config"
+    composite: bool = False
+    definition: Dict[str, Any] = field(default_factory=dict)
+    thresholds: Tuple[Tuple[str, float, float], ...] = ()
+    error: Optional[str] = None
+
+    def require(self) -> KPIFunction:
+        if self.func is None:
+            raise ValueError(self.error or f"KPI '{self.name}' has no function")
+        return self.func
+
+    def status(self, value: float) -> str:
+        for status, lower, upper in self.thresholds:
+            if lower <= value <= upper:
+                return status
+        return "unknown"
+
+
+def _parse_thresholds(thresholds: Mapping[str, Any]) -> Tuple[Tuple[str, float, float], ...]:
+    return tuple(
+        (status, float(bounds[0]), float(bounds[1]))
+        for status, bounds in (thresholds or {}).items()
+        if isinstance(bounds, (list, tuple)) and len(bounds) == 2
+    )
+
+
+def _check_signature(func: Callable[..., Any], arity: int) -> None:
+    try:
+        signature = inspect.signature(func)
+    except (TypeError, ValueError):
+        return  # builtins without introspectable signatures
+    try:
+        signature.bind(*([None] * arity))
+    except TypeError as exc:
+        raise TypeError(f"expected a callable taking {arity} positional argument(s): {exc}")
+
+
+class KPIFunctionRegistry:
+    """Name -> resolved KPI function, built once from pipeline and KPI definition config."""
+
+    def __init__(
+        self,
+        definitions: Optional[Dict[str, Any]] = None,
+        fallbacks: Optional[Mapping[str, KPIFunction]] = None,
+    ):
+        self.definitions = (definitions or {}).get("kpis", {}) or {}
+        self.fallbacks = dict(fallbacks or {})
+        self._entries: Dict[str, RegisteredKPI] = {}
+
+    @classmethod
+    def from_config(
+        cls,
+        metrics_cfg: Iterable[Dict[str, Any]],
+        definitions: Optional[Dict[str, Any]] = None,
+        fallbacks: Optional[Mapping[str, KPIFunction]] = None,
+        strict: bool = False,
+    ) -> "KPIFunctionRegistry":
+        """Resolve every metric in ``metrics_cfg`` plus definitions that name a function."""
+        registry = cls(definitions, fallbacks)
+        configured = set()
+        for metric_cfg in metrics_cfg:
+            if metric_cfg.get("name"):
+                registry.resolve(metric_cfg)
+                configured.add(metric_cfg["name"])
+        for name, definition in registry.definitions.items():
+            if name not in configured and (definition or {}).get("function"):
+                registry.resolve({"name": name})
+        if registry.errors:
+            if strict:
+                raise ValueError(f"Unresolved KPI functions: {registry.errors}")
+            logger.warning("Unresolved KPI functions: %s", registry.errors)
+        return registry
+
+    def resolve(self, metric_cfg: Dict[str, Any]) -> RegisteredKPI:
+        """Return the cached entry for a metric config, resolving it on first use."""
+        name = metric_cfg.get("name")
+        if not isinstance(name, str) or not name:
+            raise ValueError(f"Invalid metric name: {name}")
+        definition = self.definitions.get(name, {}) or {}
+        path = metric_cfg.get("function") or definition.get("function")
+        cached = self._entries.get(name)
+        if cached is not None and (path is None or cached.path == path):
+            return cached
+
+        composite = name in COMPOSITE_METRICS or definition.get("type") == "composite"
+        source = "config" if path else "engine"
+        func: Optional[KPIFunction] = None
+        error: Optional[str] = None
+        try:
+            if path:
+                func = import_function(path)
+            elif name in self.fallbacks:
+                func = self.fallbacks[name]
+            else:
+                error = f"KPI '{name}' not supported by engine"
+            if func is not None:
+                _check_signature(func, 2 if composite else 1)
+        except Exception as exc:
+            func, error = None, f"{type(exc).__name__}: {exc}"
+
+        entry = RegisteredKPI(
+            name=name,
+            func=func,
+            path=path,
+            source=source,
+            composite=composite,
+            definition=definition,
+            thresholds=_parse_thresholds(definition.get("thresholds", {})),
+            error=error,
+        )
+        self._entries[name] = entry
+        return entry
+
+    def register(self, name: str, func: KPIFunction, composite: bool = False) -> RegisteredKPI:
+        if not name:
+            raise ValueError("KPI name is required")
+        _check_signature(func, 2 if composite else 1)
+        definition = self.definitions.get(name, {}) or {}
+        entry = RegisteredKPI(
+            name=name,
+            func=func,
+            source="registered",
+            composite=composite,
+            definition=definition,
+            thresholds=_parse_thresholds(definition.get("thresholds", {})),
+        )
+        self._entries[name] = entry
+        return entry
+
+    def get(self, name: str) -> RegisteredKPI:
+        try:
+            return self._entries[name]
+        except KeyError as exc:
+            raise KeyError(f"Unknown KPI: {name}") from exc
+
+    def names(self) -> List[str]:
+        return sorted(name for name, entry in self._entries.items() if entry.func is not None)
+
+    @property
+    def errors(self) -> Dict[str, str]:
+        return {name: e.error for name, e in self._entries.items() if e.error}
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._entries
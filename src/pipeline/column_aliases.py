@@ -0,0 +1,164 @@
+"""Shared column alias resolution with a per-schema cached index."""
+
+from __future__ import annotations
+
+import logging
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+import yaml
+
+logger = logging.getLogger(__name__)
+
+# Resolved against this checkout, not the working directory; no .git lookup, so it
+# also works in Docker images, sdists and ``git archive`` copies
+ALIAS_CONFIG_PATH = Path(__file__).resolve().parents[2] / "config" / "column_aliases.yml"
+
+# Resolution strategies, matching the lookup rules that existed at each call site:
+#   exact            - literal column names only
+#   case_insensitive - exact, then lower-cased
+#   finder           - exact, case-insensitive, then substring (ColumnFinder)
+#   normalized       - lower-cased, punctuation-normalized token, then token substring
+MODES = ("exact", "case_insensitive", "finder", "normalized")
+
+ColumnsLike = Union[pd.DataFrame, pd.Index, Sequence[str]]
+
+
+def normalize_token(value: Any) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", str(value).lower()).strip()
+
+
+class ColumnIndex:
+    """Normalized lookup tables for one column schema.
+
+    Built once per tuple of column names; every resolved alias group is memoized,
+    so repeated lookups against frames with the same schema are O(1).
+    """
+
+    def __init__(self, columns: Tuple[str, ...]):
+        self.columns = columns
+        self.column_set = frozenset(columns)
+        self.lower = {str(col).lower(): col for col in columns}
+        self.normalized = {normalize_token(col): col for col in columns}
+        self._cache: Dict[Tuple[str, Tuple[str, ...]], Optional[str]] = {}
+
+    def resolve(self, candidates: Iterable[Any], mode: str = "finder") -> Optional[str]:
+        key = (mode, tuple(str(c) for c in candidates if c is not None))
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        if mode not in MODES:
+            raise ValueError(f"Unknown column resolution mode: {mode}")
+        resolved = getattr(self, f"_resolve_{mode}")(key[1])
+        self._cache[key] = resolved
+        return resolved
+
+    def _resolve_exact(self, candidates: Tuple[str, ...]) -> Optional[str]:
+        for candidate in candidates:
+            if candidate in self.column_set:
+                return candidate
+        return None
+
+    def _resolve_case_insensitive(self, candidates: Tuple[str, ...]) -> Optional[str]:
+        found = self._resolve_exact(candidates)
+        if found is not None:
+            return found
+        for candidate in candidates:
+            col = self.lower.get(candidate.lower())
+            if col is not None:
+                return col
+        return None
+
+    def _resolve_finder(self, candidates: Tuple[str, ...]) -> Optional[str]:
+        found = self._resolve_case_insensitive(candidates)
+        if found is not None:
+            return found
+        for candidate in candidates:
+            needle = candidate.lower()
+            for col in self.columns:
+                if needle in str(col).lower():
+                    return col
+        return None
+
+    def _resolve_normalized(self, candidates: Tuple[str, ...]) -> Optional[str]:
+        for candidate in candidates:
+            col = self.lower.get(candidate.lower())
+            if col is not None:
+                return col
+        tokens = [normalize_token(c) for c in candidates]
+        for token in tokens:
+            col = self.normalized.get(token)
+            if col is not None:
+                return col
+        for token in tokens:
+            if not token:
+                continue
+            for col_norm, col in self.normalized.items():
+                if token in col_norm:
+                    return col
+        return None
+
+
+@lru_cache(maxsize=256)
+def _index_for(columns: Tuple[str, ...]) -> ColumnIndex:
+    return ColumnIndex(columns)
+
+
+def get_column_index(columns: ColumnsLike) -> ColumnIndex:
+    """Return the cached index for a frame (or list of column names)."""
+    if isinstance(columns, pd.DataFrame):
+        columns = columns.columns
+    return _index_for(tuple(columns))
+
+
+def resolve_columns(
+    columns: ColumnsLike, candidates: Iterable[Any], mode: str = "finder"
+) -> Optional[str]:
+    """Resolve the first matching column for an alias group."""
+    return get_column_index(columns).resolve(candidates, mode=mode)
+
+
+class AliasRegistry:
+    """Canonical column name -> ordered alias list, loaded from config."""
+
+    def __init__(self, groups: Optional[Dict[str, List[str]]] = None):
+        self.groups: Dict[str, Tuple[str, ...]] = {
+            name: tuple(aliases) for name, aliases in (groups or {}).items()
+        }
+
+    @classmethod
+    def from_yaml(cls, path: Path = ALIAS_CONFIG_PATH) -> "AliasRegistry":
+        if not path.exists():
+            logger.warning("Column alias config missing: %s", path)
+            return cls()
+        try:
+            with path.open("r", encoding="utf-8") as handle:
+                payload = yaml.safe_load(handle) or {}
+        except Exception as exc:
+            logger.error("Failed to load column alias config: %s", exc)
+            return cls()
+        return cls(payload.get("aliases", {}))
+
+    def aliases(self, name: str) -> Tuple[str, ...]:
+        """Aliases for a canonical name; unknown names resolve to themselves."""
+        return self.groups.get(name, (name,))
+
+    def resolve(self, columns: ColumnsLike, name: str, mode: str = "finder") -> Optional[str]:
+        return resolve_columns(columns, self.aliases(name), mode=mode)
+
+
+@lru_cache(maxsize=1)
+def get_alias_registry() -> AliasRegistry:
+    """Process-wide registry loaded from ``config/column_aliases.yml``."""
+    return AliasRegistry.from_yaml()
+
+
+def expand_aliases(candidates: Union[str, Iterable[str]]) -> List[str]:
+    """Expand a registry group name into its aliases; lists pass through unchanged."""
+    if isinstance(candidates, str):
+        return list(get_alias_registry().aliases(candidates))
+    return list(candidates)
@@ -0,0 +1,226 @@
+"""Streaming CSV export with optional parallel gzip/zstd compression.
+
+Frames are encoded ``chunk_rows`` rows at a time, so the full CSV text is
+never held in memory. With compression, each chunk is compressed on a thread
+pool as an independent gzip member or zstd frame. Concatenated members and
+frames are a valid ``.gz``/``.zst`` stream, so the output reads back like
+any other compressed CSV (``pyarrow.csv.read_csv``, ``zcat``/``zstdcat``).
+zstd goes through pyarrow's codec, so no extra dependency is needed. Chunks
+are emitted in order, with at most ``workers`` of them in flight. The same
+byte stream can go to a local file (:meth:`StreamingCSVWriter.to_path`) or
+straight into a blob upload (:meth:`StreamingCSVWriter.iter_bytes`).
+"""
+
+from __future__ import annotations
+
+import gzip
+import logging
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Deque, Dict, Iterator, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+
+from src.pipeline.utils import write_hashed
+
+logger = logging.getLogger(__name__)
+
+SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+
+@dataclass
+class CSVExportStats:
+    """Progress and throughput of one export."""
+
+    total_rows: int
+    rows: int = 0
+    chunks: int = 0
+    raw_bytes: int = 0
+    written_bytes: int = 0
+    elapsed_seconds: float = 0.0
+    sha256: Optional[str] = None
+
+    @property
+    def progress(self) -> float:
+        return self.rows / self.total_rows if self.total_rows else 1.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        """Uncompressed CSV throughput."""
+        return self.raw_bytes / 1e6 / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def compression_ratio(self) -> float:
+        return self.raw_bytes / self.written_bytes if self.written_bytes else 1.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "chunks": self.chunks,
+            "raw_bytes": self.raw_bytes,
+            "written_bytes": self.written_bytes,
+            "elapsed_seconds": round(self.elapsed_seconds, 4),
+            "rows_per_second": round(self.rows_per_second, 1),
+            "megabytes_per_second": round(self.megabytes_per_second, 2),
+            "compression_ratio": round(self.compression_ratio, 2),
+            "sha256": self.sha256,
+        }
+
+
+def _datetime_witnesses(df: pd.DataFrame) -> Dict[int, pd.Series]:
+    """Per datetime column position, the value that decides how pandas prints the column.
+
+    pandas picks a datetime array's text format from its values: dates only when every
+    value is midnight, otherwise as many fractional digits as the finest value needs.
+    The witness is the value needing the most (``None`` when the column prints dates
+    only anyway).
+    """
+    witnesses: Dict[int, pd.Series] = {}
+    for position in range(df.shape[1]):
+        column = df.iloc[:, position]
+        if not pd.api.types.is_datetime64_any_dtype(column):
+            continue
+        nanosecond = column.dt.nanosecond.fillna(0)
+        microsecond = column.dt.microsecond.fillna(0)
+        rank = (
+            8 * (nanosecond != 0)
+            + 4 * (microsecond % 1000 != 0)
+            + 2 * (microsecond != 0)
+            + (column != column.dt.normalize())
+        ).where(column.notna(), 0)
+        if rank.max() > 0:
+            witnesses[position] = column.iloc[[int(rank.to_numpy().argmax())]]
+    return witnesses
+
+
+def _format_datetimes(part: pd.DataFrame, witnesses: Dict[int, pd.Series]) -> pd.DataFrame:
+    """Print ``part``'s datetime columns as one ``to_csv`` of the whole frame would."""
+    part = part.copy(deep=False)
+    for position, witness in witnesses.items():
+        column = part.iloc[:, position]
+        text = pd.concat([witness, column]).astype(str).iloc[1:]
+        part.isetitem(position, text.where(column.notna().to_numpy()))
+    return part
+
+
+def csv_chunks(df: pd.DataFrame, chunk_rows: int) -> Iterator[Tuple[int, bytes]]:
+    """Yield ``(row_count, utf-8 CSV bytes)`` per chunk; the header goes with the first.
+
+    Datetime columns are formatted the same way in every chunk, so the joined chunks
+    equal ``df.to_csv(index=False)``.
+    """
+    if df.empty:
+        yield 0, df.to_csv(index=False).encode("utf-8")
+        return
+    witnesses = _datetime_witnesses(df)
+    for start in range(0, len(df), chunk_rows):
+        part = df.iloc[start : start + chunk_rows]
+        if witnesses:
+            part = _format_datetimes(part, witnesses)
+        yield len(part), part.to_csv(index=False, header=start == 0).encode("utf-8")
+
+
+class StreamingCSVWriter:
+    """Chunked, optionally compressed CSV encoder for local files and blob uploads."""
+
+    def __init__(
+        self,
+        chunk_rows: int = 100_000,
+        compression: Optional[str] = None,
+        level: Optional[int] = None,
+        workers: int = 4,
+        progress: Optional[Callable[[CSVExportStats], None]] = None,
+    ):
+        if compression not in SUFFIXES:
+            raise ValueError(f"Unsupported CSV compression: {compression}")
+        self.chunk_rows = max(1, chunk_rows)
+        self.compression = compression
+        self.level = level
+        self.workers = max(1, workers)
+        self.progress = progress
+        self.stats: Optional[CSVExportStats] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], **kwargs: Any) -> "StreamingCSVWriter":
+        return cls(
+            chunk_rows=int(config.get("chunk_rows", 100_000)),
+            compression=config.get("compression"),
+            level=config.get("level"),
+            workers=int(config.get("workers", 4)),
+            **kwargs,
+        )
+
+    @property
+    def suffix(self) -> str:
+        """File suffix for the compression (``".gz"``, ``".zst"`` or ``""``)."""
+        return SUFFIXES[self.compression]
+
+    @property
+    def content_encoding(self) -> Optional[str]:
+        return self.compression
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.compression == "gzip":
+            return gzip.compress(data, compresslevel=self.level or 6, mtime=0)
+        codec = pa.Codec("zstd", compression_level=self.level)
+        return codec.compress(data, asbytes=True)
+
+    def _record(self, stats: CSVExportStats, rows: int, raw: int, written: int, started: float):
+        stats.rows += rows
+        stats.chunks += 1
+        stats.raw_bytes += raw
+        stats.written_bytes += written
+        stats.elapsed_seconds = time.perf_counter() - started
+        if self.progress is not None:
+            self.progress(stats)
+
+    def iter_bytes(self, df: pd.DataFrame) -> Iterator[bytes]:
+        """Yield the encoded CSV chunk by chunk; ``self.stats`` tracks progress."""
+        stats = self.stats = CSVExportStats(total_rows=len(df))
+        started = time.perf_counter()
+        if self.compression is None:
+            for rows, raw in csv_chunks(df, self.chunk_rows):
+                self._record(stats, rows, len(raw), len(raw), started)
+                yield raw
+            return
+
+        in_flight: Deque[Tuple[int, int, "Future[bytes]"]] = deque()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for rows, raw in csv_chunks(df, self.chunk_rows):
+                in_flight.append((rows, len(raw), pool.submit(self._compress, raw)))
+                if len(in_flight) >= self.workers:
+                    rows_done, raw_size, future = in_flight.popleft()
+                    data = future.result()
+                    self._record(stats, rows_done, raw_size, len(data), started)
+                    yield data
+            while in_flight:
+                rows_done, raw_size, future = in_flight.popleft()
+                data = future.result()
+                self._record(stats, rows_done, raw_size, len(data), started)
+                yield data
+
+    def write(self, df: pd.DataFrame, sink: BinaryIO) -> CSVExportStats:
+        for data in self.iter_bytes(df):
+            sink.write(data)
+        return self.stats
+
+    def to_path(self, df: pd.DataFrame, path: Path) -> CSVExportStats:
+        """Write ``df`` to ``path`` atomically; the stats carry the file's SHA-256."""
+        sha256 = write_hashed(Path(path), lambda handle: self.write(df, handle))
+        self.stats.sha256 = sha256
+        logger.info(
+            "Exported %s rows to %s (%.1f rows/s, ratio %.2f)",
+            self.stats.rows,
+            path,
+            self.stats.rows_per_second,
+            self.stats.compression_ratio,
+        )
+        return self.stats
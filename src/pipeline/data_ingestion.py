@@ -10,17 +10,21 @@ from dataclasses import dataclass
 from datetime import datetime, timezone
 from io import BytesIO, StringIO
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, MutableSequence, Optional, Tuple
 
 import pandas as pd
-import pandera as pa
 import polars as pl
 from jsonschema import Draft202012Validator
 from pydantic import BaseModel, ConfigDict, Field, ValidationError
 
 from src.agents.tools import send_slack_notification
 from src.analytics.schema import LoanTapeSchema
+from src.pipeline.column_aliases import get_column_index, normalize_token
 from src.pipeline.data_validation import validate_dataframe
+from src.pipeline.lineage import LineageSink
+from src.pipeline.schema_validation import SchemaValidationExecutor, SchemaValidationResult
+from src.pipeline.tiered_validation import (DEFAULT_CHECKS, TieredValidationResult,
+                                            TieredValidator, iso8601_violations)
 from src.pipeline.utils import (CircuitBreaker, RateLimiter, RetryPolicy,
                                 hash_file, utc_now)
 
@@ -45,6 +49,45 @@ class LoanRecord(BaseModel):
     measurement_date: Optional[str] = None
 
 
+JSON_SCHEMA_CHECK = "json_schema"
+LOAN_RECORD_CHECK = "loan_records"
+DATE_COLUMNS_CHECK = "date_columns"
+_ROW_SCAN_CHECKS = (JSON_SCHEMA_CHECK, LOAN_RECORD_CHECK, DATE_COLUMNS_CHECK)
+
+
+def _clean_columns(df: pd.DataFrame) -> pd.DataFrame:
+    frame = df.rename(columns=lambda c: str(c).strip().lower())
+    if "loan_id" not in frame.columns:
+        frame["loan_id"] = [f"agg_{idx}" for idx in range(len(frame))]
+    return frame
+
+
+def _loan_record_violations(df: pd.DataFrame) -> Dict[str, int]:
+    """Count rows that do not validate as a :class:`LoanRecord`."""
+    invalid = 0
+    for record in _clean_columns(df).to_dict(orient="records"):
+        try:
+            LoanRecord(**record)
+        except ValidationError:
+            invalid += 1
+    return {"row:loan_record": invalid} if invalid else {}
+
+
+def _project_loan_records(df: pd.DataFrame) -> pd.DataFrame:
+    """Vectorised ``LoanRecord(...).model_dump()`` of a frame whose rows all validate."""
+    frame = _clean_columns(df)
+    fields = LoanRecord.model_fields
+    for name, field in fields.items():
+        if name not in frame.columns:
+            if field.is_required():
+                raise ValueError(f"Missing LoanRecord field: {name}")
+            frame[name] = field.default
+        elif field.annotation is float:
+            frame[name] = frame[name].astype(float)
+    extras = [col for col in frame.columns if col not in fields]
+    return frame[list(fields) + extras].reset_index(drop=True)
+
+
 @dataclass
 class IngestionResult:
     """Container for ingestion outputs and metadata."""
@@ -72,7 +115,8 @@ class UnifiedIngestion:
         self.data_dir = Path(data_dir) if data_dir is not None else Path(".")
         self.strict_validation = strict_validation
         self.timestamp = utc_now()
-        self.audit_log: List[Dict[str, Any]] = []
+        self.audit_log: MutableSequence[Dict[str, Any]] = []
+        self.lineage_sink: Optional[LineageSink] = None
         self.errors: List[Dict[str, Any]] = []
         self.raw_files: List[Dict[str, Any]] = []
         self._summary: Dict[str, Any] = {"rows_ingested": 0, "files": {}}
@@ -80,6 +124,13 @@ class UnifiedIngestion:
         self.rate_limiter = self._build_rate_limiter(root_cfg)
         self.retry_policy = self._build_retry_policy(root_cfg)
         self.circuit_breaker = self._build_circuit_breaker(root_cfg)
+        self.tiered_validator = self._build_tiered_validator()
+        self.tiered_result: Optional[TieredValidationResult] = None
+        self.schema_executor = SchemaValidationExecutor(
+            LoanTapeSchema,
+            max_workers=self.config.get("validation", {}).get("schema_max_workers"),
+        )
+        self.schema_validation: Optional[SchemaValidationResult] = None
 
     def ingest_csv(self, filename: str) -> pd.DataFrame:
         """High-performance CSV ingestion using Polars."""
@@ -273,6 +324,25 @@ class UnifiedIngestion:
             reset_seconds=cb_cfg.get("reset_seconds", 60),
         )
 
+    def _build_tiered_validator(self) -> TieredValidator:
+        validation_cfg = self.config.get("validation", {})
+        tiered_cfg = validation_cfg.get("tiered", {})
+        channel = tiered_cfg.get("alert_channel", "#data-engineering-alerts")
+        # The row-level scans of ingest_file run in the tier's full pass as well
+        checks = {name: DEFAULT_CHECKS[name] for name in tiered_cfg.get("checks", DEFAULT_CHECKS)}
+        if self.schema_validator is not None:
+            checks[JSON_SCHEMA_CHECK] = self._json_schema_violations
+        checks[LOAN_RECORD_CHECK] = _loan_record_violations
+        date_columns = validation_cfg.get("date_columns")
+        if date_columns:
+            checks[DATE_COLUMNS_CHECK] = lambda df: iso8601_violations(df, date_columns)
+        return TieredValidator(
+            tiered_cfg,
+            run_id=self.run_id,
+            checks=checks,
+            alert=lambda msg: send_slack_notification(msg, channel=channel),
+        )
+
     def _load_schema_validator(self) -> Optional[Draft202012Validator]:
         schema_path = self.config.get("validation", {}).get("schema_path")
         if not schema_path:
@@ -284,6 +354,11 @@ class UnifiedIngestion:
         schema = json.loads(path.read_text(encoding="utf-8"))
         return Draft202012Validator(schema)
 
+    def attach_lineage_sink(self, sink: LineageSink) -> None:
+        """Stream audit events to ``sink`` and keep only a bounded tail in memory."""
+        self.lineage_sink = sink
+        self.audit_log = sink.attach("ingestion", self.audit_log)
+
     def _log_event(self, event: str, status: str, **details: Any) -> None:
         entry = {
             "run_id": self.run_id,
@@ -293,6 +368,8 @@ class UnifiedIngestion:
             **details,
         }
         self.audit_log.append(entry)
+        if self.lineage_sink is not None:
+            self.lineage_sink.record("ingestion", entry)
         logger.info("[Ingestion:%s] %s | %s", event, status, details)
 
     def _record_error(self, stage: str, error: Exception, **details: Any) -> None:
@@ -317,13 +394,90 @@ class UnifiedIngestion:
             return None
 
     def _validate_schema_pandera(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
-        """Validate dataframe using Pandera schemas."""
-        try:
-            validated_df = LoanTapeSchema.validate(df)
-            return validated_df, []
-        except pa.errors.SchemaError as exc:
-            logger.error("Pandera schema validation failed: %s", exc)
-            return df, [str(exc)]
+        """Validate dataframe using Pandera schemas.
+
+        Frames above the tiered ``min_rows`` threshold are coerced to the schema
+        dtypes and gated on a random sample; the full pass runs in the
+        background until :meth:`finish_tiered_validation` joins it.
+        """
+        if self.tiered_validator.should_sample(df):
+            df = self.schema_executor.coerce(df)
+            self.tiered_result = self.tiered_validator.validate(df)
+            self._log_event(
+                "tiered_validation",
+                "sampled",
+                sample_size=self.tiered_result.sample_size,
+                population=self.tiered_result.population,
+            )
+            return df, self.tiered_result.check_errors(exclude=_ROW_SCAN_CHECKS, sample_only=True)
+        result = self.schema_executor.validate(df)
+        self.schema_validation = result
+        self._log_event(
+            "pandera_validation",
+            "passed" if result.passed else "failed",
+            failure_cases=len(result.failure_cases),
+            elapsed_seconds=round(result.elapsed_seconds, 4),
+            slowest_checks=result.timings.nlargest(3, "seconds").to_dict("records"),
+        )
+        if result.passed:
+            return result.df, []
+        logger.error("Pandera schema validation failed: %s", "; ".join(result.errors))
+        return df, result.errors
+
+    def _validate_tiered(
+        self, df: pd.DataFrame
+    ) -> Tuple[pd.DataFrame, List[str], Dict[str, int]]:
+        """Validate a frame above the tiered threshold on its sample.
+
+        The JSON schema, LoanRecord and ISO 8601 scans run on the sample next to
+        the pandera checks, and again over every row in the tier's full pass,
+        which this does not wait for. The per-row scans only run here, to report
+        individual rows, when the sample flagged them; otherwise the LoanRecord
+        projection is built vectorised. Returns the validated frame, the errors
+        and the sample's ISO 8601 violations of the configured date columns.
+        """
+        df, errors = self._validate_schema_pandera(df)
+        violations = self.tiered_result.sample_violations
+        if JSON_SCHEMA_CHECK in violations:
+            errors = self._validate_schema(df) + errors
+        validated_df: Optional[pd.DataFrame] = None
+        if LOAN_RECORD_CHECK not in violations:
+            try:
+                validated_df = _project_loan_records(df)
+            except (TypeError, ValueError):
+                validated_df = None
+        if validated_df is None:
+            validated_df, record_errors = self._validate_records(df)
+            errors += record_errors
+        return validated_df, errors, violations.get(DATE_COLUMNS_CHECK, {})
+
+    def finish_tiered_validation(self) -> Optional[Dict[str, Any]]:
+        """Join the tiered full pass of the last ingested frame.
+
+        Writes the quality amendment and raises the late alert if the full pass
+        found violations the sample missed. Returns the updated tiered summary,
+        or ``None`` when the last frame was validated in full.
+        """
+        result = self.tiered_result
+        if result is None or not result.sampled:
+            return None
+        if not result.finished:
+            amendment = self.tiered_validator.finish(result)
+            self._log_event(
+                "tiered_validation",
+                "amended" if amendment else "completed",
+                population=result.population,
+                failed_checks=sorted(result.violations),
+            )
+        return result.summary()
+
+    def _json_schema_violations(self, df: pd.DataFrame) -> Dict[str, int]:
+        invalid = sum(
+            1
+            for record in df.to_dict(orient="records")
+            if next(self.schema_validator.iter_errors(record), None) is not None
+        )
+        return {"row:json_schema": invalid} if invalid else {}
 
     def _validate_schema(self, df: pd.DataFrame) -> List[str]:
         errors: List[str] = []
@@ -350,14 +504,29 @@ class UnifiedIngestion:
 
         return pd.DataFrame(validated_records), errors
 
-    def _validate_dataframe(self, df: pd.DataFrame) -> None:
+    def _validate_dataframe(
+        self, df: pd.DataFrame, date_violations: Optional[Dict[str, int]] = None
+    ) -> None:
+        """Check required, numeric and date columns.
+
+        ``date_violations`` are ISO 8601 violations already counted by the
+        tier's full pass, so the date columns are not scanned again.
+        """
         validation_cfg = self.config.get("validation", {})
+        date_columns = validation_cfg.get("date_columns")
         validate_dataframe(
             df,
             required_columns=validation_cfg.get("required_columns"),
             numeric_columns=validation_cfg.get("numeric_columns"),
-            date_columns=validation_cfg.get("date_columns"),
+            date_columns=date_columns if date_violations is None else None,
         )
+        if date_violations is None:
+            return
+        for col in date_columns or []:
+            if col not in df.columns:
+                raise ValueError(f"Missing required date column: {col}")
+            if f"{col}:iso8601" in date_violations:
+                raise ValueError(f"Column '{col}' must contain ISO 8601 dates")
 
     def _apply_deduplication(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
         dedup_cfg = self.config.get("deduplication", {})
@@ -371,29 +540,12 @@ class UnifiedIngestion:
         return deduped, before - len(deduped)
 
     def _normalize_token(self, value: str) -> str:
-        return re.sub(r"[^a-z0-9]+", " ", str(value).lower()).strip()
+        return normalize_token(value)
 
     def _select_column(self, columns: List[str], candidates: Iterable[str]) -> Optional[str]:
         if not candidates:
             return None
-        lower_map = {col.lower(): col for col in columns}
-        for candidate in candidates:
-            key = str(candidate).lower()
-            if key in lower_map:
-                return lower_map[key]
-        normalized_map = {self._normalize_token(col): col for col in columns}
-        for candidate in candidates:
-            norm = self._normalize_token(candidate)
-            if norm in normalized_map:
-                return normalized_map[norm]
-        for candidate in candidates:
-            norm = self._normalize_token(candidate)
-            if not norm:
-                continue
-            for col_norm, col in normalized_map.items():
-                if norm in col_norm:
-                    return col
-        return None
+        return get_column_index(columns).resolve(candidates, mode="normalized")
 
     def _match_metric(self, metric_name: str, mapping: Dict[str, List[str]]) -> Optional[str]:
         metric_norm = self._normalize_token(metric_name)
@@ -776,13 +928,17 @@ class UnifiedIngestion:
                 df = pd.read_csv(file_path)
             self._log_event("raw_read", "success", rows=len(df), checksum=checksum)
 
-            schema_errors = self._validate_schema(df)
+            date_violations: Optional[Dict[str, int]] = None
+            if self.tiered_validator.should_sample(df):
+                validated_df, errors, date_violations = self._validate_tiered(df)
+            else:
+                schema_errors = self._validate_schema(df)
 
-            # Pandera Strict Contract Validation (Engineering Excellence Mandate)
-            df, pandera_errors = self._validate_schema_pandera(df)
+                # Pandera Strict Contract Validation (Engineering Excellence Mandate)
+                df, pandera_errors = self._validate_schema_pandera(df)
 
-            validated_df, record_errors = self._validate_records(df)
-            errors = schema_errors + pandera_errors + record_errors
+                validated_df, record_errors = self._validate_records(df)
+                errors = schema_errors + pandera_errors + record_errors
 
             if errors:
                 self._log_event("validation", "completed", error_count=len(errors))
@@ -807,7 +963,7 @@ class UnifiedIngestion:
                         {"status": "halted", "error": "critical_violation"},
                     )
 
-            self._validate_dataframe(validated_df)
+            self._validate_dataframe(validated_df, date_violations)
 
             if errors and self.config.get("validation", {}).get("strict", True):
                 raise ValueError(f"Schema validation failed for {len(errors)} rows")
@@ -826,10 +982,16 @@ class UnifiedIngestion:
                 "row_count": len(validated_df),
                 "error_count": len(errors),
                 "deduped_count": deduped_count,
-                "audit_log": self.audit_log,
+                "audit_log": list(self.audit_log),
                 "archived_path": str(archived) if archived else None,
                 "validation_errors": errors,
             }
+            if self.tiered_result is not None:
+                metadata["tiered_validation"] = self.tiered_result.summary()
+            if self.schema_validation is not None:
+                metadata["schema_check_timings"] = self.schema_validation.timings.to_dict(
+                    "records"
+                )
 
             self._log_event("complete", "success", row_count=len(validated_df))
             return IngestionResult(
@@ -918,7 +1080,7 @@ class UnifiedIngestion:
                 "row_count": len(validated_df),
                 "error_count": len(errors),
                 "deduped_count": deduped_count,
-                "audit_log": self.audit_log,
+                "audit_log": list(self.audit_log),
                 "archived_path": str(archived) if archived else None,
                 "validation_errors": errors,
                 "financials": financials_meta,
@@ -989,7 +1151,7 @@ class UnifiedIngestion:
             "row_count": len(validated_df),
             "error_count": len(errors),
             "deduped_count": deduped_count,
-            "audit_log": self.audit_log,
+            "audit_log": list(self.audit_log),
             "validation_errors": errors,
         }
 
@@ -2,17 +2,20 @@ import logging
 import uuid
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, MutableSequence, Optional
 
 import numpy as np
 import pandas as pd
 import yaml
 
 from src.compliance import create_access_log_entry, mask_pii_in_dataframe
+from src.pipeline.column_aliases import get_column_index
 from src.pipeline.data_validation import (validate_iso8601_dates,
                                           validate_no_nulls,
                                           validate_numeric_bounds,
                                           validate_percentage_bounds)
+from src.pipeline.lineage import LineageSink
+from src.pipeline.outliers import OutlierReport, detect_outliers
 from src.pipeline.utils import hash_dataframe, utc_now
 
 logger = logging.getLogger(__name__)
@@ -29,6 +32,7 @@ class TransformationResult:
     masked_columns: List[str]
     access_log: List[Dict[str, Any]]
     timestamp: str
+    outlier_masks: Optional[pd.DataFrame] = None
 
 
 class UnifiedTransformation:
@@ -38,9 +42,11 @@ class UnifiedTransformation:
         root_cfg: Dict[str, Any] = config or {}
         self.config = root_cfg.get("pipeline", {}).get("phases", {}).get("transformation", {})
         self.run_id = run_id or f"tx_{uuid.uuid4().hex[:12]}"
-        self.lineage: List[Dict[str, Any]] = []
+        self.lineage: MutableSequence[Dict[str, Any]] = []
+        self.lineage_sink: Optional[LineageSink] = None
         self.transformations_count = 0
         self.pii_config = self._load_pii_config()
+        self.outlier_report: Optional[OutlierReport] = None
 
     def _load_pii_config(self) -> Dict[str, Any]:
         config_path = Path("config/pii_fields.yaml")
@@ -90,8 +96,7 @@ class UnifiedTransformation:
         return ratios
 
     def _select_column_case_insensitive(self, df: pd.DataFrame, name: str) -> Optional[str]:
-        lower_map = {str(c).lower(): str(c) for c in df.columns}
-        return lower_map.get(name.lower())
+        return get_column_index(df).resolve([name], mode="case_insensitive")
 
     def transform_to_kpi_dataset(self, df: pd.DataFrame) -> pd.DataFrame:
         if "_validation_passed" in df.columns:
@@ -187,6 +192,11 @@ class UnifiedTransformation:
         """Return full transformation lineage."""
         return list(self.lineage)
 
+    def attach_lineage_sink(self, sink: LineageSink) -> None:
+        """Stream lineage steps to ``sink`` and keep only a bounded tail in memory."""
+        self.lineage_sink = sink
+        self.lineage = sink.attach("transformation", self.lineage)
+
     def _log_step(self, step: str, status: str, **details: Any) -> None:
         entry = {
             "run_id": self.run_id,
@@ -196,6 +206,8 @@ class UnifiedTransformation:
             **details,
         }
         self.lineage.append(entry)
+        if self.lineage_sink is not None:
+            self.lineage_sink.record("transformation", entry)
         logger.info("[Transformation:%s] %s | %s", step, status, details)
 
     def _handle_nulls(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -212,27 +224,22 @@ class UnifiedTransformation:
         return updated
 
     def _detect_outliers(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Flag (and optionally winsorize in place) outliers; keeps masks on the instance."""
+        self.outlier_report = None
         outlier_cfg = self.config.get("outlier_detection", {})
         if not outlier_cfg.get("enabled", False):
             return {}
 
-        threshold = float(outlier_cfg.get("zscore_threshold", 4.0))
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        result: Dict[str, Any] = {}
-
-        for col in numeric_cols:
-            series = df[col].dropna()
-            if series.empty:
-                continue
-            mean = series.mean()
-            std = series.std()
-            if std == 0 or np.isnan(std):
-                continue
-            zscores = (series - mean) / std
-            outlier_count = int((zscores.abs() > threshold).sum())
-            if outlier_count:
-                result[col] = {"outliers": outlier_count, "threshold": threshold}
-        return result
+        self.outlier_report = detect_outliers(
+            df,
+            columns=outlier_cfg.get("columns"),
+            method=outlier_cfg.get("method", "zscore"),
+            zscore_threshold=float(outlier_cfg.get("zscore_threshold", 4.0)),
+            mad_threshold=float(outlier_cfg.get("mad_threshold", 3.5)),
+            iqr_multiplier=float(outlier_cfg.get("iqr_multiplier", 1.5)),
+            clip=bool(outlier_cfg.get("clip", False)),
+        )
+        return self.outlier_report.summary()
 
     def transform(self, df: pd.DataFrame, user: str = "system") -> TransformationResult:
         self._log_step("start", "initiated", input_rows=len(df))
@@ -290,11 +297,12 @@ class UnifiedTransformation:
             return TransformationResult(
                 df=clean_df,
                 run_id=self.run_id,
-                lineage=self.lineage,
+                lineage=list(self.lineage),
                 quality_checks=quality_checks,
                 masked_columns=masked_columns,
                 access_log=access_log,
                 timestamp=utc_now(),
+                outlier_masks=self.outlier_report.masks if self.outlier_report else None,
             )
 
         except Exception as exc:
@@ -6,6 +6,8 @@ from typing import Any, Dict, List, Optional
 
 import pandas as pd
 
+from src.pipeline.column_aliases import get_column_index
+
 REQUIRED_ANALYTICS_COLUMNS: List[str] = [
     "loan_amount",
     "appraised_value",
@@ -72,39 +74,13 @@ class ColumnFinder:
         self.columns_lower = {col.lower(): col for col in self.columns}
 
     def find(self, candidates: List[str]) -> Optional[str]:
-        """Find matching column from candidates."""
-        for col in self._exact_match(candidates):
-            return col
-        for col in self._case_insensitive_match(candidates):
-            return col
-        for col in self._substring_match(candidates):
-            return col
-        return None
-
-    def _exact_match(self, candidates: List[str]) -> List[str]:
-        """Get exact matches from candidates."""
-        return [c for c in candidates if c in self.columns]
-
-    def _case_insensitive_match(self, candidates: List[str]) -> List[str]:
-        """Get case-insensitive matches."""
-        lower_cands = [c.lower() for c in candidates]
-        return [self.columns_lower[lc] for lc in lower_cands if lc in self.columns_lower]
-
-    def _substring_match(self, candidates: List[str]) -> List[str]:
-        """Get substring matches (case-insensitive)."""
-        result = []
-        for candidate in candidates:
-            for col in self.columns:
-                if candidate.lower() in col.lower():
-                    result.append(col)
-                    break
-        return result
+        """Find matching column from candidates (cached per column schema)."""
+        return get_column_index(self.columns).resolve(candidates, mode="finder")
 
 
 def find_column(df: pd.DataFrame, candidates: List[str]) -> Optional[str]:
     """Find column in DataFrame matching one of the candidates."""
-    finder = ColumnFinder(df)
-    return finder.find(candidates)
+    return get_column_index(df).resolve(candidates, mode="finder")
 
 
 def is_missing_columns(df: pd.DataFrame, required: Optional[List[str]]) -> List[str]:
@@ -1,18 +1,29 @@
-import importlib
 import logging
 import uuid
 from dataclasses import dataclass
-from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, MutableSequence, Optional
 
 import pandas as pd
-import yaml
 
 from src.kpi_engine_v2 import KPIEngineV2
+from src.kpis.base import (AggregateSpec, ColumnAggregates, KPICalculator,
+                           aggregates_from_partials, compute_aggregates,
+                           compute_grouped_aggregates)
+from src.kpis.registry import (COMPOSITE_METRICS, KPIFunctionRegistry,
+                               load_kpi_definitions)
+from src.pipeline.kpi_cube import build_kpi_cube
+from src.pipeline.kpi_history import (KPIHistory, change_anomalies,
+                                      classify_statuses,
+                                      detect_rolling_anomalies)
+from src.pipeline.lineage import LineageSink
+from src.pipeline.partial_aggregates import (PartialAggregateStore,
+                                             verify_against_full)
 from src.pipeline.utils import utc_now
 
 logger = logging.getLogger(__name__)
 
+ROLLUP_FREQUENCIES = {"daily": "D", "weekly": "W", "monthly": "M"}
+
 
 @dataclass
 class CalculationResultV2:
@@ -24,6 +35,7 @@ class CalculationResultV2:
     timeseries: Dict[str, pd.DataFrame]
     anomalies: Dict[str, Any]
     timestamp: str
+    cube: Optional[pd.DataFrame] = None
 
 
 class UnifiedCalculationV2:
@@ -32,26 +44,23 @@ class UnifiedCalculationV2:
     def __init__(self, config: Dict[str, Any], run_id: Optional[str] = None):
         self.config = config.get("pipeline", {}).get("phases", {}).get("calculation", {})
         self.run_id = run_id or f"calc_{uuid.uuid4().hex[:12]}"
-        self.audit_log: List[Dict[str, Any]] = []
-        self.kpi_definitions = self._load_kpi_definitions()
-
-    def _load_kpi_definitions(self) -> Dict[str, Any]:
-        config_path = Path("config/kpis/kpi_definitions.yaml")
-        if config_path.exists():
-            try:
-                with open(config_path, "r") as f:
-                    return yaml.safe_load(f) or {}
-            except Exception as exc:
-                logger.error("Failed to load KPI definitions: %s", exc)
-        return {}
+        self.audit_log: MutableSequence[Dict[str, Any]] = []
+        self.lineage_sink: Optional[LineageSink] = None
+        self.kpi_definitions = load_kpi_definitions()
+        self.kpi_registry = KPIFunctionRegistry.from_config(
+            self.config.get("metrics", []),
+            self.kpi_definitions,
+            fallbacks={**KPIEngineV2.ON_DEMAND_KPI_FUNCTIONS, **KPIEngineV2.KPI_FUNCTIONS},
+        )
+        history_cfg = self.config.get("anomaly_detection", {}).get("history", {}) or {}
+        self.kpi_history: Optional[KPIHistory] = (
+            KPIHistory.from_config(history_cfg) if history_cfg.get("enabled", False) else None
+        )
 
-    def _get_status(self, value: float, thresholds: Dict[str, List[float]]) -> str:
-        if not thresholds:
-            return "unknown"
-        for status, bounds in thresholds.items():
-            if len(bounds) == 2 and bounds[0] <= value <= bounds[1]:
-                return status
-        return "unknown"
+    def attach_lineage_sink(self, sink: LineageSink) -> None:
+        """Stream audit events to ``sink`` and keep only a bounded tail in memory."""
+        self.lineage_sink = sink
+        self.audit_log = sink.attach("calculation", self.audit_log)
 
     def _log_event(self, event: str, status: str, **details: Any) -> None:
         entry = {
@@ -62,46 +71,43 @@ class UnifiedCalculationV2:
             **details,
         }
         self.audit_log.append(entry)
+        if self.lineage_sink is not None:
+            self.lineage_sink.record("calculation", entry)
         logger.info("[Calculation:%s] %s | %s", event, status, details)
 
-    def _import_function(self, dotted_path: str):
-        module_path, func_name = dotted_path.rsplit(".", 1)
-        module = importlib.import_module(module_path)
-        return getattr(module, func_name)
-
-    def _compute_metric(self, df: pd.DataFrame, metric_cfg: Dict[str, Any]) -> Dict[str, Any]:
+    def _compute_metric(
+        self,
+        df: pd.DataFrame,
+        metric_cfg: Dict[str, Any],
+        aggregates: Optional[ColumnAggregates] = None,
+    ) -> Dict[str, Any]:
         name = metric_cfg.get("name")
-        # Overlay with external definitions if available
-        ext_def = self.kpi_definitions.get("kpis", {}).get(name, {})
+        entry = self.kpi_registry.resolve(metric_cfg)
+        ext_def = entry.definition
+        calculator = (
+            self._additive_calculator(metric_cfg, aggregates.columns) if aggregates else None
+        )
 
-        func_path = metric_cfg.get("function") or ext_def.get("function")
-        if not func_path:
-            # Fallback to KPIEngineV2 direct calculation if function path is missing but name exists
+        if calculator is not None:
+            val, context = calculator.calculate_from_aggregates(aggregates, df)
+        elif entry.source == "engine":
+            # Name-only metrics are served by the KPIEngineV2 calculator tables
             try:
-                engine = KPIEngineV2(df)
-                # Map names to engine methods if needed
-                if not isinstance(name, str):
-                    raise ValueError(f"Invalid metric name: {name}")
-                val = engine.get_metric(name)
+                val, _ = entry.require()(df)
                 context = {"source": "KPIEngineV2"}
             except Exception as exc:
                 raise ValueError(
                     f"Missing function for metric {name} and engine fallback failed: {exc}"
                 )
         else:
-            func = self._import_function(func_path)
-            val, context = func(df)
+            val, context = entry.require()(df)
 
         value = float(val) if val is not None else None
-        status = (
-            self._get_status(value, ext_def.get("thresholds", {}))
-            if value is not None
-            else "unknown"
-        )
 
         return {
             "value": value,
-            "status": status,
+            # Filled in for the whole run by _assign_statuses
+            "status": "unknown",
             "display_name": ext_def.get("display_name", name),
             "formula": ext_def.get("formula") or metric_cfg.get("formula"),
             "source_table": metric_cfg.get("source_table"),
@@ -114,10 +120,9 @@ class UnifiedCalculationV2:
         self, base_metrics: Dict[str, Any], metric_cfg: Dict[str, Any]
     ) -> Dict[str, Any]:
         name = metric_cfg.get("name")
-        func_path = metric_cfg.get("function")
-        if not func_path:
+        if not metric_cfg.get("function"):
             raise ValueError(f"Missing function for composite metric {name}")
-        func = self._import_function(func_path)
+        func = self.kpi_registry.resolve(metric_cfg).require()
         par_val = base_metrics.get("PAR30", {}).get("value")
         coll_val = base_metrics.get("CollectionRate", {}).get("value")
         if par_val is None or coll_val is None:
@@ -132,78 +137,307 @@ class UnifiedCalculationV2:
             **context,
         }
 
+    def _additive_calculator(
+        self, metric_cfg: Dict[str, Any], columns: Iterable[str]
+    ) -> Optional[KPICalculator]:
+        """Return the calculator for ``metric_cfg`` if it can be evaluated from column sums."""
+        try:
+            func = self.kpi_registry.resolve(metric_cfg).func
+        except ValueError:
+            return None
+        for default, calculator_cls in KPIEngineV2.FUSED_CALCULATORS.values():
+            if func is default:
+                calculator = calculator_cls()
+                return calculator if calculator.supports_aggregates(columns) else None
+        return None
+
     def _compute_timeseries(
         self, df: pd.DataFrame, metrics_cfg: List[Dict[str, Any]]
     ) -> Dict[str, pd.DataFrame]:
+        """Compute per-period KPI values for each configured rollup.
+
+        Ratio-of-sums KPIs are evaluated for every period from one daily
+        ``groupby().sum()`` of their numerators/denominators; weekly and monthly
+        rollups resample those daily partials. Other metrics are computed per
+        period slice.
+        """
         ts_cfg = self.config.get("timeseries", {})
         if not ts_cfg.get("enabled", False):
             return {}
         time_column = ts_cfg.get("time_column")
         if not time_column or time_column not in df.columns:
             return {}
-        df = df.copy()
-        df[time_column] = pd.to_datetime(df[time_column], errors="coerce")
-        df = df.dropna(subset=[time_column])
-        rollups = ts_cfg.get("rollups", ["daily"])
-        results: Dict[str, pd.DataFrame] = {}
+        times = pd.to_datetime(df[time_column], errors="coerce")
+        valid = times.notna()
+        if not valid.all():
+            df, times = df.loc[valid], times.loc[valid]
+        rollups = [r for r in ts_cfg.get("rollups", ["daily"]) if r in ROLLUP_FREQUENCIES]
+        if df.empty:
+            return {rollup: pd.DataFrame() for rollup in rollups}
 
-        for rollup in rollups:
-            if rollup == "daily":
-                grouper = pd.Grouper(key=time_column, freq="D")
-            elif rollup == "weekly":
-                grouper = pd.Grouper(key=time_column, freq="W")
-            elif rollup == "monthly":
-                grouper = pd.Grouper(key=time_column, freq="M")
+        series_metrics = [
+            m for m in metrics_cfg if m.get("name") and m.get("name") not in COMPOSITE_METRICS
+        ]
+        additive: Dict[str, KPICalculator] = {}
+        sliced: List[Dict[str, Any]] = []
+        for metric in series_metrics:
+            calculator = self._additive_calculator(metric, df.columns)
+            if calculator is not None:
+                additive[metric["name"]] = calculator
             else:
-                continue
+                sliced.append(metric)
 
-            rows: List[Dict[str, Any]] = []
-            for period, group in df.groupby(grouper):
-                if pd.isna(period):
-                    continue
-                row = {"period_start": period}
-                for metric in metrics_cfg:
-                    name = metric.get("name")
-                    if not name or name in {"PortfolioHealth", "HealthScore"}:
+        daily_partials = None
+        if additive:
+            spec = AggregateSpec.union(c.AGGREGATES for c in additive.values())
+            daily_partials = compute_grouped_aggregates(df, spec, times.dt.floor("D"))
+            # Reindex to a continuous calendar so empty days appear as zero partials
+            daily_partials = daily_partials.resample("D").sum()
+        if sliced:
+            framed = df.assign(**{time_column: times})
+
+        results: Dict[str, pd.DataFrame] = {}
+        for rollup in rollups:
+            freq = ROLLUP_FREQUENCIES[rollup]
+            values: Dict[str, Dict[Any, Optional[float]]] = {}
+            if additive:
+                partials = daily_partials if freq == "D" else daily_partials.resample(freq).sum()
+                periods = aggregates_from_partials(partials, df.columns)
+                for name, calculator in additive.items():
+                    values[name] = self._evaluate_periods(name, calculator, periods)
+            if sliced:
+                for period, group in framed.groupby(pd.Grouper(key=time_column, freq=freq)):
+                    if pd.isna(period):
                         continue
-                    try:
-                        metric_result = self._compute_metric(group, metric)
-                        row[name] = metric_result.get("value")
-                    except Exception as exc:
-                        row[name] = None
-                        self._log_event(
-                            "timeseries_metric_failed", "error", metric=name, error=str(exc)
-                        )
-                rows.append(row)
-            results[rollup] = pd.DataFrame(rows)
+                    for metric in sliced:
+                        name = metric["name"]
+                        try:
+                            value = self._compute_metric(group, metric).get("value")
+                        except Exception as exc:
+                            value = None
+                            self._log_event(
+                                "timeseries_metric_failed", "error", metric=name, error=str(exc)
+                            )
+                        values.setdefault(name, {})[period] = value
+
+            frame = pd.DataFrame(values)
+            frame = frame[[m["name"] for m in series_metrics if m["name"] in frame.columns]]
+            frame.index.name = "period_start"
+            results[rollup] = frame.sort_index().reset_index()
         return results
 
+    def _evaluate_periods(
+        self,
+        name: str,
+        calculator: KPICalculator,
+        periods: Dict[Any, ColumnAggregates],
+    ) -> Dict[Any, Optional[float]]:
+        values: Dict[Any, Optional[float]] = {}
+        for period, aggs in periods.items():
+            try:
+                value, _ = calculator.calculate_from_aggregates(aggs, None)
+                values[period] = float(value) if value is not None else None
+            except Exception as exc:
+                values[period] = None
+                self._log_event("timeseries_metric_failed", "error", metric=name, error=str(exc))
+        return values
+
+    def _incremental_aggregates(
+        self,
+        df: pd.DataFrame,
+        metrics_cfg: List[Dict[str, Any]],
+        delta: Optional[pd.DataFrame],
+    ) -> Optional[ColumnAggregates]:
+        """Upsert the partitions in ``delta`` into the partial store and combine ``df``'s.
+
+        Without a delta the full tape is aggregated directly: any per-partition
+        change detection over the full tape (date parsing, grouping, hashing)
+        costs more than :func:`compute_aggregates` itself.
+        """
+        inc_cfg = self.config.get("incremental", {}) or {}
+        if not inc_cfg.get("enabled", False) or df.empty:
+            return None
+        if delta is None:
+            self._log_event("incremental_aggregates", "skipped", reason="no delta")
+            return None
+        store = PartialAggregateStore.from_config(inc_cfg)
+        if store.time_column not in delta.columns:
+            self._log_event(
+                "incremental_aggregates", "skipped", reason=f"missing {store.time_column}"
+            )
+            return None
+
+        calculators: Dict[str, KPICalculator] = {}
+        for metric in metrics_cfg:
+            name = metric.get("name")
+            if name and name not in COMPOSITE_METRICS:
+                calculator = self._additive_calculator(metric, df.columns)
+                if calculator is not None:
+                    calculators[name] = calculator
+        if not calculators:
+            return None
+
+        spec = AggregateSpec.union(c.AGGREGATES for c in calculators.values())
+        try:
+            upsert = store.upsert(delta, spec)
+        except ValueError as exc:
+            self._log_event("incremental_aggregates", "skipped", reason=str(exc))
+            return None
+        # Only the partitions still in the tape; the store may hold days since dropped
+        aggregates = store.combined(df.columns, partitions=store.partitions(df))
+        self._log_event("incremental_aggregates", "success", **upsert.summary())
+
+        if inc_cfg.get("verify", False):
+            report = verify_against_full(
+                df, calculators, aggregates, rtol=float(inc_cfg.get("rtol", 1e-9))
+            )
+            mismatched = [name for name, check in report.items() if not check["match"]]
+            if mismatched:
+                self._log_event(
+                    "incremental_verification",
+                    "mismatch",
+                    metrics={name: report[name] for name in mismatched},
+                )
+                return compute_aggregates(df, spec)
+            self._log_event("incremental_verification", "passed", metrics=list(report))
+        return aggregates
+
+    def _build_cube(self, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        cube_cfg = self.config.get("cube", {}) or {}
+        if not cube_cfg.get("enabled", False) or df.empty:
+            return None
+        configured = list(cube_cfg.get("dimensions", []))
+        dimensions = [d for d in configured if d in df.columns]
+        if len(dimensions) < len(configured):
+            self._log_event(
+                "kpi_cube",
+                "partial",
+                missing_dimensions=[d for d in configured if d not in df.columns],
+            )
+        if not dimensions:
+            return None
+        try:
+            cube = build_kpi_cube(df, dimensions)
+        except Exception as exc:
+            self._log_event("kpi_cube", "error", error=str(exc))
+            return None
+        self._log_event(
+            "kpi_cube", "success", dimensions=dimensions, cells=len(cube.frame), kpis=cube.kpis
+        )
+        return cube.frame
+
+    def _assign_statuses(self, metrics: Dict[str, Any]) -> None:
+        """Bucket every metric value into its threshold band in one vectorized lookup."""
+        names = [name for name, metric in metrics.items() if "status" in metric]
+        if not names:
+            return
+        values = pd.DataFrame([[metrics[name].get("value") for name in names]], columns=names)
+        thresholds = {
+            name: self.kpi_registry.get(name).thresholds
+            for name in names
+            if name in self.kpi_registry
+        }
+        statuses = classify_statuses(values, thresholds).iloc[0]
+        for name in names:
+            metrics[name]["status"] = statuses[name]
+
     def _detect_anomalies(
         self, metrics: Dict[str, Any], baseline: Optional[Dict[str, Any]]
     ) -> Dict[str, Any]:
         anomaly_cfg = self.config.get("anomaly_detection", {})
-        if not anomaly_cfg.get("enabled", False) or not baseline:
+        if not anomaly_cfg.get("enabled", False):
             return {}
         max_change = float(anomaly_cfg.get("max_change_pct", 0.2))
-        anomalies: Dict[str, Any] = {}
-        for name, metric in metrics.items():
-            current = metric.get("value")
-            prior = baseline.get(name, {}).get("value")
-            if current is None or prior in (None, 0):
-                continue
-            change_pct = abs(current - prior) / abs(prior)
-            if change_pct > max_change:
-                anomalies[name] = {
-                    "previous": prior,
-                    "current": current,
-                    "change_pct": round(change_pct, 4),
-                }
+        current = pd.Series(
+            {name: metric.get("value") for name, metric in metrics.items()}, dtype=float
+        )
+        previous = pd.Series(
+            {name: (metric or {}).get("value") for name, metric in (baseline or {}).items()},
+            dtype=float,
+        )
+        if self.kpi_history is None:
+            return change_anomalies(previous, current, max_change) if baseline else {}
+
+        history_cfg = anomaly_cfg.get("history", {}) or {}
+        past = self.kpi_history.values(
+            last_n=int(history_cfg.get("window", 20)), exclude_run=self.run_id
+        )
+        report = detect_rolling_anomalies(
+            past,
+            current,
+            window=int(history_cfg.get("window", 20)),
+            min_runs=int(history_cfg.get("min_runs", 5)),
+            zscore_threshold=float(history_cfg.get("zscore_threshold", 3.0)),
+            ewma_span=int(history_cfg.get("ewma_span", 10)),
+        )
+        anomalies: Dict[str, Any] = dict(report.anomalies)
+        if report.insufficient:
+            # Too little history for rolling statistics: compare with the last known run
+            fallback = previous if baseline else report.stats["previous"]
+            anomalies.update(
+                change_anomalies(fallback, current[report.insufficient], max_change)
+            )
         return anomalies
 
+    def _record_history(self, metrics: Dict[str, Any]) -> None:
+        if self.kpi_history is None:
+            return
+        try:
+            self.kpi_history.append(self.run_id, metrics)
+        except Exception as exc:
+            self._log_event("kpi_history", "error", error=str(exc))
+
+    def _exclude_outliers(
+        self, df: pd.DataFrame, outlier_masks: Optional[pd.DataFrame]
+    ) -> pd.DataFrame:
+        """Drop rows flagged by the transformation outlier stage, if configured."""
+        exclude_cfg = self.config.get("exclude_outliers", False)
+        if not exclude_cfg or outlier_masks is None or outlier_masks.empty:
+            return df
+        masks = outlier_masks
+        if isinstance(exclude_cfg, list):
+            masks = masks[[c for c in exclude_cfg if c in masks.columns]]
+        flagged = masks.any(axis=1).reindex(df.index, fill_value=False)
+        excluded = int(flagged.sum())
+        if excluded:
+            self._log_event("outlier_exclusion", "applied", excluded_rows=excluded)
+            return df.loc[~flagged]
+        return df
+
+    def delta_load(self, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """Rows of ``df`` in the partitions an incremental run has to re-aggregate.
+
+        ``None`` unless ``incremental.enabled``; see :meth:`PartialAggregateStore.delta`.
+        """
+        inc_cfg = self.config.get("incremental", {}) or {}
+        if not inc_cfg.get("enabled", False) or df.empty:
+            return None
+        store = PartialAggregateStore.from_config(inc_cfg)
+        if store.time_column not in df.columns:
+            return None
+        delta = store.delta(df, lookback_days=int(inc_cfg.get("lookback_days", 1)))
+        self._log_event("delta_load", "derived", rows=len(delta), total_rows=len(df))
+        return delta
+
     def calculate(
-        self, df: pd.DataFrame, baseline_metrics: Optional[Dict[str, Any]] = None
+        self,
+        df: pd.DataFrame,
+        baseline_metrics: Optional[Dict[str, Any]] = None,
+        outlier_masks: Optional[pd.DataFrame] = None,
+        delta: Optional[pd.DataFrame] = None,
     ) -> CalculationResultV2:
+        """Compute the configured KPIs over ``df``.
+
+        ``delta`` holds the rows of the partitions that changed since the last
+        run (a delta load, see :meth:`delta_load`). With ``incremental.enabled``
+        those partitions are upserted into the partial aggregate store and the
+        additive KPIs are combined from the stored partials of ``df``'s days.
+        Outliers are excluded from ``delta`` as from ``df``.
+        """
         self._log_event("start", "initiated", rows=len(df))
+        df = self._exclude_outliers(df, outlier_masks)
+        if delta is not None:
+            delta = self._exclude_outliers(delta, outlier_masks)
 
         metrics_cfg = list(self.config.get("metrics", []))
         metrics: Dict[str, Any] = {}
@@ -215,12 +449,13 @@ class UnifiedCalculationV2:
         if not metrics_cfg:
             metrics = kpi_engine.calculate_all(include_composite=True)
         else:
+            aggregates = self._incremental_aggregates(df, metrics_cfg, delta)
             for metric_cfg in metrics_cfg:
                 name = metric_cfg.get("name")
                 if name in {"PortfolioHealth", "HealthScore"}:
                     continue
                 try:
-                    metrics[name] = self._compute_metric(df, metric_cfg)
+                    metrics[name] = self._compute_metric(df, metric_cfg, aggregates)
                     self._log_event("metric_computed", "success", metric=name)
                 except Exception as exc:
                     self._log_event("metric_failed", "error", metric=name, error=str(exc))
@@ -240,8 +475,11 @@ class UnifiedCalculationV2:
             kpi_engine.calculate_all(include_composite=True)
         audit_trail = kpi_engine.get_audit_trail().to_dict(orient="records")
 
+        self._assign_statuses(metrics)
         timeseries = self._compute_timeseries(df, metrics_cfg)
         anomalies = self._detect_anomalies(metrics, baseline_metrics)
+        self._record_history(metrics)
+        cube = self._build_cube(df)
 
         self._log_event(
             "complete",
@@ -258,4 +496,5 @@ class UnifiedCalculationV2:
             timeseries=timeseries,
             anomalies=anomalies,
             timestamp=utc_now(),
+            cube=cube,
         )
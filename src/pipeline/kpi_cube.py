@@ -0,0 +1,176 @@
+"""Segmented KPI cube: every additive KPI across all dimension combinations.
+
+The raw frame is scanned once, grouped by the full dimension set. Every
+coarser grouping set (CUBE semantics by default) is summed from the smallest
+already-computed finer set, so no rollup rescans the loan tape.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from itertools import combinations
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from src.kpi_engine_v2 import KPIEngineV2
+from src.kpis.base import (AggregateSpec, KPICalculator,
+                           aggregates_from_partials, compute_grouped_aggregates)
+from src.pipeline.utils import ensure_dir
+
+logger = logging.getLogger(__name__)
+
+# Dimension value for cells that are rolled up over that dimension
+ALL = "__all__"
+GROUPING_ID = "grouping_id"
+
+
+def default_calculators() -> Dict[str, KPICalculator]:
+    return {name: cls() for name, (_, cls) in KPIEngineV2.FUSED_CALCULATORS.items()}
+
+
+def cube_grouping_sets(dimensions: Sequence[str]) -> List[Tuple[str, ...]]:
+    """All subsets of ``dimensions`` (SQL ``CUBE``), finest first."""
+    return [
+        combo
+        for size in range(len(dimensions), -1, -1)
+        for combo in combinations(dimensions, size)
+    ]
+
+
+def rollup_grouping_sets(dimensions: Sequence[str]) -> List[Tuple[str, ...]]:
+    """Hierarchical prefixes of ``dimensions`` (SQL ``ROLLUP``), finest first."""
+    return [tuple(dimensions[:size]) for size in range(len(dimensions), -1, -1)]
+
+
+@dataclass
+class KPICube:
+    """Tidy cube: one row per (grouping set, dimension values) cell, one column per KPI."""
+
+    dimensions: List[str]
+    kpis: List[str]
+    frame: pd.DataFrame
+
+    def slice(self, **filters: Any) -> pd.DataFrame:
+        """Cells grouped by exactly the filtered dimensions, e.g. ``slice(product_type="A")``.
+
+        Pass ``None`` as a value to get every member of that dimension.
+        """
+        unknown = set(filters) - set(self.dimensions)
+        if unknown:
+            raise KeyError(f"Unknown cube dimensions: {sorted(unknown)}")
+        mask = pd.Series(True, index=self.frame.index)
+        for dim in self.dimensions:
+            if dim not in filters:
+                mask &= self.frame[dim] == ALL
+            elif filters[dim] is None:
+                mask &= self.frame[dim] != ALL
+            else:
+                mask &= self.frame[dim] == str(filters[dim])
+        return self.frame.loc[mask]
+
+    def to_parquet(self, path: Path) -> Path:
+        path = Path(path)
+        ensure_dir(path.parent)
+        self.frame.to_parquet(path, index=False)
+        return path
+
+
+def read_kpi_cube(path: Path, dimensions: Sequence[str]) -> KPICube:
+    frame = pd.read_parquet(path)
+    skip = {*dimensions, GROUPING_ID, "rows"}
+    return KPICube(list(dimensions), [c for c in frame.columns if c not in skip], frame)
+
+
+def build_kpi_cube(
+    df: pd.DataFrame,
+    dimensions: Sequence[str],
+    calculators: Optional[Mapping[str, KPICalculator]] = None,
+    grouping_sets: Optional[Sequence[Sequence[str]]] = None,
+) -> KPICube:
+    """Compute every KPI for every grouping set of ``dimensions`` from one scan of ``df``.
+
+    Only calculators that can be evaluated from aggregates on ``df`` are
+    included. Dimension values are stored as strings; rolled-up dimensions
+    hold :data:`ALL` and ``grouping_id`` has bit ``i`` set when
+    ``dimensions[i]`` is rolled up (as in SQL ``GROUPING_ID``).
+    """
+    dimensions = list(dimensions)
+    missing = [d for d in dimensions if d not in df.columns]
+    if missing:
+        raise KeyError(f"Cube dimensions not in frame: {missing}")
+    calculators = {
+        name: calc
+        for name, calc in (calculators or default_calculators()).items()
+        if calc.supports_aggregates(df.columns)
+    }
+    sets = [tuple(s) for s in (grouping_sets or cube_grouping_sets(dimensions))]
+    spec = AggregateSpec.union(c.AGGREGATES for c in calculators.values())
+
+    finest = tuple(dimensions)
+    computed: Dict[FrozenSet[str], pd.DataFrame] = {
+        frozenset(finest): compute_grouped_aggregates(
+            df, spec, [df[d] for d in dimensions], dropna=False
+        )
+    }
+    frames: List[pd.DataFrame] = []
+    for grouping in sorted(sets, key=len, reverse=True):
+        partials = _partials_for(grouping, computed)
+        frames.append(_evaluate(partials, grouping, dimensions, calculators, df.columns))
+
+    frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    logger.info(
+        "Built KPI cube: %s cells, %s grouping sets, %s KPIs",
+        len(frame),
+        len(sets),
+        len(calculators),
+    )
+    return KPICube(dimensions, list(calculators), frame)
+
+
+def _partials_for(
+    grouping: Tuple[str, ...], computed: Dict[FrozenSet[str], pd.DataFrame]
+) -> pd.DataFrame:
+    key = frozenset(grouping)
+    if key in computed:
+        return computed[key]
+    # Roll up from the smallest computed superset
+    parent_key = min((k for k in computed if key < k), key=lambda k: len(computed[k]))
+    parent = computed[parent_key]
+    if grouping:
+        partials = parent.groupby(level=list(grouping), dropna=False).sum()
+    else:
+        partials = parent.sum().to_frame().T
+    computed[key] = partials
+    return partials
+
+
+def _evaluate(
+    partials: pd.DataFrame,
+    grouping: Tuple[str, ...],
+    dimensions: List[str],
+    calculators: Mapping[str, KPICalculator],
+    columns: Any,
+) -> pd.DataFrame:
+    cells = aggregates_from_partials(partials, columns)
+    grouping_id = sum(1 << i for i, dim in enumerate(dimensions) if dim not in grouping)
+    rows: List[Dict[str, Any]] = []
+    for key, aggs in cells.items():
+        values = key if isinstance(key, tuple) else (key,)
+        members = dict(zip(grouping, values)) if grouping else {}
+        row: Dict[str, Any] = {
+            dim: _label(members[dim]) if dim in members else ALL for dim in dimensions
+        }
+        row[GROUPING_ID] = grouping_id
+        row["rows"] = aggs.rows
+        for name, calculator in calculators.items():
+            value, _ = calculator.calculate_from_aggregates(aggs, None)
+            row[name] = float(value) if value is not None else None
+        rows.append(row)
+    return pd.DataFrame(rows, columns=[*dimensions, GROUPING_ID, "rows", *calculators])
+
+
+def _label(value: Any) -> Optional[str]:
+    return None if pd.isna(value) else str(value)
@@ -0,0 +1,219 @@
+"""Columnar KPI result history with vectorized status bucketing and rolling anomaly checks."""
+
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.utils import ensure_dir, utc_now
+
+logger = logging.getLogger(__name__)
+
+HISTORY_COLUMNS = ["run_id", "timestamp", "metric", "value", "status"]
+
+Bands = Sequence[Tuple[str, float, float]]
+
+
+def classify_statuses(values: pd.DataFrame, thresholds: Mapping[str, Bands]) -> pd.DataFrame:
+    """Bucket every cell of a runs x metrics frame into its first matching threshold band.
+
+    Bands for all metrics are packed into one padded ``metrics x bands`` array
+    and compared against the whole frame at once; cells with no matching band
+    (or no thresholds) are ``"unknown"``.
+    """
+    metrics = list(values.columns)
+    width = max((len(thresholds.get(m) or ()) for m in metrics), default=0)
+    if not metrics or width == 0:
+        return pd.DataFrame("unknown", index=values.index, columns=metrics, dtype=object)
+
+    lower = np.full((len(metrics), width), np.inf)
+    upper = np.full((len(metrics), width), -np.inf)
+    labels = np.full((len(metrics), width), "unknown", dtype=object)
+    for i, metric in enumerate(metrics):
+        for j, (status, lo, hi) in enumerate(thresholds.get(metric) or ()):
+            lower[i, j], upper[i, j], labels[i, j] = lo, hi, status
+
+    data = values.to_numpy(dtype=float, na_value=np.nan)[:, :, None]
+    with np.errstate(invalid="ignore"):
+        hits = (data >= lower) & (data <= upper)
+    first = hits.argmax(axis=2)
+    matched = hits.any(axis=2)
+    picked = labels[np.arange(len(metrics))[None, :], first]
+    return pd.DataFrame(
+        np.where(matched, picked, "unknown"), index=values.index, columns=metrics, dtype=object
+    )
+
+
+def change_anomalies(
+    previous: pd.Series, current: pd.Series, max_change_pct: float
+) -> Dict[str, Dict[str, Any]]:
+    """Relative change vs. a single prior value (the pre-history baseline rule)."""
+    prior = previous.reindex(current.index).astype(float)
+    now = current.astype(float)
+    valid = now.notna() & prior.notna() & (prior != 0)
+    change = ((now - prior).abs() / prior.abs()).where(valid)
+    flagged = change[change > max_change_pct]
+    return {
+        name: {
+            "previous": float(prior[name]),
+            "current": float(now[name]),
+            "change_pct": round(float(pct), 4),
+        }
+        for name, pct in flagged.items()
+    }
+
+
+@dataclass
+class RollingAnomalyReport:
+    """Rolling statistics per metric and the metrics flagged against them."""
+
+    stats: pd.DataFrame
+    anomalies: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    insufficient: List[str] = field(default_factory=list)
+
+
+def detect_rolling_anomalies(
+    history: pd.DataFrame,
+    current: pd.Series,
+    window: int = 20,
+    min_runs: int = 5,
+    zscore_threshold: float = 3.0,
+    ewma_span: int = 10,
+) -> RollingAnomalyReport:
+    """Score ``current`` against the last ``window`` runs of ``history`` (runs x metrics).
+
+    Rolling mean/std and EWMA mean/std for every metric come from one pass over
+    the history frame. A metric is flagged when either z-score exceeds the
+    threshold; metrics with fewer than ``min_runs`` prior values are reported
+    as ``insufficient`` so callers can fall back to a simpler rule.
+    """
+    current = current.astype(float)
+    recent = history.reindex(columns=current.index).tail(window).astype(float)
+    runs = recent.count()
+    mean = recent.mean()
+    std = recent.std(ddof=1)
+    if len(recent):
+        ewm = recent.ewm(span=ewma_span, ignore_na=True)
+        ewma = ewm.mean().iloc[-1]
+        ewma_std = ewm.std().iloc[-1]
+        last = recent.ffill().iloc[-1]
+    else:
+        ewma = ewma_std = last = pd.Series(np.nan, index=current.index)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        zscore = (current - mean) / std.where(std > 0)
+        ewma_z = (current - ewma) / ewma_std.where(ewma_std > 0)
+    stats = pd.DataFrame(
+        {
+            "current": current,
+            "previous": last,
+            "runs": runs,
+            "mean": mean,
+            "std": std,
+            "zscore": zscore,
+            "ewma": ewma,
+            "ewma_zscore": ewma_z,
+        }
+    )
+    enough = (runs >= min_runs) & current.notna()
+    flagged = enough & (
+        (zscore.abs() > zscore_threshold) | (ewma_z.abs() > zscore_threshold)
+    )
+
+    anomalies: Dict[str, Dict[str, Any]] = {}
+    for name, row in stats[flagged].iterrows():
+        anomalies[name] = {
+            "previous": _rounded(row["previous"]),
+            "current": float(row["current"]),
+            "mean": _rounded(row["mean"]),
+            "zscore": _rounded(row["zscore"]),
+            "ewma": _rounded(row["ewma"]),
+            "ewma_zscore": _rounded(row["ewma_zscore"]),
+            "runs": int(row["runs"]),
+            "method": "rolling_zscore",
+        }
+    insufficient = [name for name in current.index if not enough[name]]
+    return RollingAnomalyReport(stats=stats, anomalies=anomalies, insufficient=insufficient)
+
+
+def _rounded(value: Any) -> Optional[float]:
+    return None if pd.isna(value) else round(float(value), 4)
+
+
+class KPIHistory:
+    """Append-only Parquet table of (run, metric) results, read back as runs x metrics."""
+
+    def __init__(self, path: Path, max_runs: int = 1000):
+        self.path = Path(path)
+        self.max_runs = max(1, int(max_runs))
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "KPIHistory":
+        return cls(
+            Path(config.get("path", "data/metrics/kpi_history.parquet")),
+            max_runs=config.get("max_runs", 1000),
+        )
+
+    def load(self) -> pd.DataFrame:
+        if not self.path.exists():
+            return pd.DataFrame(columns=HISTORY_COLUMNS)
+        try:
+            return pd.read_parquet(self.path)
+        except Exception as exc:
+            logger.error("Failed to read KPI history %s: %s", self.path, exc)
+            return pd.DataFrame(columns=HISTORY_COLUMNS)
+
+    def values(
+        self, last_n: Optional[int] = None, exclude_run: Optional[str] = None
+    ) -> pd.DataFrame:
+        """Wide history: one row per run (oldest first), one column per metric."""
+        long = self.load()
+        if exclude_run is not None:
+            long = long[long["run_id"] != exclude_run]
+        if long.empty:
+            return pd.DataFrame()
+        wide = long.pivot_table(
+            index=["timestamp", "run_id"], columns="metric", values="value", aggfunc="last"
+        ).sort_index()
+        wide.index = wide.index.get_level_values("run_id")
+        wide.columns.name = None
+        return wide.tail(last_n) if last_n else wide
+
+    def append(
+        self,
+        run_id: str,
+        metrics: Mapping[str, Mapping[str, Any]],
+        timestamp: Optional[str] = None,
+    ) -> None:
+        """Record one run's metric values and statuses, replacing any earlier rows for it."""
+        timestamp = timestamp or utc_now()
+        rows = pd.DataFrame(
+            [
+                {
+                    "run_id": run_id,
+                    "timestamp": timestamp,
+                    "metric": name,
+                    "value": metric.get("value"),
+                    "status": metric.get("status"),
+                }
+                for name, metric in metrics.items()
+            ],
+            columns=HISTORY_COLUMNS,
+        ).astype({"value": float})
+        long = self.load()
+        long = long[long["run_id"] != run_id]
+        combined = pd.concat([long, rows], ignore_index=True) if not long.empty else rows
+        runs = combined.drop_duplicates("run_id").sort_values("timestamp")["run_id"]
+        if len(runs) > self.max_runs:
+            combined = combined[combined["run_id"].isin(runs.tail(self.max_runs))]
+
+        ensure_dir(self.path.parent)
+        tmp_path = self.path.with_suffix(".tmp")
+        combined.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
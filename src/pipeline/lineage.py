@@ -0,0 +1,211 @@
+"""Append-only per-run lineage log with batched writes and a bounded in-memory tail."""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from collections import Counter, deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.pipeline.utils import ensure_dir
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("jsonl", "parquet")
+
+# Fixed Parquet layout; stage-specific fields are kept as a JSON document.
+PARQUET_SCHEMA = pa.schema(
+    [
+        ("run_id", pa.string()),
+        ("stage", pa.string()),
+        ("event", pa.string()),
+        ("status", pa.string()),
+        ("timestamp", pa.string()),
+        ("details", pa.string()),
+    ]
+)
+_CORE_FIELDS = {"run_id", "stage", "event", "step", "status", "timestamp"}
+
+
+class LineageSink:
+    """Buffer lineage/audit events and flush them in batches to one file per run.
+
+    Only the most recent ``ring_size`` events are kept in memory (for manifest
+    summaries); the full history lives in ``<run_dir>/<run_id>_lineage.<format>``.
+    A Parquet file is only readable once its footer is written, so querying an
+    open Parquet sink closes the current file and later batches go to numbered
+    segments (``<run_id>_lineage.1.parquet``, ...) that :func:`read_lineage`
+    reads along with it.
+    """
+
+    def __init__(
+        self,
+        run_dir: Path,
+        run_id: str,
+        fmt: str = "jsonl",
+        batch_size: int = 200,
+        ring_size: int = 500,
+    ):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported lineage format: {fmt}")
+        self.run_id = run_id
+        self.format = fmt
+        self.batch_size = max(1, int(batch_size))
+        self.ring_size = max(1, int(ring_size))
+        self.path = ensure_dir(Path(run_dir)) / f"{run_id}_lineage.{fmt}"
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=self.ring_size)
+        self.counts: Counter = Counter()
+        self._buffer: List[Dict[str, Any]] = []
+        self._writer: Optional[pq.ParquetWriter] = None
+        self._segment = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], run_dir: Path, run_id: str) -> "LineageSink":
+        sink_cfg = config.get("sink", {}) or {}
+        return cls(
+            run_dir,
+            run_id,
+            fmt=sink_cfg.get("format", "jsonl"),
+            batch_size=sink_cfg.get("batch_size", 200),
+            ring_size=sink_cfg.get("ring_size", 500),
+        )
+
+    def attach(self, stage: str, existing: Iterable[Dict[str, Any]]) -> Deque[Dict[str, Any]]:
+        """Replay a component's earlier events and return its bounded replacement log."""
+        entries = list(existing)
+        for entry in entries:
+            self.record(stage, entry)
+        return deque(entries, maxlen=self.ring_size)
+
+    def record(self, stage: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            if self._closed:
+                logger.debug("Lineage sink closed; dropping %s event", stage)
+                return
+            event = {"stage": stage, **entry}
+            self.recent.append(event)
+            self.counts[stage] += 1
+            self._buffer.append(event)
+            if len(self._buffer) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        if self.format == "jsonl":
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.writelines(
+                    json.dumps(event, default=str, separators=(",", ":")) + "\n"
+                    for event in batch
+                )
+            return
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(
+                _segment_path(self.path, self._segment), PARQUET_SCHEMA, compression="zstd"
+            )
+        self._writer.write_table(pa.Table.from_pylist([_to_row(e) for e in batch], PARQUET_SCHEMA))
+
+    def _close_segment_locked(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._segment += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._close_segment_locked()
+            self._closed = True
+
+    def summary(self) -> Dict[str, Any]:
+        """Small manifest payload: log location, per-stage counts and the recent tail."""
+        return {
+            "path": str(self.path),
+            "format": self.format,
+            "total_events": sum(self.counts.values()),
+            "events_by_stage": dict(self.counts),
+            "recent": list(self.recent),
+        }
+
+    def query(self, stage: Optional[str] = None, event: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Read every recorded event back, optionally filtered by stage and event name."""
+        with self._lock:
+            self._flush_locked()
+            self._close_segment_locked()
+            return read_lineage(self.path, stage=stage, event=event)
+
+
+def _segment_path(path: Path, segment: int) -> Path:
+    return path if segment == 0 else path.with_name(f"{path.stem}.{segment}{path.suffix}")
+
+
+def _segments(path: Path) -> List[Path]:
+    """``path`` followed by its numbered Parquet segments, in write order."""
+    numbered = [
+        p
+        for p in path.parent.glob(f"{path.stem}.*{path.suffix}")
+        if p.stem.rsplit(".", 1)[-1].isdigit()
+    ]
+    numbered.sort(key=lambda p: int(p.stem.rsplit(".", 1)[-1]))
+    return [p for p in [path, *numbered] if p.exists()]
+
+
+def read_lineage(
+    path: Path, stage: Optional[str] = None, event: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Load events from a lineage log written by :class:`LineageSink`."""
+    path = Path(path)
+    if not path.exists():
+        return []
+    if path.suffix == ".parquet":
+        filters = [("stage", "=", stage)] if stage else None
+        rows = [
+            row
+            for segment in _segments(path)
+            for row in pq.read_table(segment, filters=filters).to_pylist()
+        ]
+        events = [{**json.loads(row.pop("details") or "{}"), **row} for row in rows]
+        return _filter(events, None, event)
+    events = []
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                events.append(json.loads(line))
+    return _filter(events, stage, event)
+
+
+def _filter(
+    events: List[Dict[str, Any]], stage: Optional[str], event: Optional[str]
+) -> List[Dict[str, Any]]:
+    return [
+        e
+        for e in events
+        if (stage is None or e.get("stage") == stage)
+        and (event is None or (e.get("event") or e.get("step")) == event)
+    ]
+
+
+def _to_row(entry: Dict[str, Any]) -> Dict[str, Any]:
+    details = {k: v for k, v in entry.items() if k not in _CORE_FIELDS}
+    return {
+        "run_id": entry.get("run_id"),
+        "stage": entry.get("stage"),
+        "event": entry.get("event") or entry.get("step"),
+        "status": entry.get("status"),
+        "timestamp": entry.get("timestamp"),
+        "details": json.dumps(details, default=str),
+    }
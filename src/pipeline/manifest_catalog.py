@@ -0,0 +1,214 @@
+"""Append-only catalog of run manifests.
+
+Writers (``UnifiedOutput.persist`` and the ``abaco-pipeline run`` CLI) append
+one JSON line per manifest to ``<manifest root>/catalog.jsonl`` with a single
+``O_APPEND`` write, so a line is either fully present or absent. Readers keep
+in-process indexes by run id, by day and by kind; they are refreshed only
+when the index's version stamp (inode, size, mtime) changes, and only the
+bytes appended since the last refresh are parsed. Lookups of the latest
+run, a run id or a day are then dictionary hits instead of a directory glob.
+
+Manifests written before the catalog existed are merged in once per root by
+:meth:`ManifestCatalog.backfill`, which appends the missing entries and
+leaves a marker file behind.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.pipeline.manifests import Manifest, read_manifest
+from src.pipeline.utils import ensure_dir, json_loads
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FILE = "catalog.jsonl"
+BACKFILL_MARKER = ".catalog_backfilled"
+LEGACY_MANIFEST_GLOB = "*/**/*_manifest.json"
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    run_id: str
+    generated_at: str
+    manifest_path: str
+    kind: str = "pipeline"
+
+    @property
+    def date(self) -> str:
+        return self.generated_at[:10]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "date": self.date}
+
+
+class ManifestCatalog:
+    """Index of the manifests under ``root`` with cached latest/run-id/date lookups."""
+
+    def __init__(self, root: Path, manifest_cache_size: int = 64):
+        self.root = Path(root)
+        self.path = self.root / CATALOG_FILE
+        self.marker_path = self.root / BACKFILL_MARKER
+        self.manifest_cache_size = manifest_cache_size
+        self._lock = threading.Lock()
+        self._backfilled = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        self._offset = 0
+        self._by_run: Dict[str, CatalogEntry] = {}
+        self._by_date: Dict[str, Dict[str, CatalogEntry]] = {}
+        self._latest: Dict[str, CatalogEntry] = {}
+        self._manifests: "OrderedDict[CatalogEntry, Manifest]" = OrderedDict()
+
+    # -- writes -----------------------------------------------------------------
+
+    def append(
+        self, run_id: str, generated_at: str, manifest_path: Path, kind: str = "pipeline"
+    ) -> CatalogEntry:
+        """Record a manifest written under ``root``; later entries for a run id win."""
+        path = Path(manifest_path)
+        try:
+            stored = path.resolve().relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            stored = str(path.resolve())
+        entry = CatalogEntry(run_id, generated_at, stored, kind)
+        self._append_lines([entry])
+        return entry
+
+    def _append_lines(self, entries: List[CatalogEntry]) -> None:
+        ensure_dir(self.root)
+        data = "".join(json.dumps(asdict(entry), sort_keys=True) + "\n" for entry in entries)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data.encode("utf-8"))
+        finally:
+            os.close(fd)
+
+    def backfill(self) -> int:
+        """Merge ``*_manifest.json`` files the index lacks into it, once per root.
+
+        Covers runs written before the catalog existed, even after writers have
+        started appending to it. Missing entries are appended (oldest first), so
+        concurrent appends are never lost; a marker file records that the merge
+        ran. Returns the number of entries added.
+        """
+        if self._backfilled or self.marker_path.exists():
+            self._backfilled = True
+            return 0
+        self.refresh()
+        with self._lock:
+            known = {entry.manifest_path for entry in self._by_run.values()}
+        manifests = sorted(
+            self.root.glob(LEGACY_MANIFEST_GLOB), key=lambda p: p.stat().st_mtime
+        )
+        entries: List[CatalogEntry] = []
+        for manifest_path in manifests:
+            stored = manifest_path.relative_to(self.root).as_posix()
+            if stored in known:
+                continue
+            try:
+                payload = json_loads(manifest_path.read_bytes())
+                entries.append(
+                    CatalogEntry(
+                        str(payload["run_id"]), str(payload.get("generated_at") or ""), stored
+                    )
+                )
+            except Exception as exc:
+                logger.warning("Skipping unreadable manifest %s: %s", manifest_path, exc)
+        if entries:
+            self._append_lines(entries)
+        self.marker_path.write_text(f"{len(entries)}\n", encoding="utf-8")
+        self._backfilled = True
+        logger.info("Backfilled manifest catalog %s with %s runs", self.path, len(entries))
+        return len(entries)
+
+    # -- reads ------------------------------------------------------------------
+
+    @property
+    def version(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def refresh(self) -> None:
+        """Bring the in-process indexes up to date with the index file."""
+        with self._lock:
+            stamp = self.version
+            if stamp == self._stamp:
+                return
+            if stamp is None or self._stamp is None or stamp[0] != self._stamp[0]:
+                self._reset()
+            elif stamp[1] < self._offset:
+                self._reset()  # truncated or rewritten in place
+            if stamp is None:
+                return
+            with self.path.open("rb") as handle:
+                handle.seek(self._offset)
+                data = handle.read()
+            # A trailing line without its newline is still being written
+            complete = data[: data.rfind(b"\n") + 1]
+            for raw in complete.splitlines():
+                self._index(raw)
+            self._offset += len(complete)
+            self._stamp = stamp
+
+    def _index(self, raw: bytes) -> None:
+        try:
+            entry = CatalogEntry(**json.loads(raw))
+        except (TypeError, ValueError) as exc:
+            logger.warning("Skipping malformed catalog line in %s: %s", self.path, exc)
+            return
+        previous = self._by_run.pop(entry.run_id, None)
+        if previous is not None:
+            self._by_date.get(previous.date, {}).pop(entry.run_id, None)
+        self._by_run[entry.run_id] = entry
+        self._by_date.setdefault(entry.date, {})[entry.run_id] = entry
+        # Backfilled entries are appended after newer runs, so rank by timestamp
+        latest = self._latest.get(entry.kind)
+        if (
+            latest is None
+            or latest.run_id == entry.run_id
+            or entry.generated_at >= latest.generated_at
+        ):
+            self._latest[entry.kind] = entry
+
+    def latest(self, kind: str = "pipeline") -> Optional[CatalogEntry]:
+        self.refresh()
+        return self._latest.get(kind)
+
+    def get(self, run_id: str) -> Optional[CatalogEntry]:
+        self.refresh()
+        return self._by_run.get(run_id)
+
+    def on_date(self, day: str) -> List[CatalogEntry]:
+        """Entries generated on ``day`` (``YYYY-MM-DD``), oldest first."""
+        self.refresh()
+        return sorted(self._by_date.get(day, {}).values(), key=lambda e: e.generated_at)
+
+    def load_manifest(self, entry: CatalogEntry) -> Manifest:
+        """Manifest of ``entry`` (header parsed, body lazy), cached per catalog entry."""
+        with self._lock:
+            cached = self._manifests.get(entry)
+            if cached is not None:
+                self._manifests.move_to_end(entry)
+                return cached
+        manifest = read_manifest(self.root / entry.manifest_path)
+        with self._lock:
+            self._manifests[entry] = manifest
+            while len(self._manifests) > self.manifest_cache_size:
+                self._manifests.popitem(last=False)
+        return manifest
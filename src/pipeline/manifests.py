@@ -0,0 +1,128 @@
+"""Run manifests split into a small JSON header and a lazily read body.
+
+Bulky sections (by default the run ``metadata``: ingestion details, lineage,
+the calculation audit trail, anomalies, ...) are written one after another to
+``<run>_manifest.body``, and the header records the byte range of each
+section. Readers get the header (run id, metrics, quality checks, file hashes)
+from one small file and load a body section only when it is accessed.
+Manifests written before the split are plain JSON and are read through the
+same :class:`Manifest` interface.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from src.pipeline.utils import json_dumps, json_loads, write_hashed
+
+MANIFEST_FORMAT = "abaco.manifest/2"
+BODY_SUFFIX = ".body"
+BODY_KEYS = ("metadata",)
+_INDEX_KEYS = ("manifest_format", "body")
+
+
+def body_path(path: Path) -> Path:
+    return Path(path).with_suffix(BODY_SUFFIX)
+
+
+def _split(manifest: Mapping[str, Any], body_keys: Sequence[str]) -> List[Tuple[str, Any]]:
+    """Body sections as ``(name, value)``; dict sections are split one level (``metadata.x``)."""
+    sections: List[Tuple[str, Any]] = []
+    for key in body_keys:
+        value = manifest[key]
+        if isinstance(value, Mapping):
+            sections.extend((f"{key}.{sub}", item) for sub, item in value.items())
+        else:
+            sections.append((key, value))
+    return sections
+
+
+def write_manifest(
+    path: Path, manifest: Mapping[str, Any], body_keys: Sequence[str] = BODY_KEYS
+) -> Dict[str, str]:
+    """Write ``manifest`` as header + body; returns the SHA-256 of both files."""
+    path = Path(path)
+    keys = [key for key in body_keys if key in manifest]
+    chunks: List[bytes] = []
+    ranges: Dict[str, List[int]] = {}
+    offset = 0
+    for name, value in _split(manifest, keys):
+        chunk = json_dumps(value)
+        ranges[name] = [offset, len(chunk)]
+        chunks.append(chunk)
+        offset += len(chunk)
+
+    body = body_path(path)
+    body_hash = write_hashed(body, lambda handle: handle.writelines(chunks))
+    header = {key: value for key, value in manifest.items() if key not in keys}
+    header["manifest_format"] = MANIFEST_FORMAT
+    header["body"] = {"file": body.name, "sha256": body_hash, "keys": keys, "sections": ranges}
+    payload = json_dumps(header, indent=True)
+    return {
+        "manifest": write_hashed(path, lambda handle: handle.write(payload)),
+        "body": body_hash,
+    }
+
+
+class Manifest(Mapping[str, Any]):
+    """Read-only view of a manifest that loads body sections on first access."""
+
+    def __init__(self, path: Path, header: Dict[str, Any]):
+        self.path = Path(path)
+        self.header = header
+        split = header.get("manifest_format") == MANIFEST_FORMAT
+        self._body: Optional[Dict[str, Any]] = header["body"] if split else None
+        self._sections: Dict[str, Any] = {}
+
+    @property
+    def sections(self) -> List[str]:
+        return list(self._body["sections"]) if self._body else []
+
+    def section(self, name: str) -> Any:
+        """One body section (e.g. ``metadata.calculation_audit``), read from its byte range."""
+        if name not in self._sections:
+            if not self._body or name not in self._body["sections"]:
+                raise KeyError(name)
+            offset, length = self._body["sections"][name]
+            with (self.path.parent / self._body["file"]).open("rb") as handle:
+                handle.seek(offset)
+                self._sections[name] = json_loads(handle.read(length))
+        return self._sections[name]
+
+    def __getitem__(self, key: str) -> Any:
+        if self._body is None:
+            return self.header[key]
+        if key in self._body["keys"]:
+            if key in self._body["sections"]:
+                return self.section(key)
+            prefix = f"{key}."
+            return {
+                name[len(prefix) :]: self.section(name)
+                for name in self._body["sections"]
+                if name.startswith(prefix)
+            }
+        if key in _INDEX_KEYS:
+            raise KeyError(key)
+        return self.header[key]
+
+    def __iter__(self) -> Iterator[str]:
+        if self._body is None:
+            return iter(self.header)
+        header_keys = [key for key in self.header if key not in _INDEX_KEYS]
+        return iter(header_keys + list(self._body["keys"]))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The full manifest, loading every body section."""
+        return {key: self[key] for key in self}
+
+
+def read_manifest(path: Path) -> Manifest:
+    """Read a manifest header (split or legacy plain JSON); body sections load lazily."""
+    header = json_loads(Path(path).read_bytes())
+    if not isinstance(header, dict):
+        raise ValueError(f"Manifest {path} is not an object (type={type(header).__name__})")
+    return Manifest(Path(path), header)
@@ -1,4 +1,3 @@
-import json
 import logging
 import os
 from datetime import datetime, timezone
@@ -13,7 +12,11 @@ from src.config.paths import Paths
 from src.pipeline.data_ingestion import UnifiedIngestion
 from src.pipeline.data_transformation import UnifiedTransformation
 from src.pipeline.kpi_calculation import UnifiedCalculationV2
-from src.pipeline.output import UnifiedOutput
+from src.pipeline.lineage import LineageSink
+from src.pipeline.manifests import read_manifest
+from src.pipeline.output import PersistContext, UnifiedOutput
+from src.pipeline.persist_queue import PersistHandle, PersistQueue
+from src.pipeline.run_store import open_run_store
 from src.pipeline.utils import (ensure_dir, load_yaml, resolve_placeholders,
                                 utc_now, write_json)
 from src.tracing_setup import get_tracer
@@ -119,6 +122,10 @@ class UnifiedPipeline:
         self.transformer = UnifiedTransformation(self.config.config, run_id=self.run_id)
         self.calculator = UnifiedCalculationV2(self.config.config, run_id=self.run_id)
         self.output = UnifiedOutput(self.config.config, run_id=self.run_id)
+        self.persist_queue: Optional[PersistQueue] = None
+        if (self.output.config.get("write_behind", {}) or {}).get("enabled", False):
+            self.persist_queue = PersistQueue.from_config(self.config.config)
+        self.pending_output: Optional[PersistHandle] = None
 
     def _generate_run_id(self, source_hash: Optional[str]) -> str:
         strategy = self.config.get("run", "id_strategy", default="timestamp")
@@ -132,6 +139,22 @@ class UnifiedPipeline:
     def _load_previous_metrics(
         self, artifacts_dir: Path, current_run_id: str
     ) -> Optional[Dict[str, Any]]:
+        if self.persist_queue is not None:
+            queued = self.persist_queue.latest_pending_metrics(exclude_run=current_run_id)
+            if queued is not None:
+                return queued
+        store_cfg = self.output.config.get("run_store", {})
+        if store_cfg.get("enabled"):
+            path = store_cfg.get("path")
+            store = open_run_store(Path(path) if path else None)
+            try:
+                previous = store.latest_run(exclude_run=current_run_id) if store else None
+            except Exception as exc:
+                logger.warning("Run store unavailable, falling back to manifests: %s", exc)
+                previous = None
+            if previous:
+                return previous["metrics"]
+        # Runs persisted before the run store existed only have manifests
         if not artifacts_dir.exists():
             return None
         manifests = sorted(
@@ -141,8 +164,7 @@ class UnifiedPipeline:
             if current_run_id in manifest_path.as_posix():
                 continue
             try:
-                payload = json.loads(manifest_path.read_text(encoding="utf-8"))
-                return payload.get("metrics")
+                return read_manifest(manifest_path).get("metrics")
             except Exception:
                 continue
         return None
@@ -193,6 +215,10 @@ class UnifiedPipeline:
             span.set_attribute("pipeline.user", user)
             span.set_attribute("pipeline.action", action)
             span.set_attribute("pipeline.source", ingest_source)
+            lineage_cfg = self.config.get("observability", "lineage", default={}) or {}
+            lineage_sink: Optional[LineageSink] = None
+            if self.persist_queue is not None:
+                self.persist_queue.recover()
             try:
                 with tracer.start_as_current_span("pipeline.ingestion"):
                     if ingest_source == "cascade_http":
@@ -237,6 +263,13 @@ class UnifiedPipeline:
                 self.calculator.run_id = self.run_id
                 self.output.run_id = self.run_id
 
+                if lineage_cfg.get("enabled", False):
+                    lineage_sink = LineageSink.from_config(lineage_cfg, run_dir, self.run_id)
+                    self.ingestor.attach_lineage_sink(lineage_sink)
+                    self.transformer.attach_lineage_sink(lineage_sink)
+                    self.calculator.attach_lineage_sink(lineage_sink)
+                    ingestion_result.metadata["audit_log"] = list(self.ingestor.audit_log)
+
                 with tracer.start_as_current_span("pipeline.transformation") as transformation_span:
                     transformation_result = self.transformer.transform(
                         ingestion_result.df, user=user
@@ -253,7 +286,10 @@ class UnifiedPipeline:
 
                 with tracer.start_as_current_span("pipeline.calculation") as calculation_span:
                     calculation_result = self.calculator.calculate(
-                        transformation_result.df, baseline_metrics
+                        transformation_result.df,
+                        baseline_metrics,
+                        outlier_masks=transformation_result.outlier_masks,
+                        delta=self.calculator.delta_load(transformation_result.df),
                     )
                     calculation_span.set_attribute(
                         "calculation.metric_count", len(calculation_result.metrics)
@@ -278,27 +314,59 @@ class UnifiedPipeline:
                     compliance_path = run_dir / f"{self.run_id}_compliance.json"
                     write_compliance_report(compliance_report, compliance_path)
 
+                # The tiered full pass ran alongside transformation and calculation;
+                # its amendment and late alert are raised before the run is persisted
+                tiered_summary = self.ingestor.finish_tiered_validation()
+                if tiered_summary is not None:
+                    ingestion_result.metadata["tiered_validation"] = tiered_summary
+
                 with tracer.start_as_current_span("pipeline.output"):
-                    output_result = self.output.persist(
-                        transformation_result.df,
-                        calculation_result.metrics,
-                        metadata={
-                            "ingestion": ingestion_result.metadata,
-                            "lineage": transformation_result.lineage,
-                            "calculation_audit": calculation_result.audit_trail,
-                            "anomalies": calculation_result.anomalies,
-                            "context": {"user": user, "action": action},
-                        },
-                        run_ids={
-                            "pipeline": self.run_id,
-                            "ingestion": ingestion_result.run_id,
-                            "transformation": transformation_result.run_id,
-                            "calculation": calculation_result.run_id,
-                        },
+                    metadata = {
+                        "ingestion": ingestion_result.metadata,
+                        "lineage": transformation_result.lineage,
+                        "calculation_audit": calculation_result.audit_trail,
+                        "anomalies": calculation_result.anomalies,
+                        "context": {"user": user, "action": action},
+                        "lineage_log": lineage_sink.summary() if lineage_sink else None,
+                    }
+                    run_ids = {
+                        "pipeline": self.run_id,
+                        "ingestion": ingestion_result.run_id,
+                        "transformation": transformation_result.run_id,
+                        "calculation": calculation_result.run_id,
+                    }
+                    persist_context = PersistContext(
                         quality_checks=transformation_result.quality_checks,
                         compliance_report_path=compliance_path,
                         timeseries=calculation_result.timeseries,
+                        cube=calculation_result.cube,
                     )
+                    if self.persist_queue is not None:
+                        # Outputs are written in the background; callers can wait on
+                        # self.pending_output
+                        self.pending_output = self.persist_queue.submit(
+                            transformation_result.df,
+                            calculation_result.metrics,
+                            metadata,
+                            run_ids,
+                            context=persist_context,
+                        )
+                        output_summary = {
+                            "status": "queued",
+                            "manifest": str(self.output.manifest_path(self.run_id)),
+                        }
+                    else:
+                        output_result = self.output.persist(
+                            transformation_result.df,
+                            calculation_result.metrics,
+                            metadata,
+                            run_ids,
+                            context=persist_context,
+                        )
+                        output_summary = {
+                            "manifest": str(output_result.manifest_path),
+                            "outputs": output_result.output_paths,
+                        }
 
                 summary = {
                     "status": "success",
@@ -320,10 +388,7 @@ class UnifiedPipeline:
                             "metrics": list(calculation_result.metrics.keys()),
                             "anomalies": calculation_result.anomalies,
                         },
-                        "output": {
-                            "manifest": str(output_result.manifest_path),
-                            "outputs": output_result.output_paths,
-                        },
+                        "output": output_summary,
                     },
                 }
 
@@ -340,6 +405,9 @@ class UnifiedPipeline:
                     "started_at": run_started,
                     "completed_at": utc_now(),
                 }
+            finally:
+                if lineage_sink is not None:
+                    lineage_sink.close()
 
     def run(self, input_file: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         context = context or {}
@@ -0,0 +1,139 @@
+"""Vectorized outlier detection (z-score, MAD, IQR) with optional winsorizing."""
+
+from __future__ import annotations
+
+import logging
+import warnings
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+METHODS = ("zscore", "mad", "iqr")
+
+# Scales MAD to a consistent estimator of the standard deviation for normal data.
+MAD_SCALE = 0.6745
+
+
+@dataclass
+class OutlierReport:
+    """Per-column statistics, rule bounds and outlier masks from one detection pass."""
+
+    method: str
+    stats: pd.DataFrame
+    masks: pd.DataFrame
+    counts: pd.DataFrame
+    clipped: List[str]
+
+    def row_mask(self, columns: Optional[Iterable[str]] = None) -> pd.Series:
+        """True for rows flagged as outliers in any of ``columns`` (default: all)."""
+        masks = self.masks
+        if columns is not None:
+            masks = masks[[c for c in columns if c in masks.columns]]
+        return masks.any(axis=1)
+
+    def summary(self) -> Dict[str, Any]:
+        """Compact lineage payload: only columns with outliers under the active rule."""
+        result: Dict[str, Any] = {}
+        for col, row in self.counts.iterrows():
+            if row[self.method] == 0:
+                continue
+            result[col] = {
+                "outliers": int(row[self.method]),
+                "method": self.method,
+                "lower": float(self.stats.at[col, "lower"]),
+                "upper": float(self.stats.at[col, "upper"]),
+                "by_method": {m: int(row[m]) for m in METHODS},
+                "clipped": col in self.clipped,
+            }
+        return result
+
+
+def detect_outliers(
+    df: pd.DataFrame,
+    columns: Optional[Sequence[str]] = None,
+    method: str = "zscore",
+    zscore_threshold: float = 4.0,
+    mad_threshold: float = 3.5,
+    iqr_multiplier: float = 1.5,
+    clip: bool = False,
+) -> OutlierReport:
+    """Flag outliers in all numeric columns at once.
+
+    Location/scale statistics for every column come from a single aggregate over
+    the numeric block; masks for the three rules are computed with broadcasting.
+    With ``clip=True`` the columns flagged under ``method`` are winsorized to the
+    rule bounds directly on ``df``.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown outlier method: {method}")
+    if columns is None:
+        columns = list(df.select_dtypes(include=[np.number]).columns)
+    else:
+        columns = [c for c in columns if c in df.columns]
+
+    values = df[columns].to_numpy(dtype=float, na_value=np.nan)
+    if values.size:
+        # All-null columns yield NaN statistics; silence numpy's warnings for them.
+        with np.errstate(all="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            mean = np.nanmean(values, axis=0)
+            std = np.nanstd(values, axis=0, ddof=1)
+            q1, median, q3 = np.nanpercentile(values, [25, 50, 75], axis=0)
+            mad = np.nanmedian(np.abs(values - median), axis=0)
+    else:
+        mean = std = q1 = median = q3 = mad = np.full(len(columns), np.nan)
+
+    iqr = q3 - q1
+    bounds = {
+        "zscore": (mean - zscore_threshold * std, mean + zscore_threshold * std),
+        "mad": (
+            median - mad_threshold * mad / MAD_SCALE,
+            median + mad_threshold * mad / MAD_SCALE,
+        ),
+        "iqr": (q1 - iqr_multiplier * iqr, q3 + iqr_multiplier * iqr),
+    }
+    # A degenerate scale (constant or all-null column) never flags anything.
+    scale = {"zscore": std, "mad": mad, "iqr": iqr}
+
+    method_masks: Dict[str, np.ndarray] = {}
+    with np.errstate(invalid="ignore"):
+        for name, (lower, upper) in bounds.items():
+            valid = np.isfinite(scale[name]) & (scale[name] > 0)
+            method_masks[name] = ((values < lower) | (values > upper)) & valid
+
+    lower, upper = bounds[method]
+    stats = pd.DataFrame(
+        {
+            "mean": mean,
+            "std": std,
+            "median": median,
+            "mad": mad,
+            "q1": q1,
+            "q3": q3,
+            "iqr": iqr,
+            "lower": lower,
+            "upper": upper,
+        },
+        index=pd.Index(columns, name="column"),
+    )
+    counts = pd.DataFrame(
+        {name: mask.sum(axis=0) for name, mask in method_masks.items()},
+        index=stats.index,
+    )
+    masks = pd.DataFrame(method_masks[method], index=df.index, columns=columns)
+
+    clipped: List[str] = []
+    if clip:
+        for pos, col in enumerate(columns):
+            if counts.at[col, method]:
+                df[col] = df[col].clip(lower=lower[pos], upper=upper[pos])
+                clipped.append(col)
+        if clipped:
+            logger.info("Winsorized %s columns to %s bounds: %s", len(clipped), method, clipped)
+
+    return OutlierReport(method=method, stats=stats, masks=masks, counts=counts, clipped=clipped)
+
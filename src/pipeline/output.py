@@ -7,7 +7,12 @@ from typing import Any, Dict, List, Optional
 import pandas as pd
 
 from src.config.paths import Paths
-from src.pipeline.utils import ensure_dir, hash_file, utc_now, write_json
+from src.pipeline.csv_stream import StreamingCSVWriter
+from src.pipeline.manifest_catalog import ManifestCatalog
+from src.pipeline.manifests import body_path, write_manifest
+from src.pipeline.parquet_dataset import PartitionedParquetDataset
+from src.pipeline.run_store import RunStore
+from src.pipeline.utils import ensure_dir, json_dumps, utc_now, write_hashed
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +31,11 @@ class PersistContext:
     quality_checks: Optional[Dict[str, Any]] = None
     compliance_report_path: Optional[Path] = None
     timeseries: Optional[Dict[str, pd.DataFrame]] = None
+    cube: Optional[pd.DataFrame] = None
+
+
+def master_run_id_of(run_ids: Dict[str, str]) -> str:
+    return run_ids.get("pipeline", run_ids.get("ingest", "unknown"))
 
 
 class UnifiedOutput:
@@ -48,23 +58,25 @@ class UnifiedOutput:
         self.audit_log.append(entry)
         logger.info("[Output:%s] %s | %s", event, status, details)
 
-    def _guess_content_type(self, path: Path) -> str:
-        mapping = {
-            ".csv": "text/csv",
-            ".json": "application/json",
-            ".parquet": "application/octet-stream",
-        }
-        return mapping.get(path.suffix.lower(), "application/octet-stream")
-
-    def upload_to_azure(self, file_paths: List[Path], run_id: str) -> Dict[str, str]:
+    def upload_to_azure(
+        self,
+        file_paths: List[Path],
+        run_id: str,
+        file_hashes: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, str]:
+        """Upload ``file_paths`` under ``<prefix>/<run_id>``, skipping unchanged blobs.
+
+        ``file_hashes`` maps local paths to SHA-256 digests already computed by
+        :meth:`persist`; blobs whose stored digest matches are not re-uploaded.
+        Stored digests come from one listing of the run prefix, so a new run
+        costs no lookups per file and a retried run skips what already landed.
+        """
         if not self.azure_config.get("enabled"):
             return {}
 
         import os
-        from concurrent.futures import ThreadPoolExecutor
 
-        from azure.core.exceptions import ResourceExistsError
-        from azure.storage.blob import BlobServiceClient, ContentSettings
+        from src.integrations.azure_outputs import BlobUploader
 
         connection_string = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
         if not connection_string:
@@ -72,39 +84,59 @@ class UnifiedOutput:
             return {}
 
         container_name = self.azure_config.get("container", "pipeline-runs")
-        blob_service_client = BlobServiceClient.from_connection_string(connection_string)
-        container_client = blob_service_client.get_container_client(container_name)
-
-        try:
-            container_client.create_container()
-        except ResourceExistsError:
-            pass
+        uploader = BlobUploader.from_connection_string(
+            connection_string,
+            container_name,
+            max_concurrency=int(self.azure_config.get("max_concurrency", 4)),
+            block_concurrency=int(self.azure_config.get("block_concurrency", 4)),
+        )
 
         prefix = f"{self.azure_config.get('prefix', 'analytics')}/{run_id}"
-        uploaded: Dict[str, str] = {}
-
-        def _upload_single_file(path: Path):
-            if not path.exists():
-                return None
-            blob_name = f"{prefix}/{path.name}"
-            with path.open("rb") as data:
-                container_client.upload_blob(
-                    name=blob_name,
-                    data=data,
-                    overwrite=True,
-                    content_settings=ContentSettings(content_type=self._guess_content_type(path)),
-                )
-            return path.name, f"{container_name}/{blob_name}"
+        file_hashes = file_hashes or {}
+        files = {f"{prefix}/{Path(path).name}": Path(path) for path in file_paths}
+        hashes = {
+            blob_name: file_hashes[str(path)]
+            for blob_name, path in files.items()
+            if str(path) in file_hashes
+        }
+        result = uploader.upload(files, hashes, prefix=f"{prefix}/")
 
-        with ThreadPoolExecutor(max_workers=min(len(file_paths), 10)) as executor:
-            results = list(executor.map(_upload_single_file, file_paths))
+        uploaded = {
+            blob_name.rsplit("/", 1)[-1]: f"{container_name}/{blob_name}"
+            for blob_name in result.blobs
+        }
+        self._log_event(
+            "azure_upload",
+            "success" if not result.failed else "partial",
+            uploaded_count=len(result.uploaded),
+            skipped_count=len(result.skipped),
+            failed=sorted(result.failed),
+        )
+        return uploaded
 
-        for res in results:
-            if res:
-                uploaded[res[0]] = res[1]
+    def manifest_dir(self) -> Path:
+        storage_cfg = self.config.get("storage", {})
+        return Path(storage_cfg.get("manifest_dir", str(Paths.runs_artifacts_dir())))
 
-        self._log_event("azure_upload", "success", uploaded_count=len(uploaded))
-        return uploaded
+    def manifest_path(self, run_id: str) -> Path:
+        """Where ``persist`` writes the manifest of ``run_id``."""
+        return self.manifest_dir() / run_id / f"{run_id}_manifest.json"
+
+    def _record_run(
+        self,
+        store_cfg: Dict[str, Any],
+        manifest: Dict[str, Any],
+        manifest_path: Path,
+        timeseries: Optional[Dict[str, pd.DataFrame]],
+    ) -> None:
+        """Add the run to the DuckDB run store; the files above stay the source of truth."""
+        try:
+            store = RunStore.from_config(store_cfg)
+            store.record_run(manifest, timeseries, manifest_path=manifest_path)
+        except Exception as exc:
+            self._log_event("run_store", "failed", error=str(exc))
+            return
+        self._log_event("run_store", "success", path=str(store.path))
 
     def persist(
         self,
@@ -121,53 +153,71 @@ class UnifiedOutput:
         quality_checks = kwargs.get("quality_checks")
         compliance_report_path = kwargs.get("compliance_report_path")
         timeseries = kwargs.get("timeseries")
+        cube = kwargs.get("cube")
 
         if context:
             quality_checks = quality_checks or context.quality_checks
             compliance_report_path = compliance_report_path or context.compliance_report_path
             timeseries = timeseries or context.timeseries
+            cube = cube if cube is not None else context.cube
 
         storage_cfg = self.config.get("storage", {})
         base_dir = ensure_dir(Path(storage_cfg.get("local_dir", str(Paths.metrics_dir()))))
-        manifest_dir = ensure_dir(
-            Path(storage_cfg.get("manifest_dir", str(Paths.runs_artifacts_dir())))
-        )
+        manifest_dir = ensure_dir(self.manifest_dir())
 
-        master_run_id = run_ids.get("pipeline", run_ids.get("ingest", "unknown"))
+        master_run_id = master_run_id_of(run_ids)
+        csv_writer = StreamingCSVWriter.from_config(self.config.get("csv", {}))
         parquet_path = base_dir / f"{master_run_id}.parquet"
-        csv_path = base_dir / f"{master_run_id}.csv"
+        csv_path = base_dir / f"{master_run_id}.csv{csv_writer.suffix}"
         metrics_path = base_dir / f"{master_run_id}_metrics.json"
-        manifest_path = manifest_dir / master_run_id / f"{master_run_id}_manifest.json"
+        manifest_path = self.manifest_path(master_run_id)
 
+        # Hashes are taken from the bytes as they are written, not by reading files back
         output_paths: Dict[str, str] = {}
+        file_hashes: Dict[str, str] = {}
         formats = set(self.config.get("formats", ["parquet", "csv", "json"]))
         if "parquet" in formats:
-            df.to_parquet(parquet_path, index=False)
+            file_hashes["parquet"] = write_hashed(
+                parquet_path, lambda handle: df.to_parquet(handle, index=False)
+            )
             output_paths["parquet"] = str(parquet_path)
+        csv_export: Optional[Dict[str, Any]] = None
         if "csv" in formats:
-            df.to_csv(csv_path, index=False)
+            stats = csv_writer.to_path(df, csv_path)
+            file_hashes["csv"] = stats.sha256
             output_paths["csv"] = str(csv_path)
+            csv_export = {"compression": csv_writer.compression, **stats.to_dict()}
+            self._log_event("csv_export", "success", **csv_export)
         if "json" in formats:
-            write_json(metrics_path, metrics)
+            payload = json_dumps(metrics, indent=True)
+            file_hashes["metrics_json"] = write_hashed(metrics_path, lambda h: h.write(payload))
             output_paths["metrics_json"] = str(metrics_path)
 
+        dataset: Optional[Dict[str, Any]] = None
+        dataset_cfg = self.config.get("dataset", {})
+        if dataset_cfg.get("enabled"):
+            appended = PartitionedParquetDataset.from_config(dataset_cfg).append(
+                df, master_run_id
+            )
+            dataset = appended.to_manifest()
+            file_hashes["dataset"] = appended.digest
+
         timeseries_paths: Dict[str, str] = {}
         if timeseries:
             ts_dir = ensure_dir(base_dir / "timeseries")
             for rollup, frame in timeseries.items():
                 ts_path = ts_dir / f"{master_run_id}_{rollup}.parquet"
-                frame.to_parquet(ts_path, index=False)
+                file_hashes[f"timeseries_{rollup}"] = write_hashed(
+                    ts_path, lambda handle, frame=frame: frame.to_parquet(handle, index=False)
+                )
                 timeseries_paths[rollup] = str(ts_path)
 
-        file_hashes: Dict[str, str] = {}
-        for key, path_str in output_paths.items():
-            path_obj = Path(path_str)
-            if path_obj.exists():
-                file_hashes[key] = hash_file(path_obj)
-        for key, path_str in timeseries_paths.items():
-            path_obj = Path(path_str)
-            if path_obj.exists():
-                file_hashes[f"timeseries_{key}"] = hash_file(path_obj)
+        cube_path: Optional[Path] = None
+        if cube is not None and not cube.empty:
+            cube_path = ensure_dir(base_dir / "cube") / f"{master_run_id}_kpi_cube.parquet"
+            file_hashes["kpi_cube"] = write_hashed(
+                cube_path, lambda handle: cube.to_parquet(handle, index=False)
+            )
 
         manifest = {
             "run_id": master_run_id,
@@ -178,18 +228,37 @@ class UnifiedOutput:
             "quality_checks": quality_checks or {},
             "files": output_paths,
             "timeseries": timeseries_paths,
+            "kpi_cube": str(cube_path) if cube_path else None,
+            "dataset": dataset,
+            "csv_export": csv_export,
             "compliance_report": str(compliance_report_path) if compliance_report_path else None,
             "file_hashes": file_hashes,
         }
 
-        write_json(manifest_path, manifest)
+        manifest_hashes = write_manifest(manifest_path, manifest)
 
+        manifest_body = body_path(manifest_path)
+        upload_hashes = {output_paths[key]: file_hashes[key] for key in output_paths}
+        upload_hashes[str(manifest_body)] = manifest_hashes["body"]
         azure_blobs = self.upload_to_azure(
-            [parquet_path, csv_path, metrics_path, manifest_path], master_run_id
+            [parquet_path, csv_path, metrics_path, manifest_path, manifest_body],
+            master_run_id,
+            file_hashes=upload_hashes,
         )
         if azure_blobs:
             manifest["azure_blobs"] = azure_blobs
-            write_json(manifest_path, manifest)
+            write_manifest(manifest_path, manifest)
+
+        try:
+            ManifestCatalog(manifest_dir).append(
+                master_run_id, manifest["generated_at"], manifest_path
+            )
+        except OSError as exc:
+            self._log_event("manifest_catalog", "failed", error=str(exc))
+
+        run_store_cfg = self.config.get("run_store", {})
+        if run_store_cfg.get("enabled"):
+            self._record_run(run_store_cfg, manifest, manifest_path, timeseries)
 
         self._log_event("complete", "success", manifest=str(manifest_path))
 
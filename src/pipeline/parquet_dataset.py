@@ -0,0 +1,189 @@
+"""Hive-partitioned Parquet dataset of pipeline outputs.
+
+Each run appends its rows under ``measurement_date=<day>/run_id=<run>/``
+instead of writing another monolithic ``{run_id}.parquet``. Files are zstd
+compressed, string columns are dictionary encoded and row groups are sized
+for column statistics to be useful, so readers going through
+:meth:`PartitionedParquetDataset.read` get partition pruning and predicate
+pushdown. Every file is hashed while it is written.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import shutil
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.pipeline.utils import write_hashed
+
+logger = logging.getLogger(__name__)
+
+PARTITION_COLUMNS = ("measurement_date", "run_id")
+UNDATED = "undated"
+PART_FILE = "part-0.parquet"
+
+
+def _dictionary_columns(schema: pa.Schema) -> List[str]:
+    """Low-cardinality friendly columns worth dictionary encoding (strings, flags)."""
+    return [
+        f.name
+        for f in schema
+        if pa.types.is_string(f.type)
+        or pa.types.is_large_string(f.type)
+        or pa.types.is_dictionary(f.type)
+        or pa.types.is_boolean(f.type)
+    ]
+
+
+@dataclass
+class DatasetWriteResult:
+    """Files (relative to the dataset root) written by one append, with their SHA-256."""
+
+    root: Path
+    rows: int = 0
+    files: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def partitions(self) -> List[str]:
+        return sorted(str(Path(name).parent) for name in self.files)
+
+    @property
+    def digest(self) -> str:
+        """Combined hash of the appended files (order independent)."""
+        hasher = hashlib.sha256()
+        for name in sorted(self.files):
+            hasher.update(f"{name}:{self.files[name]}\n".encode("utf-8"))
+        return hasher.hexdigest()
+
+    def to_manifest(self) -> Dict[str, Any]:
+        return {
+            "root": str(self.root),
+            "rows": self.rows,
+            "partitions": self.partitions,
+            "files": self.files,
+            "digest": self.digest,
+        }
+
+
+class PartitionedParquetDataset:
+    """Append-only ``measurement_date``/``run_id`` partitioned Parquet dataset."""
+
+    def __init__(
+        self,
+        root: Path,
+        date_column: str = "measurement_date",
+        row_group_size: int = 128_000,
+        compression: str = "zstd",
+        compression_level: Optional[int] = None,
+        sort_by: Sequence[str] = (),
+    ):
+        self.root = Path(root)
+        self.date_column = date_column
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.compression_level = compression_level
+        self.sort_by = list(sort_by)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "PartitionedParquetDataset":
+        return cls(
+            Path(config.get("dir", "data/metrics/dataset")),
+            date_column=config.get("date_column", "measurement_date"),
+            row_group_size=int(config.get("row_group_size", 128_000)),
+            compression=config.get("compression", "zstd"),
+            compression_level=config.get("compression_level"),
+            sort_by=config.get("sort_by", []),
+        )
+
+    @property
+    def partitioning(self) -> ds.Partitioning:
+        schema = pa.schema([(name, pa.string()) for name in PARTITION_COLUMNS])
+        return ds.partitioning(schema, flavor="hive")
+
+    def _partition_dates(self, df: pd.DataFrame, measurement_date: Optional[str]) -> pd.Series:
+        if self.date_column not in df.columns:
+            value = measurement_date or date.today().isoformat()
+            return pd.Series(value, index=df.index)
+        dates = pd.to_datetime(df[self.date_column], errors="coerce").dt.strftime("%Y-%m-%d")
+        return dates.fillna(UNDATED)
+
+    def append(
+        self, df: pd.DataFrame, run_id: str, measurement_date: Optional[str] = None
+    ) -> DatasetWriteResult:
+        """Write ``df`` as the ``run_id`` partitions, replacing any earlier write of that run.
+
+        Rows are split by their ``date_column`` day; frames without that
+        column go into ``measurement_date`` (default: today).
+        """
+        result = DatasetWriteResult(root=self.root, rows=len(df))
+        # Positional from here on: index labels may repeat
+        df = df.reset_index(drop=True)
+        frame = df.drop(columns=[c for c in PARTITION_COLUMNS if c in df.columns])
+        days = self._partition_dates(df, measurement_date)
+        if self.sort_by:
+            order = frame.sort_values([c for c in self.sort_by if c in frame.columns]).index
+            frame, days = frame.take(order), days.take(order)
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        dictionary = _dictionary_columns(table.schema)
+
+        for old in self.root.glob(f"*/run_id={run_id}"):
+            shutil.rmtree(old)
+        positions = pd.Series(range(len(frame)), index=days.to_numpy())
+        for day, rows in positions.groupby(level=0, sort=True):
+            relative = Path(f"measurement_date={day}") / f"run_id={run_id}" / PART_FILE
+
+            def write(handle, part=table.take(pa.array(rows.to_numpy()))):
+                with pq.ParquetWriter(
+                    handle,
+                    table.schema,
+                    compression=self.compression,
+                    compression_level=self.compression_level,
+                    use_dictionary=dictionary,
+                    write_statistics=True,
+                ) as writer:
+                    writer.write_table(part, row_group_size=self.row_group_size)
+
+            result.files[relative.as_posix()] = write_hashed(self.root / relative, write)
+
+        logger.info(
+            "Appended %s rows to %s in %s partitions", len(df), self.root, len(result.files)
+        )
+        return result
+
+    def dataset(self) -> ds.Dataset:
+        """The dataset over every run, with file schemas unified across runs."""
+        dataset = ds.dataset(self.root, format="parquet", partitioning=self.partitioning)
+        schemas = [fragment.physical_schema for fragment in dataset.get_fragments()]
+        if len(schemas) > 1:
+            schema = pa.unify_schemas(
+                [*schemas, self.partitioning.schema], promote_options="permissive"
+            )
+            dataset = ds.dataset(
+                self.root, schema=schema, format="parquet", partitioning=self.partitioning
+            )
+        return dataset
+
+    def read(
+        self,
+        columns: Optional[List[str]] = None,
+        filters: Optional[Any] = None,
+    ) -> pd.DataFrame:
+        """Read matching rows; ``filters`` is a ``pyarrow.dataset`` expression or DNF list.
+
+        Filters on ``measurement_date``/``run_id`` prune whole directories and
+        filters on other columns are checked against row-group statistics.
+        """
+        if not self.root.exists():
+            return pd.DataFrame(columns=columns)
+        if isinstance(filters, list):
+            filters = pq.filters_to_expression(filters)
+        return self.dataset().to_table(columns=columns, filter=filters).to_pandas()
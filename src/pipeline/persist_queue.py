@@ -0,0 +1,385 @@
+"""Write-behind persistence of pipeline outputs.
+
+:meth:`PersistQueue.submit` spools a run to ``<spool_dir>/<run_id>/`` (the
+frame, timeseries and KPI cube as Parquet, everything else as JSON), fsyncs
+it, and hands the run to a background writer. The writer then runs
+:meth:`UnifiedOutput.persist`: output files, hashing, manifest, Azure upload,
+catalog and run store. The caller gets a :class:`PersistHandle` back right
+away. A run is durable once ``submit`` returns: the spool is only removed
+after ``persist`` succeeds, and :meth:`PersistQueue.recover` replays any
+spooled run left behind by a crash or a failed attempt.
+
+A process claims a spool by holding an exclusive ``flock`` on its lock file
+for as long as it works on the run, so several pipeline processes sharing a
+spool directory never replay the same run at once; the OS drops the lock if
+the holder dies. Failed attempts are counted in the spool, and a run that
+has failed ``max_attempts`` times is moved to ``<spool_dir>/_quarantine/``
+instead of being retried on every recovery.
+
+Runs are persisted one at a time in submission order, and at most
+``max_pending`` runs are queued before ``submit`` blocks.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_all
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src.pipeline.output import OutputResult, PersistContext, UnifiedOutput, master_run_id_of
+from src.pipeline.utils import ensure_dir, json_dumps, json_loads, utc_now
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+
+    HAS_FCNTL = True
+except ImportError:  # pragma: no cover - Windows
+    HAS_FCNTL = False
+
+JOB_FILE = "job.json"
+FRAME_FILE = "frame.parquet"
+CUBE_FILE = "cube.parquet"
+LOCK_FILE = ".lock"
+ATTEMPTS_FILE = "attempts"
+QUARANTINE_DIR = "_quarantine"
+
+
+def _durable_write(path: Path, write: Callable[[Any], Any]) -> None:
+    """Write ``path`` via a temp file that is fsynced before it replaces the target."""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with tmp_path.open("wb") as handle:
+        write(handle)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+
+
+def _fsync_dir(path: Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:  # pragma: no cover - directories cannot be opened on Windows
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _try_lock(job_dir: Path) -> Optional[int]:
+    """Open and exclusively lock ``job_dir``'s lock file; ``None`` if another holder has it.
+
+    Without ``fcntl`` the claim only guards against this process.
+    """
+    fd = os.open(job_dir / LOCK_FILE, os.O_CREAT | os.O_RDWR, 0o644)
+    if not HAS_FCNTL:  # pragma: no cover - Windows
+        return fd
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _read_attempts(job_dir: Path) -> int:
+    try:
+        return int((job_dir / ATTEMPTS_FILE).read_text())
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+class PersistHandle:
+    """Completion handle of one queued run."""
+
+    def __init__(self, run_id: str, future: "Future[OutputResult]"):
+        self.run_id = run_id
+        self._future = future
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def result(self, timeout: Optional[float] = None) -> OutputResult:
+        """Wait for the run's outputs; re-raises the error if persisting failed."""
+        return self._future.result(timeout)
+
+    def exception(self, timeout: Optional[float] = None) -> Optional[BaseException]:
+        return self._future.exception(timeout)
+
+
+class PersistQueue:
+    """Background writer running ``UnifiedOutput.persist`` for spooled runs."""
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        spool_dir: Path,
+        max_pending: int = 2,
+        max_attempts: int = 3,
+    ):
+        self.config = config
+        self.spool_dir = Path(spool_dir)
+        self.max_attempts = max(1, max_attempts)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="persist")
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Tuple[PersistHandle, Dict[str, Any]]] = {}
+        # Locked lock-file descriptors of the spools this process works on
+        self._claims: Dict[str, int] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "PersistQueue":
+        outputs_cfg = config.get("pipeline", {}).get("phases", {}).get("outputs", {})
+        queue_cfg = outputs_cfg.get("write_behind", {}) or {}
+        return cls(
+            config,
+            Path(queue_cfg.get("spool_dir", "data/metrics/_spool")),
+            max_pending=int(queue_cfg.get("max_pending", 2)),
+            max_attempts=int(queue_cfg.get("max_attempts", 3)),
+        )
+
+    def _claim(self, run_id: str, job_dir: Path) -> bool:
+        """Lock the spool of ``run_id``; False if another process holds it or it is gone."""
+        try:
+            fd = _try_lock(job_dir)
+        except FileNotFoundError:
+            return False
+        if fd is None:
+            return False
+        if not job_dir.exists():
+            # Removed by the previous holder between our open and lock
+            os.close(fd)
+            return False
+        with self._lock:
+            self._claims[run_id] = fd
+        return True
+
+    def _release(self, run_id: str) -> None:
+        with self._lock:
+            fd = self._claims.pop(run_id, None)
+        if fd is not None:
+            os.close(fd)
+
+    def _quarantine(self, run_id: str, job_dir: Path, attempts: int) -> None:
+        target = ensure_dir(self.spool_dir / QUARANTINE_DIR) / run_id
+        if target.exists():
+            shutil.rmtree(target)
+        os.replace(job_dir, target)
+        self._release(run_id)
+        logger.error(
+            "Run %s failed %s persist attempts; spool moved to %s", run_id, attempts, target
+        )
+
+    def submit(
+        self,
+        df: pd.DataFrame,
+        metrics: Dict[str, Any],
+        metadata: Dict[str, Any],
+        run_ids: Dict[str, str],
+        context: Optional[PersistContext] = None,
+    ) -> PersistHandle:
+        """Spool the run and queue it; blocks while ``max_pending`` runs are queued."""
+        context = context or PersistContext()
+        run_id = master_run_id_of(run_ids)
+        self._slots.acquire()
+        try:
+            self._spool(run_id, df, metrics, metadata, run_ids, context)
+            return self._enqueue(run_id, df, metrics, metadata, run_ids, context)
+        except BaseException:
+            self._release(run_id)
+            self._slots.release()
+            raise
+
+    def _spool(
+        self,
+        run_id: str,
+        df: pd.DataFrame,
+        metrics: Dict[str, Any],
+        metadata: Dict[str, Any],
+        run_ids: Dict[str, str],
+        context: PersistContext,
+    ) -> None:
+        job_dir = self.spool_dir / run_id
+        if job_dir.exists():
+            shutil.rmtree(job_dir)
+        ensure_dir(job_dir)
+        if not self._claim(run_id, job_dir):
+            raise RuntimeError(f"Spool of run {run_id} is claimed by another process")
+        _durable_write(job_dir / FRAME_FILE, lambda h: df.to_parquet(h, index=False))
+        for rollup, frame in (context.timeseries or {}).items():
+            _durable_write(
+                job_dir / f"timeseries_{rollup}.parquet",
+                lambda h, frame=frame: frame.to_parquet(h, index=False),
+            )
+        if context.cube is not None:
+            _durable_write(job_dir / CUBE_FILE, lambda h: context.cube.to_parquet(h, index=False))
+        job = {
+            "run_id": run_id,
+            "submitted_at": utc_now(),
+            "run_ids": run_ids,
+            "metrics": metrics,
+            "metadata": metadata,
+            "quality_checks": context.quality_checks,
+            "compliance_report_path": (
+                str(context.compliance_report_path) if context.compliance_report_path else None
+            ),
+            "timeseries": list(context.timeseries or {}),
+        }
+        # The job file is written last: its presence marks the spool as complete
+        payload = json_dumps(job)
+        _durable_write(job_dir / JOB_FILE, lambda h: h.write(payload))
+        _fsync_dir(job_dir)
+
+    def _enqueue(
+        self,
+        run_id: str,
+        df: pd.DataFrame,
+        metrics: Dict[str, Any],
+        metadata: Dict[str, Any],
+        run_ids: Dict[str, str],
+        context: PersistContext,
+    ) -> PersistHandle:
+        future = self._executor.submit(
+            self._persist, run_id, df, metrics, metadata, run_ids, context
+        )
+        handle = PersistHandle(run_id, future)
+        with self._lock:
+            self._inflight[run_id] = (handle, metrics)
+        future.add_done_callback(lambda done: self._finished(run_id, done))
+        logger.info("Queued outputs of run %s for write-behind persistence", run_id)
+        return handle
+
+    def _persist(
+        self,
+        run_id: str,
+        df: pd.DataFrame,
+        metrics: Dict[str, Any],
+        metadata: Dict[str, Any],
+        run_ids: Dict[str, str],
+        context: PersistContext,
+    ) -> OutputResult:
+        output = UnifiedOutput(self.config, run_id=run_id)
+        job_dir = self.spool_dir / run_id
+        # The claim is held until the spool is removed or the failure is counted
+        try:
+            try:
+                result = output.persist(df, metrics, metadata, run_ids, context=context)
+            except BaseException:
+                if job_dir.exists():
+                    attempts = _read_attempts(job_dir) + 1
+                    _durable_write(
+                        job_dir / ATTEMPTS_FILE, lambda h: h.write(str(attempts).encode())
+                    )
+                raise
+            shutil.rmtree(job_dir, ignore_errors=True)
+        finally:
+            self._release(run_id)
+        return result
+
+    def _finished(self, run_id: str, future: "Future[OutputResult]") -> None:
+        with self._lock:
+            self._inflight.pop(run_id, None)
+        self._slots.release()
+        error = future.exception()
+        if error is not None:
+            logger.error(
+                "Write-behind persistence of run %s failed; spool kept for recovery: %s",
+                run_id,
+                error,
+            )
+
+    def pending(self) -> List[str]:
+        """Run ids submitted but not yet persisted (in submission order)."""
+        with self._lock:
+            return list(self._inflight)
+
+    def latest_pending_metrics(
+        self, exclude_run: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Metrics of the most recently queued run still being persisted."""
+        with self._lock:
+            for run_id in reversed(list(self._inflight)):
+                if run_id != exclude_run:
+                    return self._inflight[run_id][1]
+        return None
+
+    def recover(self) -> List[PersistHandle]:
+        """Re-queue spooled runs no process is working on (e.g. left behind by a crash).
+
+        Runs that already failed ``max_attempts`` times are quarantined instead.
+        """
+        if not self.spool_dir.exists():
+            return []
+        handles: List[PersistHandle] = []
+        job_dirs = sorted(
+            (p for p in self.spool_dir.iterdir() if p.is_dir() and p.name != QUARANTINE_DIR),
+            key=lambda p: p.stat().st_mtime,
+        )
+        for job_dir in job_dirs:
+            run_id = job_dir.name
+            if run_id in self.pending() or not self._claim(run_id, job_dir):
+                continue
+            if not (job_dir / JOB_FILE).exists():
+                # submit() never returned for this run, so nothing was promised
+                shutil.rmtree(job_dir, ignore_errors=True)
+                self._release(run_id)
+                continue
+            attempts = _read_attempts(job_dir)
+            if attempts >= self.max_attempts:
+                self._quarantine(run_id, job_dir, attempts)
+                continue
+            try:
+                handles.append(self._recover(run_id, job_dir))
+            except BaseException:
+                self._release(run_id)
+                raise
+        return handles
+
+    def _recover(self, run_id: str, job_dir: Path) -> PersistHandle:
+        """Load a claimed spool and queue it."""
+        job = json_loads((job_dir / JOB_FILE).read_bytes())
+        timeseries = {
+            rollup: pd.read_parquet(job_dir / f"timeseries_{rollup}.parquet")
+            for rollup in job.get("timeseries") or []
+        }
+        cube_path = job_dir / CUBE_FILE
+        report_path = job.get("compliance_report_path")
+        context = PersistContext(
+            quality_checks=job.get("quality_checks"),
+            compliance_report_path=Path(report_path) if report_path else None,
+            timeseries=timeseries or None,
+            cube=pd.read_parquet(cube_path) if cube_path.exists() else None,
+        )
+        self._slots.acquire()
+        try:
+            handle = self._enqueue(
+                run_id,
+                pd.read_parquet(job_dir / FRAME_FILE),
+                job.get("metrics") or {},
+                job.get("metadata") or {},
+                job.get("run_ids") or {"pipeline": run_id},
+                context,
+            )
+        except BaseException:
+            self._slots.release()
+            raise
+        logger.info("Recovered spooled run %s", run_id)
+        return handle
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait for every queued run; returns False if ``timeout`` expired first."""
+        with self._lock:
+            futures = [handle._future for handle, _ in self._inflight.values()]
+        _, not_done = wait_all(futures, timeout=timeout)
+        return not not_done
+
+    def close(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
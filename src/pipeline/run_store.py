@@ -0,0 +1,383 @@
+"""Embedded DuckDB store of pipeline run history.
+
+``UnifiedOutput.persist`` records every run here (run metadata, KPI values,
+quality check results and KPI timeseries) so questions such as "what did the
+previous run report?" or "how has PAR30 moved over the last five runs?" are
+one SQL query against a single local file instead of globbing and reparsing
+``*_manifest.json``/``*_metrics.json`` files.
+
+Connections are opened per call (read-only for queries), so the API, the
+batch export runner and scripts can read the store between pipeline runs.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence
+
+import pandas as pd
+
+from src.config.paths import Paths
+from src.pipeline.utils import ensure_dir
+
+try:
+    import duckdb
+
+    HAS_DUCKDB = True
+except ImportError:  # pragma: no cover - optional dependency
+    duckdb = None
+    HAS_DUCKDB = False
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS runs (
+        run_id VARCHAR NOT NULL,
+        generated_at TIMESTAMP NOT NULL,
+        manifest_path VARCHAR,
+        metric_count INTEGER,
+        anomaly_count INTEGER,
+        quality_checks INTEGER,
+        quality_failed INTEGER,
+        metadata JSON
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS kpi_values (
+        run_id VARCHAR NOT NULL,
+        generated_at TIMESTAMP NOT NULL,
+        metric VARCHAR NOT NULL,
+        value DOUBLE,
+        status VARCHAR,
+        payload JSON
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS quality_results (
+        run_id VARCHAR NOT NULL,
+        generated_at TIMESTAMP NOT NULL,
+        check_name VARCHAR NOT NULL,
+        passed BOOLEAN,
+        detail JSON
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS timeseries (
+        run_id VARCHAR NOT NULL,
+        rollup VARCHAR NOT NULL,
+        period_start TIMESTAMP NOT NULL,
+        metric VARCHAR NOT NULL,
+        value DOUBLE
+    )
+    """,
+)
+TABLES = ("runs", "kpi_values", "quality_results", "timeseries")
+
+
+def _utc_timestamp(value: Any) -> pd.Timestamp:
+    """Naive UTC timestamp for ``value`` (ISO strings from ``utc_now`` or datetimes)."""
+    stamp = pd.Timestamp(value) if value is not None else pd.Timestamp.now(tz="UTC")
+    return stamp.tz_convert("UTC").tz_localize(None) if stamp.tzinfo else stamp
+
+
+def _isoformat(value: Any) -> Optional[str]:
+    return pd.Timestamp(value).tz_localize("UTC").isoformat() if pd.notna(value) else None
+
+
+def _float_or_none(value: Any) -> Optional[float]:
+    try:
+        result = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if pd.isna(result) else result
+
+
+def _passed(result: Any) -> Optional[bool]:
+    """Pass/fail of a quality check result; numpy booleans count, anything else is ``None``."""
+    return bool(result) if pd.api.types.is_bool(result) else None
+
+
+def _json(value: Any) -> str:
+    return json.dumps(value, default=str)
+
+
+class RunStore:
+    """Run history in a DuckDB file with a small query API for downstream consumers."""
+
+    def __init__(self, path: Optional[Path] = None):
+        if not HAS_DUCKDB:
+            raise ImportError("duckdb is required for the run store (pip install duckdb)")
+        self.path = Path(path) if path is not None else Paths.run_store_file()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "RunStore":
+        path = config.get("path")
+        return cls(Path(path) if path else None)
+
+    @contextmanager
+    def connect(self, read_only: bool = False) -> Iterator[Any]:
+        if not read_only:
+            ensure_dir(self.path.parent)
+        conn = duckdb.connect(str(self.path), read_only=read_only)
+        try:
+            if not read_only:
+                for ddl in SCHEMA:
+                    conn.execute(ddl)
+            yield conn
+        finally:
+            conn.close()
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> pd.DataFrame:
+        if not self.path.exists():
+            return pd.DataFrame()
+        with self.connect(read_only=True) as conn:
+            return conn.execute(sql, list(params)).df()
+
+    # -- writes -----------------------------------------------------------------
+
+    def record_run(
+        self,
+        manifest: Mapping[str, Any],
+        timeseries: Optional[Mapping[str, pd.DataFrame]] = None,
+        manifest_path: Optional[Path] = None,
+    ) -> None:
+        """Insert (or replace) one run from its output manifest and timeseries frames."""
+        run_id = manifest["run_id"]
+        generated_at = _utc_timestamp(manifest.get("generated_at"))
+        metrics = manifest.get("metrics") or {}
+        checks = manifest.get("quality_checks") or {}
+        metadata = manifest.get("metadata") or {}
+
+        kpis = pd.DataFrame(
+            [
+                {
+                    "run_id": run_id,
+                    "generated_at": generated_at,
+                    "metric": name,
+                    "value": _float_or_none(
+                        payload.get("value") if isinstance(payload, Mapping) else payload
+                    ),
+                    "status": payload.get("status") if isinstance(payload, Mapping) else None,
+                    "payload": _json(payload),
+                }
+                for name, payload in metrics.items()
+            ],
+            columns=["run_id", "generated_at", "metric", "value", "status", "payload"],
+        )
+        passed = {name: _passed(result) for name, result in checks.items()}
+        quality = pd.DataFrame(
+            [
+                {
+                    "run_id": run_id,
+                    "generated_at": generated_at,
+                    "check_name": name,
+                    "passed": passed[name],
+                    "detail": _json(result if passed[name] is None else passed[name]),
+                }
+                for name, result in checks.items()
+            ],
+            columns=["run_id", "generated_at", "check_name", "passed", "detail"],
+        )
+        series = self._long_timeseries(run_id, timeseries or {})
+        run = pd.DataFrame(
+            [
+                {
+                    "run_id": run_id,
+                    "generated_at": generated_at,
+                    "manifest_path": str(manifest_path) if manifest_path else None,
+                    "metric_count": len(metrics),
+                    "anomaly_count": len(metadata.get("anomalies") or {}),
+                    "quality_checks": len(checks),
+                    "quality_failed": int((quality["passed"] == False).sum()),  # noqa: E712
+                    "metadata": _json(
+                        {key: manifest.get(key) for key in ("sub_runs", "files", "file_hashes")}
+                    ),
+                }
+            ]
+        )
+
+        with self.connect() as conn:
+            conn.execute("BEGIN TRANSACTION")
+            try:
+                for table in TABLES:
+                    conn.execute(f"DELETE FROM {table} WHERE run_id = ?", [run_id])
+                for table, frame in (
+                    ("runs", run),
+                    ("kpi_values", kpis),
+                    ("quality_results", quality),
+                    ("timeseries", series),
+                ):
+                    if not frame.empty:
+                        conn.register("incoming", frame)
+                        conn.execute(f"INSERT INTO {table} BY NAME SELECT * FROM incoming")
+                        conn.unregister("incoming")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        logger.info(
+            "Recorded run %s in %s (%s KPIs, %s checks, %s timeseries points)",
+            run_id,
+            self.path,
+            len(kpis),
+            len(quality),
+            len(series),
+        )
+
+    @staticmethod
+    def _long_timeseries(run_id: str, timeseries: Mapping[str, pd.DataFrame]) -> pd.DataFrame:
+        frames: List[pd.DataFrame] = []
+        for rollup, frame in timeseries.items():
+            if frame is None or frame.empty or "period_start" not in frame.columns:
+                continue
+            long = frame.melt(id_vars="period_start", var_name="metric", value_name="value")
+            long["period_start"] = pd.to_datetime(long["period_start"]).map(_utc_timestamp)
+            long["value"] = pd.to_numeric(long["value"], errors="coerce")
+            frames.append(long.assign(run_id=run_id, rollup=rollup))
+        columns = ["run_id", "rollup", "period_start", "metric", "value"]
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)[columns]
+
+    # -- queries ----------------------------------------------------------------
+
+    def latest_run(self, exclude_run: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """The most recent run (optionally skipping ``exclude_run``) with its KPIs and checks."""
+        runs = self._query(
+            """
+            SELECT run_id, generated_at, manifest_path FROM runs
+            WHERE run_id IS DISTINCT FROM ?
+            ORDER BY generated_at DESC LIMIT 1
+            """,
+            [exclude_run],
+        )
+        if runs.empty:
+            return None
+        row = runs.iloc[0]
+        with self.connect(read_only=True) as conn:
+            kpis = conn.execute(
+                "SELECT metric, payload FROM kpi_values WHERE run_id = ? ORDER BY metric",
+                [row["run_id"]],
+            ).fetchall()
+            checks = conn.execute(
+                "SELECT check_name, detail FROM quality_results WHERE run_id = ? "
+                "ORDER BY check_name",
+                [row["run_id"]],
+            ).fetchall()
+        return {
+            "run_id": row["run_id"],
+            "generated_at": _isoformat(row["generated_at"]),
+            "manifest_path": row["manifest_path"],
+            "metrics": {metric: json.loads(payload) for metric, payload in kpis},
+            "quality_checks": {name: json.loads(detail) for name, detail in checks},
+        }
+
+    def kpi_history(
+        self, metrics: Optional[Sequence[str]] = None, last_n: Optional[int] = None
+    ) -> pd.DataFrame:
+        """Long ``run_id, generated_at, metric, value, status`` rows of the last ``last_n`` runs."""
+        sql = """
+            WITH recent AS (
+                SELECT run_id FROM runs ORDER BY generated_at DESC LIMIT ?
+            )
+            SELECT k.run_id, k.generated_at, k.metric, k.value, k.status
+            FROM kpi_values k JOIN recent USING (run_id)
+        """
+        params: List[Any] = [last_n]
+        if metrics:
+            sql += " WHERE k.metric IN (SELECT UNNEST(?))"
+            params.append(list(metrics))
+        return self._query(sql + " ORDER BY k.generated_at, k.metric", params)
+
+    def kpi_trend(self, metric: str, window: int = 5) -> pd.DataFrame:
+        """Per-run values of ``metric`` with rolling mean/min/max over ``window`` runs."""
+        # Window frame bounds cannot be bound parameters
+        preceding = max(int(window), 1) - 1
+        return self._query(
+            f"""
+            SELECT run_id, generated_at, value,
+                   value - LAG(value) OVER w_all AS change,
+                   AVG(value) OVER w AS rolling_mean,
+                   MIN(value) OVER w AS rolling_min,
+                   MAX(value) OVER w AS rolling_max
+            FROM kpi_values
+            WHERE metric = ?
+            WINDOW w_all AS (ORDER BY generated_at),
+                   w AS (ORDER BY generated_at ROWS BETWEEN {preceding} PRECEDING AND CURRENT ROW)
+            ORDER BY generated_at
+            """,
+            [metric],
+        )
+
+    def latest_kpis(self) -> Dict[str, Dict[str, Any]]:
+        """Latest value of every KPI with the previous run's value and the change between them."""
+        frame = self._query(
+            """
+            SELECT metric, value, status,
+                   LAG(value) OVER (PARTITION BY metric ORDER BY generated_at) AS previous,
+                   ROW_NUMBER() OVER (PARTITION BY metric ORDER BY generated_at DESC) AS rank
+            FROM kpi_values
+            QUALIFY rank = 1
+            ORDER BY metric
+            """
+        )
+        return {
+            row.metric: {
+                "current_value": _float_or_none(row.value),
+                "previous_value": _float_or_none(row.previous),
+                "change": _float_or_none(row.value - row.previous),
+                "status": row.status or "neutral",
+            }
+            for row in frame.itertuples(index=False)
+        }
+
+    def quality_trend(self, window: int = 5) -> pd.DataFrame:
+        """Per-run quality pass rate and anomaly count with a rolling pass rate."""
+        preceding = max(int(window), 1) - 1
+        return self._query(
+            f"""
+            SELECT run_id, generated_at, quality_checks, quality_failed, anomaly_count,
+                   CASE WHEN quality_checks > 0
+                        THEN 1 - quality_failed / quality_checks END AS pass_rate,
+                   AVG(CASE WHEN quality_checks > 0
+                            THEN 1 - quality_failed / quality_checks END) OVER (
+                       ORDER BY generated_at ROWS BETWEEN {preceding} PRECEDING AND CURRENT ROW
+                   ) AS rolling_pass_rate
+            FROM runs
+            ORDER BY generated_at
+            """
+        )
+
+    def timeseries(
+        self, rollup: str = "daily", metrics: Optional[Sequence[str]] = None
+    ) -> pd.DataFrame:
+        """The latest run's ``rollup`` series as ``period_start`` x metric columns."""
+        frame = self._query(
+            """
+            SELECT period_start, metric, value FROM timeseries
+            WHERE rollup = ? AND run_id = (
+                SELECT t.run_id FROM timeseries t JOIN runs r USING (run_id)
+                WHERE t.rollup = ? ORDER BY r.generated_at DESC LIMIT 1
+            )
+            """,
+            [rollup, rollup],
+        )
+        if frame.empty:
+            return frame
+        if metrics:
+            frame = frame[frame["metric"].isin(metrics)]
+        wide = frame.pivot(index="period_start", columns="metric", values="value")
+        wide.columns.name = None
+        return wide.sort_index().reset_index()
+
+
+def open_run_store(path: Optional[Path] = None) -> Optional[RunStore]:
+    """The run store at ``path`` (default location) if duckdb is installed and it exists."""
+    if not HAS_DUCKDB:
+        return None
+    store = RunStore(path)
+    return store if store.path.exists() else None
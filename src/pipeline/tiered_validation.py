@@ -0,0 +1,291 @@
+"""Tiered data quality validation: sampled synchronous gate plus background full pass."""
+
+from __future__ import annotations
+
+import logging
+import math
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from src.analytics.schema import LoanTapeSchema
+from src.pipeline.data_validation import ISO8601_REGEX
+from src.pipeline.schema_validation import SchemaValidationExecutor
+from src.pipeline.utils import utc_now, write_json
+
+logger = logging.getLogger(__name__)
+
+# A check returns violation counts keyed by "<column>:<check>".
+QualityCheck = Callable[[pd.DataFrame], Dict[str, int]]
+
+Z_SCORES = {0.90: 1.645, 0.95: 1.96, 0.98: 2.326, 0.99: 2.576, 0.999: 3.291}
+
+
+def required_sample_size(
+    population: int,
+    confidence: float = 0.99,
+    margin_of_error: float = 0.01,
+    expected_rate: float = 0.5,
+) -> int:
+    """Cochran sample size with finite population correction."""
+    if population <= 0:
+        return 0
+    z = Z_SCORES.get(round(confidence, 3))
+    if z is None:
+        raise ValueError(f"Unsupported confidence level: {confidence}")
+    n0 = (z**2) * expected_rate * (1 - expected_rate) / (margin_of_error**2)
+    n = n0 / (1 + (n0 - 1) / population)
+    return min(population, int(math.ceil(n)))
+
+
+def iso8601_violations(df: pd.DataFrame, columns: Optional[List[str]] = None) -> Dict[str, int]:
+    """Count non-ISO 8601 values per date column (same semantics as validate_iso8601_dates)."""
+    if columns is None:
+        columns = [c for c in df.columns if "date" in c.lower() or c.lower().endswith("_at")]
+    violations: Dict[str, int] = {}
+    for col in columns:
+        if col not in df.columns or pd.api.types.is_datetime64_any_dtype(df[col]):
+            continue
+        values = df[col].dropna()
+        if values.empty:
+            continue
+        is_datetime = values.map(lambda v: isinstance(v, datetime)).astype(bool)
+        is_str = values.map(lambda v: isinstance(v, str)).astype(bool)
+        strings = values[is_str].astype(str)
+        bad_strings = int((~strings.str.match(ISO8601_REGEX.pattern)).sum())
+        bad_types = int((~is_str & ~is_datetime).sum())
+        if bad_strings + bad_types:
+            violations[f"{col}:iso8601"] = bad_strings + bad_types
+    return violations
+
+
+def loan_tape_schema_violations(df: pd.DataFrame) -> Dict[str, int]:
+    """Count LoanTapeSchema failure cases per column/check, collecting lazily."""
+    return SchemaValidationExecutor(LoanTapeSchema).validate(df).counts()
+
+
+DEFAULT_CHECKS: Dict[str, QualityCheck] = {
+    "iso8601_dates": iso8601_violations,
+    "loan_tape_schema": loan_tape_schema_violations,
+}
+
+
+@dataclass
+class TieredValidationResult:
+    """Outcome of the synchronous sampled gate."""
+
+    population: int
+    sample_size: int
+    sampled: bool
+    sample_violations: Dict[str, Dict[str, int]]
+    full_pass: Optional[Future] = field(default=None, repr=False)
+    finished: bool = False
+    amendment: Optional[Dict[str, Any]] = None
+
+    @property
+    def violations(self) -> Dict[str, Dict[str, int]]:
+        """Full-pass violations once the full pass has completed, otherwise the sample's."""
+        if self.full_pass is not None and self.full_pass.done():
+            if self.full_pass.exception() is None:
+                return self.full_pass.result()
+        return self.sample_violations
+
+    @property
+    def errors(self) -> List[str]:
+        return self.check_errors()
+
+    def check_errors(self, exclude: Iterable[str] = (), sample_only: bool = False) -> List[str]:
+        """One message per violation, from the full pass if it has completed.
+
+        ``sample_only`` reports the sample's violations even then, for gating.
+        """
+        excluded = set(exclude)
+        messages: List[str] = []
+        scope, rows, violations = "sample", self.sample_size, self.sample_violations
+        if not self.sampled:
+            scope = "full"
+        elif not sample_only and self.full_pass is not None and self.full_pass.done():
+            error = self.full_pass.exception()
+            if error is None:
+                scope, rows, violations = "full", self.population, self.full_pass.result()
+            else:
+                messages.append(f"[full] validation did not complete: {error}")
+        messages.extend(
+            f"[{scope}] {check} {key}: {count} of {rows} rows"
+            for check, found in violations.items()
+            if check not in excluded
+            for key, count in found.items()
+        )
+        return messages
+
+    def summary(self) -> Dict[str, Any]:
+        status = "not_required"
+        if self.full_pass is not None:
+            status = "completed" if self.full_pass.done() else "pending"
+        summary = {
+            "population": self.population,
+            "sample_size": self.sample_size,
+            "sampled": self.sampled,
+            "sample_violations": self.sample_violations,
+            "full_pass": status,
+        }
+        if self.finished:
+            summary["violations"] = self.violations
+            summary["amendment"] = self.amendment["path"] if self.amendment else None
+        return summary
+
+
+class TieredValidator:
+    """Gate on a random sample, then confirm with a full pass in a background worker.
+
+    :meth:`validate` returns as soon as the sample is checked; :meth:`finish`
+    joins the full pass later and raises the late alert if it found more.
+
+    Config keys (``pipeline.phases.ingestion.validation.tiered``): ``enabled``,
+    ``min_rows``, ``confidence``, ``margin_of_error``, ``expected_violation_rate``,
+    ``seed``, ``checks``, ``amendment_dir`` and ``alert_channel``.
+    """
+
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        run_id: str = "",
+        checks: Optional[Dict[str, QualityCheck]] = None,
+        alert: Optional[Callable[[str], Any]] = None,
+    ):
+        cfg = config or {}
+        self.enabled = bool(cfg.get("enabled", False))
+        self.min_rows = int(cfg.get("min_rows", 100_000))
+        self.confidence = float(cfg.get("confidence", 0.99))
+        self.margin_of_error = float(cfg.get("margin_of_error", 0.01))
+        self.expected_rate = float(cfg.get("expected_violation_rate", 0.5))
+        self.seed = cfg.get("seed", 42)
+        self.amendment_dir = Path(cfg.get("amendment_dir", "logs/runs/quality_amendments"))
+        self.alert_channel = cfg.get("alert_channel", "#data-engineering-alerts")
+        self.run_id = run_id
+        if checks is None:
+            names = cfg.get("checks", list(DEFAULT_CHECKS))
+            checks = {name: DEFAULT_CHECKS[name] for name in names}
+        self.checks = checks
+        self.alert = alert
+        self.amendment: Optional[Dict[str, Any]] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def should_sample(self, df: pd.DataFrame) -> bool:
+        return self.enabled and len(df) >= self.min_rows
+
+    def run_checks(self, df: pd.DataFrame) -> Dict[str, Dict[str, int]]:
+        results: Dict[str, Dict[str, int]] = {}
+        for name, check in self.checks.items():
+            try:
+                found = check(df)
+            except Exception as exc:
+                logger.error("Quality check %s failed to execute: %s", name, exc)
+                found = {f"{name}:execution_error": 1}
+            if found:
+                results[name] = found
+        return results
+
+    def validate(self, df: pd.DataFrame) -> TieredValidationResult:
+        """Validate a sample synchronously and schedule the full pass if sampling applied."""
+        population = len(df)
+        if not self.should_sample(df):
+            return TieredValidationResult(
+                population=population,
+                sample_size=population,
+                sampled=False,
+                sample_violations=self.run_checks(df),
+            )
+
+        size = required_sample_size(
+            population, self.confidence, self.margin_of_error, self.expected_rate
+        )
+        sample = df.sample(n=size, random_state=self.seed)
+        sample_violations = self.run_checks(sample)
+        logger.info(
+            "[TieredValidation] sampled %s of %s rows, %s checks flagged",
+            size,
+            population,
+            len(sample_violations),
+        )
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="full-validation")
+        # The full pass reads ``df`` without a copy: callers must not modify it in
+        # place until finish() returns.
+        future = self._executor.submit(self.run_checks, df)
+        return TieredValidationResult(
+            population=population,
+            sample_size=size,
+            sampled=True,
+            sample_violations=sample_violations,
+            full_pass=future,
+        )
+
+    def finish(self, result: TieredValidationResult) -> Optional[Dict[str, Any]]:
+        """Join ``result``'s full pass and amend the quality report if the sample missed any.
+
+        Returns the amendment (``None`` if nothing was missed). Calling it again
+        returns the same amendment without alerting twice.
+        """
+        if result.finished or result.full_pass is None:
+            return result.amendment
+        try:
+            full_violations = result.full_pass.result()
+        except Exception as exc:
+            logger.error("Full validation pass for run %s failed: %s", self.run_id, exc)
+            full_violations = {}
+        sample_violations = result.sample_violations
+        missed = {
+            check: {k: v for k, v in found.items() if k not in sample_violations.get(check, {})}
+            for check, found in full_violations.items()
+        }
+        missed = {check: found for check, found in missed.items() if found}
+        if missed:
+            result.amendment = self._write_amendment(
+                result.population, sample_violations, full_violations, missed
+            )
+        result.finished = True
+        return result.amendment
+
+    def _write_amendment(
+        self,
+        population: int,
+        sample_violations: Dict[str, Dict[str, int]],
+        full_violations: Dict[str, Dict[str, int]],
+        missed: Dict[str, Dict[str, int]],
+    ) -> Dict[str, Any]:
+        amendment = {
+            "run_id": self.run_id,
+            "generated_at": utc_now(),
+            "population": population,
+            "sample_violations": sample_violations,
+            "full_violations": full_violations,
+            "missed_by_sample": missed,
+        }
+        path = self.amendment_dir / f"{self.run_id or 'run'}_quality_amendment.json"
+        write_json(path, amendment)
+        self.amendment = {**amendment, "path": str(path)}
+
+        msg = (
+            f"LATE QUALITY ALERT: full validation for run {self.run_id} found "
+            f"{sum(len(v) for v in missed.values())} violation types missed by the sample "
+            f"(amendment: {path})"
+        )
+        logger.critical(msg)
+        if self.alert is not None:
+            try:
+                self.alert(msg)
+            except Exception as alert_err:
+                logger.error("Failed to send late quality alert: %s", alert_err)
+        return self.amendment
+
+    def wait(self) -> None:
+        """Block until any scheduled full pass has finished."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -1,4 +1,5 @@
 import hashlib
+import io
 import json
 import os
 import re
@@ -11,6 +12,14 @@ from typing import Any, Callable, Dict, Optional
 import pandas as pd
 import yaml
 
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+    HAS_ORJSON = False
+
 ENV_PATTERN = re.compile(r"\$\{([^}]+)\}")
 
 
@@ -51,6 +60,48 @@ def hash_file(path: Path) -> str:
     return hasher.hexdigest()
 
 
+class HashingWriter(io.RawIOBase):
+    """Binary write handle that SHA-256 hashes everything written through it."""
+
+    def __init__(self, raw: Any) -> None:
+        self._raw = raw
+        self._hasher = hashlib.sha256()
+        self._size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        view = memoryview(data).cast("B")
+        written = self._raw.write(view)
+        written = len(view) if written is None else written
+        self._hasher.update(view[:written])
+        self._size += written
+        return written
+
+    def tell(self) -> int:
+        return self._size
+
+    def flush(self) -> None:
+        self._raw.flush()
+
+    def hexdigest(self) -> str:
+        return self._hasher.hexdigest()
+
+
+def write_hashed(path: Path, write: Callable[[HashingWriter], Any]) -> str:
+    """Atomically write ``path`` via ``write(handle)`` and return the SHA-256 of its bytes."""
+    ensure_dir(path.parent)
+    # Dot-prefixed so dataset readers skip a half-written file
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with tmp_path.open("wb") as raw:
+        handle = HashingWriter(raw)
+        write(handle)
+        handle.flush()
+    os.replace(tmp_path, path)
+    return handle.hexdigest()
+
+
 def hash_dataframe(df: pd.DataFrame) -> str:
     if df.empty:
         return hashlib.sha256(b"").hexdigest()
@@ -69,10 +120,26 @@ def utc_now() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def json_dumps(payload: Any, indent: bool = False) -> bytes:
+    """Serialize ``payload`` with orjson when available; unknown types are written as ``str``."""
+    if HAS_ORJSON:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(payload, default=str, option=option)
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits, which the stdlib encoder handles
+    return json.dumps(payload, indent=2 if indent else None, default=str).encode("utf-8")
+
+
+def json_loads(data: Any) -> Any:
+    return orjson.loads(data) if HAS_ORJSON else json.loads(data)
+
+
 def write_json(path: Path, payload: Any) -> None:
     ensure_dir(path.parent)
-    with path.open("w", encoding="utf-8") as handle:
-        json.dump(payload, handle, indent=2, default=str)
+    path.write_bytes(json_dumps(payload, indent=True))
 
 
 @dataclass
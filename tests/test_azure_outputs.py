@@ -0,0 +1,186 @@
+import os
+import threading
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("azure.storage.blob")
+
+from azure.core.exceptions import ResourceNotFoundError  # noqa: E402
+
+from src.integrations.azure_outputs import (HASH_METADATA_KEY,  # noqa: E402
+                                            BlobUploader)
+from src.pipeline.utils import hash_file  # noqa: E402
+
+RUN_AZURITE_TESTS = os.getenv("RUN_AZURITE_TESTS") in {"1", "true", "yes"}
+
+
+class _FakeContainer:
+    """In-memory container client recording uploads and blob metadata."""
+
+    def __init__(self, fail=()):
+        self.blobs = {}
+        self.uploads = []
+        self.lookups = []
+        self.staged = {}
+        self.fail = set(fail)
+        self.lock = threading.Lock()
+
+    def list_blobs(self, name_starts_with=None, include=None):
+        self.lookups.append(("list", name_starts_with))
+        return [
+            SimpleNamespace(name=name, metadata=blob["metadata"] if include else None)
+            for name, blob in self.blobs.items()
+            if name.startswith(name_starts_with or "")
+        ]
+
+    def get_blob_client(self, name):
+        container = self
+
+        class _Blob:
+            url = f"http://127.0.0.1:10000/devstoreaccount1/test/{name}"
+
+            def get_blob_properties(self):
+                container.lookups.append(("properties", name))
+                if name not in container.blobs:
+                    raise ResourceNotFoundError("missing")
+                return SimpleNamespace(metadata=container.blobs[name]["metadata"])
+
+            def upload_blob(self, data, **kwargs):
+                if name in container.fail:
+                    raise RuntimeError("boom")
+                with container.lock:
+                    container.blobs[name] = {"data": data.read(), "metadata": kwargs["metadata"]}
+                    container.uploads.append((name, kwargs))
+
+            def stage_block(self, block_id, data):
+                with container.lock:
+                    container.staged.setdefault(name, {})[block_id] = data
+
+            def commit_block_list(self, block_list, **kwargs):
+                with container.lock:
+                    staged = container.staged.pop(name)
+                    data = b"".join(staged[block_id] for block_id in block_list)
+                    container.blobs[name] = {"data": data, "metadata": kwargs["metadata"]}
+                    container.uploads.append((name, {**kwargs, "blocks": len(block_list)}))
+
+        return _Blob()
+
+
+def _files(tmp_path):
+    small = tmp_path / "metrics.json"
+    small.write_text('{"par_30": 0.1}')
+    large = tmp_path / "portfolio.parquet"
+    large.write_bytes(os.urandom(64 * 1024))
+    return {"run/metrics.json": small, "run/portfolio.parquet": large}
+
+
+def test_unchanged_files_are_skipped_by_hash(tmp_path):
+    container = _FakeContainer()
+    uploader = BlobUploader(container, block_threshold=32 * 1024)
+    files = _files(tmp_path)
+
+    first = uploader.upload(files)
+    assert sorted(first.uploaded) == sorted(files)
+    assert not first.skipped
+    kwargs = dict(container.uploads)
+    assert kwargs["run/portfolio.parquet"]["max_concurrency"] == 4
+    assert kwargs["run/metrics.json"]["max_concurrency"] == 1
+    assert kwargs["run/metrics.json"]["content_settings"].content_type == "application/json"
+    meta = container.blobs["run/portfolio.parquet"]["metadata"]
+    assert meta[HASH_METADATA_KEY] == hash_file(files["run/portfolio.parquet"])
+
+    files["run/metrics.json"].write_text('{"par_30": 0.2}')
+    second = uploader.upload(files, hashes={"run/portfolio.parquet": meta[HASH_METADATA_KEY]})
+    assert list(second.uploaded) == ["run/metrics.json"]
+    assert list(second.skipped) == ["run/portfolio.parquet"]
+    assert len(container.uploads) == 3
+    assert container.blobs["run/metrics.json"]["data"] == b'{"par_30": 0.2}'
+
+
+def test_failures_are_reported_per_file(tmp_path):
+    container = _FakeContainer(fail={"run/metrics.json"})
+    result = BlobUploader(container).upload({**_files(tmp_path), "run/gone.csv": tmp_path / "x"})
+    assert result.failed == {"run/metrics.json": "boom"}
+    assert list(result.blobs) == ["run/portfolio.parquet"]
+
+
+@pytest.mark.skipif(not RUN_AZURITE_TESTS, reason="Azurite tests are opt-in (RUN_AZURITE_TESTS=1).")
+def test_round_trip_against_azurite(tmp_path):
+    connection_string = os.getenv("AZURE_STORAGE_CONNECTION_STRING", "UseDevelopmentStorage=true")
+    uploader = BlobUploader.from_connection_string(
+        connection_string, f"test-{uuid.uuid4().hex[:8]}", block_threshold=16 * 1024
+    )
+    files = _files(tmp_path)
+    try:
+        assert len(uploader.upload(files).uploaded) == 2
+        assert len(uploader.upload(files).skipped) == 2
+        blob = uploader.container_client.download_blob("run/portfolio.parquet").readall()
+        assert blob == files["run/portfolio.parquet"].read_bytes()
+    finally:
+        uploader.container_client.delete_container()
+
+
+def test_pipeline_output_passes_persisted_hashes(tmp_path, monkeypatch):
+    from src.pipeline.output import UnifiedOutput
+
+    container = _FakeContainer()
+    monkeypatch.setenv("AZURE_STORAGE_CONNECTION_STRING", "UseDevelopmentStorage=true")
+    monkeypatch.setattr(
+        BlobUploader,
+        "from_connection_string",
+        classmethod(lambda cls, conn, name, **kwargs: cls(container, **kwargs)),
+    )
+    output = UnifiedOutput(
+        {"pipeline": {"phases": {"outputs": {"azure": {"enabled": True, "container": "runs"}}}}}
+    )
+    path = tmp_path / "run.csv"
+    path.write_text("a\n1\n")
+    # A matching stored hash means the file is not uploaded again
+    container.blobs["analytics/r1/run.csv"] = {"data": b"", "metadata": {HASH_METADATA_KEY: "h"}}
+
+    blobs = output.upload_to_azure([path], "r1", file_hashes={str(path): "h"})
+    assert blobs == {"run.csv": "runs/analytics/r1/run.csv"}
+    assert container.uploads == []
+    assert output.audit_log[-1]["skipped_count"] == 1
+    assert container.lookups == [("list", "analytics/r1/")]
+
+
+def test_prefix_listing_replaces_per_file_lookups(tmp_path):
+    container = _FakeContainer()
+    uploader = BlobUploader(container)
+    files = _files(tmp_path)
+
+    first = uploader.upload(files, prefix="run/")
+    assert sorted(first.uploaded) == sorted(files)
+    # A new run prefix costs one listing, not a properties request per file
+    assert container.lookups == [("list", "run/")]
+
+    files["run/metrics.json"].write_text('{"par_30": 0.3}')
+    second = uploader.upload(files, prefix="run/")
+    assert list(second.uploaded) == ["run/metrics.json"]
+    assert list(second.skipped) == ["run/portfolio.parquet"]
+    assert container.lookups == [("list", "run/")] * 2
+
+    with pytest.raises(ValueError):
+        uploader.upload(files, prefix="other/")
+
+
+def test_upload_stream_stages_blocks_and_records_hash():
+    import hashlib
+
+    container = _FakeContainer()
+    chunks = [bytes([i]) * 300 for i in range(5)]
+    url, digest = BlobUploader(container).upload_stream(
+        "run/loans.csv.gz", iter(chunks), "text/csv", "gzip", block_size=1000
+    )
+
+    payload = b"".join(chunks)
+    assert url.endswith("run/loans.csv.gz")
+    assert digest == hashlib.sha256(payload).hexdigest()
+    assert container.blobs["run/loans.csv.gz"]["data"] == payload
+    assert container.blobs["run/loans.csv.gz"]["metadata"] == {HASH_METADATA_KEY: digest}
+    _, kwargs = container.uploads[0]
+    assert kwargs["blocks"] == 2
+    assert kwargs["content_settings"].content_encoding == "gzip"
@@ -0,0 +1,90 @@
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.pipeline.column_aliases import (
+    ALIAS_CONFIG_PATH,
+    AliasRegistry,
+    expand_aliases,
+    get_alias_registry,
+    get_column_index,
+    resolve_columns,
+)
+from src.pipeline.data_ingestion import UnifiedIngestion
+
+
+def test_index_is_shared_per_column_schema():
+    df1 = pd.DataFrame(columns=["Loan_ID", "dpd"])
+    df2 = pd.DataFrame({"Loan_ID": [1], "dpd": [0]})
+    assert get_column_index(df1) is get_column_index(df2)
+    assert get_column_index(df1) is not get_column_index(["loan_id", "dpd"])
+
+
+def test_resolution_modes():
+    columns = ["Loan_ID", "Days Past Due", "outstanding_balance_usd"]
+    assert resolve_columns(columns, ["loan_id"], mode="exact") is None
+    assert resolve_columns(columns, ["loan_id"], mode="case_insensitive") == "Loan_ID"
+    assert resolve_columns(columns, ["outstanding_balance"], mode="finder") == (
+        "outstanding_balance_usd"
+    )
+    assert resolve_columns(columns, ["days_past_due"], mode="normalized") == "Days Past Due"
+    with pytest.raises(ValueError):
+        resolve_columns(columns, ["x"], mode="fuzzy")
+
+
+def test_resolution_is_memoized():
+    index = get_column_index(["a_col", "b_col"])
+    assert index.resolve(["b"], mode="finder") == "b_col"
+    assert ("finder", ("b",)) in index._cache
+
+
+def test_registry_groups_and_fallback(tmp_path):
+    config = tmp_path / "aliases.yml"
+    config.write_text("aliases:\n  dpd:\n    - days_past_due\n    - dpd\n")
+    registry = AliasRegistry.from_yaml(config)
+    assert registry.aliases("dpd") == ("days_past_due", "dpd")
+    assert registry.aliases("unknown") == ("unknown",)
+    assert registry.resolve(["loan_id", "dpd"], "dpd") == "dpd"
+    assert AliasRegistry.from_yaml(tmp_path / "missing.yml").groups == {}
+
+
+def test_global_registry_loaded_from_config():
+    registry = get_alias_registry()
+    assert "disbursement_date" in registry.groups
+    assert expand_aliases("disbursement_date")[0] == "disbursement_date"
+    assert expand_aliases(["a", "b"]) == ["a", "b"]
+
+
+def test_ingestion_select_column_uses_normalized_rules(minimal_config):
+    ingestion = UnifiedIngestion(minimal_config)
+    columns = ["Fecha Corte", "Total Receivable (USD)"]
+    assert ingestion._select_column(columns, ["fecha_corte"]) == "Fecha Corte"
+    assert ingestion._select_column(columns, ["total receivable"]) == "Total Receivable (USD)"
+    assert ingestion._select_column(columns, []) is None
+
+
+def test_registry_loads_outside_repo_root(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert ALIAS_CONFIG_PATH.is_absolute()
+    registry = AliasRegistry.from_yaml()
+    assert len(registry.aliases("outstanding_balance")) > 1
+
+
+def test_pipeline_imports_without_a_git_checkout(tmp_path):
+    # Docker images, sdists and ``git archive`` copies ship without .git
+    root = Path(__file__).resolve().parents[1]
+    for name in ("src", "config"):
+        shutil.copytree(root / name, tmp_path / name, ignore=shutil.ignore_patterns("__pycache__"))
+    code = (
+        "from src.pipeline.column_aliases import AliasRegistry;"
+        "print(len(AliasRegistry.from_yaml().aliases('outstanding_balance')))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=tmp_path, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    assert int(result.stdout.split()[-1]) > 1
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analytics.credit_loss import (DEFAULT, PAID, STATES,
+                                       estimate_transition_matrix,
+                                       exposures_from_loan_month,
+                                       simulate_credit_losses,
+                                       stressed_matrices)
+
+TRANSITION = np.array(
+    [
+        [0.90, 0.05, 0.00, 0.00, 0.05],
+        [0.40, 0.30, 0.30, 0.00, 0.00],
+        [0.10, 0.10, 0.30, 0.50, 0.00],
+        [0.00, 0.00, 0.00, 1.00, 0.00],
+        [0.00, 0.00, 0.00, 0.00, 1.00],
+    ]
+)
+
+
+def _loan_month() -> pd.DataFrame:
+    # loan 1: current -> 30+ -> 60+ -> default; loan 2: current -> current -> paid
+    # loan 3 skips a month, so its only pair is not counted
+    return pd.DataFrame(
+        {
+            "loan_id": [1, 1, 1, 1, 2, 2, 2, 3, 3],
+            "month_end": pd.to_datetime(
+                [
+                    "2025-01-31",
+                    "2025-02-28",
+                    "2025-03-31",
+                    "2025-04-30",
+                    "2025-01-31",
+                    "2025-02-28",
+                    "2025-03-31",
+                    "2025-01-31",
+                    "2025-03-31",
+                ]
+            ),
+            "days_past_due": [0, 35, 65, 120, 0, 0, 0, 0, 100],
+            "outstanding": [100.0, 90, 80, 80, 50, 40, 0, 10, 10],
+            "product": ["a"] * 4 + ["b"] * 3 + ["a"] * 2,
+        }
+    )
+
+
+def test_transition_matrix_counts_consecutive_months():
+    matrix = estimate_transition_matrix(_loan_month())
+    assert matrix[0].tolist() == pytest.approx([1 / 3, 1 / 3, 0, 0, 1 / 3])
+    assert matrix[1, 2] == 1.0
+    assert matrix[2, DEFAULT] == 1.0
+    assert matrix[DEFAULT, DEFAULT] == matrix[PAID, PAID] == 1.0
+    np.testing.assert_allclose(matrix.sum(axis=1), 1.0)
+
+
+def test_exposures_keep_open_loans_of_latest_month():
+    exposures = exposures_from_loan_month(_loan_month(), segment_column="product")
+    # Latest month holds loan 1 (default) only
+    assert exposures.empty
+    earlier = _loan_month()[lambda df: df["month_end"] <= "2025-02-28"]
+    exposures = exposures_from_loan_month(earlier, segment_column="product")
+    assert exposures["state"].tolist() == [1, 0]
+    assert exposures["segment"].tolist() == ["a", "b"]
+
+
+def test_stressed_matrices_stay_stochastic():
+    stressed = stressed_matrices(TRANSITION, np.array([[0.5, 1.0, 3.0]]))
+    assert stressed.shape == (1, 3, len(STATES), len(STATES))
+    np.testing.assert_allclose(stressed.sum(axis=-1), 1.0)
+    assert (stressed >= 0).all()
+    np.testing.assert_allclose(stressed[0, 1], TRANSITION)
+    assert stressed[0, 2, 0, 1] == pytest.approx(0.15)
+    # Worsening is capped at the available diagonal mass
+    assert stressed[0, 2, 2, DEFAULT] == pytest.approx(0.8)
+
+
+def test_expected_loss_matches_matrix_power_without_systematic_risk():
+    rng = np.random.default_rng(4)
+    exposures = pd.DataFrame(
+        {
+            "state": rng.integers(0, 3, 3000),
+            "exposure": rng.uniform(1e3, 1e4, 3000),
+            "segment": rng.choice(["x", "y"], 3000),
+        }
+    )
+    result = simulate_credit_losses(
+        exposures, TRANSITION, n_paths=1000, systematic_volatility=0.0, lgd=0.5, seed=2
+    )
+    absorbed = np.linalg.matrix_power(TRANSITION, 12)[:, DEFAULT]
+    expected = (exposures["exposure"] * 0.5 * absorbed[exposures["state"]]).sum()
+
+    summary = result.summary()
+    assert summary["segment"].tolist() == ["portfolio", "x", "y"]
+    assert summary.loc[0, "expected_loss"] == pytest.approx(expected, rel=0.01)
+    assert summary.loc[1:, "exposure"].sum() == pytest.approx(exposures["exposure"].sum())
+    assert (summary["es_99"] >= summary["var_99"]).all()
+    assert (summary["var_99"] >= summary["var_95"]).all()
+    assert set(summary["risk_level"]) <= {"low", "medium", "high", "critical"}
+
+
+def test_results_are_reproducible_across_workers():
+    exposures = pd.DataFrame({"state": [0, 1, 2] * 50, "exposure": [100.0] * 150})
+    kwargs = dict(n_paths=300, paths_per_shard=100, seed=11)
+    serial = simulate_credit_losses(exposures, TRANSITION, workers=1, **kwargs)
+    parallel = simulate_credit_losses(exposures, TRANSITION, workers=2, **kwargs)
+    np.testing.assert_array_equal(serial.losses, parallel.losses)
+
+    stressed = simulate_credit_losses(
+        exposures, TRANSITION, systematic_volatility=0.6, **kwargs
+    ).summary()
+    assert stressed.loc[0, "var_99"] > serial.summary().loc[0, "var_99"]
@@ -0,0 +1,110 @@
+import gzip
+
+import numpy as np
+import pandas as pd
+import pyarrow.csv as pv
+import pytest
+
+from src.pipeline.csv_stream import StreamingCSVWriter, csv_chunks
+from src.pipeline.utils import hash_file
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(7)
+    return pd.DataFrame(
+        {
+            "loan_id": [f"L{i:05d}" for i in range(2_500)],
+            "balance": rng.uniform(0, 10_000, 2_500).round(2),
+            "dpd": rng.integers(0, 120, 2_500),
+        }
+    )
+
+
+def test_plain_export_matches_to_csv(tmp_path, frame):
+    progress = []
+    writer = StreamingCSVWriter(chunk_rows=1_000, progress=lambda s: progress.append(s.rows))
+    path = tmp_path / "loans.csv"
+
+    stats = writer.to_path(frame, path)
+
+    assert path.read_text() == frame.to_csv(index=False)
+    assert progress == [1_000, 2_000, 2_500]
+    assert stats.chunks == 3
+    assert stats.progress == 1.0
+    assert stats.raw_bytes == stats.written_bytes == path.stat().st_size
+    assert stats.sha256 == hash_file(path)
+
+
+def test_chunks_format_datetimes_like_one_to_csv():
+    # Only the third chunk holds a non-midnight or sub-second value
+    day = pd.Series(pd.date_range("2024-01-01", periods=6, freq="D"))
+    due = day.copy()
+    due[4] += pd.Timedelta(hours=12, minutes=30)
+    posted = day.dt.tz_localize("UTC").copy()
+    posted[5] += pd.Timedelta(milliseconds=5)
+    frame = pd.DataFrame({"due": due, "paid": due.where(due.index != 1), "posted": posted})
+    frame["day"] = day
+
+    chunked = b"".join(data for _, data in csv_chunks(frame, chunk_rows=2)).decode("utf-8")
+    assert chunked == frame.to_csv(index=False)
+    assert chunked.splitlines()[1].startswith("2024-01-01 00:00:00,")
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zstd"])
+def test_compressed_chunks_read_back_as_one_stream(tmp_path, frame, compression):
+    writer = StreamingCSVWriter(chunk_rows=300, compression=compression, workers=3)
+    path = tmp_path / f"loans.csv{writer.suffix}"
+
+    stats = writer.to_path(frame, path)
+
+    pd.testing.assert_frame_equal(pv.read_csv(path).to_pandas(), frame)
+    assert stats.chunks == 9
+    assert stats.written_bytes == path.stat().st_size
+    assert stats.compression_ratio > 1
+    assert stats.to_dict()["rows"] == len(frame)
+
+
+def test_gzip_output_is_deterministic(frame):
+    writer = StreamingCSVWriter(chunk_rows=500, compression="gzip")
+    first = b"".join(writer.iter_bytes(frame))
+    second = b"".join(writer.iter_bytes(frame))
+    assert first == second
+    assert gzip.decompress(first).decode() == frame.to_csv(index=False)
+
+
+def test_empty_frame_keeps_header(tmp_path):
+    path = tmp_path / "empty.csv"
+    stats = StreamingCSVWriter().to_path(pd.DataFrame(columns=["a", "b"]), path)
+    assert path.read_text() == "a,b\n"
+    assert stats.rows == 0
+
+
+def test_unknown_compression_is_rejected():
+    with pytest.raises(ValueError, match="bz2"):
+        StreamingCSVWriter(compression="bz2")
+
+
+def test_persist_writes_compressed_csv(tmp_path, frame):
+    from src.pipeline.output import UnifiedOutput
+
+    config = {
+        "pipeline": {
+            "phases": {
+                "outputs": {
+                    "storage": {"local_dir": str(tmp_path), "manifest_dir": str(tmp_path / "runs")},
+                    "formats": ["csv"],
+                    "csv": {"chunk_rows": 1_000, "compression": "gzip"},
+                }
+            }
+        }
+    }
+    result = UnifiedOutput(config).persist(frame, {}, {}, {"pipeline": "run_1"})
+
+    csv_path = tmp_path / "run_1.csv.gz"
+    assert result.output_paths["csv"] == str(csv_path)
+    pd.testing.assert_frame_equal(pd.read_csv(csv_path), frame)
+    export = result.manifest["csv_export"]
+    assert export["compression"] == "gzip"
+    assert export["rows"] == len(frame)
+    assert result.manifest["file_hashes"]["csv"] == hash_file(csv_path)
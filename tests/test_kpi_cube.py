@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.kpi_engine_v2 import KPIEngineV2
+from src.pipeline.kpi_calculation import UnifiedCalculationV2
+from src.pipeline.kpi_cube import (ALL, GROUPING_ID, build_kpi_cube,
+                                   default_calculators, read_kpi_cube,
+                                   rollup_grouping_sets)
+
+DIMENSIONS = ["product_type", "region"]
+
+
+def _tape(n: int = 600) -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame(
+        {
+            "product_type": rng.choice(["factoring", "credit_line", "leasing"], n),
+            "region": rng.choice(["north", "south"], n).astype(object),
+            "dpd_30_60_usd": rng.uniform(0, 1e4, n),
+            "dpd_60_90_usd": rng.uniform(0, 1e4, n),
+            "dpd_90_plus_usd": rng.uniform(0, 1e4, n),
+            "total_receivable_usd": rng.uniform(1e4, 1e5, n),
+            "cash_available_usd": rng.uniform(0, 1e5, n),
+            "total_eligible_usd": rng.uniform(1e4, 1e5, n),
+            "interest_rate": rng.uniform(0.05, 0.4, n),
+            "principal_balance": rng.uniform(1e3, 5e4, n),
+        }
+    )
+    df.loc[::17, "region"] = np.nan
+    return df
+
+
+def test_cube_cells_match_direct_calculation_on_slices():
+    df = _tape()
+    cube = build_kpi_cube(df, DIMENSIONS)
+    assert cube.kpis == ["PAR30", "PAR90", "CollectionRate", "PortfolioYield"]
+    assert sorted(cube.frame[GROUPING_ID].unique()) == [0, 1, 2, 3]
+
+    calculators = default_calculators()
+    for _, cell in cube.slice(product_type=None, region=None).iterrows():
+        region = df["region"].isna() if cell["region"] is None else df["region"] == cell["region"]
+        subset = df[(df["product_type"] == cell["product_type"]) & region]
+        assert cell["rows"] == len(subset)
+        for name, calculator in calculators.items():
+            expected, _ = calculator.calculate(subset)
+            assert cell[name] == pytest.approx(expected, rel=1e-12)
+
+    by_product = cube.slice(product_type="leasing")
+    assert len(by_product) == 1
+    assert by_product.iloc[0]["region"] == ALL
+    assert by_product.iloc[0][GROUPING_ID] == 2
+
+
+def test_grand_total_matches_engine():
+    df = _tape()
+    total = build_kpi_cube(df, DIMENSIONS).slice().iloc[0]
+    assert total["rows"] == len(df)
+    metrics = KPIEngineV2(df).calculate_all()
+    for name in ("PAR30", "PAR90", "CollectionRate"):
+        assert total[name] == pytest.approx(metrics[name]["value"], rel=1e-12)
+
+
+def test_rollup_sets_and_parquet_round_trip(tmp_path):
+    df = _tape()
+    cube = build_kpi_cube(df, DIMENSIONS, grouping_sets=rollup_grouping_sets(DIMENSIONS))
+    assert sorted(cube.frame[GROUPING_ID].unique()) == [0, 2, 3]
+    with pytest.raises(KeyError):
+        cube.slice(kam="x")
+
+    restored = read_kpi_cube(cube.to_parquet(tmp_path / "cube.parquet"), DIMENSIONS)
+    assert restored.kpis == cube.kpis
+    pd.testing.assert_frame_equal(restored.frame, cube.frame)
+
+
+def test_calculation_builds_cube_for_present_dimensions(minimal_config):
+    minimal_config["pipeline"]["phases"]["calculation"] = {
+        "metrics": [{"name": "PAR90", "function": "src.kpis.par_90.calculate_par_90"}],
+        "cube": {"enabled": True, "dimensions": ["product_type", "kam"]},
+    }
+    calculator = UnifiedCalculationV2(minimal_config)
+    result = calculator.calculate(_tape())
+    assert list(result.cube.columns[:2]) == ["product_type", GROUPING_ID]
+    assert len(result.cube) == 4
+    events = [e for e in calculator.audit_log if e["event"] == "kpi_cube"]
+    assert [e["status"] for e in events] == ["partial", "success"]
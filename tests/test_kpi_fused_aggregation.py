@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.kpi_engine_v2 import KPIEngineV2
+from src.kpis.base import AggregateSpec, compute_aggregates, safe_numeric
+from src.kpis.par_30 import calculate_par_30
+
+COLUMNS = [
+    "dpd_30_60_usd",
+    "dpd_60_90_usd",
+    "dpd_90_plus_usd",
+    "total_receivable_usd",
+    "cash_available_usd",
+    "total_eligible_usd",
+]
+
+
+def _frame(n: int = 5003) -> pd.DataFrame:
+    rng = np.random.default_rng(11)
+    df = pd.DataFrame({c: rng.uniform(0, 1e6, n) for c in COLUMNS})
+    df.loc[::9, "dpd_60_90_usd"] = np.nan
+    df["cash_available_usd"] = df["cash_available_usd"].astype(int)
+    df["total_eligible_usd"] = df["total_eligible_usd"].astype(object)
+    df.loc[[2, 4], "total_eligible_usd"] = ["$1,000", None]
+    return df
+
+
+def _without_timestamp(metrics):
+    return {k: {f: v for f, v in ctx.items() if f != "timestamp"} for k, ctx in metrics.items()}
+
+
+def test_aggregates_match_safe_numeric():
+    df = _frame()
+    spec = AggregateSpec(sums=tuple(COLUMNS) + ("missing",), null_counts=tuple(COLUMNS))
+    aggs = compute_aggregates(df, spec)
+    for col in COLUMNS:
+        assert aggs.sum(col) == safe_numeric(df[col]).sum()
+        assert aggs.nulls(col) == df[col].isnull().sum()
+    assert aggs.sum("missing") == 0.0
+    assert not aggs.has("missing")
+
+
+def test_union_keeps_first_seen_order():
+    spec = AggregateSpec.union(
+        [AggregateSpec(sums=("a", "b")), AggregateSpec(sums=("b", "c"), null_counts=("a",))]
+    )
+    assert spec.sums == ("a", "b", "c")
+    assert spec.null_counts == ("a",)
+
+
+@pytest.mark.parametrize(
+    "df",
+    [
+        _frame(),
+        _frame().iloc[:0],
+        _frame().drop(columns=["dpd_30_60_usd"]).assign(loan_status="60-89 days past due"),
+    ],
+    ids=["full", "empty", "status_fallback"],
+)
+def test_fused_calculate_all_matches_individual_calls(df):
+    engine = KPIEngineV2(df)
+    fused = _without_timestamp(engine.calculate_all(include_composite=False))
+    individual = {}
+    for name, method in [
+        ("PAR30", engine.calculate_par_30),
+        ("PAR90", engine.calculate_par_90),
+        ("CollectionRate", engine.calculate_collection_rate),
+    ]:
+        value, context = method()
+        individual[name] = {"value": float(value), **context}
+    individual = _without_timestamp(individual)
+    assert fused == individual
+
+
+def test_overridden_kpi_function_bypasses_fused_path(monkeypatch):
+    monkeypatch.setitem(KPIEngineV2.KPI_FUNCTIONS, "PAR30", lambda df: (1.0, {"custom": True}))
+    metrics = KPIEngineV2(_frame()).calculate_all(include_composite=False)
+    assert metrics["PAR30"]["value"] == 1.0
+    assert metrics["PAR30"]["custom"] is True
+
+
+def test_missing_columns_still_raise_for_par30():
+    with pytest.raises(ValueError):
+        calculate_par_30(pd.DataFrame({"total_receivable_usd": [1.0]}))
+    metrics = KPIEngineV2(pd.DataFrame({"total_receivable_usd": [1.0]})).calculate_all()
+    assert metrics["PAR30"]["value"] is None
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+from src.pipeline.kpi_calculation import UnifiedCalculationV2
+from src.pipeline.kpi_history import (KPIHistory, change_anomalies,
+                                      classify_statuses,
+                                      detect_rolling_anomalies)
+
+BANDS = {
+    "PAR30": (("ok", 0.0, 5.0), ("warning", 5.0, 10.0), ("critical", 10.0, 100.0)),
+    "CollectionRate": (("ok", 95.0, 100.0), ("critical", 0.0, 85.0)),
+}
+
+
+def test_classify_statuses_first_matching_band():
+    values = pd.DataFrame(
+        {"PAR30": [1.0, 5.0, 50.0, np.nan], "CollectionRate": [99.0, 90.0, 10.0, 96.0]}
+    )
+    values["Other"] = 1.0
+    statuses = classify_statuses(values, BANDS)
+    assert statuses["PAR30"].tolist() == ["ok", "ok", "critical", "unknown"]
+    assert statuses["CollectionRate"].tolist() == ["ok", "unknown", "critical", "ok"]
+    assert set(statuses["Other"]) == {"unknown"}
+
+
+def test_rolling_anomalies_use_zscore_and_report_short_history():
+    rng = np.random.default_rng(0)
+    history = pd.DataFrame(
+        {"PAR30": 4.0 + rng.normal(0, 0.1, 30), "PAR90": [1.0, 1.1] + [np.nan] * 28}
+    )
+    current = pd.Series({"PAR30": 6.0, "PAR90": 5.0})
+    report = detect_rolling_anomalies(history, current, window=20, min_runs=5)
+    assert set(report.anomalies) == {"PAR30"}
+    assert report.anomalies["PAR30"]["method"] == "rolling_zscore"
+    assert report.anomalies["PAR30"]["runs"] == 20
+    assert report.insufficient == ["PAR90"]
+
+    # A value inside the normal spread is not an anomaly, even if it moved >20%
+    calm = detect_rolling_anomalies(history, pd.Series({"PAR30": 4.05}), min_runs=5)
+    assert calm.anomalies == {}
+
+
+def test_change_rule_matches_legacy_semantics():
+    previous = pd.Series({"a": 10.0, "b": 0.0, "c": 10.0})
+    current = pd.Series({"a": 13.0, "b": 5.0, "c": 10.5, "d": 1.0})
+    assert change_anomalies(previous, current, 0.2) == {
+        "a": {"previous": 10.0, "current": 13.0, "change_pct": 0.3}
+    }
+
+
+def test_history_round_trip_and_retention(tmp_path):
+    history = KPIHistory(tmp_path / "history.parquet", max_runs=3)
+    for i in range(5):
+        metrics = {"PAR30": {"value": float(i), "status": "ok"}}
+        history.append(f"run{i}", metrics, f"2025-01-0{i + 1}")
+    history.append("run4", {"PAR30": {"value": 40.0, "status": "critical"}}, "2025-01-05")
+    wide = history.values()
+    assert list(wide.index) == ["run2", "run3", "run4"]
+    assert wide["PAR30"].tolist() == [2.0, 3.0, 40.0]
+    assert list(history.values(last_n=1, exclude_run="run4").index) == ["run3"]
+
+
+def test_calculation_persists_history_and_flags_anomalies(tmp_path, minimal_config):
+    minimal_config["pipeline"]["phases"]["calculation"] = {
+        "metrics": [{"name": "PAR90", "function": "src.kpis.par_90.calculate_par_90"}],
+        "anomaly_detection": {
+            "enabled": True,
+            "history": {"enabled": True, "path": str(tmp_path / "h.parquet"), "min_runs": 3},
+        },
+    }
+    results = []
+    for i, dpd in enumerate([5.0, 5.1, 4.9, 5.0, 5.05, 30.0]):
+        calculator = UnifiedCalculationV2(minimal_config, run_id=f"run{i}")
+        df = pd.DataFrame({"dpd_90_plus_usd": [dpd], "total_receivable_usd": [100.0]})
+        results.append(calculator.calculate(df))
+
+    assert all(r.anomalies == {} for r in results[:5])
+    assert results[-1].anomalies["PAR90"]["method"] == "rolling_zscore"
+    assert len(KPIHistory(tmp_path / "h.parquet").values()) == 6
+    assert results[0].metrics["PAR90"]["status"] == "unknown"
+
+
+def test_calculation_assigns_statuses_from_definitions(minimal_config):
+    minimal_config["pipeline"]["phases"]["calculation"] = {
+        "metrics": [{"name": "PAR30", "function": "src.kpis.par_30.calculate_par_30"}]
+    }
+    df = pd.DataFrame(
+        {
+            "dpd_30_60_usd": [1.0],
+            "dpd_60_90_usd": [1.0],
+            "dpd_90_plus_usd": [0.0],
+            "total_receivable_usd": [100.0],
+        }
+    )
+    result = UnifiedCalculationV2(minimal_config).calculate(df)
+    assert result.metrics["PAR30"]["status"] == "ok"
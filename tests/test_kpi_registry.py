@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+
+from src.abaco_pipeline.kpi.builtins import noop_kpi
+from src.abaco_pipeline.kpi.registry import KPIRegistry
+from src.kpis import registry as registry_module
+from src.kpis.par_30 import calculate_par_30
+from src.kpis.registry import KPIFunctionRegistry
+from src.pipeline.kpi_calculation import UnifiedCalculationV2
+
+DEFINITIONS = {
+    "kpis": {
+        "PAR30": {"display_name": "PAR 30+", "thresholds": {"ok": [0, 5], "critical": [5, 100]}},
+        "Custom": {"function": "src.kpis.par_90.calculate_par_90"},
+    }
+}
+
+
+def test_paths_resolved_once_and_cached(monkeypatch):
+    calls = []
+    original = registry_module.import_function
+
+    def counting_import(path):
+        calls.append(path)
+        return original(path)
+
+    monkeypatch.setattr(registry_module, "import_function", counting_import)
+    metrics = [{"name": "PAR30", "function": "src.kpis.par_30.calculate_par_30"}]
+    registry = KPIFunctionRegistry.from_config(metrics, DEFINITIONS)
+    for _ in range(5):
+        entry = registry.resolve(metrics[0])
+    assert entry.func is calculate_par_30
+    assert calls == ["src.kpis.par_30.calculate_par_30", "src.kpis.par_90.calculate_par_90"]
+    assert registry.names() == ["Custom", "PAR30"]
+    assert entry.status(3.0) == "ok"
+    assert entry.status(50.0) == "critical"
+    assert entry.status(-1.0) == "unknown"
+
+
+def test_bad_paths_and_signatures_are_recorded():
+    metrics = [
+        {"name": "Missing", "function": "src.kpis.nope.calculate"},
+        {"name": "PortfolioHealth", "function": "src.kpis.par_30.calculate_par_30"},
+        {"name": "Unknown"},
+    ]
+    registry = KPIFunctionRegistry.from_config(metrics)
+    assert set(registry.errors) == {"Missing", "PortfolioHealth", "Unknown"}
+    assert "positional" in registry.errors["PortfolioHealth"]
+    with pytest.raises(ValueError, match="Unknown"):
+        registry.get("Unknown").require()
+    with pytest.raises(ValueError):
+        KPIFunctionRegistry.from_config(metrics, strict=True)
+
+
+def test_calculation_uses_registry_for_engine_fallback(minimal_config):
+    minimal_config["pipeline"]["phases"]["calculation"] = {"metrics": [{"name": "PAR90"}]}
+    calculator = UnifiedCalculationV2(minimal_config)
+    assert calculator.kpi_registry.get("PAR90").source == "engine"
+    df = pd.DataFrame({"dpd_90_plus_usd": [5.0], "total_receivable_usd": [100.0]})
+    result = calculator._compute_metric(df, {"name": "PAR90"})
+    assert result["value"] == 5.0
+    assert result["source"] == "KPIEngineV2"
+    with pytest.raises(ValueError, match="engine fallback failed"):
+        calculator._compute_metric(df, {"name": "NotAKPI"})
+
+
+def test_pipeline_registry_facade():
+    registry = KPIRegistry.from_config()
+    assert {"PAR30", "PAR90", "CollectionRate", "PortfolioHealth"} <= set(registry.list())
+    assert registry.get("PAR30") is calculate_par_30
+    assert registry.status("PAR30", 2.0) == "ok"
+    registry.register("noop", noop_kpi)
+    assert registry.get("noop") is noop_kpi
+    with pytest.raises(KeyError):
+        registry.get("nope")
+    with pytest.raises(ValueError):
+        registry.register("", noop_kpi)
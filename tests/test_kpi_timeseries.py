@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.kpis.base import AggregateSpec, compute_grouped_aggregates
+from src.pipeline.kpi_calculation import UnifiedCalculationV2
+
+METRICS = [
+    {"name": "PAR30", "function": "src.kpis.par_30.calculate_par_30"},
+    {"name": "PAR90", "function": "src.kpis.par_90.calculate_par_90"},
+    {"name": "CollectionRate", "function": "src.kpis.collection_rate.calculate_collection_rate"},
+    {"name": "PortfolioHealth", "function": "src.kpis.portfolio_health.calculate_portfolio_health"},
+]
+
+
+def _frame(n: int = 3000) -> pd.DataFrame:
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame(
+        {
+            "measurement_date": pd.Timestamp("2025-01-01")
+            + pd.to_timedelta(rng.integers(0, 90 * 24, n), unit="h"),
+            "dpd_30_60_usd": rng.uniform(0, 1e4, n),
+            "dpd_60_90_usd": rng.uniform(0, 1e4, n),
+            "dpd_90_plus_usd": rng.uniform(0, 1e4, n),
+            "total_receivable_usd": rng.uniform(1e4, 1e5, n),
+            "cash_available_usd": rng.uniform(0, 1e5, n),
+            "total_eligible_usd": rng.uniform(1e4, 1e5, n),
+        }
+    )
+    # Leave a gap of empty days and a few unparseable timestamps
+    df = df[~df["measurement_date"].dt.day.isin([10, 11])].copy()
+    df.loc[df.index[::97], "measurement_date"] = None
+    return df
+
+
+def _calculator(minimal_config, rollups=("daily", "weekly", "monthly")):
+    minimal_config["pipeline"]["phases"]["calculation"] = {
+        "timeseries": {
+            "enabled": True,
+            "time_column": "measurement_date",
+            "rollups": list(rollups),
+        }
+    }
+    return UnifiedCalculationV2(minimal_config)
+
+
+def _per_period_reference(calculator, df, metrics, freq):
+    df = df.dropna(subset=["measurement_date"])
+    rows = []
+    for period, group in df.groupby(pd.Grouper(key="measurement_date", freq=freq)):
+        row = {"period_start": period}
+        for metric in metrics:
+            if metric["name"] != "PortfolioHealth":
+                row[metric["name"]] = calculator._compute_metric(group, metric)["value"]
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+@pytest.mark.parametrize("rollup,freq", [("daily", "D"), ("weekly", "W"), ("monthly", "M")])
+def test_grouped_rollups_match_per_period_slices(minimal_config, rollup, freq):
+    calculator = _calculator(minimal_config)
+    df = _frame()
+    result = calculator._compute_timeseries(df, METRICS)[rollup]
+    expected = _per_period_reference(calculator, df, METRICS, freq)
+    pd.testing.assert_frame_equal(result, expected, check_exact=False, rtol=1e-10)
+
+
+def test_empty_days_evaluate_as_empty_periods(minimal_config):
+    calculator = _calculator(minimal_config, ["daily"])
+    result = calculator._compute_timeseries(_frame(), METRICS)["daily"]
+    gap = result[result["period_start"] == pd.Timestamp("2025-01-10")]
+    assert gap[["PAR30", "PAR90", "CollectionRate"]].iloc[0].tolist() == [0.0, 0.0, 0.0]
+
+
+def test_status_fallback_and_custom_metrics_use_period_slices(minimal_config):
+    calculator = _calculator(minimal_config, ["weekly"])
+    df = _frame().drop(columns=["dpd_30_60_usd"])
+    df["loan_status"] = np.where(np.arange(len(df)) % 4 == 0, "60-89 days past due", "current")
+    metrics = METRICS[:3] + [{"name": "PortfolioYield", "function": "src.kpis.missing.nope"}]
+    result = calculator._compute_timeseries(df, metrics)["weekly"]
+    expected = _per_period_reference(calculator, df, METRICS[:3], "W")
+    pd.testing.assert_frame_equal(result[expected.columns], expected, check_exact=False)
+    assert result["PortfolioYield"].isna().all()
+    assert any(e["event"] == "timeseries_metric_failed" for e in calculator.audit_log)
+
+
+def test_no_valid_timestamps_returns_empty_frames(minimal_config):
+    df = _frame()
+    df["measurement_date"] = None
+    result = _calculator(minimal_config)._compute_timeseries(df, METRICS)
+    assert set(result) == {"daily", "weekly", "monthly"}
+    assert all(frame.empty for frame in result.values())
+
+
+def test_grouped_partials_are_additive():
+    df = _frame().dropna(subset=["measurement_date"])
+    spec = AggregateSpec(sums=("cash_available_usd",), null_counts=("cash_available_usd",))
+    daily = compute_grouped_aggregates(df, spec, df["measurement_date"].dt.floor("D"))
+    assert daily["rows"].sum() == len(df)
+    assert daily["sum:cash_available_usd"].sum() == pytest.approx(df["cash_available_usd"].sum())
+    assert daily["nulls:cash_available_usd"].sum() == 0
@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+
+from src.pipeline.data_transformation import UnifiedTransformation
+from src.pipeline.kpi_calculation import UnifiedCalculationV2
+from src.pipeline.lineage import LineageSink, read_lineage
+
+
+def _event(i: int, stage_key: str = "event") -> dict:
+    return {"run_id": "r1", stage_key: f"e{i}", "status": "ok", "timestamp": "t", "n": i}
+
+
+def test_batches_are_flushed_and_ring_is_bounded(tmp_path):
+    sink = LineageSink(tmp_path, "r1", batch_size=3, ring_size=2)
+    for i in range(4):
+        sink.record("ingestion", _event(i))
+    # One full batch on disk, one event still buffered
+    assert len(read_lineage(sink.path)) == 3
+    sink.close()
+    assert len(read_lineage(sink.path)) == 4
+    summary = sink.summary()
+    assert summary["total_events"] == 4
+    assert [e["event"] for e in summary["recent"]] == ["e2", "e3"]
+
+
+def test_query_by_stage_and_event(tmp_path):
+    sink = LineageSink(tmp_path, "r1")
+    sink.record("ingestion", _event(1))
+    sink.record("transformation", _event(2, stage_key="step"))
+    sink.record("transformation", _event(3, stage_key="step"))
+    assert [e["n"] for e in sink.query(stage="transformation")] == [2, 3]
+    assert [e["n"] for e in sink.query(event="e3")] == [3]
+    sink.close()
+    assert sink.summary()["events_by_stage"] == {"ingestion": 1, "transformation": 2}
+
+
+def test_parquet_format_round_trips(tmp_path):
+    sink = LineageSink(tmp_path, "r1", fmt="parquet", batch_size=2)
+    for i in range(5):
+        sink.record("calculation", _event(i))
+    sink.close()
+    events = read_lineage(sink.path, stage="calculation")
+    assert [e["n"] for e in events] == list(range(5))
+    assert events[0]["event"] == "e0"
+    with pytest.raises(ValueError):
+        LineageSink(tmp_path, "r1", fmt="csv")
+
+
+def test_parquet_query_while_open_returns_flushed_events(tmp_path):
+    sink = LineageSink(tmp_path, "r1", fmt="parquet", batch_size=2, ring_size=2)
+    for i in range(5):
+        sink.record("calculation", _event(i))
+    assert [e["n"] for e in sink.query()] == list(range(5))
+
+    for i in range(5, 8):
+        sink.record("calculation", _event(i))
+    assert [e["n"] for e in sink.query(event="e6")] == [6]
+    sink.record("calculation", _event(8))
+    sink.close()
+    assert [e["n"] for e in read_lineage(sink.path)] == list(range(9))
+
+
+def test_components_stream_to_sink(tmp_path, minimal_config):
+    sink = LineageSink(tmp_path, "r1", ring_size=3)
+    transformer = UnifiedTransformation(minimal_config)
+    transformer._log_step("pre_attach", "ok")
+    transformer.attach_lineage_sink(sink)
+    result = transformer.transform(pd.DataFrame({"total_receivable_usd": [1.0, 2.0]}))
+
+    calculator = UnifiedCalculationV2(minimal_config)
+    calculator.attach_lineage_sink(sink)
+    calculator._log_event("start", "initiated")
+    sink.close()
+
+    persisted = read_lineage(sink.path, stage="transformation")
+    assert persisted[0]["step"] == "pre_attach"
+    assert len(persisted) > 3
+    assert len(result.lineage) == 3
+    assert isinstance(result.lineage, list)
+    assert read_lineage(sink.path, stage="calculation")[0]["event"] == "start"
@@ -0,0 +1,162 @@
+import json
+
+import pandas as pd
+import pytest
+
+from src.pipeline.manifest_catalog import CATALOG_FILE, ManifestCatalog
+from src.pipeline.output import UnifiedOutput
+
+
+def _write_manifest(root, run_id, generated_at, **extra):
+    path = root / run_id / f"{run_id}_manifest.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"run_id": run_id, "generated_at": generated_at, **extra}))
+    return path
+
+
+def test_lookups_refresh_incrementally_on_version_change(tmp_path):
+    writer = ManifestCatalog(tmp_path)
+    reader = ManifestCatalog(tmp_path)
+    assert reader.latest() is None and reader.version is None
+
+    writer.append("run_1", "2025-01-01T08:00:00+00:00", _write_manifest(tmp_path, "run_1", "x"))
+    writer.append("run_2", "2025-01-01T09:00:00+00:00", _write_manifest(tmp_path, "run_2", "y"))
+    writer.append(
+        "cli_1", "2025-01-02T09:00:00+00:00", tmp_path / "cli_1" / "manifest.json", "abaco_pipeline"
+    )
+
+    assert reader.latest().run_id == "run_2"
+    assert reader.latest("abaco_pipeline").run_id == "cli_1"
+    assert [e.run_id for e in reader.on_date("2025-01-01")] == ["run_1", "run_2"]
+    assert reader.get("run_1").manifest_path == "run_1/run_1_manifest.json"
+
+    offset = reader._offset
+    # A half-written line is left for the next refresh
+    with open(tmp_path / CATALOG_FILE, "ab") as handle:
+        handle.write(b'{"generated_at": "2025-01-03T00:00:00+00:00", "kind": "pipeline", ')
+    assert reader.latest().run_id == "run_2"
+    assert reader._offset == offset
+    with open(tmp_path / CATALOG_FILE, "ab") as handle:
+        handle.write(b'"manifest_path": "run_1/run_1_manifest.json", "run_id": "run_1"}\n')
+
+    # Re-running run_1 moves it to its new date and makes it the latest run
+    assert reader.latest().run_id == "run_1"
+    assert [e.run_id for e in reader.on_date("2025-01-01")] == ["run_2"]
+    assert reader.get("run_1").date == "2025-01-03"
+
+
+def test_manifests_are_cached_per_entry(tmp_path):
+    catalog = ManifestCatalog(tmp_path)
+    entry = catalog.append("run_1", "2025-01-01", _write_manifest(tmp_path, "run_1", "x", v=1))
+    assert catalog.load_manifest(entry)["v"] == 1
+
+    _write_manifest(tmp_path, "run_1", "x", v=2)
+    assert catalog.load_manifest(entry)["v"] == 1
+    newer = catalog.append("run_1", "2025-01-02", tmp_path / "run_1" / "run_1_manifest.json")
+    assert catalog.load_manifest(catalog.get("run_1"))["v"] == 2
+    assert catalog.get("run_1") == newer
+
+    (tmp_path / "bad.json").write_text("[1]")
+    bad = catalog.append("bad", "2025-01-02", tmp_path / "bad.json")
+    with pytest.raises(ValueError, match="not an object"):
+        catalog.load_manifest(bad)
+
+
+def test_backfill_merges_legacy_manifests_once(tmp_path):
+    _write_manifest(tmp_path, "run_1", "2025-01-01T00:00:00+00:00")
+    _write_manifest(tmp_path, "run_2", "2025-01-02T00:00:00+00:00")
+    (tmp_path / "broken").mkdir()
+    (tmp_path / "broken" / "broken_manifest.json").write_text("{")
+
+    catalog = ManifestCatalog(tmp_path)
+    catalog.append("newer", "2025-02-01T00:00:00+00:00", tmp_path / "newer.json")
+    assert catalog.backfill() == 2
+    # Entries appended before the merge are kept and stay the latest run
+    assert catalog.latest().run_id == "newer"
+    assert sorted(catalog._by_run) == ["newer", "run_1", "run_2"]
+    assert [e.run_id for e in catalog.on_date("2025-01-02")] == ["run_2"]
+
+    _write_manifest(tmp_path, "run_3", "2025-01-03T00:00:00+00:00")
+    assert ManifestCatalog(tmp_path).backfill() == 0
+    assert ManifestCatalog(tmp_path).get("run_3") is None
+
+
+def test_persist_appends_catalog_entry(tmp_path):
+    config = {
+        "pipeline": {
+            "phases": {
+                "outputs": {
+                    "storage": {"local_dir": str(tmp_path), "manifest_dir": str(tmp_path)},
+                    "formats": ["json"],
+                }
+            }
+        }
+    }
+    result = UnifiedOutput(config).persist(
+        pd.DataFrame({"a": [1]}), {"par_30": {"value": 0.1}}, {}, {"pipeline": "run_x"}
+    )
+    entry = ManifestCatalog(tmp_path).latest()
+    assert entry.run_id == "run_x"
+    assert entry.generated_at == result.manifest["generated_at"]
+    assert entry.manifest_path == "run_x/run_x_manifest.json"
+
+
+def test_api_serves_latest_run_and_date_lookups(tmp_path, monkeypatch):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    import apps.analytics.api.main as api
+
+    _write_manifest(tmp_path, "run_1", "2025-01-01T08:00:00+00:00", metrics={"par_30": 1})
+    monkeypatch.setattr(api, "ARTIFACTS_DIR", tmp_path)
+    client = TestClient(api.app)
+
+    latest = client.get("/api/kpis/latest").json()
+    assert latest["run_id"] == "run_1" and latest["metrics"] == {"par_30": 1}
+
+    ManifestCatalog(tmp_path).append(
+        "run_2",
+        "2025-01-01T09:00:00+00:00",
+        _write_manifest(tmp_path, "run_2", "2025-01-01T09:00:00+00:00", metrics={"par_30": 2}),
+    )
+    assert client.get("/api/kpis/latest").json()["metrics"] == {"par_30": 2}
+    assert client.get("/api/runs/run_1").json()["manifest"]["metrics"] == {"par_30": 1}
+    assert client.get("/api/runs/missing").status_code == 404
+    section = client.get("/api/runs/run_2", params={"section": "metrics"}).json()
+    assert section["value"] == {"par_30": 2}
+    assert client.get("/api/runs/run_2", params={"section": "nope"}).status_code == 404
+    runs = client.get("/api/runs", params={"date": "2025-01-01"}).json()["runs"]
+    assert [run["run_id"] for run in runs] == ["run_1", "run_2"]
+    assert client.get("/api/runs", params={"date": "01/01/2025"}).status_code == 400
+
+
+def test_api_indexes_runs_older_than_a_catalog_created_by_persist(tmp_path, monkeypatch):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    import apps.analytics.api.main as api
+
+    # Written before the catalog existed
+    _write_manifest(tmp_path, "run_old", "2024-12-31T08:00:00+00:00", metrics={"par_30": 1})
+    config = {
+        "pipeline": {
+            "phases": {
+                "outputs": {
+                    "storage": {"local_dir": str(tmp_path), "manifest_dir": str(tmp_path)},
+                    "formats": ["json"],
+                }
+            }
+        }
+    }
+    UnifiedOutput(config).persist(
+        pd.DataFrame({"a": [1]}), {"par_30": {"value": 0.1}}, {}, {"pipeline": "run_new"}
+    )
+    assert (tmp_path / CATALOG_FILE).exists()
+
+    monkeypatch.setattr(api, "ARTIFACTS_DIR", tmp_path)
+    monkeypatch.setattr(api, "_catalog", None)
+    client = TestClient(api.app)
+    assert client.get("/api/runs/run_old").json()["manifest"]["metrics"] == {"par_30": 1}
+    runs = client.get("/api/runs", params={"date": "2024-12-31"}).json()["runs"]
+    assert [run["run_id"] for run in runs] == ["run_old"]
+    assert client.get("/api/kpis/latest").json()["run_id"] == "run_new"
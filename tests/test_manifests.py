@@ -0,0 +1,102 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.pipeline.manifests import BODY_SUFFIX, read_manifest, write_manifest
+from src.pipeline.output import UnifiedOutput
+from src.pipeline.utils import hash_file, json_dumps, json_loads
+
+
+def _manifest():
+    return {
+        "run_id": "run_1",
+        "generated_at": "2025-01-01T00:00:00+00:00",
+        "metrics": {"par_30": {"value": 0.1}},
+        "metadata": {
+            "calculation_audit": [{"step": i, "detail": "x" * 50} for i in range(200)],
+            "anomalies": {"par_30": {"change": 0.3}},
+            "context": {"user": "pipeline"},
+        },
+        "quality_checks": {"no_nulls": True},
+    }
+
+
+def test_split_manifest_loads_body_sections_lazily(tmp_path):
+    path = tmp_path / "run_1_manifest.json"
+    hashes = write_manifest(path, _manifest())
+
+    assert hashes["body"] == hash_file(path.with_suffix(BODY_SUFFIX))
+    assert hashes["manifest"] == hash_file(path)
+    header = json.loads(path.read_text())
+    assert "metadata" not in header
+    assert path.stat().st_size < path.with_suffix(BODY_SUFFIX).stat().st_size / 10
+
+    manifest = read_manifest(path)
+    assert manifest["metrics"] == {"par_30": {"value": 0.1}}
+    assert manifest.sections == [
+        "metadata.calculation_audit",
+        "metadata.anomalies",
+        "metadata.context",
+    ]
+    assert manifest.section("metadata.anomalies") == {"par_30": {"change": 0.3}}
+    assert list(manifest._sections) == ["metadata.anomalies"]
+    assert manifest["metadata"]["context"] == {"user": "pipeline"}
+    assert manifest.to_dict() == _manifest()
+    assert "body" not in manifest and len(manifest) == 5
+    with pytest.raises(KeyError):
+        manifest.section("metadata.missing")
+
+
+def test_legacy_manifests_read_through_the_same_interface(tmp_path):
+    path = tmp_path / "old_manifest.json"
+    path.write_text(json.dumps(_manifest(), indent=2))
+
+    manifest = read_manifest(path)
+    assert manifest.sections == []
+    assert manifest.get("metadata")["context"] == {"user": "pipeline"}
+    assert manifest.to_dict() == _manifest()
+
+    path.write_text("[]")
+    with pytest.raises(ValueError, match="not an object"):
+        read_manifest(path)
+
+
+def test_json_dumps_handles_numpy_and_unknown_types():
+    payload = {
+        "count": np.int64(3),
+        "values": np.array([0.5, 1.5]),
+        1: pd.Timestamp("2025-01-01"),
+        "missing": float("nan"),
+    }
+    assert json_loads(json_dumps(payload)) == {
+        "count": 3,
+        "values": [0.5, 1.5],
+        "1": "2025-01-01 00:00:00",
+        "missing": None,
+    }
+    assert json_loads(json_dumps({"big": 2**70}, indent=True)) == {"big": 2**70}
+
+
+def test_persist_writes_split_manifest(tmp_path):
+    config = {
+        "pipeline": {
+            "phases": {
+                "outputs": {
+                    "storage": {"local_dir": str(tmp_path), "manifest_dir": str(tmp_path)},
+                    "formats": ["json"],
+                }
+            }
+        }
+    }
+    result = UnifiedOutput(config).persist(
+        pd.DataFrame({"a": [1]}),
+        {"par_30": {"value": 0.1}},
+        {"lineage": {"steps": ["clean"]}},
+        {"pipeline": "run_x"},
+    )
+
+    manifest = read_manifest(result.manifest_path)
+    assert manifest.sections == ["metadata.lineage"]
+    assert manifest.to_dict() == json.loads(json.dumps(result.manifest))
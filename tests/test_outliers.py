@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.pipeline.data_transformation import UnifiedTransformation
+from src.pipeline.kpi_calculation import UnifiedCalculationV2
+from src.pipeline.outliers import detect_outliers
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "balance": [10.0, 11.0, 12.0, 13.0, 14.0, 500.0],
+            "constant": [1.0] * 6,
+            "empty": [np.nan] * 6,
+            "label": list("abcdef"),
+        }
+    )
+
+
+def test_zscore_matches_legacy_loop():
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({"x": np.append(rng.normal(size=500), [25.0, -30.0])})
+    series = df["x"]
+    legacy = int((((series - series.mean()) / series.std()).abs() > 4.0).sum())
+    report = detect_outliers(df, zscore_threshold=4.0)
+    assert report.counts.at["x", "zscore"] == legacy == 2
+
+
+def test_all_methods_reported_and_degenerate_columns_ignored():
+    report = detect_outliers(_frame(), method="iqr")
+    assert list(report.counts.index) == ["balance", "constant", "empty"]
+    assert report.counts.at["balance", "iqr"] == 1
+    assert report.counts.at["balance", "mad"] == 1
+    assert report.counts.loc[["constant", "empty"]].to_numpy().sum() == 0
+    assert report.masks["balance"].tolist() == [False] * 5 + [True]
+    assert set(report.summary()) == {"balance"}
+
+
+def test_clip_winsorizes_in_place():
+    df = _frame()
+    frame_id = id(df)
+    report = detect_outliers(df, method="iqr", clip=True)
+    upper = report.stats.at["balance", "upper"]
+    assert id(df) == frame_id
+    assert df["balance"].max() == pytest.approx(upper)
+    assert report.clipped == ["balance"]
+    assert df["constant"].tolist() == [1.0] * 6
+
+
+def test_unknown_method_rejected():
+    with pytest.raises(ValueError):
+        detect_outliers(_frame(), method="dbscan")
+
+
+def test_transformation_exposes_masks_and_honors_clip(minimal_config):
+    minimal_config["pipeline"]["phases"]["transformation"]["outlier_detection"] = {
+        "enabled": True,
+        "method": "iqr",
+        "clip": True,
+    }
+    result = UnifiedTransformation(minimal_config).transform(_frame())
+    assert result.outlier_masks is not None
+    assert result.outlier_masks["balance"].sum() == 1
+    assert result.df["balance"].max() < 500.0
+    step = next(s for s in result.lineage if s.get("step") == "outlier_detection")
+    assert step["status"] == "flagged"
+
+
+def test_calculation_excludes_flagged_rows(minimal_config):
+    minimal_config["pipeline"]["phases"].setdefault("calculation", {})["exclude_outliers"] = [
+        "balance"
+    ]
+    calculator = UnifiedCalculationV2(minimal_config)
+    df = _frame()
+    masks = detect_outliers(df, method="iqr").masks
+    kept = calculator._exclude_outliers(df, masks)
+    assert len(kept) == 5
+    assert calculator.audit_log[-1]["event"] == "outlier_exclusion"
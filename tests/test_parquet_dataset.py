@@ -0,0 +1,99 @@
+import pandas as pd
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.pipeline.output import UnifiedOutput
+from src.pipeline.parquet_dataset import PartitionedParquetDataset
+from src.pipeline.utils import hash_file
+
+
+def _frame(days=("2025-01-31", "2025-02-28"), loans=100) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "loan_id": [f"L{i:03d}" for i in range(loans)] * len(days),
+            "measurement_date": [day for day in days for _ in range(loans)],
+            "outstanding": [float(i) for i in range(loans)] * len(days),
+            "product": ["a", "b"] * (loans * len(days) // 2),
+        }
+    )
+
+
+def test_append_writes_hive_partitions_with_streamed_hashes(tmp_path):
+    dataset = PartitionedParquetDataset(tmp_path, row_group_size=25, sort_by=["loan_id"])
+    result = dataset.append(_frame(), "run_1")
+
+    assert result.partitions == [
+        "measurement_date=2025-01-31/run_id=run_1",
+        "measurement_date=2025-02-28/run_id=run_1",
+    ]
+    for name, digest in result.files.items():
+        assert hash_file(tmp_path / name) == digest
+    metadata = pq.ParquetFile(tmp_path / next(iter(result.files))).metadata
+    assert metadata.num_row_groups == 4
+    assert metadata.row_group(0).column(0).compression == "ZSTD"
+    assert metadata.row_group(0).column(0).statistics.max == "L024"
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_append_handles_duplicate_index_labels(tmp_path):
+    frame = _frame(loans=4)
+    # Concatenated tapes keep their own 0..n-1 index
+    frame.index = [0, 1, 2, 3] * 2
+    dataset = PartitionedParquetDataset(tmp_path, sort_by=["loan_id"])
+    result = dataset.append(frame, "run_1")
+
+    assert result.rows == 8
+    read = dataset.read().sort_values(["measurement_date", "loan_id"], ignore_index=True)
+    expected = frame.sort_values(["measurement_date", "loan_id"], ignore_index=True)
+    pd.testing.assert_frame_equal(
+        read[["loan_id", "measurement_date", "outstanding"]].astype({"measurement_date": str}),
+        expected[["loan_id", "measurement_date", "outstanding"]],
+    )
+    unsorted = PartitionedParquetDataset(tmp_path / "unsorted").append(frame, "run_1")
+    assert unsorted.partitions == result.partitions
+
+
+def test_reads_prune_partitions_and_push_down_predicates(tmp_path):
+    dataset = PartitionedParquetDataset(tmp_path, row_group_size=25, sort_by=["loan_id"])
+    dataset.append(_frame(), "run_1")
+    dataset.append(_frame(days=("2025-02-28",)).assign(extra=1), "run_2")
+
+    pruned = dataset.dataset().get_fragments(filter=ds.field("run_id") == "run_2")
+    assert len(list(pruned)) == 1
+    latest = dataset.read(filters=[("measurement_date", "=", "2025-02-28")])
+    assert sorted(latest["run_id"].unique()) == ["run_1", "run_2"]
+    assert latest["extra"].isna().sum() == 100  # run_1 predates the column
+
+    rows = dataset.read(
+        columns=["loan_id", "outstanding"],
+        filters=(ds.field("run_id") == "run_1") & (ds.field("loan_id") < "L010"),
+    )
+    assert len(rows) == 20 and list(rows.columns) == ["loan_id", "outstanding"]
+
+    # Re-running a run replaces its partitions instead of duplicating rows
+    dataset.append(_frame(days=("2025-03-31",), loans=10), "run_1")
+    assert len(dataset.read(filters=[("run_id", "=", "run_1")])) == 10
+
+
+def test_persist_appends_dataset_and_hashes_outputs_once(tmp_path):
+    config = {
+        "pipeline": {
+            "phases": {
+                "outputs": {
+                    "storage": {"local_dir": str(tmp_path), "manifest_dir": str(tmp_path)},
+                    "dataset": {"enabled": True, "dir": str(tmp_path / "dataset")},
+                }
+            }
+        }
+    }
+    result = UnifiedOutput(config).persist(
+        _frame(), {"par_30": 0.1}, {}, {"pipeline": "run_x"}
+    )
+
+    manifest = result.manifest
+    assert manifest["dataset"]["rows"] == 200
+    assert manifest["file_hashes"]["dataset"] == manifest["dataset"]["digest"]
+    for key in ("parquet", "csv", "metrics_json"):
+        assert manifest["file_hashes"][key] == hash_file(tmp_path / result.output_paths[key])
+    reloaded = PartitionedParquetDataset(tmp_path / "dataset").read()
+    assert len(reloaded) == 200 and set(reloaded["run_id"]) == {"run_x"}
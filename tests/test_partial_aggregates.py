@@ -0,0 +1,205 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.kpis.base import AggregateSpec
+from src.kpis.collection_rate import CollectionRateCalculator
+from src.kpis.par_30 import PAR30Calculator
+from src.kpis.portfolio_yield import PortfolioYieldCalculator
+from src.pipeline.kpi_calculation import UnifiedCalculationV2
+from src.pipeline.partial_aggregates import (PartialAggregateStore,
+                                             verify_against_full)
+
+CALCULATORS = {
+    "PAR30": PAR30Calculator(),
+    "CollectionRate": CollectionRateCalculator(),
+    "PortfolioYield": PortfolioYieldCalculator(),
+}
+SPEC = AggregateSpec.union(c.AGGREGATES for c in CALCULATORS.values())
+
+
+def _tape(days: int = 20, per_day: int = 50) -> pd.DataFrame:
+    rng = np.random.default_rng(9)
+    n = days * per_day
+    df = pd.DataFrame(
+        {
+            "measurement_date": np.repeat(pd.date_range("2025-03-01", periods=days), per_day),
+            "dpd_30_60_usd": rng.uniform(0, 1e4, n),
+            "dpd_60_90_usd": rng.uniform(0, 1e4, n),
+            "dpd_90_plus_usd": rng.uniform(0, 1e4, n),
+            "total_receivable_usd": rng.uniform(1e4, 1e5, n),
+            "cash_available_usd": rng.uniform(0, 1e5, n),
+            "total_eligible_usd": rng.uniform(1e4, 1e5, n),
+            "interest_rate": rng.uniform(0.05, 0.4, n),
+            "principal_balance": rng.uniform(1e3, 5e4, n),
+        }
+    )
+    df["measurement_date"] = df["measurement_date"].astype(object)
+    df.loc[[3, 400], "measurement_date"] = "not a date"
+    df.loc[::13, "dpd_60_90_usd"] = np.nan
+    return df
+
+
+def test_sync_only_reaggregates_changed_partitions(tmp_path):
+    store = PartialAggregateStore(tmp_path / "partials.parquet")
+    df = _tape()
+    first = store.sync(df, SPEC)
+    assert first.partitions == 21  # 20 days + undated rows
+    assert len(first.recomputed) == 21
+    assert "undated" in first.recomputed
+
+    assert store.sync(df, SPEC).recomputed == []
+
+    changed = df.copy()
+    on_day = changed["measurement_date"] == pd.Timestamp("2025-03-05")
+    changed.loc[on_day, "cash_available_usd"] += 1
+    result = store.sync(changed, SPEC)
+    assert result.recomputed == ["2025-03-05"]
+    assert result.reused == 20
+
+    report = verify_against_full(changed, CALCULATORS, store.combined(changed.columns))
+    assert all(check["match"] for check in report.values()), report
+
+
+def test_dropped_partitions_are_removed(tmp_path):
+    store = PartialAggregateStore(tmp_path / "partials.parquet")
+    df = _tape()
+    store.sync(df, SPEC)
+    trimmed = df[df["measurement_date"] != pd.Timestamp("2025-03-01")]
+    result = store.sync(trimmed, SPEC)
+    assert result.dropped == ["2025-03-01"]
+    assert store.combined(trimmed.columns).rows == len(trimmed)
+
+
+def test_upsert_combines_delta_with_stored_partials(tmp_path):
+    store = PartialAggregateStore(tmp_path / "partials.parquet")
+    df = _tape()
+    is_last_day = df["measurement_date"].astype(str).str.startswith("2025-03-20")
+    store.upsert(df[~is_last_day], SPEC)
+    result = store.upsert(df[is_last_day], SPEC)
+    assert result.recomputed == ["2025-03-20"]
+    combined = store.combined(df.columns)
+    assert combined.rows == len(df)
+    report = verify_against_full(df, CALCULATORS, combined)
+    assert all(check["match"] for check in report.values())
+
+
+def test_calculation_uses_incremental_store(tmp_path, minimal_config):
+    metrics = [
+        {"name": "PAR30", "function": "src.kpis.par_30.calculate_par_30"},
+        {
+            "name": "PortfolioYield",
+            "function": "src.kpis.portfolio_yield.calculate_portfolio_yield",
+        },
+    ]
+    minimal_config["pipeline"]["phases"]["calculation"] = {
+        "metrics": metrics,
+        "incremental": {
+            "enabled": True,
+            "store_path": str(tmp_path / "partials.parquet"),
+            "verify": True,
+        },
+    }
+    df = _tape()
+    full = UnifiedCalculationV2({"pipeline": {"phases": {"calculation": {"metrics": metrics}}}})
+    expected = full.calculate(df).metrics
+
+    calculator = UnifiedCalculationV2(minimal_config)
+    result = calculator.calculate(df, delta=df)
+    for name in ("PAR30", "PortfolioYield"):
+        assert result.metrics[name]["value"] == pytest.approx(expected[name]["value"], rel=1e-12)
+        assert result.metrics[name]["rows_processed"] == len(df)
+    events = {e["event"]: e for e in calculator.audit_log}
+    assert events["incremental_aggregates"]["recomputed"] == 21
+    assert events["incremental_verification"]["status"] == "passed"
+
+    changed = df.copy()
+    on_day = changed["measurement_date"] == pd.Timestamp("2025-03-05")
+    changed.loc[on_day, "cash_available_usd"] += 1
+    rerun = UnifiedCalculationV2(minimal_config)
+    rerun.calculate(changed, delta=changed.loc[on_day])
+    events = {e["event"]: e for e in rerun.audit_log}
+    assert events["incremental_aggregates"]["recomputed"] == 1
+    assert events["incremental_aggregates"]["reused"] == 20
+    assert events["incremental_verification"]["status"] == "passed"
+
+
+def test_calculation_without_delta_aggregates_directly(tmp_path, minimal_config):
+    minimal_config["pipeline"]["phases"]["calculation"] = {
+        "metrics": [{"name": "PAR30", "function": "src.kpis.par_30.calculate_par_30"}],
+        "incremental": {"enabled": True, "store_path": str(tmp_path / "partials.parquet")},
+    }
+    calculator = UnifiedCalculationV2(minimal_config)
+    calculator.calculate(_tape())
+    event = next(e for e in calculator.audit_log if e["event"] == "incremental_aggregates")
+    assert event["status"] == "skipped"
+    assert not (tmp_path / "partials.parquet").exists()
+
+
+def test_delta_is_new_partitions_plus_the_latest_days(tmp_path):
+    store = PartialAggregateStore(tmp_path / "partials.parquet")
+    df = _tape()
+    assert len(store.delta(df)) == len(df)
+
+    dates = pd.to_datetime(df["measurement_date"], errors="coerce")
+    store.upsert(df[dates < pd.Timestamp("2025-03-18")], SPEC)
+    delta = store.delta(df, lookback_days=1)
+    delta_dates = pd.to_datetime(delta["measurement_date"], errors="coerce")
+    # Unstored 18th-20th, plus the undated rows that cannot be located in the store
+    assert sorted(delta_dates.dt.day.dropna().unique()) == [18, 19, 20]
+    assert delta_dates.isna().sum() == 2
+    store.upsert(delta, SPEC)
+    recent = pd.to_datetime(store.delta(df, lookback_days=3)["measurement_date"], errors="coerce")
+    assert sorted(recent.dt.day.dropna().unique()) == [18, 19, 20]
+    assert len(store.delta(df, lookback_days=0)) == 2
+
+
+def _incremental_config(config, tmp_path, metrics, **incremental):
+    config["pipeline"]["phases"]["calculation"] = {
+        "metrics": metrics,
+        "incremental": {
+            "enabled": True,
+            "store_path": str(tmp_path / "partials.parquet"),
+            **incremental,
+        },
+    }
+    return config
+
+
+def test_pipeline_runs_combine_stored_partials_with_new_days(tmp_path, minimal_config):
+    metrics = [{"name": "PAR30", "function": "src.kpis.par_30.calculate_par_30"}]
+    config = _incremental_config(minimal_config, tmp_path, metrics)
+    df = _tape()
+    dates = pd.to_datetime(df["measurement_date"], errors="coerce")
+    first_tape = df[~(dates >= pd.Timestamp("2025-03-20"))]
+    first = UnifiedCalculationV2(config)
+    first.calculate(first_tape, delta=first.delta_load(first_tape))
+
+    # The next tape adds the 20th and drops the 1st, which stays in the store
+    tape = df[dates != pd.Timestamp("2025-03-01")]
+    rerun = UnifiedCalculationV2(config)
+    result = rerun.calculate(tape, delta=rerun.delta_load(tape))
+    full = UnifiedCalculationV2({"pipeline": {"phases": {"calculation": {"metrics": metrics}}}})
+    expected = full.calculate(tape).metrics["PAR30"]
+    assert result.metrics["PAR30"]["value"] == pytest.approx(expected["value"], rel=1e-12)
+    assert result.metrics["PAR30"]["rows_processed"] == len(tape)
+    events = {e["event"]: e for e in rerun.audit_log}
+    # The new day and the undated rows
+    assert events["delta_load"]["rows"] == 52
+    assert events["incremental_aggregates"]["recomputed"] == 2
+
+
+def test_outliers_are_excluded_from_the_delta(tmp_path, minimal_config):
+    metrics = [{"name": "PAR30", "function": "src.kpis.par_30.calculate_par_30"}]
+    config = _incremental_config(minimal_config, tmp_path, metrics, verify=True)
+    config["pipeline"]["phases"]["calculation"]["exclude_outliers"] = True
+    df = _tape()
+    masks = pd.DataFrame({"dpd_90_plus_usd": df.index % 7 == 0}, index=df.index)
+
+    calculator = UnifiedCalculationV2(config)
+    result = calculator.calculate(df, outlier_masks=masks, delta=df)
+    kept = int((~masks["dpd_90_plus_usd"]).sum())
+    assert result.metrics["PAR30"]["rows_processed"] == kept
+    assert PartialAggregateStore(tmp_path / "partials.parquet").combined(df.columns).rows == kept
+    events = {e["event"]: e for e in calculator.audit_log}
+    assert events["incremental_verification"]["status"] == "passed"
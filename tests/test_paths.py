@@ -67,6 +67,19 @@ class TestResolvePath:
         with pytest.raises(ValueError):
             resolve_path("")
 
+    def test_resolve_falls_back_to_package_root_without_git(self, monkeypatch):
+        """Checkouts without .git (Docker images, sdists) resolve against the package."""
+
+        def missing_root():
+            raise RuntimeError("Project root not found")
+
+        monkeypatch.setattr("src.config.paths.get_project_root", missing_root)
+        for name in ("RUN_STORE_FILE", "METRICS_DIR", "DATA_METRICS_PATH"):
+            monkeypatch.delenv(name, raising=False)
+        root = Path(__file__).resolve().parents[1]
+        assert resolve_path("./data") == root / "data"
+        assert Paths.run_store_file() == root / "data" / "metrics" / "runs.duckdb"
+
 
 class TestPathsMetricsDir:
     """Test metrics directory path resolution."""
@@ -0,0 +1,155 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from src.pipeline.manifest_catalog import ManifestCatalog
+from src.pipeline.manifests import read_manifest
+from src.pipeline.output import PersistContext, UnifiedOutput
+from src.pipeline.persist_queue import (ATTEMPTS_FILE, JOB_FILE, QUARANTINE_DIR,
+                                        PersistQueue)
+
+
+def _config(tmp_path):
+    return {
+        "pipeline": {
+            "phases": {
+                "outputs": {
+                    "storage": {
+                        "local_dir": str(tmp_path / "metrics"),
+                        "manifest_dir": str(tmp_path / "runs"),
+                    },
+                    "write_behind": {"spool_dir": str(tmp_path / "spool"), "max_pending": 1},
+                }
+            }
+        }
+    }
+
+
+def _context():
+    daily = pd.DataFrame({"period_start": pd.to_datetime(["2025-01-01"]), "par_30": [0.1]})
+    return PersistContext(quality_checks={"no_nulls": True}, timeseries={"daily": daily})
+
+
+def _gate_persist(monkeypatch, fail=False):
+    """Make UnifiedOutput.persist wait for ``gate`` (and optionally fail afterwards)."""
+    gate = threading.Event()
+    persist = UnifiedOutput.persist
+
+    def gated(self, *args, **kwargs):
+        assert gate.wait(5)
+        if fail:
+            raise OSError("disk full")
+        return persist(self, *args, **kwargs)
+
+    monkeypatch.setattr(UnifiedOutput, "persist", gated)
+    return gate
+
+
+def test_submit_returns_before_outputs_are_written(tmp_path, monkeypatch):
+    gate = _gate_persist(monkeypatch)
+    queue = PersistQueue.from_config(_config(tmp_path))
+    frame = pd.DataFrame({"loan_id": ["L1", "L2"]})
+
+    handle = queue.submit(frame, {"par_30": {"value": 0.1}}, {}, {"pipeline": "run_1"}, _context())
+    assert not handle.done()
+    assert queue.pending() == ["run_1"]
+    assert queue.latest_pending_metrics() == {"par_30": {"value": 0.1}}
+    assert queue.latest_pending_metrics(exclude_run="run_1") is None
+    assert (tmp_path / "spool" / "run_1" / JOB_FILE).exists()
+    assert ManifestCatalog(tmp_path / "runs").latest() is None
+
+    gate.set()
+    result = handle.result(timeout=5)
+    manifest = read_manifest(result.manifest_path)
+    assert manifest["timeseries"]["daily"].endswith("run_1_daily.parquet")
+    assert ManifestCatalog(tmp_path / "runs").latest().run_id == "run_1"
+    assert not (tmp_path / "spool" / "run_1").exists()
+    assert queue.drain(timeout=1) and queue.pending() == []
+    queue.close()
+
+
+def test_failed_runs_stay_spooled_and_are_recovered(tmp_path, monkeypatch):
+    gate = _gate_persist(monkeypatch, fail=True)
+    gate.set()
+    queue = PersistQueue.from_config(_config(tmp_path))
+    frame = pd.DataFrame({"loan_id": ["L1"], "amount": [10.5]})
+    handle = queue.submit(
+        frame, {"par_30": {"value": 0.2}}, {"k": 1}, {"pipeline": "run_2"}, _context()
+    )
+    with pytest.raises(OSError, match="disk full"):
+        handle.result(timeout=5)
+    queue.close()
+    assert (tmp_path / "spool" / "run_2" / JOB_FILE).exists()
+    # A spool without its job file was never acknowledged and is discarded
+    (tmp_path / "spool" / "run_partial").mkdir()
+
+    monkeypatch.undo()
+    recovered = PersistQueue.from_config(_config(tmp_path)).recover()
+    assert [h.run_id for h in recovered] == ["run_2"]
+    manifest = read_manifest(recovered[0].result(timeout=5).manifest_path)
+    assert manifest["metrics"] == {"par_30": {"value": 0.2}}
+    assert manifest["metadata"] == {"k": 1}
+    assert manifest["quality_checks"] == {"no_nulls": True}
+    assert pd.read_parquet(tmp_path / "metrics" / "run_2.parquet").equals(frame)
+    assert not any((tmp_path / "spool").iterdir())
+
+
+def test_submit_blocks_when_max_pending_runs_are_queued(tmp_path, monkeypatch):
+    gate = _gate_persist(monkeypatch)
+    queue = PersistQueue.from_config(_config(tmp_path))
+    frame = pd.DataFrame({"loan_id": ["L1"]})
+    first = queue.submit(frame, {}, {}, {"pipeline": "run_a"})
+
+    submitted = threading.Event()
+
+    def submit_second():
+        queue.submit(frame, {}, {}, {"pipeline": "run_b"})
+        submitted.set()
+
+    threading.Thread(target=submit_second).start()
+    assert not submitted.wait(0.2)
+    gate.set()
+    assert submitted.wait(5)
+    first.result(timeout=5)
+    assert queue.drain(timeout=5)
+    queue.close()
+
+
+def test_runs_claimed_by_another_process_are_not_replayed(tmp_path, monkeypatch):
+    gate = _gate_persist(monkeypatch)
+    owner = PersistQueue.from_config(_config(tmp_path))
+    handle = owner.submit(pd.DataFrame({"loan_id": ["L1"]}), {}, {}, {"pipeline": "run_c"})
+
+    # A second pipeline sharing the spool sees the run locked and leaves it alone
+    other = PersistQueue.from_config(_config(tmp_path))
+    assert other.recover() == [] and other.pending() == []
+
+    gate.set()
+    handle.result(timeout=5)
+    owner.close()
+    assert other.recover() == []
+    other.close()
+
+
+def test_repeatedly_failing_runs_are_quarantined(tmp_path, monkeypatch):
+    _gate_persist(monkeypatch, fail=True).set()
+    config = _config(tmp_path)
+    config["pipeline"]["phases"]["outputs"]["write_behind"]["max_attempts"] = 2
+    queue = PersistQueue.from_config(config)
+    queue.submit(pd.DataFrame({"loan_id": ["L1"]}), {}, {}, {"pipeline": "run_d"})
+    queue.close()
+
+    retry = PersistQueue.from_config(config)
+    [handle] = retry.recover()
+    with pytest.raises(OSError, match="disk full"):
+        handle.result(timeout=5)
+    retry.close()
+    assert (tmp_path / "spool" / "run_d" / ATTEMPTS_FILE).read_text() == "2"
+
+    assert PersistQueue.from_config(config).recover() == []
+    quarantined = tmp_path / "spool" / QUARANTINE_DIR / "run_d"
+    assert (quarantined / JOB_FILE).exists()
+    assert not (tmp_path / "spool" / "run_d").exists()
+    # Quarantined runs are not picked up again
+    assert PersistQueue.from_config(config).recover() == []
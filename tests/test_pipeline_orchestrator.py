@@ -116,3 +116,44 @@ class TestUnifiedPipeline:
         if result["status"] == "success":
             assert "phases" in result
             assert "ingestion" in result["phases"]
+
+    def test_pipeline_execute_with_write_behind_outputs(self, sample_looker_par_file, tmp_path):
+        """Outputs are queued for the background writer and land after the run returns."""
+        config_dict = {
+            "name": "test_write_behind_pipeline",
+            "run": {"artifacts_dir": str(tmp_path / "runs")},
+            "pipeline": {
+                "phases": {
+                    "ingestion": {
+                        "source": "looker",
+                        "looker": {"loans_par_path": str(sample_looker_par_file)},
+                    },
+                    "transformation": {},
+                    "calculation": {},
+                    "outputs": {
+                        "storage": {
+                            "local_dir": str(tmp_path / "metrics"),
+                            "manifest_dir": str(tmp_path / "runs"),
+                        },
+                        "write_behind": {
+                            "enabled": True,
+                            "spool_dir": str(tmp_path / "spool"),
+                        },
+                    },
+                }
+            },
+        }
+        config_file = tmp_path / "write_behind_config.yml"
+        with open(config_file, "w") as f:
+            yaml.safe_dump(config_dict, f)
+
+        pipeline = UnifiedPipeline(config_path=config_file)
+        result = pipeline.execute(sample_looker_par_file)
+
+        assert result["status"] == "success"
+        assert result["phases"]["output"]["status"] == "queued"
+        output = pipeline.pending_output.result(timeout=30)
+        assert str(output.manifest_path) == result["phases"]["output"]["manifest"]
+        assert output.manifest_path.exists()
+        assert not any((tmp_path / "spool").iterdir())
+        pipeline.persist_queue.close()
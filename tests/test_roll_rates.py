@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analytics.kpi_catalog_processor import KPICatalogProcessor
+from src.analytics.roll_rates import (CURRENT, DEFAULT, DPD_30, DPD_60, PAID,
+                                      STATES, build_roll_rates, dpd_states,
+                                      read_roll_rates,
+                                      scheduled_days_past_due)
+
+
+def _loan_month(loans: int = 300, months: int = 8) -> pd.DataFrame:
+    rng = np.random.default_rng(5)
+    frame = pd.DataFrame(
+        {
+            "loan_id": np.repeat([f"L{i}" for i in range(loans)], months),
+            "month_end": np.tile(pd.date_range("2024-01-31", periods=months, freq="ME"), loans),
+            "days_past_due": rng.choice([0, 10, 40, 70, 120], loans * months),
+            "outstanding": rng.uniform(0, 1e4, loans * months).round(2),
+        }
+    )
+    frame.loc[rng.random(len(frame)) < 0.05, "outstanding"] = 0.0
+    # Drop some snapshots so gaps break the month-to-month chain, then shuffle
+    return frame.sample(frac=0.9, random_state=1)
+
+
+def _naive_counts(frame: pd.DataFrame) -> pd.DataFrame:
+    frame = frame.assign(state=dpd_states(frame["days_past_due"], frame["outstanding"]))
+    nxt = frame.assign(month_end=frame["month_end"] - pd.offsets.MonthEnd(1))
+    joined = frame.merge(nxt, on=["loan_id", "month_end"], suffixes=("", "_next"))
+    return joined.groupby(["month_end", "state", "state_next"]).agg(
+        count=("loan_id", "size"), outstanding=("outstanding", "sum")
+    )
+
+
+def test_counts_and_balances_match_self_join():
+    frame = _loan_month()
+    roll_rates = build_roll_rates(frame)
+    expected = _naive_counts(frame)
+
+    assert len(roll_rates.months) == 7
+    for (month, src, dst), row in expected.iterrows():
+        m = roll_rates.months.get_loc(month)
+        assert roll_rates.counts[m, src, dst] == row["count"]
+        assert roll_rates.balances[m, src, dst] == pytest.approx(row["outstanding"])
+    assert roll_rates.counts.sum() == expected["count"].sum()
+
+    monthly = roll_rates.monthly("outstanding")
+    np.testing.assert_allclose(monthly.sum(axis=-1), 1.0)
+
+
+def test_pooled_matrix_and_absorbing_rows():
+    roll_rates = build_roll_rates(_loan_month())
+    pooled = roll_rates.matrix("count")
+    counts = roll_rates.counts.sum(axis=0)
+    np.testing.assert_allclose(pooled[0], counts[0] / counts[0].sum())
+    assert pooled[DEFAULT, 0] > 0  # cures out of default are observed
+
+    absorbing = roll_rates.matrix("count", absorbing=(DEFAULT, PAID))
+    assert absorbing[DEFAULT].tolist() == [0, 0, 0, 1, 0]
+    assert absorbing[PAID].tolist() == [0, 0, 0, 0, 1]
+
+    first = roll_rates.months[:1]
+    np.testing.assert_allclose(roll_rates.matrix(months=first), roll_rates.monthly()[0])
+    with pytest.raises(ValueError):
+        roll_rates.matrix("balance")
+
+
+def test_parquet_round_trip(tmp_path):
+    roll_rates = build_roll_rates(_loan_month())
+    frame = roll_rates.to_frame()
+    assert len(frame) == len(roll_rates.months) * len(STATES) ** 2
+    assert set(frame["from_state"]) == set(STATES)
+
+    restored = read_roll_rates(roll_rates.to_parquet(tmp_path / "roll_rates.parquet"))
+    assert restored.states == STATES
+    assert restored.months.equals(roll_rates.months)
+    np.testing.assert_array_equal(restored.counts, roll_rates.counts)
+    np.testing.assert_allclose(restored.balances, roll_rates.balances)
+
+
+def test_no_consecutive_snapshots_gives_identity():
+    frame = pd.DataFrame(
+        {
+            "loan_id": [1, 1],
+            "month_end": pd.to_datetime(["2024-01-31", "2024-03-31"]),
+            "days_past_due": [0, 40],
+            "outstanding": [10.0, 10.0],
+        }
+    )
+    roll_rates = build_roll_rates(frame)
+    assert len(roll_rates.months) == 0
+    np.testing.assert_array_equal(roll_rates.matrix(), np.eye(len(STATES)))
+
+
+def test_scheduled_days_past_due_counts_from_oldest_unpaid_installment():
+    schedule = pd.DataFrame(
+        {
+            "loan_id": ["A", "A", "A"],
+            "date_due": ["2024-01-15", "2024-02-10", "2024-02-15"],
+            "principal": [100.0, 0.0, 100.0],
+        }
+    )
+    loan_month = pd.DataFrame(
+        {
+            "loan_id": ["A", "A", "A", "B"],
+            "month_end": pd.to_datetime(["2024-01-31", "2024-02-29", "2024-03-31", "2024-01-31"]),
+            "cum_principal": [0.0, 100.0, 200.0, 0.0],
+        },
+        index=[10, 11, 12, 13],
+    )
+    dpd = scheduled_days_past_due(loan_month, schedule)
+    assert dpd.index.tolist() == [10, 11, 12, 13]
+    assert dpd.loc[[10, 11, 12]].tolist() == [16, 14, 0]
+    assert np.isnan(dpd.loc[13])
+
+
+def test_catalog_roll_rates_use_month_end_dpd():
+    loans = pd.DataFrame(
+        {
+            "loan_id": ["A"],
+            "customer_id": ["C1"],
+            "disbursement_date": ["2024-01-01"],
+            "disbursement_amount": [300.0],
+            # Tape DPD as of today; must not be back-dated to earlier months
+            "days_past_due": [120],
+        }
+    )
+    payments = pd.DataFrame(
+        {"loan_id": ["A"], "true_payment_date": ["2024-01-14"], "true_principal_payment": [100.0]}
+    )
+    schedule = pd.DataFrame(
+        {
+            "loan_id": ["A"] * 3,
+            "date_due": ["2024-01-15", "2024-02-15", "2024-03-15"],
+            "principal": [100.0] * 3,
+            "interest": [0.0] * 3,
+        }
+    )
+    customers = pd.DataFrame({"customer_id": ["C1"]})
+    processor = KPICatalogProcessor(loans, payments, customers, schedule)
+    loan_month = processor.build_loan_month("2024-01-01", "2024-05-31")
+    assert loan_month["days_past_due"].tolist() == [0, 14, 45, 75, 106]
+    assert loan_month["dpd_from_schedule"].all()
+
+    roll_rates = processor.get_roll_rates()
+    moves = roll_rates[roll_rates["count"] > 0]
+    assert list(zip(moves["from_state"], moves["to_state"])) == [
+        (STATES[CURRENT], STATES[CURRENT]),
+        (STATES[CURRENT], STATES[DPD_30]),
+        (STATES[DPD_30], STATES[DPD_60]),
+        (STATES[DPD_60], STATES[DEFAULT]),
+    ]
+
+    without_schedule = KPICatalogProcessor(loans, payments, customers)
+    without_schedule.build_loan_month("2024-01-01", "2024-05-31")
+    assert without_schedule.get_roll_rates().empty
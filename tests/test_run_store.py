@@ -0,0 +1,129 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("duckdb")
+
+from src.pipeline.output import UnifiedOutput  # noqa: E402
+from src.pipeline.run_store import RunStore, open_run_store  # noqa: E402
+
+
+def _manifest(run_id, day, par_30, checks=None, anomalies=None):
+    return {
+        "run_id": run_id,
+        "generated_at": f"2025-01-{day:02d}T08:00:00+00:00",
+        "metrics": {
+            "par_30": {"value": par_30, "status": "warning", "formula": "x / y"},
+            "portfolio_yield": {"value": 0.2, "status": "good"},
+        },
+        "metadata": {"anomalies": anomalies or {}},
+        "quality_checks": checks or {"no_nulls": True, "bounds": True},
+    }
+
+
+def _store(tmp_path):
+    store = RunStore(tmp_path / "runs.duckdb")
+    store.record_run(_manifest("run_1", 1, 0.10))
+    store.record_run(_manifest("run_2", 2, 0.12, {"no_nulls": False, "bounds": True}))
+    store.record_run(_manifest("run_3", 3, 0.15, anomalies={"par_30": {"change": 0.25}}))
+    return store
+
+
+def test_latest_run_and_kpi_history(tmp_path):
+    store = _store(tmp_path)
+
+    latest = store.latest_run()
+    assert latest["run_id"] == "run_3"
+    assert latest["generated_at"] == "2025-01-03T08:00:00+00:00"
+    assert latest["metrics"]["par_30"] == {"value": 0.15, "status": "warning", "formula": "x / y"}
+    assert latest["quality_checks"] == {"bounds": True, "no_nulls": True}
+    assert store.latest_run(exclude_run="run_3")["run_id"] == "run_2"
+
+    history = store.kpi_history(metrics=["par_30"], last_n=2)
+    assert list(history["run_id"]) == ["run_2", "run_3"]
+    assert list(history["value"]) == [0.12, 0.15]
+    assert len(store.kpi_history()) == 6
+
+    # Recording a run again replaces its rows
+    store.record_run(_manifest("run_3", 3, 0.16))
+    assert store.kpi_history(metrics=["par_30"])["value"].tolist() == [0.10, 0.12, 0.16]
+
+
+def test_trend_windows_and_latest_kpis(tmp_path):
+    store = _store(tmp_path)
+
+    trend = store.kpi_trend("par_30", window=2)
+    assert trend["rolling_mean"].round(3).tolist() == [0.1, 0.11, 0.135]
+    assert trend["change"].round(3).tolist()[1:] == [0.02, 0.03]
+    assert trend["rolling_max"].tolist() == [0.10, 0.12, 0.15]
+
+    kpis = store.latest_kpis()
+    assert kpis["par_30"]["current_value"] == 0.15
+    assert kpis["par_30"]["previous_value"] == 0.12
+    assert kpis["par_30"]["change"] == pytest.approx(0.03)
+    assert kpis["portfolio_yield"]["status"] == "good"
+
+    quality = store.quality_trend(window=3)
+    assert quality["pass_rate"].tolist() == [1.0, 0.5, 1.0]
+    assert quality["rolling_pass_rate"].iloc[-1] == pytest.approx(2.5 / 3)
+    assert quality["anomaly_count"].tolist() == [0, 0, 1]
+
+
+def test_missing_store_is_not_opened(tmp_path):
+    assert open_run_store(tmp_path / "absent.duckdb") is None
+    assert RunStore(tmp_path / "absent.duckdb").latest_run() is None
+
+
+def test_persist_records_run_and_timeseries(tmp_path):
+    store_path = tmp_path / "runs.duckdb"
+    config = {
+        "pipeline": {
+            "phases": {
+                "outputs": {
+                    "storage": {"local_dir": str(tmp_path), "manifest_dir": str(tmp_path)},
+                    "formats": ["json"],
+                    "run_store": {"enabled": True, "path": str(store_path)},
+                }
+            }
+        }
+    }
+    daily = pd.DataFrame(
+        {
+            "period_start": pd.to_datetime(["2025-01-01", "2025-01-02"]),
+            "par_30": [0.1, 0.2],
+            "portfolio_yield": [0.3, None],
+        }
+    )
+    result = UnifiedOutput(config).persist(
+        pd.DataFrame({"loan_id": ["L1"]}),
+        {"par_30": {"value": 0.15}},
+        {},
+        {"pipeline": "run_x"},
+        quality_checks={"no_nulls": True},
+        timeseries={"daily": daily},
+    )
+
+    store = RunStore(store_path)
+    latest = store.latest_run()
+    assert latest["run_id"] == "run_x"
+    assert latest["generated_at"] == result.manifest["generated_at"]
+    assert latest["manifest_path"] == str(result.manifest_path)
+    assert latest["metrics"] == json.loads(json.dumps(result.manifest["metrics"]))
+    series = store.timeseries("daily", metrics=["par_30"])
+    assert series["par_30"].tolist() == [0.1, 0.2]
+    assert store.timeseries("weekly").empty
+
+
+def test_numpy_check_results_count_as_pass_fail(tmp_path):
+    store = RunStore(tmp_path / "runs.duckdb")
+    checks = {"no_nulls": np.bool_(True), "bounds": np.bool_(False), "rows": 10}
+    store.record_run(_manifest("run_1", 1, 0.10, checks))
+
+    assert store.latest_run()["quality_checks"] == {"bounds": False, "no_nulls": True, "rows": 10}
+    with store.connect() as con:
+        passed = dict(con.execute("SELECT check_name, passed FROM quality_results").fetchall())
+        failed = con.execute("SELECT quality_failed FROM runs").fetchone()[0]
+    assert passed == {"no_nulls": True, "bounds": False, "rows": None}
+    assert failed == 1
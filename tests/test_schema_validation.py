@@ -0,0 +1,82 @@
+import pandas as pd
+
+from src.analytics.schema import LoanTapeSchema
+from src.pipeline.data_ingestion import UnifiedIngestion
+from src.pipeline.schema_validation import FAILURE_CASE_COLUMNS, SchemaValidationExecutor
+
+
+def _loan_tape() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "loan_id": ["L1", "L2", "L3", "L4"],
+            "outstanding_balance": [100.0, 50.0, 25.0, 10.0],
+            "dpd": [0, 15, 45, 120],
+            "disbursement_date": pd.to_datetime(
+                ["2024-01-01", "2024-02-01", "2024-03-01", None]
+            ),
+        }
+    )
+
+
+def test_valid_frame_passes_and_is_coerced():
+    result = SchemaValidationExecutor(LoanTapeSchema, max_workers=2).validate(_loan_tape())
+    assert result.passed
+    assert result.errors == []
+    assert list(result.failure_cases.columns) == FAILURE_CASE_COLUMNS
+    assert result.df["dpd"].dtype == "int64"
+
+
+def test_collects_all_failures_lazily():
+    df = _loan_tape()
+    df.loc[1, "loan_id"] = "L1"
+    df.loc[2, "outstanding_balance"] = -5.0
+    df.loc[3, "dpd"] = 5000
+    df.loc[0, "disbursement_date"] = pd.Timestamp("2200-01-01")
+
+    result = SchemaValidationExecutor(LoanTapeSchema).validate(df)
+
+    assert not result.passed
+    assert result.counts() == {
+        "loan_id:field_uniqueness": 2,
+        "outstanding_balance:greater_than_or_equal_to": 1,
+        "dpd:less_than_or_equal_to": 1,
+        "disbursement_date:date_not_in_future": 1,
+    }
+    future = result.failure_cases[result.failure_cases["check"] == "date_not_in_future"]
+    assert future["index"].tolist() == [0]
+    assert len(result.errors) == 4
+
+
+def test_missing_required_column_is_reported():
+    df = _loan_tape().drop(columns=["dpd"])
+    result = SchemaValidationExecutor(LoanTapeSchema).validate(df)
+    assert result.counts() == {"dpd:column_in_dataframe": 1}
+
+
+def test_reference_time_is_pinned_once():
+    df = _loan_tape()
+    as_of = pd.Timestamp("2024-01-15")
+    result = SchemaValidationExecutor(LoanTapeSchema).validate(df, as_of=as_of)
+    assert result.as_of == as_of
+    assert result.counts() == {"disbursement_date:date_not_in_future": 2}
+
+
+def test_timings_cover_every_check():
+    result = SchemaValidationExecutor(LoanTapeSchema).validate(_loan_tape())
+    checks = set(zip(result.timings["column"], result.timings["check"]))
+    assert ("loan_id", "structure") in checks
+    assert ("dpd", "less_than_or_equal_to") in checks
+    assert ("disbursement_date", "date_not_in_future") in checks
+    assert (result.timings["seconds"] >= 0).all()
+
+
+def test_ingestion_reports_structured_errors(minimal_config):
+    df = _loan_tape()
+    df.loc[2, "outstanding_balance"] = -1.0
+    ingestion = UnifiedIngestion(minimal_config)
+    returned, errors = ingestion._validate_schema_pandera(df)
+    assert returned is df
+    assert len(errors) == 1
+    assert errors[0].startswith("outstanding_balance: greater_than_or_equal_to")
+    assert ingestion.audit_log[-1]["event"] == "pandera_validation"
+    assert ingestion.audit_log[-1]["status"] == "failed"
@@ -0,0 +1,193 @@
+import json
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.pipeline.data_ingestion import UnifiedIngestion
+from src.pipeline.tiered_validation import (
+    TieredValidator,
+    iso8601_violations,
+    loan_tape_schema_violations,
+    required_sample_size,
+)
+
+
+def _loan_tape(rows: int) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "loan_id": [f"L{i}" for i in range(rows)],
+            "outstanding_balance": [100.0] * rows,
+            "dpd": [0] * rows,
+            "disbursement_date": ["2024-01-01"] * rows,
+        }
+    )
+
+
+def test_required_sample_size_cochran():
+    assert required_sample_size(0) == 0
+    assert required_sample_size(50) == 50
+    # Infinite-population Cochran size at 95% / 5% is 385
+    assert required_sample_size(10_000_000, confidence=0.95, margin_of_error=0.05) == 385
+    with pytest.raises(ValueError):
+        required_sample_size(1000, confidence=0.5)
+
+
+def test_iso8601_violations_counts_bad_values():
+    df = pd.DataFrame({"measurement_date": ["2025-01-01", "01/02/2025", None, 5]})
+    assert iso8601_violations(df) == {"measurement_date:iso8601": 2}
+
+
+def test_loan_tape_schema_violations_collects_duplicates():
+    df = _loan_tape(5)
+    df.loc[4, "loan_id"] = "L0"
+    found = loan_tape_schema_violations(df)
+    assert found["loan_id:field_uniqueness"] == 2
+
+
+def test_small_frames_validate_fully():
+    validator = TieredValidator({"enabled": True, "min_rows": 1000, "checks": ["iso8601_dates"]})
+    result = validator.validate(_loan_tape(10))
+    assert not result.sampled
+    assert result.full_pass is None
+    assert result.errors == []
+
+
+def test_full_pass_amends_when_sample_misses(tmp_path):
+    alerts = []
+    validator = TieredValidator(
+        {
+            "enabled": True,
+            "min_rows": 100,
+            "confidence": 0.95,
+            "margin_of_error": 0.1,
+            "amendment_dir": str(tmp_path),
+        },
+        run_id="run_1",
+        checks={"loan_tape_schema": loan_tape_schema_violations},
+        alert=alerts.append,
+    )
+    df = _loan_tape(5000)
+    df.loc[4999, "loan_id"] = "L0"
+
+    result = validator.validate(df)
+    assert result.sampled
+    assert result.sample_size < len(df)
+    assert "loan_id:field_uniqueness" not in result.sample_violations.get("loan_tape_schema", {})
+
+    validator.wait()
+    assert result.full_pass.result()["loan_tape_schema"]["loan_id:field_uniqueness"] == 2
+    # The amendment and alert wait for the caller to join the full pass
+    assert alerts == [] and not (tmp_path / "run_1_quality_amendment.json").exists()
+
+    joined = validator.finish(result)
+    amendment = json.loads((tmp_path / "run_1_quality_amendment.json").read_text())
+    assert amendment["missed_by_sample"] == {"loan_tape_schema": {"loan_id:field_uniqueness": 2}}
+    assert joined["path"] == str(tmp_path / "run_1_quality_amendment.json")
+    assert validator.finish(result) is joined
+    assert len(alerts) == 1
+
+
+def test_ingestion_uses_sampled_gate(tmp_path, minimal_config):
+    minimal_config["pipeline"]["phases"]["ingestion"]["validation"]["tiered"] = {
+        "enabled": True,
+        "min_rows": 100,
+        "confidence": 0.95,
+        "margin_of_error": 0.1,
+        "checks": ["iso8601_dates"],
+        "amendment_dir": str(tmp_path / "amendments"),
+    }
+    ingestion = UnifiedIngestion(minimal_config)
+    ingestion.tiered_validator.alert = None
+    df, errors = ingestion._validate_schema_pandera(_loan_tape(1000))
+    ingestion.tiered_validator.wait()
+    assert errors == []
+    assert len(df) == 1000
+    assert ingestion.tiered_result.sampled
+    assert ingestion.audit_log[-1]["event"] == "tiered_validation"
+
+
+def _receivables(rows: int) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "loan_id": [f"L{i}" for i in range(rows)],
+            "outstanding_balance": [100] * rows,
+            "dpd": [3] * rows,
+            "disbursement_date": ["2024-01-01"] * rows,
+            "total_receivable_usd": [1000] * rows,
+            "total_eligible_usd": [900.0] * rows,
+            "discounted_balance_usd": [850.0] * rows,
+            "measurement_date": ["2024-01-31"] * rows,
+        }
+    )
+
+
+def _tiered_ingestion(tmp_path, config):
+    config["pipeline"]["phases"]["ingestion"]["validation"]["tiered"] = {
+        "enabled": True,
+        "min_rows": 100,
+        "confidence": 0.95,
+        "margin_of_error": 0.1,
+        "amendment_dir": str(tmp_path / "amendments"),
+    }
+    ingestion = UnifiedIngestion(config)
+    ingestion.tiered_validator.alert = None
+    return ingestion
+
+
+def test_gated_ingest_matches_full_validation(tmp_path, minimal_config):
+    path = tmp_path / "tape.csv"
+    _receivables(2000).to_csv(path, index=False)
+
+    gated = _tiered_ingestion(tmp_path, minimal_config).ingest_file(path)
+    full = UnifiedIngestion(minimal_config).ingest_file(path)
+
+    assert gated.metadata["validation_errors"] == []
+    assert gated.metadata["tiered_validation"]["sampled"]
+    pd.testing.assert_frame_equal(gated.df, full.df)
+    assert gated.df["outstanding_balance"].dtype == "float64"
+
+
+def test_ingest_returns_before_the_full_pass(tmp_path, minimal_config):
+    path = tmp_path / "tape.csv"
+    _receivables(2000).to_csv(path, index=False)
+    ingestion = _tiered_ingestion(tmp_path, minimal_config)
+    release = threading.Event()
+
+    def slow_check(df):
+        # Only the full pass blocks; the sample is far smaller than the file
+        if len(df) == 2000:
+            assert release.wait(5)
+        return {}
+
+    ingestion.tiered_validator.checks["slow"] = slow_check
+    result = ingestion.ingest_file(path)
+    assert len(result.df) == 2000
+    assert result.metadata["tiered_validation"]["full_pass"] == "pending"
+
+    release.set()
+    summary = ingestion.finish_tiered_validation()
+    assert summary["full_pass"] == "completed"
+    assert summary["amendment"] is None
+
+
+def test_full_pass_amends_rows_the_sample_missed(tmp_path, minimal_config):
+    df = _receivables(2000)
+    df["measurement_date"] = df["measurement_date"].astype(object)
+    df.loc[1999, "total_receivable_usd"] = -5
+    df.loc[1998, "measurement_date"] = "31/01/2024"
+    path = tmp_path / "tape.csv"
+    df.to_csv(path, index=False)
+    ingestion = _tiered_ingestion(tmp_path, minimal_config)
+    alerts = []
+    ingestion.tiered_validator.alert = alerts.append
+
+    # The sample gate passes; the full pass finds both rows
+    result = ingestion.ingest_file(path)
+    assert result.metadata["validation_errors"] == []
+    summary = ingestion.finish_tiered_validation()
+    amendment = json.loads(Path(summary["amendment"]).read_text())
+    assert set(amendment["missed_by_sample"]) >= {"loan_records", "date_columns"}
+    assert len(alerts) == 1
+    assert ingestion.audit_log[-1]["status"] == "amended"
@@ -0,0 +1,125 @@
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from src.integrations.unified_output_manager import OUTPUTS, UnifiedOutputManager
+
+
+def _manager(delays=None, failures=(), **kwargs) -> UnifiedOutputManager:
+    """Manager whose platform clients are mocks sleeping ``delays[name]`` seconds."""
+    delays = delays or {}
+    manager = UnifiedOutputManager(**kwargs)
+    manager.calls = []
+    manager.active = {name: 0 for name in OUTPUTS}
+    manager.peak = {name: 0 for name in OUTPUTS}
+    lock = threading.Lock()
+
+    def sink(name):
+        def export(*args):
+            with lock:
+                manager.calls.append(name)
+                manager.active[name] += 1
+                manager.peak[name] = max(manager.peak[name], manager.active[name])
+            time.sleep(delays.get(name, 0.0))
+            with lock:
+                manager.active[name] -= 1
+            if name in failures:
+                raise RuntimeError(f"{name} is down")
+            return {"success": True}
+
+        return export
+
+    manager.figma_client = Mock(sync_batch_export=sink("figma"))
+    manager.supabase_client = Mock(sync_batch_export=sink("supabase"))
+    manager.meta_client = Mock(sync_batch_export=sink("meta"))
+    manager.notion_client = Mock(sync_batch_export=sink("notion"))
+    manager.azure_storage_client = Mock(upload_batch_exports=sink("azure"))
+    manager.azure_dashboard_client = Mock(sync_batch_export=lambda data: {})
+    return manager
+
+
+def test_fan_out_overlaps_sinks_and_collects_in_completion_order():
+    delays = {"figma": 0.3, "azure": 0.2, "supabase": 0.1, "meta": 0.0, "notion": 0.25}
+    manager = _manager(delays)
+
+    started = time.perf_counter()
+    results = manager.export_batch({}, "run-1", concurrent=True)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < sum(delays.values()) * 0.6
+    assert list(results["outputs"]) == ["meta", "supabase", "azure", "notion", "figma"]
+    assert results["success"] is True
+    assert results["latency_ms"]["figma"] >= 300
+    histogram = results["latency_histograms"]["figma"]
+    assert histogram["count"] == 1 and histogram["buckets"]["le_500"] == 1
+    assert histogram["buckets"]["le_250"] == 0
+
+    sequential = manager.export_batch({}, "run-2")
+    assert list(sequential["outputs"]) == list(OUTPUTS)
+    assert manager.latency_histograms()["figma"]["count"] == 2
+
+
+def test_timeouts_and_errors_fail_only_their_sink():
+    manager = _manager(
+        {"notion": 1.0}, failures=("meta",), concurrent=True, sink_timeouts={"notion": 0.2}
+    )
+    started = time.perf_counter()
+    results = manager.export_batch({}, "run-1")
+
+    assert time.perf_counter() - started < 0.8
+    assert results["success"] is False
+    assert results["outputs"]["notion"] == {"success": False, "error": "timed out after 0.2s"}
+    assert results["latency_ms"]["notion"] is None
+    assert results["outputs"]["meta"]["error"] == "meta is down"
+    assert all("error" not in results["outputs"][name] for name in ("figma", "azure", "supabase"))
+
+
+@pytest.mark.parametrize("limit", [1, 2])
+def test_per_sink_concurrency_limit_holds_across_batches(limit):
+    manager = _manager({"supabase": 0.1}, concurrent=True)
+    manager.configure_clients({"fanout": {"concurrency": {"supabase": limit}}})
+
+    threads = [
+        threading.Thread(target=manager.export_batch, args=({}, f"run-{i}", ["supabase"]))
+        for i in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert manager.calls.count("supabase") == 4
+    assert manager.peak["supabase"] == limit
+
+
+def test_timeout_starts_once_the_slot_is_free():
+    delays = {"notion": 0.8}
+    manager = _manager(delays, concurrent=True, sink_timeouts={"notion": 0.5})
+    first = manager.export_batch({}, "run-1", ["notion"])
+    assert first["outputs"]["notion"]["error"] == "timed out after 0.5s"
+
+    # Waits ~0.3s for the abandoned export, then runs 0.3s: 0.6s in all, under 0.5s each
+    delays["notion"] = 0.3
+    second = manager.export_batch({}, "run-2", ["notion"])
+    assert second["outputs"]["notion"] == {"success": True}
+    assert manager.calls.count("notion") == 2
+    assert manager.peak["notion"] == 1
+    # The abandoned export's late latency is recorded too
+    assert manager.latency_histograms()["notion"]["count"] == 2
+    assert manager.latency_histograms()["notion"]["max_ms"] >= 800
+
+
+def test_platform_still_held_by_abandoned_export_is_busy():
+    manager = _manager({"notion": 1.2}, concurrent=True, sink_timeouts={"notion": 0.3})
+    manager.export_batch({}, "run-1", ["notion"])
+    second = manager.export_batch({}, "run-2", ["notion"])
+
+    assert second["outputs"]["notion"] == {
+        "success": False,
+        "busy": True,
+        "error": "busy: no free slot after 0.3s",
+    }
+    assert second["latency_ms"]["notion"] is None
+    assert manager.calls.count("notion") == 1
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analytics.kpi_catalog_processor import KPICatalogProcessor
+from src.analytics.vintages import (CELL_COLUMNS, build_vintage_curves,
+                                    load_vintage_curves, update_vintage_store)
+
+
+def _loan_month(loans: int = 200) -> pd.DataFrame:
+    rng = np.random.default_rng(8)
+    months = pd.date_range("2024-01-31", periods=10, freq="ME")
+    disbursed_at = pd.to_datetime(rng.choice(months[:6], loans)) - pd.Timedelta(days=10)
+    rows = []
+    for loan in range(loans):
+        amount = float(rng.uniform(1e3, 1e4))
+        for month in months[months >= disbursed_at[loan]]:
+            rows.append(
+                {
+                    "loan_id": f"L{loan}",
+                    "month_end": month,
+                    "disbursement_date": disbursed_at[loan],
+                    "disbursement_amount": amount,
+                    "cum_principal": amount * float(rng.uniform(0, 1)),
+                    "outstanding": amount * float(rng.choice([0.0, 0.5, 1.0])),
+                    "days_past_due": int(rng.choice([0, 35, 95])),
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def test_cells_match_per_cohort_aggregation():
+    frame = _loan_month()
+    curves = build_vintage_curves(frame).curves()
+
+    frame["cohort"] = frame["disbursement_date"].dt.to_period("M").astype(str)
+    frame["mob"] = (
+        frame["month_end"].dt.to_period("M") - frame["disbursement_date"].dt.to_period("M")
+    ).apply(lambda offset: offset.n)
+    active = frame["outstanding"] > 1e-4
+    for (cohort, mob), cell in frame.groupby(["cohort", "mob"]):
+        row = curves[(curves["cohort"] == cohort) & (curves["mob"] == mob)].iloc[0]
+        in_cell = active.loc[cell.index]
+        assert row["loans"] == len(cell)
+        assert row["outstanding"] == pytest.approx(cell.loc[in_cell, "outstanding"].sum())
+        dpd30 = cell.loc[in_cell & (cell["days_past_due"] >= 30), "outstanding"].sum()
+        assert row["dpd30_outstanding"] == pytest.approx(dpd30)
+        assert row["cum_collections"] == pytest.approx(cell["cum_principal"].sum())
+        assert row["dpd30_rate"] == pytest.approx(dpd30 / cell["disbursement_amount"].sum())
+
+    # Cumulative default curves never decrease along MOB
+    defaults = build_vintage_curves(_loan_month()).matrix("cum_default_disbursed")
+    assert (defaults.diff(axis=1).fillna(0) >= -1e-9).all().all()
+
+
+def test_incremental_update_matches_full_build():
+    frame = _loan_month()
+    cutoff = pd.Timestamp("2024-08-31")
+    partial = build_vintage_curves(frame[frame["month_end"] <= cutoff])
+    updated = partial.update(frame[frame["month_end"] > cutoff])
+    full = build_vintage_curves(frame)
+
+    pd.testing.assert_frame_equal(updated.cells, full.cells)
+    pd.testing.assert_series_equal(updated.defaulted.sort_index(), full.defaulted.sort_index())
+    with pytest.raises(ValueError):
+        updated.update(frame[frame["month_end"] == cutoff])
+
+
+def test_store_appends_only_new_months(tmp_path):
+    frame = _loan_month()
+    cutoff = pd.Timestamp("2024-06-30")
+    update_vintage_store(tmp_path, frame[frame["month_end"] <= cutoff])
+    stored = update_vintage_store(tmp_path, frame)
+
+    reloaded = load_vintage_curves(tmp_path)
+    assert reloaded.last_month == pd.Timestamp("2024-10-31")
+    pd.testing.assert_frame_equal(
+        reloaded.cells, build_vintage_curves(frame).cells, check_dtype=False
+    )
+    assert len(stored.cells) == len(reloaded.cells)
+    assert update_vintage_store(tmp_path, frame).last_month == reloaded.last_month
+
+
+def _scheduled_processor() -> KPICatalogProcessor:
+    # A pays the first installment and then stops; B prepays in full in month one
+    loans = pd.DataFrame(
+        {
+            "loan_id": ["A", "B"],
+            "customer_id": ["C1", "C1"],
+            "disbursement_date": ["2024-01-01", "2024-01-05"],
+            "disbursement_amount": [300.0, 300.0],
+            "days_past_due": [136, 0],
+        }
+    )
+    payments = pd.DataFrame(
+        {
+            "loan_id": ["A", "B"],
+            "true_payment_date": ["2024-01-14", "2024-01-20"],
+            "true_principal_payment": [100.0, 300.0],
+        }
+    )
+    schedule = pd.DataFrame(
+        {
+            "loan_id": ["A"] * 3 + ["B"] * 3,
+            "date_due": ["2024-01-15", "2024-02-15", "2024-03-15"] * 2,
+            "principal": [100.0] * 6,
+        }
+    )
+    customers = pd.DataFrame({"customer_id": ["C1"]})
+    processor = KPICatalogProcessor(loans, payments, customers, schedule)
+    processor.build_loan_month("2024-01-01", "2024-06-30")
+    return processor
+
+
+def test_default_and_prepayment_curves_follow_mob():
+    curves = _scheduled_processor().get_vintage_curves().set_index("mob")
+
+    assert curves["cohort"].unique().tolist() == ["2024-01"]
+    # A crosses 90 DPD in May (MOB 4), not at origination
+    assert curves["cum_default_rate"].tolist() == [0.0, 0.0, 0.0, 0.0, 0.5, 0.5]
+    assert curves["dpd30_outstanding"].tolist() == [0.0, 0.0, 200.0, 200.0, 200.0, 200.0]
+    # B's 300 against 100/200/300 scheduled; A never runs ahead
+    assert curves["cum_prepaid"].tolist() == [200.0, 100.0, 0.0, 0.0, 0.0, 0.0]
+    assert curves.loc[0, "prepayment_rate"] == pytest.approx(200 / 600)
+
+
+def test_prepayment_needs_scheduled_principal(tmp_path):
+    curves = build_vintage_curves(_loan_month()).curves()
+    assert curves["cum_prepaid"].isna().all()
+
+    # Stores written before the prepayment curve are rebuilt on the next update
+    frame = _loan_month()
+    build_vintage_curves(frame).save(tmp_path)
+    cells = pd.read_parquet(tmp_path / "cells.parquet").drop(columns=["cum_prepaid"])
+    cells.to_parquet(tmp_path / "cells.parquet", index=False)
+    assert load_vintage_curves(tmp_path).cells.empty
+    rebuilt = update_vintage_store(tmp_path, frame)
+    assert list(rebuilt.cells.columns) == CELL_COLUMNS
+    assert rebuilt.last_month == pd.Timestamp("2024-10-31")
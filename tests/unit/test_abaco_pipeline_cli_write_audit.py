@@ -52,7 +52,7 @@ def test_write_audit_dry_run_prints_enriched_payload(tmp_path, capsys, monkeypat
 
 
 @patch("src.abaco_pipeline.main.subprocess.check_output")
-@patch("src.abaco_pipeline.output.supabase_writer.requests.post")
+@patch("src.abaco_pipeline.output.supabase_writer.requests.Session.post")
 def test_write_audit_writes_to_supabase(mock_post: Mock, mock_git: Mock, tmp_path, monkeypatch):
     mock_git.return_value = b"abc123\n"
     mock_resp = Mock()
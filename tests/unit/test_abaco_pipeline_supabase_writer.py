@@ -1,14 +1,22 @@
 from __future__ import annotations
 
 import json
+import threading
+import time
 from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import Mock, patch
 
+import pandas as pd
+import pytest
+import requests
+
 from src.abaco_pipeline.output.supabase_writer import (SupabaseAuth,
-                                                       SupabaseWriter)
+                                                       SupabaseWriter,
+                                                       json_batches)
 
 
-@patch("src.abaco_pipeline.output.supabase_writer.requests.post")
+@patch("src.abaco_pipeline.output.supabase_writer.requests.Session.post")
 def test_upsert_pipeline_run_posts_expected_url_headers_and_body(mock_post: Mock):
     mock_resp = Mock()
     mock_resp.raise_for_status = Mock()
@@ -42,7 +50,7 @@ def test_upsert_pipeline_run_posts_expected_url_headers_and_body(mock_post: Mock
     assert body[0]["started_at"].startswith("2025-12-31T00:00:00")
 
 
-@patch("src.abaco_pipeline.output.supabase_writer.requests.post")
+@patch("src.abaco_pipeline.output.supabase_writer.requests.Session.post")
 def test_insert_kpi_values_noop_on_empty(mock_post: Mock):
     mock_resp = Mock()
     mock_resp.raise_for_status = Mock()
@@ -51,3 +59,163 @@ def test_insert_kpi_values_noop_on_empty(mock_post: Mock):
     writer = SupabaseWriter(SupabaseAuth(url="https://example.supabase.co", service_role_key="svc"))
     writer.insert_kpi_values([])
     mock_post.assert_not_called()
+
+
+class _PostgrestStandIn:
+    """Local HTTP server recording POSTed JSON arrays; fails the first ``failures`` calls."""
+
+    def __init__(self, failures: int = 0, delay: float = 0.0, status: int = 503) -> None:
+        self.bodies: list[list[dict]] = []
+        self.paths: list[str] = []
+        self.active = self.peak = self.calls = 0
+        self.failures = failures
+        self.lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self) -> None:  # noqa: N802
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                with stand_in.lock:
+                    stand_in.calls += 1
+                    stand_in.active += 1
+                    stand_in.peak = max(stand_in.peak, stand_in.active)
+                    fail = stand_in.failures > 0
+                    stand_in.failures -= int(fail)
+                time.sleep(delay)
+                with stand_in.lock:
+                    stand_in.active -= 1
+                    if not fail:
+                        stand_in.bodies.append(json.loads(body))
+                        stand_in.paths.append(self.path)
+                self.send_response(status if fail else 201)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def test_post_frame_streams_bounded_batches_concurrently():
+    stand_in = _PostgrestStandIn(delay=0.05)
+    frame = pd.DataFrame(
+        {
+            "id": range(2500),
+            "value": [1.5, None] * 1250,
+            "day": pd.date_range("2025-01-01", periods=2500, freq="h"),
+        }
+    )
+    try:
+        with SupabaseWriter(
+            SupabaseAuth(url=stand_in.url, service_role_key="svc"), max_in_flight=4
+        ) as writer:
+            written = writer.post_frame("raw", frame, max_rows=200, max_bytes=5_000)
+    finally:
+        stand_in.close()
+
+    assert written == 2500
+    rows = sorted((row for body in stand_in.bodies for row in body), key=lambda row: row["id"])
+    assert [row["id"] for row in rows] == list(range(2500))
+    assert all(len(json.dumps(body, separators=(",", ":"))) <= 5_000 for body in stand_in.bodies)
+    assert rows[0]["value"] == 1.5 and rows[1]["value"] is None
+    assert rows[0]["day"].startswith("2025-01-01T00:00:00")
+    assert 1 < stand_in.peak <= 4
+
+
+def test_json_batches_respect_row_and_byte_limits():
+    frame = pd.DataFrame({"id": range(10), "text": ["x" * 50] * 10})
+    batches = list(json_batches(frame, max_rows=4, max_bytes=10_000, chunk_rows=3))
+    assert [rows for _, rows in batches] == [4, 4, 2]
+    assert [len(json.loads(body)) for body, _ in batches] == [4, 4, 2]
+    single = list(json_batches(frame, max_rows=100, max_bytes=10))
+    assert len(single) == 10
+
+
+def test_retries_transient_errors_then_upserts_once():
+    stand_in = _PostgrestStandIn(failures=2)
+    try:
+        writer = SupabaseWriter(
+            SupabaseAuth(url=stand_in.url, service_role_key="svc"), retries=2, backoff=0
+        )
+        writer.upsert_rows("analytics_kpi_metrics", [{"kpi_name": "par_30"}, {"kpi_name": "x"}])
+    finally:
+        stand_in.close()
+    assert stand_in.bodies == [[{"kpi_name": "par_30"}, {"kpi_name": "x"}]]
+    assert stand_in.paths == ["/rest/v1/analytics_kpi_metrics"]
+
+
+def test_inserts_are_not_resent_after_a_server_error():
+    stand_in = _PostgrestStandIn(failures=1)
+    try:
+        writer = SupabaseWriter(
+            SupabaseAuth(url=stand_in.url, service_role_key="svc"), retries=2, backoff=0
+        )
+        with pytest.raises(requests.HTTPError):
+            writer.insert_kpi_values([{"kpi_name": "par_30"}])
+    finally:
+        stand_in.close()
+    # The 503 may have followed a commit, so the insert is sent exactly once
+    assert stand_in.calls == 1 and stand_in.bodies == []
+
+
+def test_inserts_are_retried_when_rejected_or_never_sent():
+    stand_in = _PostgrestStandIn(failures=1, status=429)
+    try:
+        writer = SupabaseWriter(
+            SupabaseAuth(url=stand_in.url, service_role_key="svc"), retries=2, backoff=0
+        )
+        writer.insert_kpi_values([{"kpi_name": "par_30"}])
+    finally:
+        stand_in.close()
+    assert stand_in.calls == 2 and stand_in.bodies == [[{"kpi_name": "par_30"}]]
+
+    ok = Mock(status_code=201)
+    writer = SupabaseWriter(
+        SupabaseAuth(url="https://example.supabase.co", service_role_key="svc"), backoff=0
+    )
+    with patch.object(writer._session, "post", side_effect=[requests.ConnectTimeout(), ok]) as post:
+        writer.insert_raw_artifacts([{"artifact": "a"}])
+    assert post.call_count == 2
+    with patch.object(writer._session, "post", side_effect=[requests.ReadTimeout(), ok]) as post:
+        with pytest.raises(requests.ReadTimeout):
+            writer.insert_raw_artifacts([{"artifact": "a"}])
+    assert post.call_count == 1
+    with patch.object(writer._session, "post", side_effect=[requests.ReadTimeout(), ok]) as post:
+        writer.upsert_rows("analytics_kpi_metrics", [{"kpi_name": "par_30"}])
+    assert post.call_count == 2
+
+
+def test_output_client_sends_kpis_in_one_request():
+    from src.integrations.supabase_client import SupabaseOutputClient
+
+    stand_in = _PostgrestStandIn()
+    try:
+        client = SupabaseOutputClient(url=stand_in.url, service_role_key="svc")
+        results = client.insert_kpi_metrics(
+            {"par_30": {"current_value": 0.1}, "par_90": {"current_value": 0.05}}, "run-1"
+        )
+        inserted = client.insert_raw_data(
+            pd.DataFrame({"loan_id": ["a", "b", "c"]}), "raw", "run-1", batch_size=2
+        )
+    finally:
+        stand_in.close()
+    assert results == {"par_30": True, "par_90": True}
+    assert inserted == 3
+    kpi_body = stand_in.bodies[stand_in.paths.index("/rest/v1/analytics_kpi_metrics")]
+    assert [row["kpi_name"] for row in kpi_body] == ["par_30", "par_90"]
+    raw_rows = [
+        row
+        for path, body in zip(stand_in.paths, stand_in.bodies)
+        if path == "/rest/v1/raw"
+        for row in body
+    ]
+    assert {row["run_id"] for row in raw_rows} == {"run-1"} and len(raw_rows) == 3